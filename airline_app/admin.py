@@ -1,5 +1,29 @@
-from django.contrib import admin
-from .models import Runway, Gate, Personnel, Aircraft, Flight, ResourceConstraint
+from django.contrib import admin, messages
+from django.contrib.admin.utils import flatten_fieldsets
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .admin_mixins import (
+    BulkResolveMixin,
+    CachedValuesFieldListFilter,
+    EstimatedCountMixin,
+)
+from .audit import ISSUE_LABELS, admin_window, audit_schedule
+from .bulk_actions import BulkActionError, cancel_flights, set_status, shift_flights
+from .forms import FlightActionForm, FlightAdminForm, ResourceConstraintForm
+from .models import (
+    Runway,
+    Gate,
+    Personnel,
+    Aircraft,
+    Flight,
+    ArchivedFlight,
+    Job,
+    SlotHold,
+    RecurringFlight,
+    ResourceConstraint,
+    StaleFlightError,
+)
 
 
 @admin.register(Runway)
@@ -83,9 +107,10 @@ class AircraftAdmin(admin.ModelAdmin):
 
 
 @admin.register(Flight)
-class FlightAdmin(admin.ModelAdmin):
+class FlightAdmin(EstimatedCountMixin, admin.ModelAdmin):
     """Interfaz de administración para el modelo de Vuelos."""
 
+    form = FlightAdminForm
     list_display = [
         "flight_number",
         "origin",
@@ -94,11 +119,32 @@ class FlightAdmin(admin.ModelAdmin):
         "arrival_time",
         "status",
         "get_duration_display",
+        "runway",
+        "gate",
+        "aircraft",
+        "pilot",
+    ]
+    list_select_related = ["runway", "gate", "aircraft", "pilot"]
+    list_filter = [
+        "status",
+        "departure_time",
+        ("origin", CachedValuesFieldListFilter),
+        ("destination", CachedValuesFieldListFilter),
     ]
-    list_filter = ["status", "departure_time", "origin", "destination"]
+    date_hierarchy = "departure_time"
     search_fields = ["flight_number", "origin", "destination"]
     ordering = ["-departure_time"]
-    filter_horizontal = ["copilots"]
+    # Validadas en conjunto y aplicadas con un solo UPDATE (ver ``airline_app.bulk_actions``)
+    actions = [
+        "cancel_selected",
+        "shift_selected",
+        "mark_in_progress",
+        "mark_completed",
+    ]
+    action_form = FlightActionForm
+    # Búsqueda bajo demanda en lugar de cargar todos los recursos en cada formulario
+    autocomplete_fields = ["runway", "gate", "aircraft", "pilot", "copilots"]
+    change_list_template = "admin/airline_app/flight/change_list.html"
 
     fieldsets = (
         (
@@ -107,9 +153,17 @@ class FlightAdmin(admin.ModelAdmin):
         ),
         ("Schedule", {"fields": ("departure_time", "arrival_time")}),
         ("Resource Assignment", {"fields": ("runway", "gate", "aircraft")}),
-        ("Crew Assignment", {"fields": ("pilot", "copilots")}),
+        ("Crew Assignment", {"fields": ("pilot", "copilots", "version")}),
     )
 
+    def get_form(self, request, obj=None, change=False, **kwargs):
+        # ``version`` es un campo declarado de FlightAdminForm (el del modelo no es editable)
+        fields = kwargs.get("fields") or flatten_fieldsets(
+            self.get_fieldsets(request, obj)
+        )
+        kwargs["fields"] = [field for field in fields if field != "version"]
+        return super().get_form(request, obj, change, **kwargs)
+
     def get_duration_display(self, obj):
         """Convierte las fechas en fechas legibles."""
         duration = obj.get_duration()
@@ -119,10 +173,88 @@ class FlightAdmin(admin.ModelAdmin):
 
     get_duration_display.short_description = "Duration"
 
+    def _apply_bulk_action(self, request, operation, success):
+        """Aplica una operación masiva y reporta el resultado o los vuelos rechazados."""
+        try:
+            count = operation()
+        except BulkActionError as e:
+            self.message_user(
+                request,
+                f"No se aplicó ningún cambio: {len(e.rejections)} vuelo(s) lo impiden.",
+                level=messages.ERROR,
+            )
+            for rejection in e.rejections[:20]:
+                self.message_user(
+                    request,
+                    f"{rejection.flight_number}: {rejection.message}",
+                    level=messages.ERROR,
+                )
+            return
+        self.message_user(request, success.format(count=count), messages.SUCCESS)
+
+    def cancel_selected(self, request, queryset):
+        ids = list(queryset.values_list("id", flat=True))
+        self._apply_bulk_action(
+            request, lambda: cancel_flights(ids), "{count} vuelo(s) cancelado(s)."
+        )
+
+    cancel_selected.short_description = "Cancelar los vuelos seleccionados"
+
+    def shift_selected(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        if not form.is_valid() or not form.cleaned_data["minutes"]:
+            self.message_user(
+                request,
+                "Indique los minutos a desplazar los vuelos.",
+                level=messages.ERROR,
+            )
+            return
+        ids = list(queryset.values_list("id", flat=True))
+        minutes = form.cleaned_data["minutes"]
+        self._apply_bulk_action(
+            request,
+            lambda: shift_flights(ids, minutes),
+            f"{{count}} vuelo(s) desplazado(s) {minutes} minuto(s).",
+        )
+
+    shift_selected.short_description = "Desplazar los vuelos seleccionados (minutos)"
+
+    def mark_in_progress(self, request, queryset):
+        ids = list(queryset.values_list("id", flat=True))
+        self._apply_bulk_action(
+            request,
+            lambda: set_status(ids, "IN_PROGRESS"),
+            "{count} vuelo(s) marcado(s) en progreso.",
+        )
+
+    mark_in_progress.short_description = "Marcar como en progreso"
+
+    def mark_completed(self, request, queryset):
+        ids = list(queryset.values_list("id", flat=True))
+        self._apply_bulk_action(
+            request,
+            lambda: set_status(ids, "COMPLETED"),
+            "{count} vuelo(s) marcado(s) como completado(s).",
+        )
+
+    mark_completed.short_description = "Marcar como completados"
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except StaleFlightError:
+            # La transacción de la vista ya se revirtió. Al procesar el envío de nuevo, el
+            # formulario carga la versión guardada y muestra la diferencia como error.
+            return super().changeform_view(request, object_id, form_url, extra_context)
+
     def save_model(self, request, obj, form, change):
         """Validaciones en general."""
         try:
             super().save_model(request, obj, form, change)
+        except StaleFlightError:
+            # Otro usuario guardó el vuelo entre la validación del formulario y el guardado
+            raise
         except Exception as e:
             self.message_user(request, f"Error saving flight: {str(e)}", level="error")
             raise
@@ -135,21 +267,130 @@ class FlightAdmin(admin.ModelAdmin):
         except Exception as e:
             self.message_user(request, f"Warning: {str(e)}", level="warning")
 
+    def get_urls(self):
+        urls = [
+            path(
+                "audit/",
+                self.admin_site.admin_view(self.audit_view),
+                name="airline_app_flight_audit",
+            )
+        ]
+        return urls + super().get_urls()
+
+    def audit_view(self, request):
+        """
+        Reporte de integridad del horario (ver ``airline_app.audit``) en la ventana acotada de
+        ``admin_window``; el historial completo se audita con ``manage.py audit_schedule``.
+        """
+        start, end = admin_window()
+        report = audit_schedule(start, end)
+        numbers = report.flight_numbers()
+        issues = [
+            {
+                "issue": issue,
+                "label": ISSUE_LABELS[issue.kind],
+                "flights": [(i, numbers.get(i, i)) for i in issue.flight_ids],
+            }
+            for issue in report.issues[:500]
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Auditoría del horario",
+            "report": report,
+            "window": (start, end),
+            "counts": [
+                (label, report.counts.get(kind, 0))
+                for kind, label in ISSUE_LABELS.items()
+            ],
+            "issues": issues,
+        }
+        return TemplateResponse(request, "admin/airline_app/flight/audit.html", context)
+
+
+@admin.register(ArchivedFlight)
+class ArchivedFlightAdmin(EstimatedCountMixin, admin.ModelAdmin):
+    """Consulta de solo lectura de los vuelos archivados (ver ``airline_app.archive``)."""
+
+    list_display = [
+        "flight_number",
+        "origin",
+        "destination",
+        "departure_time",
+        "arrival_time",
+        "status",
+        "archived_at",
+    ]
+    list_filter = ["status", "departure_time"]
+    date_hierarchy = "departure_time"
+    search_fields = ["flight_number", "origin", "destination"]
+    ordering = ["-departure_time"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RecurringFlight)
+class RecurringFlightAdmin(admin.ModelAdmin):
+    """Patrones de vuelos recurrentes (ver ``airline_app.recurrence``)."""
+
+    list_display = [
+        "flight_number",
+        "origin",
+        "destination",
+        "weekdays",
+        "departure_time",
+        "start_date",
+        "end_date",
+        "is_active",
+        "materialized_until",
+    ]
+    list_filter = ["is_active", "origin", "destination"]
+    search_fields = ["flight_number", "origin", "destination"]
+    ordering = ["flight_number"]
+    filter_horizontal = ["copilots"]
+    readonly_fields = ["materialized_until"]
+
+    fieldsets = (
+        ("Flight Information", {"fields": ("flight_number", "origin", "destination")}),
+        (
+            "Schedule",
+            {
+                "fields": (
+                    "weekdays",
+                    "departure_time",
+                    "duration_minutes",
+                    "start_date",
+                    "end_date",
+                    "is_active",
+                    "materialized_until",
+                )
+            },
+        ),
+        ("Resource Assignment", {"fields": ("runway", "gate", "aircraft")}),
+        ("Crew Assignment", {"fields": ("pilot", "copilots")}),
+    )
+
 
 @admin.register(ResourceConstraint)
-class ResourceConstraintAdmin(admin.ModelAdmin):
+class ResourceConstraintAdmin(BulkResolveMixin, admin.ModelAdmin):
     """Interfaz de administración para el modelo de Restricciones de Recursos."""
 
     list_display = [
         "name",
         "constraint_type",
         "primary_resource_type",
-        "primary_resource_id",
+        "get_primary_resource_display",
         "related_resource_type",
-        "related_resource_id",
+        "get_related_resource_display",
         "is_active",
         "created_at",
     ]
+    # Recursos de la página con una consulta por tipo en lugar de dos por fila
+    resolve_results = ResourceConstraint.resolve_resources
     list_filter = [
         "constraint_type",
         "is_active",
@@ -159,6 +400,9 @@ class ResourceConstraintAdmin(admin.ModelAdmin):
     ]
     search_fields = ["name", "description"]
     ordering = ["name"]
+    # Los recursos se eligen con los widgets de autocompletado del formulario: los IDs de la
+    # restricción no son claves foráneas, así que ``autocomplete_fields`` no aplica.
+    form = ResourceConstraintForm
     fieldsets = (
         (
             "Información Básica",
@@ -166,11 +410,86 @@ class ResourceConstraintAdmin(admin.ModelAdmin):
         ),
         (
             "Recurso Primario",
-            {"fields": ("primary_resource_type", "primary_resource_id")},
+            {
+                "fields": (
+                    "primary_resource_type",
+                    "primary_runway",
+                    "primary_gate",
+                    "primary_aircraft",
+                    "primary_personnel",
+                )
+            },
         ),
         (
             "Recurso Relacionado",
-            {"fields": ("related_resource_type", "related_resource_id")},
+            {
+                "fields": (
+                    "related_resource_type",
+                    "related_runway",
+                    "related_gate",
+                    "related_aircraft",
+                    "related_personnel",
+                )
+            },
         ),
     )
 
+    def get_primary_resource_display(self, obj):
+        """Recurso primario por su nombre (el ID si ya no existe)."""
+        return obj.get_primary_resource() or obj.primary_resource_id
+
+    get_primary_resource_display.short_description = "Recurso Primario"
+
+    def get_related_resource_display(self, obj):
+        """Recurso relacionado por su nombre (el ID si ya no existe)."""
+        return obj.get_related_resource() or obj.related_resource_id
+
+    get_related_resource_display.short_description = "Recurso Relacionado"
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Trabajos en segundo plano (ver ``airline_app.jobs``)."""
+
+    list_display = [
+        "id",
+        "kind",
+        "status",
+        "progress",
+        "worker",
+        "created_at",
+        "started_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "kind"]
+    search_fields = ["kind", "worker"]
+    readonly_fields = [
+        "status",
+        "progress",
+        "progress_message",
+        "result",
+        "error",
+        "worker",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "updated_at",
+    ]
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    """Reservas temporales de horarios (ver ``airline_app.holds``)."""
+
+    list_display = [
+        "start_time",
+        "end_time",
+        "runway",
+        "gate",
+        "aircraft",
+        "pilot",
+        "expires_at",
+    ]
+    list_filter = ["expires_at"]
+    ordering = ["expires_at"]
+    list_select_related = ["runway", "gate", "aircraft", "pilot"]
@@ -0,0 +1,149 @@
+"""
+Mixins de rendimiento para los listados del admin.
+
+Con millones de vuelos, el listado por defecto del admin hace trabajo proporcional a la tabla
+en cada página: ``COUNT(*)`` del resultado y del total, ``SELECT DISTINCT`` por cada filtro de
+valores y conteos por opción (facets). Estos mixins lo acotan:
+
+- ``EstimatedCountMixin``: cuenta exacto solo hasta ``EXACT_COUNT_LIMIT`` filas y estima más
+  allá; sin conteo del total ni facets.
+- ``CachedValuesFieldListFilter``: las opciones de un filtro de valores salen de la caché durante
+  ``ADMIN_FILTER_CACHE_TIMEOUT`` segundos.
+- ``BulkResolveMixin``: resuelve en bloque lo que muestra cada fila de la página (por ejemplo, los
+  recursos de las restricciones) en lugar de una consulta por fila.
+"""
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+# Filas que se cuentan exactamente antes de recurrir a la estimación
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimated_table_rows(model, using="default"):
+    """
+    Cantidad aproximada de filas de la tabla del modelo, sin recorrerla; None si la base no
+    tiene estadísticas.
+
+    PostgreSQL la toma de las estadísticas del planificador (``pg_class.reltuples``) y SQLite de
+    las de ``ANALYZE`` (``sqlite_stat1``). Ambas siguen a las filas borradas (por ejemplo, al
+    archivar), a diferencia del mayor ID.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [table],
+            )
+            row = cursor.fetchone()
+            # -1 si la tabla nunca se analizó
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            except DatabaseError:
+                # La tabla de estadísticas no existe hasta el primer ANALYZE
+                return None
+            # Cada fila empieza con la cantidad de filas de la tabla (o del índice)
+            counts = [int(stat.split()[0]) for (stat,) in cursor.fetchall()]
+            return max(counts, default=None)
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador que no cuenta más de ``EXACT_COUNT_LIMIT`` filas.
+
+    Hasta el límite el conteo es exacto. Más allá, un listado sin filtros usa el tamaño estimado
+    de la tabla y uno filtrado (o sin estadísticas) se reporta con el límite. Como el conteo no
+    es exacto, se puede pedir cualquier página: las que pasan de la estimación se leen igual y,
+    si tienen filas, extienden el conteo hasta la página siguiente (el enlace "siguiente").
+    """
+
+    # Si el conteo pasó del límite (se calcula junto con ``count``)
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        exact = queryset.order_by().values("pk")[: EXACT_COUNT_LIMIT + 1].count()
+        if exact <= EXACT_COUNT_LIMIT:
+            return exact
+        self.estimated = True
+        if queryset.query.has_filters():
+            return exact
+        return max(exact, estimated_table_rows(queryset.model, queryset.db) or 0)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if number < 1 or not (self.count and self.estimated):
+                raise
+            return number
+
+    def page(self, number):
+        if not (self.count and self.estimated):
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom : bottom + self.per_page])
+        if not object_list:
+            raise EmptyPage(self.error_messages["no_results"])
+        # Hay al menos estas filas, y una página más si esta está llena
+        seen = bottom + len(object_list) + (len(object_list) == self.per_page)
+        if seen > self.count:
+            self.count = seen
+            self.__dict__.pop("num_pages", None)
+        return self._get_page(object_list, number, self)
+
+
+class EstimatedCountMixin:
+    """Listado sin conteos proporcionales a la tabla (ver ``EstimatedCountPaginator``)."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+
+class CachedValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """
+    Filtro por los valores distintos de un campo, con las opciones en caché.
+
+    ``SELECT DISTINCT`` recorre la tabla completa; los valores nuevos (un origen que no existía)
+    aparecen en el filtro al vencer la caché, a lo sumo ``ADMIN_FILTER_CACHE_TIMEOUT`` segundos
+    después.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        choices = self.lookup_choices
+        self.lookup_choices = cache.get_or_set(
+            f"airline_app:admin-filter:{model._meta.label_lower}:{field_path}",
+            lambda: list(choices),
+            getattr(settings, "ADMIN_FILTER_CACHE_TIMEOUT", 600),
+        )
+
+
+class BulkResolveMixin:
+    """
+    Pasa la página del listado por ``resolve_results`` antes de renderizarla.
+
+    ``resolve_results`` recibe las filas de la página y las retorna (como lista) con lo que
+    muestran las columnas ya cargado, en un número de consultas que no depende de las filas.
+    """
+
+    resolve_results = None
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        if self.resolve_results is not None:
+            changelist.result_list = self.resolve_results(changelist.result_list)
+        return changelist
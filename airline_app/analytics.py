@@ -0,0 +1,394 @@
+"""
+Analítica de utilización y capacidad.
+
+Todas las métricas se calculan sobre un periodo ``[start, end)`` con los vuelos no cancelados,
+recortando cada vuelo a los límites del periodo:
+
+- Porcentaje de ocupación por recurso (pistas, puertas, aeronaves y personal).
+- Pico de vuelos simultáneos por hora y terminal.
+- Horas bloque por aeronave y semana.
+- Vuelos por ruta.
+
+La ocupación y las horas bloque se agregan en la base de datos (``Sum`` sobre la duración
+recortada, agrupado por recurso o por semana). El pico de simultaneidad no se puede agregar con
+el ORM: se obtiene con una sola consulta columnar (terminal, salida, llegada) y un barrido de
+eventos en memoria, como en ``airline_app.audit``.
+
+Los periodos de días completos ya agregados en las tablas de rollup (``airline_app.rollups``)
+leen la ocupación, las horas bloque y las rutas de esas tablas en lugar de recorrer los vuelos;
+ahí cada vuelo cuenta entero en el día de su salida.
+
+``period_report`` reúne las métricas y las guarda en la caché de Django. La clave incluye una
+huella de los datos del periodo (la hora del último rollup, o la cantidad y última modificación
+de sus vuelos), de modo que cualquier cambio invalida el informe sin depender de señales.
+"""
+
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DateTimeField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Greatest, Least, TruncWeek
+from django.utils import timezone
+
+from .availability import RESOURCE_MODELS
+from .models import Aircraft, DailyResourceRollup, DailyRouteRollup, Flight, RollupDay
+
+# Estados que no ocupan recursos en los informes
+EXCLUDED_STATUSES = ["CANCELLED"]
+
+# Cantidad de rutas listadas en el informe
+TOP_ROUTES = 20
+
+# utilization: fracción del periodo (0-1) en que el recurso estuvo asignado a un vuelo
+ResourceUsage = namedtuple(
+    "ResourceUsage", ["resource_id", "label", "flights", "occupied", "utilization"]
+)
+
+
+def period_flights(start, end):
+    """Vuelos no cancelados que se solapan con el periodo."""
+    return Flight.objects.exclude(status__in=EXCLUDED_STATUSES).filter(
+        departure_time__lt=end, arrival_time__gt=start
+    )
+
+
+def clipped_duration(start, end, prefix=""):
+    """Expresión con la duración del vuelo recortada al periodo ``[start, end)``."""
+    return ExpressionWrapper(
+        Least(F(f"{prefix}arrival_time"), Value(end, output_field=DateTimeField()))
+        - Greatest(
+            F(f"{prefix}departure_time"), Value(start, output_field=DateTimeField())
+        ),
+        output_field=DurationField(),
+    )
+
+
+def _occupied_by_resource(resource_type, start, end):
+    """{id_recurso: (vuelos, tiempo ocupado)} con una consulta (dos para el personal)."""
+    if resource_type != "personnel":
+        rows = (
+            period_flights(start, end)
+            .values_list(f"{resource_type}_id")
+            .annotate(flights=Count("id"), occupied=Sum(clipped_duration(start, end)))
+            .order_by()
+        )
+        return {
+            resource_id: (flights, occupied) for resource_id, flights, occupied in rows
+        }
+
+    # El personal ocupa tiempo como piloto y como copiloto
+    occupied = dict(
+        (pilot_id, (flights, duration))
+        for pilot_id, flights, duration in period_flights(start, end)
+        .values_list("pilot_id")
+        .annotate(flights=Count("id"), occupied=Sum(clipped_duration(start, end)))
+        .order_by()
+    )
+    copilots = (
+        Flight.copilots.through.objects.filter(
+            flight__in=period_flights(start, end).values("id")
+        )
+        .values_list("personnel_id")
+        .annotate(
+            flights=Count("flight_id"),
+            occupied=Sum(clipped_duration(start, end, prefix="flight__")),
+        )
+        .order_by()
+    )
+    for personnel_id, flights, duration in copilots:
+        previous_flights, previous_duration = occupied.get(
+            personnel_id, (0, timedelta())
+        )
+        occupied[personnel_id] = (
+            previous_flights + flights,
+            previous_duration + duration,
+        )
+    return occupied
+
+
+def _rolled_up_by_resource(resource_type, days):
+    """{id_recurso: (vuelos, tiempo ocupado)} desde los rollups diarios (una consulta)."""
+    rows = (
+        DailyResourceRollup.objects.filter(
+            resource_type=resource_type, date__range=days
+        )
+        .values_list("resource_id")
+        .annotate(flights=Sum("flights"), minutes=Sum("occupied_minutes"))
+        .order_by()
+    )
+    return {
+        resource_id: (flights, timedelta(minutes=minutes))
+        for resource_id, flights, minutes in rows
+    }
+
+
+def resource_utilization(resource_type, start, end, days=None):
+    """
+    Ocupación de cada recurso del tipo dado durante el periodo.
+
+    Args:
+        days: Rango ``(primer_día, último_día)`` a leer de los rollups (None = vuelos)
+
+    Returns:
+        list[ResourceUsage]: Todos los recursos, ordenados de mayor a menor ocupación
+    """
+    if days:
+        occupied = _rolled_up_by_resource(resource_type, days)
+    else:
+        occupied = _occupied_by_resource(resource_type, start, end)
+    period = (end - start).total_seconds()
+    usages = []
+    for resource in RESOURCE_MODELS[resource_type].objects.order_by("pk"):
+        flights, duration = occupied.get(resource.pk, (0, timedelta()))
+        usages.append(
+            ResourceUsage(
+                resource.pk,
+                str(resource),
+                flights,
+                duration,
+                duration.total_seconds() / period if period else 0,
+            )
+        )
+    usages.sort(key=lambda usage: (-usage.utilization, usage.resource_id))
+    return usages
+
+
+def peak_concurrency(start, end):
+    """
+    Pico de vuelos simultáneos por hora en cada terminal (según la puerta asignada).
+
+    Returns:
+        dict: {terminal: {inicio_de_hora: pico}}, solo las horas con algún vuelo
+    """
+    rows = (
+        period_flights(start, end)
+        .values_list("gate__terminal", "departure_time", "arrival_time")
+        .order_by()
+    )
+    events = defaultdict(list)
+    for terminal, departure, arrival in rows:
+        # Las llegadas (-1) se ordenan antes que las salidas (+1) del mismo instante
+        events[terminal].append((max(departure, start), 1))
+        events[terminal].append((min(arrival, end), -1))
+
+    hour = timedelta(hours=1)
+    peaks = {}
+    for terminal, terminal_events in events.items():
+        terminal_events.sort()
+        hourly = {}
+        current = 0
+        bucket = None
+        for instant, delta in terminal_events:
+            instant_bucket = instant.replace(minute=0, second=0, microsecond=0)
+            if current and bucket < instant_bucket:
+                # Las horas entre eventos conservan la simultaneidad con la que empiezan
+                while bucket + hour < instant_bucket:
+                    bucket += hour
+                    hourly[bucket] = max(hourly.get(bucket, 0), current)
+                if instant > instant_bucket:
+                    hourly[instant_bucket] = max(hourly.get(instant_bucket, 0), current)
+            bucket = instant_bucket
+            current += delta
+            if current:
+                hourly[bucket] = max(hourly.get(bucket, 0), current)
+        peaks[terminal] = hourly
+    return peaks
+
+
+def block_hours_by_week(start, end, days=None):
+    """
+    Horas bloque (tiempo de vuelo) de cada aeronave por semana, agregadas en la base de datos.
+
+    Args:
+        days: Rango ``(primer_día, último_día)`` a leer de los rollups (None = vuelos)
+
+    Returns:
+        tuple: (semanas ordenadas, {matrícula: {semana: horas}})
+    """
+    if days:
+        rows = (
+            DailyResourceRollup.objects.filter(
+                resource_type="aircraft", date__range=days
+            )
+            .annotate(week=TruncWeek("date"))
+            .values_list("resource_id", "week")
+            .annotate(block=Sum("occupied_minutes"))
+            .order_by()
+        )
+        rows = list(rows)
+        registrations = dict(
+            Aircraft.objects.filter(id__in={row[0] for row in rows}).values_list(
+                "id", "registration_number"
+            )
+        )
+        rows = [
+            (registrations.get(aircraft_id), week, timedelta(minutes=minutes))
+            for aircraft_id, week, minutes in rows
+        ]
+    else:
+        rows = (
+            period_flights(start, end)
+            .annotate(week=TruncWeek("departure_time"))
+            .values_list("aircraft__registration_number", "week")
+            .annotate(block=Sum(clipped_duration(start, end)))
+            .order_by()
+        )
+    weeks = set()
+    hours = defaultdict(dict)
+    for registration, week, block in rows:
+        week = week.date() if isinstance(week, datetime) else week
+        weeks.add(week)
+        hours[registration][week] = block.total_seconds() / 3600
+    return sorted(weeks), dict(hours)
+
+
+def top_routes(start, end, days=None, limit=TOP_ROUTES):
+    """
+    Rutas con más vuelos en el periodo.
+
+    Returns:
+        list: Tuplas (origen, destino, vuelos), de mayor a menor
+    """
+    if days:
+        routes = DailyRouteRollup.objects.filter(date__range=days).values_list(
+            "origin", "destination"
+        )
+        routes = routes.annotate(flights=Sum("flights"))
+    else:
+        routes = (
+            period_flights(start, end)
+            .values_list("origin", "destination")
+            .annotate(flights=Count("id"))
+        )
+    return list(routes.order_by("-flights", "origin", "destination")[:limit])
+
+
+def rollup_days(start, end):
+    """
+    Rango de días del periodo si está completamente agregado en los rollups.
+
+    Returns:
+        tuple | None: ``(primer_día, último_día, hora_del_último_rollup)``, o None si el
+        periodo no empieza y termina a medianoche local o le falta algún día por agregar
+    """
+    first, last = timezone.localdate(start), timezone.localdate(end) - timedelta(days=1)
+    if (
+        last < first
+        or timezone.localtime(start).time() != datetime.min.time()
+        or timezone.localtime(end).time() != datetime.min.time()
+    ):
+        return None
+    coverage = RollupDay.objects.filter(
+        date__range=(first, last), stale=False
+    ).aggregate(days=Count("id"), computed_at=Max("computed_at"))
+    if coverage["days"] != (last - first).days + 1:
+        return None
+    return first, last, coverage["computed_at"]
+
+
+def data_version(start, end):
+    """Huella de los vuelos del periodo: cambia si se crea, edita o elimina alguno."""
+    stamp = Flight.objects.filter(
+        departure_time__lt=end, arrival_time__gt=start
+    ).aggregate(count=Count("id"), updated=Max("updated_at"))
+    updated = stamp["updated"].isoformat() if stamp["updated"] else "-"
+    return f"{stamp['count']}:{updated}"
+
+
+class PeriodReport:
+    """Métricas de un periodo, listas para mostrar y cachear."""
+
+    def __init__(
+        self,
+        start,
+        end,
+        utilization,
+        peaks,
+        weeks,
+        block_hours,
+        routes,
+        elapsed,
+        rolled_up_at=None,
+    ):
+        self.start = start
+        self.end = end
+        # {tipo_recurso: [ResourceUsage]}
+        self.utilization = utilization
+        self.peaks = peaks
+        self.weeks = weeks
+        self.block_hours = block_hours
+        self.routes = routes
+        self.elapsed = elapsed
+        # Hora del rollup del que se leyó el informe (None = calculado sobre los vuelos)
+        self.rolled_up_at = rolled_up_at
+
+    def hourly_profile(self):
+        """Pico por hora del día (0-23) en cada terminal, en la zona horaria local."""
+        profile = {}
+        for terminal, hourly in self.peaks.items():
+            by_hour = [0] * 24
+            for bucket, peak in hourly.items():
+                local_hour = timezone.localtime(bucket).hour
+                by_hour[local_hour] = max(by_hour[local_hour], peak)
+            profile[terminal] = by_hour
+        return profile
+
+
+def compute_report(start, end, coverage=None):
+    """
+    Calcula todas las métricas del periodo sin pasar por la caché.
+
+    Args:
+        coverage: Resultado de ``rollup_days``; si se indica, la ocupación, las horas bloque
+            y las rutas se leen de los rollups
+    """
+    started = time.perf_counter()
+    days = coverage[:2] if coverage else None
+    utilization = {
+        resource_type: resource_utilization(resource_type, start, end, days)
+        for resource_type in RESOURCE_MODELS
+    }
+    peaks = peak_concurrency(start, end)
+    weeks, block_hours = block_hours_by_week(start, end, days)
+    return PeriodReport(
+        start,
+        end,
+        utilization,
+        peaks,
+        weeks,
+        block_hours,
+        top_routes(start, end, days),
+        time.perf_counter() - started,
+        coverage[2] if coverage else None,
+    )
+
+
+def period_report(start, end):
+    """
+    Informe del periodo, desde la caché si sus datos no cambiaron.
+
+    Lee de los rollups si el periodo está completamente agregado. La duración de la caché se
+    configura con ``ANALYTICS_CACHE_TIMEOUT`` (segundos).
+    """
+    coverage = rollup_days(start, end)
+    version = (
+        f"rollups:{coverage[2].isoformat()}" if coverage else data_version(start, end)
+    )
+    key = f"airline_app:analytics:{start.isoformat()}:{end.isoformat()}:{version}"
+    report = cache.get(key)
+    if report is None:
+        report = compute_report(start, end, coverage)
+        cache.set(key, report, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 900))
+    return report
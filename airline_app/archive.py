@@ -0,0 +1,126 @@
+"""
+Archivo de vuelos completados y cancelados.
+
+La tabla de vuelos la consultan todas las verificaciones de disponibilidad, los listados y el
+admin; los vuelos terminados hace tiempo solo la hacen crecer. ``archive_flights`` los mueve por
+lotes a ``ArchivedFlight`` (con sus copilotos), cada lote en una transacción.
+
+El archivo respeta el mantenimiento de 24 horas de las aeronaves: un vuelo solo se archiva si
+su llegada más el mantenimiento queda antes del límite de retención, de modo que ningún vuelo
+posterior al límite pierde de vista un vuelo que lo bloquee, y el último vuelo completado de
+cada aeronave nunca se archiva.
+
+Los vuelos archivados se consultan explícitamente: ``ArchivedFlight.objects`` o la opción
+"Incluir archivados" de la búsqueda de vuelos.
+
+Uso:
+    python manage.py archive_flights --retention-days 365 --batch-size 1000
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .availability import MAINTENANCE_BUFFER
+from .models import ArchivedFlight, Flight
+
+ARCHIVABLE_STATUSES = ["COMPLETED", "CANCELLED"]
+
+DEFAULT_RETENTION_DAYS = 365
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Columnas copiadas de Flight a ArchivedFlight
+ARCHIVED_FIELDS = [
+    "id",
+    "flight_number",
+    "origin",
+    "destination",
+    "departure_time",
+    "arrival_time",
+    "status",
+    "runway_id",
+    "gate_id",
+    "aircraft_id",
+    "pilot_id",
+    "created_at",
+    "updated_at",
+]
+
+
+def archive_cutoff(now=None, retention_days=None):
+    """Los vuelos que llegaron (más el mantenimiento) antes de este instante se archivan."""
+    if retention_days is None:
+        retention_days = getattr(
+            settings, "FLIGHT_ARCHIVE_RETENTION_DAYS", DEFAULT_RETENTION_DAYS
+        )
+    return (now or timezone.now()) - timedelta(days=retention_days)
+
+
+def archivable_flights(cutoff):
+    """Vuelos completados o cancelados que se pueden archivar sin afectar validaciones."""
+    latest_completed = (
+        Flight.objects.filter(aircraft=OuterRef("aircraft"), status="COMPLETED")
+        .order_by("-arrival_time", "-id")
+        .values("id")[:1]
+    )
+    return Flight.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        arrival_time__lt=cutoff - MAINTENANCE_BUFFER,
+    ).exclude(Q(status="COMPLETED") & Q(id=Subquery(latest_completed)))
+
+
+def archive_batch(ids):
+    """
+    Mueve los vuelos dados a ``ArchivedFlight`` con sus copilotos, en una transacción.
+
+    Returns:
+        int: Cantidad de vuelos archivados
+    """
+    with transaction.atomic():
+        rows = list(Flight.objects.filter(id__in=ids).values(*ARCHIVED_FIELDS))
+        archived = ArchivedFlight.objects.bulk_create(
+            [ArchivedFlight(original_id=row.pop("id"), **row) for row in rows]
+        )
+        archived_ids = {flight.original_id: flight.pk for flight in archived}
+
+        Through = ArchivedFlight.copilots.through
+        Through.objects.bulk_create(
+            [
+                Through(
+                    archivedflight_id=archived_ids[flight_id], personnel_id=personnel_id
+                )
+                for flight_id, personnel_id in Flight.copilots.through.objects.filter(
+                    flight_id__in=archived_ids
+                ).values_list("flight_id", "personnel_id")
+            ]
+        )
+        Flight.objects.filter(id__in=archived_ids).delete()
+    return len(archived_ids)
+
+
+def archive_flights(retention_days=None, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Archiva por lotes los vuelos completados y cancelados fuera de la retención.
+
+    Args:
+        retention_days: Días que los vuelos terminados permanecen en la tabla de vuelos
+            (por defecto ``FLIGHT_ARCHIVE_RETENTION_DAYS``)
+        batch_size: Vuelos por lote; cada lote es una transacción
+
+    Yields:
+        int: Cantidad de vuelos archivados en cada lote
+    """
+    cutoff = archive_cutoff(now, retention_days)
+    while True:
+        ids = list(
+            archivable_flights(cutoff)
+            .order_by("departure_time", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield archive_batch(ids)
@@ -0,0 +1,213 @@
+"""
+Auditoría de integridad del horario.
+
+Los datos editados directamente en la base de datos, con actualizaciones masivas o desde el
+admin (cuyo ``save_related`` solo advierte) pueden dejar reservas superpuestas. La auditoría
+carga todos los vuelos bloqueantes con dos consultas (ver ``airline_app.occupancy``), recorre
+la línea de tiempo de cada recurso con un barrido (sweep-line) en O(n log n) y reporta:
+
+- Solapamientos de pistas, puertas y personal (piloto o copiloto).
+- Violaciones del mantenimiento de 24 horas entre vuelos de una misma aeronave.
+- Vuelos con menos copilotos de los requeridos por su duración.
+- Vuelos que violan restricciones de recursos activas.
+
+Uso:
+    python manage.py audit_schedule --start 2025-01-01 --end 2026-01-01
+
+El reporte del admin audita solo ``admin_window`` (hoy ± ``AUDIT_ADMIN_WINDOW_DAYS`` días); el
+historial completo se audita con el comando.
+"""
+
+import heapq
+import time
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .availability import BLOCKING_STATUSES, MAINTENANCE_BUFFER
+from .constraints import ConstraintIndex, flight_resources
+from .generator import required_copilots
+from .occupancy import Occupancy
+
+OVERLAP = "overlap"
+MAINTENANCE = "maintenance_buffer"
+INSUFFICIENT_COPILOTS = "insufficient_copilots"
+CONSTRAINT_VIOLATION = "constraint_violation"
+
+DEFAULT_ADMIN_WINDOW_DAYS = 7
+
+ISSUE_LABELS = {
+    OVERLAP: "Solapamiento de recurso",
+    MAINTENANCE: "Mantenimiento de 24 horas no respetado",
+    INSUFFICIENT_COPILOTS: "Copilotos insuficientes",
+    CONSTRAINT_VIOLATION: "Restricción violada",
+}
+
+# kind: uno de ISSUE_LABELS; flight_ids: vuelos involucrados; detail: texto legible
+Issue = namedtuple(
+    "Issue",
+    ["kind", "resource_type", "resource_id", "flight_ids", "start", "detail"],
+)
+
+
+def sweep_overlaps(intervals, padding=None):
+    """
+    Pares de intervalos que se solapan, con un barrido sobre intervalos ordenados.
+
+    Mantiene un heap con el fin de los intervalos abiertos: al llegar un intervalo se
+    descartan los que ya terminaron y todos los que quedan se solapan con él. El costo es
+    O(n log n + k), con k la cantidad de pares reportados.
+
+    Args:
+        intervals: Iterable de (inicio, fin, id_vuelo) ordenado por inicio
+        padding: Tiempo extra tras el fin de cada intervalo (mantenimiento de aeronaves)
+
+    Yields:
+        tuple: (intervalo_anterior, intervalo)
+    """
+    open_intervals = []
+    for interval in intervals:
+        start = interval[0]
+        while open_intervals and open_intervals[0][0] <= start:
+            heapq.heappop(open_intervals)
+        for _, previous in open_intervals:
+            if previous[2] != interval[2]:
+                yield previous, interval
+        end = interval[1] + padding if padding else interval[1]
+        heapq.heappush(open_intervals, (end, interval))
+
+
+class AuditReport:
+    """Resultado de ``audit_schedule``."""
+
+    def __init__(self, issues, flights_checked, elapsed):
+        self.issues = issues
+        self.flights_checked = flights_checked
+        self.elapsed = elapsed
+
+    @property
+    def counts(self):
+        return Counter(issue.kind for issue in self.issues)
+
+    @property
+    def flight_ids(self):
+        return {flight_id for issue in self.issues for flight_id in issue.flight_ids}
+
+    def __bool__(self):
+        return bool(self.issues)
+
+    def flight_numbers(self):
+        """Números de los vuelos involucrados, con una sola consulta."""
+        from .models import Flight
+
+        return dict(
+            Flight.objects.filter(id__in=self.flight_ids).values_list(
+                "id", "flight_number"
+            )
+        )
+
+
+def admin_window(now=None, days=None):
+    """Ventana del reporte del admin: desde ``days`` días antes hasta ``days`` días después."""
+    if days is None:
+        days = getattr(settings, "AUDIT_ADMIN_WINDOW_DAYS", DEFAULT_ADMIN_WINDOW_DAYS)
+    now = now or timezone.now()
+    return now - timedelta(days=days), now + timedelta(days=days)
+
+
+def audit_schedule(
+    start=None, end=None, occupancy=None, constraints=None, progress=None
+):
+    """
+    Audita los vuelos bloqueantes (SCHEDULED, IN_PROGRESS y COMPLETED).
+
+    Args:
+        start, end: Ventana a auditar (por defecto, todo el historial)
+        occupancy: Ocupación ya cargada (por defecto se carga con ``Occupancy.load``)
+        constraints: ConstraintIndex ya cargado (por defecto, las restricciones activas)
+        progress: Función ``(hecho, total, mensaje)`` que recibe el avance por recurso y
+            por vuelo revisado (por ejemplo, ``jobs.throttled_progress``)
+
+    Returns:
+        AuditReport: Inconsistencias encontradas, ordenadas por fecha
+    """
+    started = time.perf_counter()
+    if occupancy is None:
+        occupancy = Occupancy.load(start, end, recurring=False)
+    if constraints is None:
+        constraints = ConstraintIndex.load()
+
+    issues = []
+    total = len(occupancy.timelines) + len(occupancy.flights)
+    done = 0
+    for (resource_type, resource_id), timeline in occupancy.timelines.items():
+        if progress:
+            progress(done, total, "Revisando solapamientos")
+        done += 1
+        padding = MAINTENANCE_BUFFER if resource_type == "aircraft" else None
+        kind = MAINTENANCE if padding else OVERLAP
+        for previous, current in sweep_overlaps(timeline, padding):
+            issues.append(
+                Issue(
+                    kind,
+                    resource_type,
+                    resource_id,
+                    (previous[2], current[2]),
+                    current[0],
+                    f"{resource_type} {resource_id}: vuelos {previous[2]} y "
+                    f"{current[2]}",
+                )
+            )
+
+    for flight_id, (departure, arrival, status, resources) in occupancy.flights.items():
+        if progress:
+            progress(done, total, "Revisando copilotos y restricciones")
+        done += 1
+        pilot_ids = resources["personnel"][:1]
+        copilots = len(resources["personnel"]) - len(pilot_ids)
+        required = required_copilots((arrival - departure).total_seconds() / 60)
+        if copilots < required:
+            issues.append(
+                Issue(
+                    INSUFFICIENT_COPILOTS,
+                    "personnel",
+                    None,
+                    (flight_id,),
+                    departure,
+                    f"vuelo {flight_id}: {copilots} de {required} copilotos",
+                )
+            )
+
+        # Las restricciones se evalúan sobre vuelos vigentes: pueden haberse creado después
+        # de vuelos ya completados.
+        if status not in BLOCKING_STATUSES:
+            continue
+        violated = constraints.violations(
+            flight_resources(
+                *(
+                    ids[0] if ids else None
+                    for ids in (
+                        resources["runway"],
+                        resources["gate"],
+                        resources["aircraft"],
+                        pilot_ids,
+                    )
+                )
+            )
+        )
+        for rule in violated:
+            issues.append(
+                Issue(
+                    CONSTRAINT_VIOLATION,
+                    rule.primary_resource_type,
+                    rule.primary_resource_id,
+                    (flight_id,),
+                    departure,
+                    f'vuelo {flight_id}: "{rule.name}"',
+                )
+            )
+
+    issues.sort(key=lambda issue: (issue.start, issue.kind, issue.flight_ids))
+    return AuditReport(issues, len(occupancy.flights), time.perf_counter() - started)
@@ -0,0 +1,82 @@
+"""
+Búsqueda paginada de recursos para los widgets de autocompletado.
+
+Los formularios con muchos recursos (restricciones, búsqueda de horarios) no renderizan la
+tabla completa en el ``<select>``: el widget ``AutocompleteSelect`` solo incluye lo seleccionado
+y pide el resto a ``/recursos/<tipo>/buscar/`` a medida que el usuario escribe. Cada página es
+una consulta: búsqueda por prefijo sobre columnas indexadas, en el orden del modelo (también
+indexado) y ``AUTOCOMPLETE_PAGE_SIZE + 1`` filas para saber si hay más sin contar el total.
+
+La búsqueda no distingue mayúsculas y compara ``UPPER(columna)``, que tiene su propio índice
+funcional (migración 0013): ``istartswith`` no podría usarlo.
+"""
+
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Upper
+from django.db.models.lookups import GreaterThanOrEqual, LessThan, StartsWith
+
+from .availability import RESOURCE_MODELS, base_queryset
+
+AUTOCOMPLETE_PAGE_SIZE = 20
+
+# Columnas (indexadas) en las que busca el texto ingresado, por tipo de recurso
+SEARCH_FIELDS = {
+    "runway": ["runway_code", "name"],
+    "gate": ["gate_code", "name"],
+    "aircraft": ["registration_number"],
+    "personnel": ["last_name", "first_name", "employee_id"],
+}
+
+# Mayor carácter Unicode: ``prefijo + PREFIX_END`` es mayor que todo texto con ese prefijo
+PREFIX_END = "\U0010ffff"
+
+
+def prefix_filter(field, term, vendor):
+    """
+    Condición "``field`` empieza con ``term``" sin distinguir mayúsculas, resoluble con el
+    índice sobre ``UPPER(field)``.
+
+    PostgreSQL usa ``UPPER(field) LIKE 'TERM%'`` (el índice tiene ``text_pattern_ops``). El
+    resto de las bases busca por rango en el orden binario del índice, con el término pasado
+    por el ``UPPER`` de la propia base para que ambos lados se normalicen igual.
+    """
+    column = Upper(field)
+    if vendor == "postgresql":
+        return Q(StartsWith(column, term.upper()))
+    start = Upper(Value(term))
+    return Q(GreaterThanOrEqual(column, start)) & Q(
+        LessThan(column, Concat(start, Value(PREFIX_END)))
+    )
+
+
+def search_resources(resource_type, term="", page=1, active=False, personnel_type=None):
+    """
+    Una página de recursos cuyo código o nombre empieza con ``term``.
+
+    Args:
+        resource_type: 'runway', 'gate', 'aircraft' o 'personnel'
+        active: Solo los recursos asignables (activos u operacionales)
+        personnel_type: 'PILOT' o 'COPILOT' para filtrar el personal
+
+    Returns:
+        tuple: (lista de recursos, hay más páginas)
+    """
+    if active:
+        resources = base_queryset(resource_type)
+    else:
+        resources = RESOURCE_MODELS[resource_type].objects.all()
+    if personnel_type and resource_type == "personnel":
+        resources = resources.filter(personnel_type=personnel_type)
+
+    term = term.strip()
+    if term:
+        vendor = connections[resources.db].vendor
+        condition = Q()
+        for field in SEARCH_FIELDS[resource_type]:
+            condition |= prefix_filter(field, term, vendor)
+        resources = resources.filter(condition)
+
+    offset = (max(page, 1) - 1) * AUTOCOMPLETE_PAGE_SIZE
+    results = list(resources[offset : offset + AUTOCOMPLETE_PAGE_SIZE + 1])
+    return results[:AUTOCOMPLETE_PAGE_SIZE], len(results) > AUTOCOMPLETE_PAGE_SIZE
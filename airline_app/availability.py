@@ -0,0 +1,300 @@
+"""
+Consultas de disponibilidad basadas en conjuntos.
+
+En lugar de llamar a ``is_available`` recurso por recurso (una o dos consultas por recurso),
+estas funciones resuelven la disponibilidad de todos los recursos de un tipo con una sola
+consulta SQL: los recursos ocupados se calculan como subconsulta y se excluyen.
+
+Las reglas son las mismas que las de los métodos ``is_available`` de cada modelo. Las
+funciones con prefijo ``a`` son las versiones asíncronas para las vistas ASGI.
+"""
+
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Aircraft, Flight, Gate, Personnel, Runway
+
+# Estados de vuelo que ocupan pistas, puertas y personal
+BLOCKING_STATUSES = ["SCHEDULED", "IN_PROGRESS"]
+
+# Las aeronaves también cuentan los vuelos completados (mantenimiento de 24 horas)
+AIRCRAFT_BLOCKING_STATUSES = ["SCHEDULED", "IN_PROGRESS", "COMPLETED"]
+
+MAINTENANCE_BUFFER = timedelta(hours=24)
+
+RESOURCE_MODELS = {
+    "runway": Runway,
+    "gate": Gate,
+    "aircraft": Aircraft,
+    "personnel": Personnel,
+}
+
+
+def base_queryset(resource_type):
+    """Recursos que pueden asignarse a un vuelo (activos u operacionales)."""
+    if resource_type == "aircraft":
+        return Aircraft.objects.filter(status="OPERATIONAL")
+    return RESOURCE_MODELS[resource_type].objects.filter(is_active=True)
+
+
+def overlapping_flights(start_time, end_time, statuses=None, exclude_flight_id=None):
+    """Vuelos que se solapan con el intervalo dado."""
+    flights = Flight.objects.filter(
+        status__in=statuses or BLOCKING_STATUSES,
+        departure_time__lt=end_time,
+        arrival_time__gt=start_time,
+    )
+    if exclude_flight_id:
+        flights = flights.exclude(id=exclude_flight_id)
+    return flights
+
+
+def busy_filter(resource_type, start_time, end_time, exclude_flight_id=None):
+    """
+    Condición ``Q`` que selecciona los recursos ocupados en el intervalo.
+
+    Args:
+        resource_type: 'runway', 'gate', 'aircraft' o 'personnel'
+        start_time: Fecha de inicio
+        end_time: Fecha de fin
+        exclude_flight_id: ID de vuelo para excluir (para actualizaciones)
+    """
+    if resource_type == "aircraft":
+        flights = overlapping_flights(
+            start_time - MAINTENANCE_BUFFER,
+            end_time + MAINTENANCE_BUFFER,
+            AIRCRAFT_BLOCKING_STATUSES,
+            exclude_flight_id,
+        )
+        return Q(id__in=flights.values("aircraft_id"))
+
+    flights = overlapping_flights(
+        start_time, end_time, exclude_flight_id=exclude_flight_id
+    )
+    if resource_type == "personnel":
+        copilot_ids = Flight.copilots.through.objects.filter(flight__in=flights).values(
+            "personnel_id"
+        )
+        return Q(id__in=flights.values("pilot_id")) | Q(id__in=copilot_ids)
+    return Q(id__in=flights.values(f"{resource_type}_id"))
+
+
+def available_resources(
+    resource_type,
+    start_time,
+    end_time,
+    exclude_flight_id=None,
+    queryset=None,
+    recurring=True,
+    holds=True,
+    holder=None,
+    occurrences=None,
+):
+    """
+    Recursos del tipo dado libres durante el intervalo (una sola consulta).
+
+    Args:
+        queryset: Conjunto de recursos candidatos (por defecto, los activos/operacionales)
+        recurring: Excluye también los recursos reservados por ocurrencias pendientes de
+            vuelos recurrentes (dos consultas más, ver ``airline_app.recurrence``)
+        holds: Excluye también los recursos con reservas temporales activas de otros
+            titulares que ``holder`` (subconsulta de la misma consulta, ver ``airline_app.holds``)
+        occurrences: Ocurrencias pendientes ya cargadas, para no consultarlas por cada tipo
+
+    Returns:
+        QuerySet: Recursos disponibles
+    """
+    if queryset is None:
+        queryset = base_queryset(resource_type)
+    available = queryset.exclude(
+        busy_filter(resource_type, start_time, end_time, exclude_flight_id)
+    )
+    if holds:
+        from .holds import held_filter
+
+        available = available.exclude(
+            held_filter(resource_type, start_time, end_time, holder)
+        )
+    if recurring:
+        from .recurrence import recurring_busy_ids
+
+        reserved = recurring_busy_ids(resource_type, start_time, end_time, occurrences)
+        if reserved:
+            available = available.exclude(id__in=reserved)
+    return available
+
+
+async def aavailable_resources(
+    resource_type,
+    start_time,
+    end_time,
+    exclude_flight_id=None,
+    queryset=None,
+    recurring=True,
+    holds=True,
+    holder=None,
+):
+    """
+    Versión asíncrona de ``available_resources`` (ORM asíncrono).
+
+    La consulta de recursos libres y la de reservas de vuelos recurrentes son independientes
+    y se lanzan a la vez.
+
+    Returns:
+        list: Recursos disponibles
+    """
+    candidates = available_resources(
+        resource_type,
+        start_time,
+        end_time,
+        exclude_flight_id,
+        queryset,
+        recurring=False,
+        holds=holds,
+        holder=holder,
+    )
+
+    async def reserved_ids():
+        if not recurring:
+            return set()
+        from .recurrence import recurring_busy_ids
+
+        return await sync_to_async(recurring_busy_ids)(
+            resource_type, start_time, end_time
+        )
+
+    async def fetch():
+        return [resource async for resource in candidates]
+
+    resources, reserved = await asyncio.gather(fetch(), reserved_ids())
+    return [resource for resource in resources if resource.id not in reserved]
+
+
+def busy_resource_ids(resource_ids, resource_type, start_time, end_time, **kwargs):
+    """IDs (de entre ``resource_ids``) ocupados en el intervalo, con una sola consulta."""
+    model = RESOURCE_MODELS[resource_type]
+    return set(
+        model.objects.filter(id__in=resource_ids)
+        .filter(busy_filter(resource_type, start_time, end_time, **kwargs))
+        .values_list("id", flat=True)
+    )
+
+
+def alternative_resources(
+    resource_type,
+    start_time,
+    end_time,
+    resources,
+    exclude_flight_id=None,
+    holder=None,
+    index=None,
+    occurrences=None,
+    limit=3,
+):
+    """
+    Recursos libres del tipo dado para reemplazar uno en conflicto (una consulta, más la de
+    las ocurrencias pendientes de vuelos recurrentes si no se pasan).
+
+    Los candidatos se filtran con el índice de restricciones: se descartan los que, puestos en
+    lugar del recurso actual, violan una restricción en la que participa el tipo. Como en
+    ``Flight.clean``, tampoco se sugieren recursos reservados por ocurrencias pendientes.
+
+    Args:
+        resources: Recursos del vuelo, como los retorna ``constraints.flight_resources``
+        holder: Titular cuyas reservas temporales no bloquean (ver ``airline_app.holds``)
+        index: ConstraintIndex ya cargado (por defecto se carga uno)
+        occurrences: Ocurrencias pendientes ya cargadas (ver ``recurrence.pending_occurrences``)
+        limit: Cantidad máxima de alternativas
+
+    Returns:
+        list: Recursos alternativos, en el orden de su modelo
+    """
+    from .constraints import ConstraintIndex
+    from .recurrence import recurring_busy_ids
+
+    if index is None:
+        index = ConstraintIndex.load()
+    reserved = recurring_busy_ids(resource_type, start_time, end_time, occurrences)
+    queryset = base_queryset(resource_type)
+    if resource_type == "personnel":
+        queryset = queryset.filter(personnel_type="PILOT")
+    aliases = (
+        {resource_type, "pilot"} if resource_type == "personnel" else {resource_type}
+    )
+
+    alternatives = []
+    for resource in available_resources(
+        resource_type,
+        start_time,
+        end_time,
+        exclude_flight_id,
+        queryset.exclude(id__in=reserved),
+        recurring=False,
+        holder=holder,
+    ):
+        candidate = {**resources, **{alias: resource.id for alias in aliases}}
+        if any(
+            rule.primary_resource_type in aliases
+            or rule.related_resource_type in aliases
+            for rule in index.violations(candidate)
+        ):
+            continue
+        alternatives.append(resource)
+        if len(alternatives) == limit:
+            break
+    return alternatives
+
+
+def available_choices(start_time, end_time, exclude_flight_id=None, holder=None):
+    """
+    Opciones libres para los campos de recursos del formulario de vuelos.
+
+    Una consulta por tipo de recurso (pilotos y copilotos salen de la misma), más las de las
+    ocurrencias pendientes de vuelos recurrentes (una sola vez), que ``Flight.clean`` también
+    rechaza. El resultado se cachea por ventana exacta durante
+    ``AVAILABLE_CHOICES_CACHE_TIMEOUT`` segundos: redondearla ocultaría recursos ocupados
+    solo en el margen que ``Flight.clean`` sí aceptaría.
+
+    Returns:
+        dict: Campo del formulario -> lista de ``{"id", "label"}``
+    """
+    key = (
+        f"airline_app:choices:{start_time.timestamp()}:{end_time.timestamp()}:"
+        f"{exclude_flight_id or ''}:{holder or ''}"
+    )
+    choices = cache.get(key)
+    if choices is not None:
+        return choices
+
+    from .recurrence import pending_occurrences
+
+    occurrences = pending_occurrences(start_time, end_time)
+    choices = {}
+    for resource_type in ["runway", "gate", "aircraft", "personnel"]:
+        resources = available_resources(
+            resource_type,
+            start_time,
+            end_time,
+            exclude_flight_id,
+            holder=holder,
+            occurrences=occurrences,
+        )
+        if resource_type == "personnel":
+            by_type = {"PILOT": [], "COPILOT": []}
+            for person in resources:
+                by_type[person.personnel_type].append(
+                    {"id": person.pk, "label": str(person)}
+                )
+            choices["pilot"] = by_type["PILOT"]
+            choices["copilots"] = by_type["COPILOT"]
+        else:
+            choices[resource_type] = [
+                {"id": resource.pk, "label": str(resource)} for resource in resources
+            ]
+    cache.set(key, choices, getattr(settings, "AVAILABLE_CHOICES_CACHE_TIMEOUT", 30))
+    return choices
@@ -0,0 +1,521 @@
+"""
+Suite de benchmarks de las rutas críticas de programación de vuelos.
+
+Cada benchmark mide el tiempo de pared y la cantidad de consultas SQL de una operación sobre
+un horario sembrado de ``n`` vuelos. Los resultados se guardan en JSON y pueden compararse con
+una línea base para detectar regresiones.
+
+Uso:
+    python manage.py benchmark --sizes 1000,10000 --baseline benchmarks/baseline.json
+    python manage.py benchmark --sizes 10000 --concurrency 32 --only none
+    python manage.py benchmark --sizes 10000 --slot-workers 16 --only none
+    pytest -m benchmark
+
+Con ``--concurrency`` también se mide el throughput de las vistas asíncronas (búsqueda de
+horarios y disponibilidad) bajo carga concurrente, servidas por el manejador WSGI (un hilo por
+petición) y por el ASGI (un único bucle de eventos, como un worker de uvicorn).
+
+Con ``--slot-workers N`` se mide cómo escala la búsqueda de horarios sobre muchas combinaciones
+de recursos (``Flight.find_available_slots``) con 1, 2, 4... hasta N procesos.
+"""
+
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection, connections
+from django.test import AsyncClient, Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .generator import generate_schedule
+from .middleware import QueryRecorder
+from .models import Aircraft, Flight, Gate, Personnel, ResourceConstraint, Runway
+from .validation import validate_flights
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Tolerancia por defecto sobre el tiempo de la línea base antes de reportar regresión
+DEFAULT_TOLERANCE = 0.25
+
+# Peticiones por ejecución del benchmark de concurrencia, en múltiplos de la concurrencia
+CONCURRENCY_ROUNDS = 4
+
+# Recursos candidatos de cada tipo en el benchmark de búsqueda paralela (combinaciones = n⁴)
+SLOT_SEARCH_CANDIDATES = 6
+
+
+def seed_schedule(n_flights, seed=0):
+    """
+    Siembra un horario realista y sin conflictos de ``n_flights`` vuelos con el generador
+    sintético (``airline_app.generator``).
+
+    Returns:
+        datetime: Inicio del horario sembrado
+    """
+    summary = generate_schedule(n_flights, seed=seed, constraints=20, prefix="BM")
+    return summary["start"]
+
+
+def measure(func, repeat=5):
+    """
+    Ejecuta ``func`` ``repeat`` veces y mide tiempo y consultas.
+
+    Returns:
+        dict: ``wall_ms`` (mediana), ``min_ms`` y ``queries`` (de la última ejecución)
+    """
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = recorder.count
+    return {
+        "wall_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "queries": queries,
+    }
+
+
+def _render(view, request):
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    response = view(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def build_benchmarks(start):
+    """Arma el diccionario ``{nombre: callable}`` de operaciones a medir."""
+    from . import views
+
+    factory = RequestFactory()
+    flight = Flight.objects.filter(status="SCHEDULED").order_by("departure_time")[
+        Flight.objects.filter(status="SCHEDULED").count() // 2
+    ]
+    window_start = flight.departure_time
+    window_end = flight.arrival_time
+
+    runway = flight.runway
+    gate = flight.gate
+    aircraft = flight.aircraft
+    pilot = flight.pilot
+
+    candidate = Flight(
+        flight_number="BM-CANDIDATE",
+        origin="Havana",
+        destination="Cancun",
+        departure_time=window_start,
+        arrival_time=window_end,
+        status="SCHEDULED",
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+
+    def full_clean():
+        try:
+            candidate.full_clean()
+        except Exception:
+            pass
+
+    def validate_copilots():
+        try:
+            flight.validate_copilots()
+        except Exception:
+            pass
+
+    # Candidatos en las ventanas y recursos de vuelos sembrados (chocan con ellos)
+    payloads = [
+        {
+            "flight_number": f"BM-VAL-{index}",
+            "origin": "Havana",
+            "destination": "Cancun",
+            "departure_time": other.departure_time,
+            "arrival_time": other.arrival_time,
+            "runway": other.runway_id,
+            "gate": other.gate_id,
+            "aircraft": other.aircraft_id,
+            "pilot": other.pilot_id,
+        }
+        for index, other in enumerate(
+            Flight.objects.filter(
+                status="SCHEDULED", departure_time__gte=window_start
+            ).order_by("departure_time")[:100]
+        )
+    ]
+
+    def get(view, path, **params):
+        request = factory.get(path, params)
+        request.user = AnonymousUser()
+        return lambda: _render(view, request)
+
+    def check_availability(resource_type):
+        data = {
+            "resource_type": resource_type,
+            "start_time": window_start.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": window_end.strftime("%Y-%m-%dT%H:%M"),
+        }
+
+        def run():
+            request = factory.post("/disponibilidad/", data)
+            request.user = AnonymousUser()
+            _render(views.check_availability, request)
+
+        return run
+
+    benchmarks = {
+        "is_available.runway": lambda: runway.is_available(window_start, window_end),
+        "is_available.gate": lambda: gate.is_available(window_start, window_end),
+        "is_available.aircraft": lambda: aircraft.is_available(
+            window_start, window_end
+        ),
+        "is_available.personnel": lambda: pilot.is_available(window_start, window_end),
+        "flight.full_clean": full_clean,
+        "flight.validate_copilots": validate_copilots,
+        "validate_flights.single": lambda: validate_flights(payloads[:1]),
+        "validate_flights.batch_100": lambda: validate_flights(payloads),
+        "find_next_available_slot": lambda: Flight.find_next_available_slot(
+            runway.id, gate.id, aircraft.id, pilot.id, 2, start_search_from=start
+        ),
+    }
+    for resource_type in ["runway", "gate", "aircraft", "personnel"]:
+        benchmarks[f"check_availability.{resource_type}"] = check_availability(
+            resource_type
+        )
+    benchmarks.update(
+        {
+            "view.flight_list": get(views.FlightListView.as_view(), "/vuelos/"),
+            "view.runway_list": get(views.RunwayListView.as_view(), "/pistas/"),
+            "view.gate_list": get(views.GateListView.as_view(), "/puertas/"),
+            "view.aircraft_list": get(views.AircraftListView.as_view(), "/aeronaves/"),
+            "view.personnel_list": get(views.PersonnelListView.as_view(), "/personal/"),
+            "view.constraint_list": get(
+                views.ConstraintListView.as_view(), "/restricciones/"
+            ),
+        }
+    )
+    return benchmarks
+
+
+def concurrency_requests(start):
+    """Peticiones POST ``{nombre: (url, datos)}`` del benchmark de concurrencia."""
+    flight = Flight.objects.filter(status="SCHEDULED").order_by("departure_time")[
+        Flight.objects.filter(status="SCHEDULED").count() // 2
+    ]
+    return {
+        "find_slot": (
+            reverse("find_slot"),
+            {
+                "runway": flight.runway_id,
+                "gate": flight.gate_id,
+                "aircraft": flight.aircraft_id,
+                "pilot": flight.pilot_id,
+                "duration_hours": 2,
+                "start_search_from": timezone.localtime(start).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+            },
+        ),
+        "check_availability": (
+            reverse("check_availability"),
+            {
+                "resource_type": "gate",
+                "start_time": timezone.localtime(flight.departure_time).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "end_time": timezone.localtime(flight.arrival_time).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+            },
+        ),
+    }
+
+
+def _close_connections():
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+def measure_wsgi(url, data, concurrency, total):
+    """
+    ``total`` peticiones a través del manejador WSGI con ``concurrency`` hilos, como un
+    servidor WSGI con ese número de hilos.
+
+    Returns:
+        float: Segundos que tardaron todas las peticiones
+    """
+    local = threading.local()
+
+    def post(_):
+        if not hasattr(local, "client"):
+            local.client = Client()
+        return local.client.post(url, data).status_code
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        statuses = list(pool.map(post, range(total)))
+        elapsed = time.perf_counter() - started
+        # Cada hilo abrió su propia conexión
+        list(pool.map(lambda _: _close_connections(), range(concurrency)))
+    assert set(statuses) == {200}, statuses
+    return elapsed
+
+
+def measure_asgi(url, data, concurrency, total):
+    """
+    ``total`` peticiones a través del manejador ASGI en un único bucle de eventos, con
+    ``concurrency`` peticiones en curso a la vez.
+
+    Cada petición tiene su propio contexto de hilo, como en ``ASGIHandler``.
+
+    Returns:
+        float: Segundos que tardaron todas las peticiones
+    """
+
+    async def run():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post():
+            async with semaphore, ThreadSensitiveContext():
+                response = await client.post(url, data)
+                await asyncio.to_thread(_close_connections)
+                return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*[post() for _ in range(total)])
+        return time.perf_counter() - started, statuses
+
+    elapsed, statuses = asyncio.run(run())
+    assert set(statuses) == {200}, statuses
+    return elapsed
+
+
+def run_concurrency(start, concurrency, repeat=3, stdout=None):
+    """
+    Compara el throughput (peticiones por segundo) de WSGI y ASGI bajo carga concurrente.
+
+    Returns:
+        dict: ``{vista: {"wsgi": {...}, "asgi": {...}}}`` con la mediana de ``rps`` y ``wall_ms``
+    """
+    total = concurrency * CONCURRENCY_ROUNDS
+    results = {}
+    # Los clientes de pruebas usan el host "testserver", como en el entorno de tests; el log
+    # por petición del middleware de instrumentación se silencia durante la medición
+    performance_logger = logging.getLogger("airline_app.performance")
+    level = performance_logger.level
+    performance_logger.setLevel(logging.ERROR)
+    try:
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, (url, data) in concurrency_requests(start).items():
+                results[name] = {}
+                for server, measure_server in [
+                    ("wsgi", measure_wsgi),
+                    ("asgi", measure_asgi),
+                ]:
+                    elapsed = statistics.median(
+                        measure_server(url, data, concurrency, total)
+                        for _ in range(repeat)
+                    )
+                    results[name][server] = {
+                        "concurrency": concurrency,
+                        "requests": total,
+                        "wall_ms": round(elapsed * 1000, 3),
+                        "rps": round(total / elapsed, 1),
+                    }
+                    if stdout:
+                        stdout.write(
+                            f"  {f'concurrency.{name}.{server}':<32} "
+                            f"{total / elapsed:>10.1f} pet/s ({concurrency} concurrentes)"
+                        )
+    finally:
+        performance_logger.setLevel(level)
+    return results
+
+
+def run_slot_search(start, max_workers, repeat=3, stdout=None):
+    """
+    Mide la búsqueda de horarios sobre ``SLOT_SEARCH_CANDIDATES``⁴ combinaciones con 1, 2,
+    4... hasta ``max_workers`` procesos.
+
+    Returns:
+        dict: ``{workers: {...}}`` con la mediana de ``wall_ms``, combinaciones por segundo y
+        aceleración respecto a un proceso
+    """
+    candidates = [
+        list(
+            model.objects.order_by("id").values_list("id", flat=True)[
+                :SLOT_SEARCH_CANDIDATES
+            ]
+        )
+        for model in (Runway, Gate, Aircraft)
+    ]
+    candidates.append(
+        list(
+            Personnel.objects.filter(personnel_type="PILOT")
+            .order_by("id")
+            .values_list("id", flat=True)[:SLOT_SEARCH_CANDIDATES]
+        )
+    )
+    combos = 1
+    for ids in candidates:
+        combos *= len(ids)
+
+    counts = sorted(
+        {
+            1,
+            max_workers,
+            *(2**i for i in range(max_workers.bit_length()) if 2**i < max_workers),
+        }
+    )
+    results = {}
+    for workers in counts:
+        elapsed = measure(
+            lambda: Flight.find_available_slots(
+                *candidates, 2, start_search_from=start, workers=workers
+            ),
+            repeat=repeat,
+        )["wall_ms"]
+        results[str(workers)] = {
+            "combinations": combos,
+            "wall_ms": elapsed,
+            "combinations_per_s": round(combos / elapsed * 1000, 1),
+            "speedup": round(results["1"]["wall_ms"] / elapsed, 2) if results else 1.0,
+        }
+        if stdout:
+            stdout.write(
+                f"  {f'slot_search.workers.{workers}':<32} {elapsed:>10.2f} ms "
+                f"x{results[str(workers)]['speedup']} ({combos} combinaciones)"
+            )
+    return results
+
+
+def run_benchmarks(
+    sizes, repeat=5, only=None, stdout=None, concurrency=0, slot_workers=0
+):
+    """
+    Siembra cada tamaño y ejecuta los benchmarks.
+
+    La base de datos se vacía antes de cada tamaño, por lo que debe ejecutarse sobre una base
+    de datos de pruebas (el comando ``benchmark`` crea una propia).
+
+    Args:
+        concurrency: Peticiones concurrentes del benchmark WSGI contra ASGI (0 = no se mide)
+        slot_workers: Máximo de procesos del benchmark de búsqueda paralela (0 = no se mide)
+
+    Returns:
+        dict: Resultados listos para serializar a JSON
+    """
+    results = {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+
+    for size in sizes:
+        _clear_schedule()
+        seed_started = time.perf_counter()
+        start = seed_schedule(size)
+        seed_ms = (time.perf_counter() - seed_started) * 1000
+        if stdout:
+            stdout.write(f"Sembrados {size} vuelos en {seed_ms / 1000:.1f}s")
+
+        size_results = {}
+        for name, func in build_benchmarks(start).items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            size_results[name] = measure(func, repeat=repeat)
+            if stdout:
+                r = size_results[name]
+                stdout.write(
+                    f"  {name:<32} {r['wall_ms']:>10.2f} ms {r['queries']:>6} consultas"
+                )
+        results["results"][str(size)] = size_results
+
+        if concurrency:
+            results.setdefault("concurrency", {})[str(size)] = run_concurrency(
+                start, concurrency, stdout=stdout
+            )
+
+        if slot_workers:
+            results.setdefault("slot_search", {})[str(size)] = run_slot_search(
+                start, slot_workers, stdout=stdout
+            )
+
+    return results
+
+
+def _clear_schedule():
+    Flight.copilots.through.objects.all().delete()
+    Flight.objects.all().delete()
+    for model in (ResourceConstraint, Runway, Gate, Aircraft, Personnel):
+        model.objects.all().delete()
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara resultados contra una línea base.
+
+    Una operación regresa si su mediana supera la de la línea base en más de ``tolerance``
+    (proporción) o si ejecuta más consultas.
+
+    Returns:
+        list[dict]: Regresiones encontradas
+    """
+    regressions = []
+    for size, size_results in results["results"].items():
+        base_results = baseline.get("results", {}).get(size, {})
+        for name, current in size_results.items():
+            base = base_results.get(name)
+            if base is None:
+                continue
+            if current["queries"] > base["queries"]:
+                regressions.append(
+                    {
+                        "size": size,
+                        "benchmark": name,
+                        "metric": "queries",
+                        "baseline": base["queries"],
+                        "current": current["queries"],
+                    }
+                )
+            if current["wall_ms"] > base["wall_ms"] * (1 + tolerance):
+                regressions.append(
+                    {
+                        "size": size,
+                        "benchmark": name,
+                        "metric": "wall_ms",
+                        "baseline": base["wall_ms"],
+                        "current": current["wall_ms"],
+                    }
+                )
+    return regressions
+
+
+def load_results(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_results(results, path):
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
@@ -0,0 +1,262 @@
+"""
+Operaciones masivas sobre vuelos: cancelar, desplazar y cambiar de estado.
+
+Cambiar cientos de vuelos uno por uno cuesta un ``full_clean`` y un ``save()`` por vuelo. Estas
+operaciones validan la selección completa de una vez y la aplican con un solo ``UPDATE``, en una
+transacción que bloquea las filas seleccionadas:
+
+- ``set_status``: cancela o marca los vuelos como en progreso o completados, según las
+  transiciones de ``STATUS_TRANSITIONS`` y sus horarios.
+- ``shift_flights``: desplaza los vuelos ``minutes`` minutos. La selección se valida contra el
+  resto del horario y contra sí misma con una sola carga de la ocupación de sus recursos
+  (``airline_app.occupancy``): dos vuelos seleccionados que quedan superpuestos se rechazan.
+
+Si algún vuelo no puede cambiar, no se aplica nada y ``BulkActionError`` lista los rechazos. Los
+vuelos modificados reciben ``updated_at`` y una versión nueva (ver ``Flight.version``), de modo
+que la analítica, los rollups y las ediciones concurrentes ven el cambio.
+
+Uso:
+    python manage.py bulk_flights cancel --ids 10,11,12
+    python manage.py bulk_flights shift --minutes 45 --numbers AV100,AV101
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .holds import is_hold_id
+from .models import Flight, RollupDay
+from .occupancy import Occupancy
+from .outages import REASSIGNABLE_STATUSES
+
+# Estado destino -> estados desde los que se puede llegar
+STATUS_TRANSITIONS = {
+    "CANCELLED": ["SCHEDULED", "DELAYED"],
+    "IN_PROGRESS": ["SCHEDULED", "DELAYED"],
+    "COMPLETED": ["SCHEDULED", "DELAYED", "IN_PROGRESS"],
+}
+
+# Campo en conflicto -> sujeto del mensaje de rechazo
+CONFLICT_LABELS = {
+    "runway": "La pista",
+    "gate": "La puerta",
+    "aircraft": "La aeronave",
+    "pilot": "El piloto",
+    "copilot": "Un copiloto",
+}
+
+Rejection = namedtuple("Rejection", ["flight_id", "flight_number", "code", "message"])
+
+
+class BulkActionError(Exception):
+    """Algún vuelo de la selección no admite el cambio; no se aplicó ninguno."""
+
+    def __init__(self, rejections):
+        self.rejections = rejections
+        super().__init__(
+            f"{len(rejections)} vuelo(s) no admiten el cambio: "
+            + "; ".join(f"{r.flight_number}: {r.message}" for r in rejections[:10])
+        )
+
+
+def _blocker(flight_id):
+    """Qué ocupa el recurso, según el ID del motor de ocupación."""
+    if is_hold_id(flight_id):
+        return "reserva temporal"
+    if flight_id < 0:
+        return "vuelo recurrente"
+    return f"vuelo #{flight_id}"
+
+
+def _lock(flight_ids, *fields):
+    """Filas seleccionadas, bloqueadas hasta el fin de la transacción, en orden de salida."""
+    return list(
+        Flight.objects.select_for_update()
+        .filter(id__in=flight_ids)
+        .order_by("departure_time", "id")
+        .values_list("id", "flight_number", "status", *fields)
+    )
+
+
+def set_status(flight_ids, status, now=None):
+    """
+    Cambia el estado de los vuelos con un solo ``UPDATE``.
+
+    Un vuelo solo pasa a en progreso si ya salió y a completado si ya llegó.
+
+    Raises:
+        BulkActionError: Si algún vuelo no admite la transición
+
+    Returns:
+        int: Cantidad de vuelos actualizados
+    """
+    now = now or timezone.now()
+    allowed = STATUS_TRANSITIONS[status]
+    labels = dict(Flight.FLIGHT_STATUS)
+    with transaction.atomic():
+        rows = _lock(flight_ids, "departure_time", "arrival_time")
+        rejections = []
+        for flight_id, number, current, departure, arrival in rows:
+            if current not in allowed:
+                rejections.append(
+                    Rejection(
+                        flight_id,
+                        number,
+                        "invalid_status",
+                        f"Un vuelo {labels[current].lower()} no puede pasar a "
+                        f"{labels[status].lower()}.",
+                    )
+                )
+            elif status == "IN_PROGRESS" and departure > now:
+                rejections.append(
+                    Rejection(
+                        flight_id,
+                        number,
+                        "invalid_departure_time",
+                        "El vuelo todavía no ha salido.",
+                    )
+                )
+            elif status == "COMPLETED" and arrival > now:
+                rejections.append(
+                    Rejection(
+                        flight_id,
+                        number,
+                        "invalid_arrival_time",
+                        "El vuelo todavía no ha llegado.",
+                    )
+                )
+        if rejections:
+            raise BulkActionError(rejections)
+
+        return Flight.objects.filter(id__in=[row[0] for row in rows]).update(
+            status=status, updated_at=now, version=F("version") + 1
+        )
+
+
+def cancel_flights(flight_ids, now=None):
+    """Cancela los vuelos (ver ``set_status``)."""
+    return set_status(flight_ids, "CANCELLED", now)
+
+
+def shift_flights(flight_ids, minutes, now=None):
+    """
+    Desplaza los vuelos ``minutes`` minutos (negativo para adelantarlos) con un solo ``UPDATE``.
+
+    Usa un número fijo de consultas, independientemente de la cantidad de vuelos: filas
+    seleccionadas, sus copilotos, la ocupación de sus recursos en la ventana nueva (con vuelos
+    recurrentes pendientes y reservas temporales), la actualización y los rollups.
+
+    Raises:
+        BulkActionError: Si algún vuelo no es reprogramable, saldría en el pasado o choca con
+            otro vuelo (seleccionado o no), una ocurrencia recurrente o una reserva
+
+    Returns:
+        int: Cantidad de vuelos desplazados
+    """
+    now = now or timezone.now()
+    delta = timedelta(minutes=minutes)
+    with transaction.atomic():
+        rows = _lock(
+            flight_ids,
+            "departure_time",
+            "arrival_time",
+            "runway_id",
+            "gate_id",
+            "aircraft_id",
+            "pilot_id",
+        )
+        if not rows or not minutes:
+            return 0
+        ids = [row[0] for row in rows]
+        crews = defaultdict(list)
+        for flight_id, personnel_id in Flight.copilots.through.objects.filter(
+            flight_id__in=ids
+        ).values_list("flight_id", "personnel_id"):
+            crews[flight_id].append(personnel_id)
+
+        occupancy = Occupancy.load(
+            min(row[3] for row in rows) + delta,
+            max(row[4] for row in rows) + delta,
+            runway_ids={row[5] for row in rows},
+            gate_ids={row[6] for row in rows},
+            aircraft_ids={row[7] for row in rows},
+            personnel_ids={row[8] for row in rows}
+            | {p for crew in crews.values() for p in crew},
+            holds=True,
+        )
+        for flight_id in ids:
+            occupancy.remove_flight(flight_id)
+
+        rejections = []
+        for row in rows:
+            flight_id, number, status, departure, arrival = row[:5]
+            runway, gate, aircraft, pilot = row[5:]
+            departure, arrival = departure + delta, arrival + delta
+            if status not in REASSIGNABLE_STATUSES:
+                rejections.append(
+                    Rejection(
+                        flight_id,
+                        number,
+                        "invalid_status",
+                        "Solo se reprograman vuelos programados o retrasados.",
+                    )
+                )
+                continue
+            if departure < now:
+                rejections.append(
+                    Rejection(
+                        flight_id,
+                        number,
+                        "invalid_departure_time",
+                        "La fecha de salida no puede ser anterior a la fecha actual.",
+                    )
+                )
+                continue
+
+            checks = [
+                ("runway", "runway", runway),
+                ("gate", "gate", gate),
+                ("aircraft", "aircraft", aircraft),
+                ("pilot", "personnel", pilot),
+            ] + [("copilot", "personnel", copilot) for copilot in crews[flight_id]]
+            for field, resource_type, resource_id in checks:
+                conflicts = occupancy.conflicts(
+                    resource_type, resource_id, departure, arrival
+                )
+                if conflicts:
+                    rejections.append(
+                        Rejection(
+                            flight_id,
+                            number,
+                            f"{field}_conflict",
+                            f"{CONFLICT_LABELS[field]} no está disponible en el horario "
+                            f"nuevo ({_blocker(conflicts[0][2])}).",
+                        )
+                    )
+                    break
+            # Los siguientes vuelos de la selección ven este en su horario nuevo
+            occupancy.add_flight(
+                flight_id,
+                departure,
+                arrival,
+                status,
+                runway=runway,
+                gate=gate,
+                aircraft=aircraft,
+                personnel=[pilot, *crews[flight_id]],
+            )
+        if rejections:
+            raise BulkActionError(rejections)
+
+        updated = Flight.objects.filter(id__in=ids).update(
+            departure_time=F("departure_time") + delta,
+            arrival_time=F("arrival_time") + delta,
+            updated_at=now,
+            version=F("version") + 1,
+        )
+        # Los días nuevos se recalculan por ``updated_at``; los que dejaron, no
+        RollupDay.mark_stale(*(row[3] for row in rows))
+    return updated
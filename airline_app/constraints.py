@@ -0,0 +1,128 @@
+"""
+Evaluación en memoria de las restricciones de recursos (ResourceConstraint).
+
+ConstraintIndex agrupa las restricciones activas por recurso primario, de modo que evaluar
+una combinación de recursos cuesta una búsqueda por recurso en lugar de recorrer todas las
+restricciones. Sigue la misma semántica que ``Flight.validate_resource_constraints``: el tipo
+``personnel`` se refiere al piloto del vuelo.
+"""
+
+from collections import defaultdict, namedtuple
+
+Rule = namedtuple(
+    "Rule",
+    [
+        "id",
+        "name",
+        "constraint_type",
+        "primary_resource_type",
+        "primary_resource_id",
+        "related_resource_type",
+        "related_resource_id",
+    ],
+)
+
+
+def flight_resources(runway_id, gate_id, aircraft_id, pilot_id):
+    """Diccionario de recursos de un vuelo con las claves de ResourceConstraint.RESOURCE_TYPES."""
+    return {
+        "runway": runway_id,
+        "gate": gate_id,
+        "aircraft": aircraft_id,
+        # ResourceConstraint usa 'personnel'; el vuelo guarda la persona en el FK 'pilot'.
+        "personnel": pilot_id,
+        # Alias defensivo (por si alguna restricción usa 'pilot').
+        "pilot": pilot_id,
+    }
+
+
+class ConstraintIndex:
+    """Índice en memoria de restricciones por (tipo, id) del recurso primario."""
+
+    def __init__(self, rules=()):
+        self.by_primary = defaultdict(list)
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def load(cls, queryset=None):
+        """Construye el índice con una sola consulta (por defecto, las restricciones activas)."""
+        from .models import ResourceConstraint
+
+        if queryset is None:
+            queryset = ResourceConstraint.objects.filter(is_active=True)
+        return cls(Rule(*values) for values in queryset.values_list(*Rule._fields))
+
+    def add(self, rule):
+        key = (rule.primary_resource_type, rule.primary_resource_id)
+        self.by_primary[key].append(rule)
+
+    def __len__(self):
+        return sum(len(rules) for rules in self.by_primary.values())
+
+    def violations(self, resources):
+        """
+        Retorna las reglas violadas por una combinación de recursos.
+
+        Args:
+            resources: Diccionario como el que retorna ``flight_resources``
+
+        Returns:
+            list[Rule]: Reglas violadas (vacía si la combinación es válida)
+        """
+        violated = []
+        for resource_type, resource_id in resources.items():
+            for rule in self.by_primary.get((resource_type, resource_id), ()):
+                related_id = resources.get(rule.related_resource_type)
+                if rule.constraint_type == "CO_REQUISITE":
+                    if related_id != rule.related_resource_id:
+                        violated.append(rule)
+                elif rule.constraint_type == "MUTUAL_EXCLUSION":
+                    if related_id == rule.related_resource_id:
+                        violated.append(rule)
+        return violated
+
+    def is_valid(self, resources):
+        return not self.violations(resources)
+
+
+# Columna de Flight que guarda cada tipo de recurso ('personnel' es el piloto)
+FLIGHT_COLUMNS = {
+    "runway": "runway_id",
+    "gate": "gate_id",
+    "aircraft": "aircraft_id",
+    "personnel": "pilot_id",
+    "pilot": "pilot_id",
+}
+
+
+def violating_flights(constraint, flights=None):
+    """
+    Vuelos que violan una restricción, resuelto en SQL sobre las columnas de recursos.
+
+    A diferencia de ``validate_resource_constraints`` (un vuelo contra todas las reglas),
+    evalúa una regla contra todos los vuelos con una sola consulta.
+
+    Args:
+        constraint: ResourceConstraint (puede no estar guardada) o Rule
+        flights: QuerySet de vuelos a revisar (por defecto, los SCHEDULED)
+
+    Returns:
+        QuerySet: Vuelos que violan la restricción
+    """
+    from .models import Flight
+
+    if flights is None:
+        flights = Flight.objects.filter(status="SCHEDULED")
+
+    primary = FLIGHT_COLUMNS.get(constraint.primary_resource_type)
+    related = FLIGHT_COLUMNS.get(constraint.related_resource_type)
+    if primary is None or related is None:
+        return flights.none()
+
+    flights = flights.filter(**{primary: constraint.primary_resource_id})
+    if constraint.constraint_type == "CO_REQUISITE":
+        return flights.exclude(**{related: constraint.related_resource_id})
+    if constraint.constraint_type == "MUTUAL_EXCLUSION":
+        return flights.filter(**{related: constraint.related_resource_id})
+    return flights.none()
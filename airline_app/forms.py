@@ -1,6 +1,14 @@
+import copy
+from urllib.parse import urlencode
+
 from django import forms
+from django.contrib.admin.helpers import ActionForm
 from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse
 
+from .availability import available_resources
 from .models import Aircraft, Flight, Gate, Personnel, Runway, ResourceConstraint
 
 
@@ -154,8 +162,123 @@ class AircraftForm(forms.ModelForm):
             )
 
 
-class FlightForm(forms.ModelForm):
-    """Form for creating and editing flights with comprehensive validation."""
+class VersionedFlightForm(forms.ModelForm):
+    """
+    Base form for editing flights with optimistic concurrency control.
+
+    The hidden ``version`` field carries the version the user loaded. If the flight was saved
+    since then, the form reports what changed instead of overwriting it, and takes the new
+    version so that submitting again overwrites on purpose.
+    """
+
+    version = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial["version"] = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get("version")
+        if self.instance.pk and version is not None:
+            if version != self.instance.version:
+                self.add_conflict_error(
+                    self.instance.conflict_error(
+                        {
+                            name: value
+                            for name, value in cleaned_data.items()
+                            if name != "version"
+                        }
+                    )
+                )
+            # Flight.save only writes if the stored version is still the one the user loaded
+            self.instance.version = version
+        return cleaned_data
+
+    def add_conflict_error(self, error):
+        """Report a StaleFlightError and take the stored version for the next submit."""
+        self.add_error(None, error)
+        self.data = self.data.copy()
+        self.data[self.add_prefix("version")] = error.flight.version
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select that only renders the selected option and searches the rest on demand.
+
+    ``autocomplete.js`` adds a search box that fills the options from the paginated
+    ``resource_autocomplete`` endpoint; ``filters`` are passed along as query parameters.
+    """
+
+    class Media:
+        js = ["airline_app/js/autocomplete.js"]
+
+    def __init__(self, resource_type, filters=None, attrs=None):
+        super().__init__(attrs)
+        self.resource_type = resource_type
+        self.filters = filters or {}
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        url = reverse("resource_autocomplete", args=[self.resource_type])
+        if self.filters:
+            url += "?" + urlencode(self.filters)
+        attrs["data-autocomplete-url"] = url
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        self.choices = copy.copy(choices)
+        self.choices.queryset = choices.queryset.filter(
+            pk__in=[v for v in value if str(v).isdigit()]
+        )
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class AvailableChoiceIterator(ModelChoiceIterator):
+    """
+    Options of a resource field limited to what the form can offer.
+
+    Validation still uses the field's full queryset; only the rendered options are narrowed,
+    and the narrowed queryset is built when the widget renders (see
+    ``FlightForm.available_queryset``).
+    """
+
+    def __init__(self, field, form, name):
+        super().__init__(field)
+        self.form = form
+        self.name = name
+
+    def __iter__(self):
+        self.queryset = self.form.available_queryset(self.name)
+        return super().__iter__()
+
+    def __len__(self):
+        self.queryset = self.form.available_queryset(self.name)
+        return super().__len__()
+
+
+class FlightForm(VersionedFlightForm):
+    """
+    Form for creating and editing flights with comprehensive validation.
+
+    Resource fields only render the resources free in the entered time window (plus the
+    selected ones); without a window they render only the selection, and ``main.js`` fetches
+    the free options from ``flight_resource_choices`` once both times are entered.
+    """
+
+    # Resource field -> resource type in ``airline_app.availability``
+    RESOURCE_FIELDS = {
+        "runway": "runway",
+        "gate": "gate",
+        "aircraft": "aircraft",
+        "pilot": "personnel",
+        "copilots": "personnel",
+    }
 
     class Meta:
         model = Flight
@@ -226,6 +349,9 @@ class FlightForm(forms.ModelForm):
         self.fields["copilots"].queryset = Personnel.objects.filter(
             personnel_type="COPILOT", is_active=True
         )
+        for name in self.RESOURCE_FIELDS:
+            field = self.fields[name]
+            field.widget.choices = AvailableChoiceIterator(field, self, name)
 
         # Format datetime fields for editing
         if self.instance.pk:
@@ -276,6 +402,159 @@ class FlightForm(forms.ModelForm):
 
         return cleaned_data
 
+    def time_window(self):
+        """The entered (departure, arrival) window, or None if it is missing or invalid."""
+        try:
+            start = self.fields["departure_time"].clean(self["departure_time"].value())
+            end = self.fields["arrival_time"].clean(self["arrival_time"].value())
+        except ValidationError:
+            return None
+        if start and end and start < end:
+            return start, end
+        return None
+
+    def available_queryset(self, name):
+        """Options to render for a resource field: free in the window, or selected."""
+        field = self.fields[name]
+        value = self[name].value()
+        values = value if isinstance(value, (list, tuple)) else [value]
+        selected = [v for v in values if str(v).isdigit()]
+        window = self.time_window()
+        if window is None:
+            return field.queryset.filter(pk__in=selected)
+        free = available_resources(
+            self.RESOURCE_FIELDS[name],
+            *window,
+            exclude_flight_id=self.instance.pk,
+            queryset=field.queryset,
+            holder=getattr(self.instance, "slot_holder", None),
+        )
+        return field.queryset.filter(Q(pk__in=free.values("pk")) | Q(pk__in=selected))
+
+    def conflict_alternatives(self):
+        """
+        Free resources suggested by ``Flight.clean`` for each conflicting resource field.
+
+        Returns:
+            list: (bound field, alternative resources) pairs, in field order
+        """
+        errors = self.errors.as_data()
+        pairs = []
+        for name in self._meta.fields:
+            for error in errors.get(name, ()):
+                if error.params and error.params.get("alternatives"):
+                    pairs.append((self[name], error.params["alternatives"]))
+        return pairs
+
+
+class FlightAdminForm(VersionedFlightForm):
+    """Flight form for the admin, with the same concurrent edit check."""
+
+    class Meta:
+        model = Flight
+        fields = "__all__"
+
+
+class FlightActionForm(ActionForm):
+    """Admin action bar with the shift amount for the "shift selected" action."""
+
+    minutes = forms.IntegerField(
+        required=False,
+        label="Minutos",
+        help_text="Para desplazar: positivos retrasan, negativos adelantan.",
+    )
+
+
+class ResourceChoicesForm(forms.Form):
+    """Time window whose free resources the flight form asks for."""
+
+    departure_time = forms.DateTimeField(input_formats=["%Y-%m-%dT%H:%M"])
+    arrival_time = forms.DateTimeField(input_formats=["%Y-%m-%dT%H:%M"])
+    flight = forms.IntegerField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        departure_time = cleaned_data.get("departure_time")
+        arrival_time = cleaned_data.get("arrival_time")
+        if departure_time and arrival_time and arrival_time <= departure_time:
+            raise ValidationError(
+                "La hora de llegada debe ser posterior a la hora de salida."
+            )
+        return cleaned_data
+
+
+# IDs are BigAutoField primary keys: larger values overflow the database driver
+MAX_ID = 2**63 - 1
+
+
+class IntegerListField(forms.Field):
+    """List of integer IDs (a JSON array or repeated form values)."""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if not isinstance(value, (list, tuple)):
+            raise ValidationError("Ingrese una lista de IDs.", code="invalid_list")
+        try:
+            ids = [int(item) for item in value]
+        except (TypeError, ValueError):
+            raise ValidationError("Los IDs deben ser números enteros.", code="invalid")
+        if any(not 1 <= item <= MAX_ID for item in ids):
+            raise ValidationError("Los IDs están fuera de rango.", code="invalid")
+        return ids
+
+
+class StringValueMixin:
+    """Rejects non-string values (JSON numbers, arrays or objects) before parsing."""
+
+    def to_python(self, value):
+        if value not in self.empty_values and not isinstance(value, str):
+            raise ValidationError("Ingrese un texto.", code="invalid")
+        return super().to_python(value)
+
+
+class StringCharField(StringValueMixin, forms.CharField):
+    pass
+
+
+class StringDateTimeField(StringValueMixin, forms.DateTimeField):
+    pass
+
+
+class IdField(forms.IntegerField):
+    """Primary key of an existing row, bounded so lookups never overflow."""
+
+    def __init__(self, **kwargs):
+        super().__init__(min_value=1, max_value=MAX_ID, **kwargs)
+
+
+class FlightPayloadForm(forms.Form):
+    """
+    Field-level parsing of a flight payload for dry-run validation.
+
+    Resources are plain IDs: ``airline_app.validation`` resolves them and checks the flight
+    rules against a shared snapshot instead of one query per field. Payloads come from JSON,
+    so every malformed value has to end up as a field error rather than an exception.
+    """
+
+    id = IdField(required=False)
+    flight_number = StringCharField(max_length=20)
+    origin = StringCharField(max_length=100)
+    destination = StringCharField(max_length=100)
+    departure_time = StringDateTimeField()
+    arrival_time = StringDateTimeField()
+    status = forms.ChoiceField(choices=Flight.FLIGHT_STATUS, required=False)
+    runway = IdField()
+    gate = IdField()
+    aircraft = IdField()
+    pilot = IdField()
+    copilots = IntegerListField(required=False)
+
+    def clean_status(self):
+        return self.cleaned_data["status"] or "SCHEDULED"
+
 
 class FlightSearchForm(forms.Form):
     """Form for searching and filtering flights."""
@@ -323,6 +602,28 @@ class FlightSearchForm(forms.Form):
         widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
     )
 
+    include_archived = forms.BooleanField(
+        required=False,
+        label="Incluir archivados",
+    )
+
+    def filter_queryset(self, queryset):
+        """Apply the search filters to a Flight or ArchivedFlight queryset."""
+        data = self.cleaned_data
+        if data.get("flight_number"):
+            queryset = queryset.filter(flight_number__icontains=data["flight_number"])
+        if data.get("origin"):
+            queryset = queryset.filter(origin__icontains=data["origin"])
+        if data.get("destination"):
+            queryset = queryset.filter(destination__icontains=data["destination"])
+        if data.get("status"):
+            queryset = queryset.filter(status=data["status"])
+        if data.get("date_from"):
+            queryset = queryset.filter(departure_time__gte=data["date_from"])
+        if data.get("date_to"):
+            queryset = queryset.filter(departure_time__lte=data["date_to"])
+        return queryset
+
 
 class ResourceAvailabilityForm(forms.Form):
     """Form for checking resource availability."""
@@ -376,50 +677,50 @@ class ResourceConstraintForm(forms.ModelForm):
         queryset=Runway.objects.all(),
         required=False,
         label="Pista Primaria",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("runway", attrs={"class": "form-control p-3.5"}),
     )
     primary_gate = forms.ModelChoiceField(
         queryset=Gate.objects.all(),
         required=False,
         label="Puerta Primaria",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("gate", attrs={"class": "form-control p-3.5"}),
     )
     primary_aircraft = forms.ModelChoiceField(
         queryset=Aircraft.objects.all(),
         required=False,
         label="Aeronave Primaria",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("aircraft", attrs={"class": "form-control p-3.5"}),
     )
     primary_personnel = forms.ModelChoiceField(
         queryset=Personnel.objects.all(),
         required=False,
         label="Personal Primario",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("personnel", attrs={"class": "form-control p-3.5"}),
     )
 
     related_runway = forms.ModelChoiceField(
         queryset=Runway.objects.all(),
         required=False,
         label="Pista Relacionada",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("runway", attrs={"class": "form-control p-3.5"}),
     )
     related_gate = forms.ModelChoiceField(
         queryset=Gate.objects.all(),
         required=False,
         label="Puerta Relacionada",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("gate", attrs={"class": "form-control p-3.5"}),
     )
     related_aircraft = forms.ModelChoiceField(
         queryset=Aircraft.objects.all(),
         required=False,
         label="Aeronave Relacionada",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("aircraft", attrs={"class": "form-control p-3.5"}),
     )
     related_personnel = forms.ModelChoiceField(
         queryset=Personnel.objects.all(),
         required=False,
         label="Personal Relacionado",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect("personnel", attrs={"class": "form-control p-3.5"}),
     )
 
     class Meta:
@@ -588,25 +889,35 @@ class FindSlotForm(forms.Form):
     runway = forms.ModelChoiceField(
         queryset=Runway.objects.filter(is_active=True),
         label="Pista",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect(
+            "runway", {"active": 1}, attrs={"class": "form-control p-3.5"}
+        ),
     )
 
     gate = forms.ModelChoiceField(
         queryset=Gate.objects.filter(is_active=True),
         label="Puerta",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect(
+            "gate", {"active": 1}, attrs={"class": "form-control p-3.5"}
+        ),
     )
 
     aircraft = forms.ModelChoiceField(
         queryset=Aircraft.objects.filter(status="OPERATIONAL"),
         label="Aeronave",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect(
+            "aircraft", {"active": 1}, attrs={"class": "form-control p-3.5"}
+        ),
     )
 
     pilot = forms.ModelChoiceField(
         queryset=Personnel.objects.filter(personnel_type="PILOT", is_active=True),
         label="Piloto",
-        widget=forms.Select(attrs={"class": "form-control p-3.5"}),
+        widget=AutocompleteSelect(
+            "personnel",
+            {"active": 1, "personnel_type": "PILOT"},
+            attrs={"class": "form-control p-3.5"},
+        ),
     )
 
     duration_hours = forms.DecimalField(
@@ -631,3 +942,123 @@ class FindSlotForm(forms.Form):
         ),
         help_text="Deja en blanco para buscar desde ahora",
     )
+
+    hold_slot = forms.BooleanField(
+        required=False,
+        label="Reservar el horario encontrado",
+        help_text="Bloquea los recursos para otros usuarios mientras crea el vuelo",
+    )
+
+    run_in_background = forms.BooleanField(
+        required=False,
+        label="Ejecutar en segundo plano",
+        help_text="Encola la búsqueda y muestra su progreso en lugar de esperar la respuesta",
+    )
+
+    def clean(self):
+        """A background search has no page to show its hold on, so it cannot hold the slot."""
+        cleaned_data = super().clean()
+        if cleaned_data.get("hold_slot") and cleaned_data.get("run_in_background"):
+            raise ValidationError(
+                "Para reservar el horario encontrado, ejecute la búsqueda sin segundo plano."
+            )
+        return cleaned_data
+
+
+class DelaySimulationForm(forms.Form):
+    """Form for simulating a new schedule for an existing flight."""
+
+    new_departure_time = forms.DateTimeField(
+        label="Nueva Hora de Salida",
+        widget=forms.DateTimeInput(
+            attrs={"class": "form-control", "type": "datetime-local"},
+            format="%Y-%m-%dT%H:%M",
+        ),
+    )
+
+    new_arrival_time = forms.DateTimeField(
+        required=False,
+        label="Nueva Hora de Llegada",
+        widget=forms.DateTimeInput(
+            attrs={"class": "form-control", "type": "datetime-local"},
+            format="%Y-%m-%dT%H:%M",
+        ),
+        help_text="Deja en blanco para conservar la duración del vuelo",
+    )
+
+    def clean(self):
+        """Validate that the new arrival is after the new departure."""
+        cleaned_data = super().clean()
+        departure = cleaned_data.get("new_departure_time")
+        arrival = cleaned_data.get("new_arrival_time")
+        if departure and arrival and arrival <= departure:
+            raise ValidationError(
+                "La nueva llegada debe ser posterior a la nueva salida."
+            )
+        return cleaned_data
+
+
+class OutageForm(forms.Form):
+    """Form for planning a resource outage and the reassignment of its flights."""
+
+    start_time = forms.DateTimeField(
+        label="Inicio de la Interrupción",
+        widget=forms.DateTimeInput(
+            attrs={"class": "form-control", "type": "datetime-local"},
+            format="%Y-%m-%dT%H:%M",
+        ),
+    )
+
+    end_time = forms.DateTimeField(
+        required=False,
+        label="Fin de la Interrupción",
+        widget=forms.DateTimeInput(
+            attrs={"class": "form-control", "type": "datetime-local"},
+            format="%Y-%m-%dT%H:%M",
+        ),
+        help_text="Deja en blanco para una interrupción indefinida",
+    )
+
+    def clean(self):
+        """Validate that the outage ends after it starts."""
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get("start_time")
+        end_time = cleaned_data.get("end_time")
+        if start_time and end_time and end_time <= start_time:
+            raise ValidationError(
+                "El fin de la interrupción debe ser posterior a su inicio."
+            )
+        return cleaned_data
+
+
+class AnalyticsPeriodForm(forms.Form):
+    """Form for choosing the period of the utilization and capacity reports."""
+
+    MAX_DAYS = 366
+
+    start_date = forms.DateField(
+        label="Desde",
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+
+    end_date = forms.DateField(
+        label="Hasta",
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+        help_text="Día incluido en el informe",
+    )
+
+    def clean(self):
+        """Validate that the period is not empty and not longer than a year."""
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date and end_date:
+            if end_date < start_date:
+                raise ValidationError(
+                    "La fecha final debe ser igual o posterior a la inicial."
+                )
+            if (end_date - start_date).days >= self.MAX_DAYS:
+                raise ValidationError(
+                    f"El periodo no puede superar {self.MAX_DAYS} días."
+                )
+        return cleaned_data
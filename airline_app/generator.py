@@ -0,0 +1,528 @@
+"""
+Generador de horarios sintéticos para pruebas de carga y escala.
+
+Crea recursos (pistas, puertas, aeronaves, pilotos y copilotos), restricciones de recursos y
+vuelos sin conflictos siguiendo distribuciones configurables (horas pico, proporción de vuelos
+largos). Es determinista a partir de la semilla.
+
+Los conflictos se evitan en memoria: los vuelos se procesan por hora de salida y cada tipo de
+recurso mantiene un heap de ``(libre_desde, id)``. Como la asignación voraz por hora de inicio
+es óptima para intervalos, basta con dimensionar cada conjunto con su concurrencia máxima
+(calculada con un barrido) para que ningún vuelo quede sin recursos. Todo se inserta con
+``bulk_create``; nunca se llama a ``Flight.save()``.
+"""
+
+import heapq
+import itertools
+import math
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .constraints import ConstraintIndex, Rule, flight_resources
+from .models import Aircraft, Flight, Gate, Personnel, ResourceConstraint, Runway
+
+MAINTENANCE_BUFFER = 24 * 3600
+
+# Rangos (mínimo, máximo) de duración en minutos por tipo de vuelo
+SHORT_HAUL = (60, 240)
+MEDIUM_HAUL = (245, 480)
+LONG_HAUL = (485, 840)
+
+DEFAULT_PEAK_HOURS = [(6, 10), (16, 20)]
+
+CITIES = [
+    "Havana",
+    "Miami",
+    "Madrid",
+    "Mexico City",
+    "Cancun",
+    "Bogota",
+    "Panama City",
+    "Toronto",
+    "New York",
+    "Paris",
+    "Lima",
+    "Santo Domingo",
+    "Caracas",
+    "Buenos Aires",
+    "Santiago",
+    "Frankfurt",
+]
+
+BATCH_SIZE = 5000
+
+
+def required_copilots(duration_minutes):
+    """Misma regla que ``Flight.get_required_copilots`` expresada en minutos."""
+    if duration_minutes <= 4 * 60:
+        return 1
+    elif duration_minutes <= 8 * 60:
+        return 2
+    return 3
+
+
+def hourly_weights(peak_hours, peak_weight, night_weight=0.2):
+    """Peso relativo de cada hora del día para la distribución de salidas."""
+    weights = []
+    for hour in range(24):
+        if any(start <= hour < end for start, end in peak_hours):
+            weights.append(peak_weight)
+        elif hour < 5:
+            weights.append(night_weight)
+        else:
+            weights.append(1.0)
+    return weights
+
+
+def max_concurrency(intervals, weights=None):
+    """
+    Máxima cantidad simultánea de intervalos (ponderados) mediante un barrido O(n log n).
+
+    Args:
+        intervals: Iterable de (inicio, fin) en segundos, fin exclusivo
+        weights: Peso de cada intervalo (por defecto 1)
+    """
+    events = []
+    for i, (start, end) in enumerate(intervals):
+        weight = weights[i] if weights else 1
+        events.append((start, weight))
+        events.append((end, -weight))
+    # Las salidas (-) se procesan antes que las entradas en el mismo instante
+    events.sort(key=lambda event: (event[0], event[1]))
+    current = peak = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def plan_flights(rng, flights, days, peak_hours, peak_weight, long_haul_share):
+    """
+    Genera las salidas y duraciones de los vuelos, ordenadas por salida.
+
+    Returns:
+        list[tuple[int, int]]: (segundos desde ``start``, duración en minutos)
+    """
+    weights = hourly_weights(peak_hours, peak_weight)
+    medium_share = min(1 - long_haul_share, 2 * long_haul_share)
+    plan = []
+    hours = rng.choices(range(24), weights=weights, k=flights)
+    for i, hour in enumerate(hours):
+        day = i * days // flights
+        offset = (day * 24 + hour) * 3600 + rng.randrange(0, 60, 5) * 60
+        r = rng.random()
+        if r < long_haul_share:
+            low, high = LONG_HAUL
+        elif r < long_haul_share + medium_share:
+            low, high = MEDIUM_HAUL
+        else:
+            low, high = SHORT_HAUL
+        plan.append((offset, rng.randrange(low, high + 1, 5)))
+    plan.sort()
+    return plan
+
+
+def pool_sizes(plan, slack):
+    """Dimensiona cada tipo de recurso según la concurrencia máxima del plan."""
+    intervals = [(dep, dep + minutes * 60) for dep, minutes in plan]
+    concurrent = max_concurrency(intervals)
+    copilots = max_concurrency(
+        intervals, [required_copilots(minutes) for _, minutes in plan]
+    )
+    aircraft = max_concurrency(
+        [(dep, end + MAINTENANCE_BUFFER) for dep, end in intervals]
+    )
+
+    def grow(n):
+        return max(1, math.ceil(n * (1 + slack)))
+
+    return {
+        "runways": grow(concurrent),
+        "gates": grow(concurrent),
+        "pilots": grow(concurrent),
+        "copilots": grow(copilots),
+        "aircraft": grow(aircraft),
+    }
+
+
+def create_resources(prefix, counts, terminals):
+    """Crea los recursos con ``bulk_create`` y retorna sus IDs por tipo."""
+    Runway.objects.bulk_create(
+        (
+            Runway(
+                name=f"{prefix} Pista {i}",
+                runway_code=f"{prefix}R{i}",
+                length_meters=3000 + (i % 5) * 300,
+                is_active=True,
+            )
+            for i in range(counts["runways"])
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Gate.objects.bulk_create(
+        (
+            Gate(
+                name=f"{prefix} Puerta {i}",
+                gate_code=f"{prefix}G{i}",
+                terminal=f"Terminal {i % terminals + 1}",
+                is_active=True,
+            )
+            for i in range(counts["gates"])
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Aircraft.objects.bulk_create(
+        (
+            Aircraft(
+                registration_number=f"{prefix}N{i}",
+                model="737-800" if i % 3 else "787-9",
+                manufacturer="Boeing",
+                capacity=180 if i % 3 else 290,
+                year_manufactured=2010 + i % 15,
+                status="OPERATIONAL",
+            )
+            for i in range(counts["aircraft"])
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Personnel.objects.bulk_create(
+        (
+            Personnel(
+                first_name=first_name,
+                last_name=f"{prefix}{i}",
+                employee_id=f"{prefix}{code}{i}",
+                personnel_type=personnel_type,
+                license_number=f"{prefix}L{code}{i}",
+                years_of_experience=5 + i % 20,
+                is_active=True,
+            )
+            for personnel_type, first_name, code, count in [
+                ("PILOT", "Piloto", "P", counts["pilots"]),
+                ("COPILOT", "Copiloto", "C", counts["copilots"]),
+            ]
+            for i in range(count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    # Se vuelven a leer los IDs: no todos los motores los retornan en bulk_create
+    return {
+        "runway": list(
+            Runway.objects.filter(runway_code__startswith=f"{prefix}R")
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+        "gate": list(
+            Gate.objects.filter(gate_code__startswith=f"{prefix}G")
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+        "aircraft": list(
+            Aircraft.objects.filter(registration_number__startswith=f"{prefix}N")
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+        "pilot": list(
+            Personnel.objects.filter(employee_id__startswith=f"{prefix}P")
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+        "copilot": list(
+            Personnel.objects.filter(employee_id__startswith=f"{prefix}C")
+            .order_by("id")
+            .values_list("id", flat=True)
+        ),
+    }
+
+
+def create_constraints(rng, prefix, ids, count):
+    """
+    Crea ``count`` restricciones aleatorias (mitad co-requisitos, mitad exclusiones) entre
+    recursos de distinto tipo.
+
+    Returns:
+        ConstraintIndex: Índice con las restricciones creadas
+    """
+    pools = {
+        "runway": ids["runway"],
+        "gate": ids["gate"],
+        "aircraft": ids["aircraft"],
+        "personnel": ids["pilot"],
+    }
+    constraints = []
+    for i in range(count):
+        primary_type, related_type = rng.sample(list(pools), 2)
+        constraint_type = "CO_REQUISITE" if i % 2 == 0 else "MUTUAL_EXCLUSION"
+        constraints.append(
+            ResourceConstraint(
+                name=f"{prefix} Restricción {i}",
+                constraint_type=constraint_type,
+                description="Generada por generate_schedule.",
+                primary_resource_type=primary_type,
+                primary_resource_id=rng.choice(pools[primary_type]),
+                related_resource_type=related_type,
+                related_resource_id=rng.choice(pools[related_type]),
+                is_active=True,
+            )
+        )
+    ResourceConstraint.objects.bulk_create(constraints)
+    return ConstraintIndex(
+        Rule(
+            None,
+            c.name,
+            c.constraint_type,
+            c.primary_resource_type,
+            c.primary_resource_id,
+            c.related_resource_type,
+            c.related_resource_id,
+        )
+        for c in constraints
+    )
+
+
+class ResourcePool:
+    """Heap de ``(libre_desde, id)`` para asignar recursos sin solapamientos."""
+
+    def __init__(self, ids):
+        self.heap = [(-math.inf, resource_id) for resource_id in ids]
+        heapq.heapify(self.heap)
+
+    def take(self, at):
+        """Saca un recurso libre en ``at`` (o None si no hay)."""
+        if self.heap and self.heap[0][0] <= at:
+            return heapq.heappop(self.heap)
+        return None
+
+    def put(self, entry):
+        heapq.heappush(self.heap, entry)
+
+    def release(self, resource_id, free_at):
+        heapq.heappush(self.heap, (free_at, resource_id))
+
+
+def assign_resources(plan, ids, index, stats, max_attempts=8):
+    """
+    Asigna recursos a cada vuelo del plan sin conflictos ni violaciones de restricciones.
+
+    Los vuelos que no se pueden asignar se descartan y se cuentan en ``stats["dropped"]``.
+
+    Yields:
+        tuple: ``(salida, minutos, runway, gate, aircraft, pilot, [copilotos])``
+    """
+    pools = {
+        "runway": ResourcePool(ids["runway"]),
+        "gate": ResourcePool(ids["gate"]),
+        "aircraft": ResourcePool(ids["aircraft"]),
+        "personnel": ResourcePool(ids["pilot"]),
+    }
+    copilots = ResourcePool(ids["copilot"])
+
+    for departure, minutes in plan:
+        arrival = departure + minutes * 60
+        picked = {kind: pool.take(departure) for kind, pool in pools.items()}
+        rejected = []
+        attempts = 0
+
+        while all(picked.values()) and attempts < max_attempts:
+            resources = flight_resources(
+                picked["runway"][1],
+                picked["gate"][1],
+                picked["aircraft"][1],
+                picked["personnel"][1],
+            )
+            violated = index.violations(resources) if index else None
+            if not violated:
+                break
+            # Cambiar el recurso primario siempre resuelve la regla violada
+            kind = violated[0].primary_resource_type
+            kind = "personnel" if kind == "pilot" else kind
+            rejected.append((kind, picked[kind]))
+            picked[kind] = pools[kind].take(departure)
+            attempts += 1
+
+        crew = []
+        needed = required_copilots(minutes)
+        if all(picked.values()) and attempts < max_attempts:
+            crew = [copilots.take(departure) for _ in range(needed)]
+
+        # Los recursos rechazados vuelven al final de los libres para no bloquear la cabeza
+        for kind, (_, resource_id) in rejected:
+            pools[kind].release(resource_id, departure)
+
+        if len(crew) < needed or not all(crew):
+            # Sin capacidad suficiente: se devuelven los recursos y se descarta el vuelo
+            for kind, entry in picked.items():
+                if entry:
+                    pools[kind].put(entry)
+            for entry in crew:
+                if entry:
+                    copilots.put(entry)
+            stats["dropped"] += 1
+            continue
+
+        for kind, (_, resource_id) in picked.items():
+            free_at = arrival + (MAINTENANCE_BUFFER if kind == "aircraft" else 0)
+            pools[kind].release(resource_id, free_at)
+        for _, copilot_id in crew:
+            copilots.release(copilot_id, arrival)
+
+        yield (
+            departure,
+            minutes,
+            picked["runway"][1],
+            picked["gate"][1],
+            picked["aircraft"][1],
+            picked["personnel"][1],
+            [copilot_id for _, copilot_id in crew],
+        )
+
+
+def flight_status(rng, departure, arrival, now, cancelled_share):
+    if rng.random() < cancelled_share:
+        return "CANCELLED"
+    if arrival <= now:
+        return "COMPLETED"
+    if departure <= now:
+        return "IN_PROGRESS"
+    return "SCHEDULED"
+
+
+def insert_flights(rng, prefix, start, assignments, cancelled_share, stdout=None):
+    """
+    Inserta los vuelos y sus copilotos por lotes con ``bulk_create``.
+
+    Returns:
+        int: Cantidad de vuelos insertados
+    """
+    now = timezone.now()
+    Through = Flight.copilots.through
+    assignments = iter(assignments)
+    offset = 0
+
+    while batch := list(itertools.islice(assignments, BATCH_SIZE)):
+        flights = []
+        crews = {}
+        for i, (dep, minutes, runway, gate, aircraft, pilot, crew) in enumerate(
+            batch, start=offset
+        ):
+            departure = start + timedelta(seconds=dep)
+            arrival = departure + timedelta(minutes=minutes)
+            origin, destination = rng.sample(CITIES, 2)
+            number = f"{prefix}{i:07d}"
+            crews[number] = crew
+            flights.append(
+                Flight(
+                    flight_number=number,
+                    origin=origin,
+                    destination=destination,
+                    departure_time=departure,
+                    arrival_time=arrival,
+                    status=flight_status(rng, departure, arrival, now, cancelled_share),
+                    runway_id=runway,
+                    gate_id=gate,
+                    aircraft_id=aircraft,
+                    pilot_id=pilot,
+                )
+            )
+        Flight.objects.bulk_create(flights)
+        ids = Flight.objects.filter(flight_number__in=list(crews)).values_list(
+            "flight_number", "id"
+        )
+        Through.objects.bulk_create(
+            (
+                Through(flight_id=flight_id, personnel_id=copilot_id)
+                for number, flight_id in ids
+                for copilot_id in crews[number]
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        offset += len(batch)
+        if stdout:
+            stdout.write(f"  {offset} vuelos insertados")
+
+    return offset
+
+
+def generate_schedule(
+    flights,
+    seed=0,
+    start=None,
+    days=None,
+    flights_per_day=1000,
+    peak_hours=None,
+    peak_weight=3.0,
+    long_haul_share=0.1,
+    cancelled_share=0.0,
+    constraints=0,
+    terminals=4,
+    slack=0.1,
+    resources=None,
+    prefix="GEN",
+    stdout=None,
+):
+    """
+    Genera un horario sintético completo.
+
+    Args:
+        flights: Cantidad de vuelos a generar
+        seed: Semilla (misma semilla y parámetros = mismo horario)
+        start: Inicio del horario (por defecto: mañana a las 00:00)
+        days: Días que abarca el horario (por defecto: flights / flights_per_day)
+        flights_per_day: Usado para calcular ``days`` si no se indica
+        peak_hours: Lista de (hora_inicio, hora_fin) de horas pico
+        peak_weight: Peso relativo de las horas pico frente a las normales
+        long_haul_share: Proporción de vuelos de larga distancia (> 8 horas)
+        cancelled_share: Proporción de vuelos cancelados
+        constraints: Cantidad de ResourceConstraint a generar
+        terminals: Cantidad de terminales entre las que repartir las puertas
+        slack: Holgura sobre la concurrencia máxima al dimensionar los recursos
+        resources: Diccionario para fijar cantidades (runways, gates, aircraft, pilots, copilots)
+        prefix: Prefijo de códigos y números de vuelo (deben ser únicos en la base de datos)
+
+    Returns:
+        dict: Resumen con la cantidad de recursos, restricciones y vuelos creados
+    """
+    rng = random.Random(seed)
+    if start is None:
+        start = (timezone.now() + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+    if days is None:
+        days = max(1, math.ceil(flights / flights_per_day))
+
+    plan = plan_flights(
+        rng,
+        flights,
+        days,
+        peak_hours or DEFAULT_PEAK_HOURS,
+        peak_weight,
+        long_haul_share,
+    )
+    counts = pool_sizes(plan, slack)
+    # Cada restricción puede inutilizar a lo sumo un recurso primario de cada tipo
+    for name in ["runways", "gates", "aircraft", "pilots"]:
+        counts[name] += constraints
+    counts.update(resources or {})
+
+    with transaction.atomic():
+        ids = create_resources(prefix, counts, terminals)
+        index = (
+            create_constraints(rng, prefix, ids, constraints) if constraints else None
+        )
+        stats = {"dropped": 0}
+        assignments = assign_resources(plan, ids, index, stats)
+        created = insert_flights(
+            rng, prefix, start, assignments, cancelled_share, stdout
+        )
+
+    return {
+        "start": start,
+        "days": days,
+        "resources": counts,
+        "constraints": constraints,
+        "flights": created,
+        "dropped": stats["dropped"],
+    }
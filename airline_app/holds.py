@@ -0,0 +1,231 @@
+"""
+Reservas temporales de horarios (SlotHold).
+
+Entre buscar un horario y terminar de llenar el formulario del vuelo pasan minutos, y en horas
+pico el horario suele ocuparse en ese tiempo. Con ``place_hold`` la búsqueda de horarios
+reserva el conjunto de recursos encontrado y su ventana durante ``SLOT_HOLD_MINUTES`` minutos.
+Mientras la reserva está activa:
+
+- ``Flight.clean`` rechaza los vuelos de otros usuarios que usan esos recursos en la ventana.
+- ``availability.available_resources`` y la búsqueda de horarios (``Occupancy.load`` con
+  ``holds=True``) los tratan como ocupados.
+
+Las reglas son las de un vuelo programado (la aeronave también bloquea 24 horas de
+mantenimiento antes y después). Quien reservó (identificado por su clave de sesión) no se
+bloquea a sí mismo. ``place_hold`` vuelve a comprobar el horario dentro de su transacción, con
+las filas de los recursos bloqueadas: de dos búsquedas que encontraron el mismo horario, solo la
+primera lo reserva. Las reservas vencidas dejan de bloquear de inmediato y se eliminan en
+lote con ``sweep_expired_holds`` (al reservar y con ``python manage.py sweep_holds``).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .availability import MAINTENANCE_BUFFER, RESOURCE_MODELS
+from .models import SlotHold
+from .occupancy import Occupancy
+
+DEFAULT_HOLD_MINUTES = 10
+
+# Tipo de recurso -> campo de la reserva
+HOLD_FIELDS = {
+    "runway": "runway_id",
+    "gate": "gate_id",
+    "aircraft": "aircraft_id",
+    "personnel": "pilot_id",
+}
+
+
+class HoldConflictError(Exception):
+    """El horario ya no está libre: otro vuelo, ocurrencia o reserva tomó algún recurso."""
+
+    def __init__(self, resource_types):
+        self.resource_types = resource_types
+        super().__init__(
+            f"El horario ya no está libre ({', '.join(resource_types)}); busque de nuevo."
+        )
+
+
+def hold_minutes():
+    return getattr(settings, "SLOT_HOLD_MINUTES", DEFAULT_HOLD_MINUTES)
+
+
+def hold_id(pk):
+    """
+    ID virtual negativo de una reserva en el motor de ocupación.
+
+    No choca con los vuelos reales (positivos) ni con las ocurrencias de vuelos recurrentes,
+    cuyo ordinal de fecha nunca es cero (ver ``recurrence.occurrence_id``).
+    """
+    return -(pk << 20)
+
+
+def is_hold_id(flight_id):
+    """Si un ID del motor de ocupación corresponde a una reserva (ver ``hold_id``)."""
+    return flight_id < 0 and flight_id % (1 << 20) == 0
+
+
+def place_hold(
+    holder,
+    runway_id,
+    gate_id,
+    aircraft_id,
+    pilot_id,
+    start,
+    end,
+    minutes=None,
+    now=None,
+):
+    """
+    Reserva los recursos en ``[start, end)``, reemplazando las reservas anteriores del titular.
+
+    Los recursos se bloquean (``select_for_update``, siempre en el mismo orden) y el horario se
+    comprueba de nuevo contra los vuelos, las ocurrencias pendientes de vuelos recurrentes y las
+    reservas activas de otros titulares antes de insertar la reserva.
+
+    Args:
+        holder: Clave de sesión de quien reserva
+        minutes: Duración de la reserva (por defecto ``SLOT_HOLD_MINUTES``)
+
+    Raises:
+        HoldConflictError: Si algún recurso ya no está libre en la ventana
+
+    Returns:
+        SlotHold: La reserva creada
+    """
+    now = now or timezone.now()
+    resources = [
+        ("runway", runway_id),
+        ("gate", gate_id),
+        ("aircraft", aircraft_id),
+        ("personnel", pilot_id),
+    ]
+    with transaction.atomic():
+        # Serializa las reservas concurrentes sobre los mismos recursos
+        for resource_type, resource_id in resources:
+            list(
+                RESOURCE_MODELS[resource_type]
+                .objects.select_for_update()
+                .filter(pk=resource_id)
+                .values_list("pk", flat=True)
+            )
+        sweep_expired_holds(now)
+        SlotHold.objects.filter(holder=holder).delete()
+
+        occupancy = Occupancy.load(
+            start,
+            end,
+            runway_ids=[runway_id],
+            gate_ids=[gate_id],
+            aircraft_ids=[aircraft_id],
+            personnel_ids=[pilot_id],
+            holds=True,
+            holder=holder,
+        )
+        taken = [
+            resource_type
+            for resource_type, resource_id in resources
+            if not occupancy.is_free(resource_type, resource_id, start, end)
+        ]
+        if taken:
+            raise HoldConflictError(taken)
+
+        return SlotHold.objects.create(
+            holder=holder,
+            runway_id=runway_id,
+            gate_id=gate_id,
+            aircraft_id=aircraft_id,
+            pilot_id=pilot_id,
+            start_time=start,
+            end_time=end,
+            expires_at=now
+            + timedelta(minutes=minutes if minutes is not None else hold_minutes()),
+        )
+
+
+def release_holds(holder):
+    """Libera las reservas del titular (por ejemplo, al crear el vuelo reservado)."""
+    return SlotHold.objects.filter(holder=holder).delete()[0]
+
+
+def sweep_expired_holds(now=None):
+    """
+    Elimina las reservas vencidas con un único ``DELETE``.
+
+    Returns:
+        int: Cantidad de reservas eliminadas
+    """
+    return SlotHold.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
+
+
+def blocking_holds(start, end, holder=None):
+    """Reservas activas de otros titulares que pueden bloquear recursos en ``[start, end)``."""
+    holds = SlotHold.objects.active().filter(
+        start_time__lt=end + MAINTENANCE_BUFFER,
+        end_time__gt=start - MAINTENANCE_BUFFER,
+    )
+    if holder:
+        holds = holds.exclude(holder=holder)
+    return holds
+
+
+def held_filter(resource_type, start, end, holder=None):
+    """Condición ``Q`` (subconsulta) de los recursos del tipo reservados por otros."""
+    if resource_type == "aircraft":
+        start, end = start - MAINTENANCE_BUFFER, end + MAINTENANCE_BUFFER
+    holds = SlotHold.objects.active().filter(start_time__lt=end, end_time__gt=start)
+    if holder:
+        holds = holds.exclude(holder=holder)
+    return Q(id__in=holds.values(HOLD_FIELDS[resource_type]))
+
+
+def held_conflicts(runway_id, gate_id, aircraft_id, pilot_id, start, end, holder=None):
+    """
+    Recursos de un vuelo reservados por otros en ``[start, end)`` (una consulta).
+
+    Returns:
+        set[str]: Tipos de recurso en conflicto ('runway', 'gate', 'aircraft', 'personnel')
+    """
+    resources = {
+        "runway": runway_id,
+        "gate": gate_id,
+        "aircraft": aircraft_id,
+        "personnel": pilot_id,
+    }
+    condition = Q()
+    for resource_type, resource_id in resources.items():
+        if resource_id is not None:
+            condition |= Q(**{HOLD_FIELDS[resource_type]: resource_id})
+    if not condition:
+        return set()
+
+    conflicts = set()
+    for hold in blocking_holds(start, end, holder).filter(condition):
+        for resource_type, resource_id in resources.items():
+            margin = MAINTENANCE_BUFFER if resource_type == "aircraft" else timedelta()
+            if (
+                getattr(hold, HOLD_FIELDS[resource_type]) == resource_id
+                and hold.start_time < end + margin
+                and hold.end_time > start - margin
+            ):
+                conflicts.add(resource_type)
+    return conflicts
+
+
+def add_holds(occupancy, start, end, holder=None):
+    """Registra en la ocupación las reservas de otros como vuelos programados (una consulta)."""
+    for hold in blocking_holds(start, end, holder):
+        occupancy.add_flight(
+            hold_id(hold.pk),
+            hold.start_time,
+            hold.end_time,
+            "SCHEDULED",
+            runway=hold.runway_id,
+            gate=hold.gate_id,
+            aircraft=hold.aircraft_id,
+            personnel=[hold.pilot_id],
+        )
@@ -0,0 +1,312 @@
+"""
+Cola local de trabajos en segundo plano, respaldada por la base de datos.
+
+Las operaciones largas (búsquedas de horario en horizontes extensos, auditorías, revalidación
+de restricciones, rollups, materialización de vuelos recurrentes) no deben correr dentro de la
+petición HTTP. ``enqueue`` guarda un ``Job`` pendiente y retorna de inmediato; los workers de
+``python manage.py run_workers`` lo toman, reportan su progreso y guardan el resultado, que la
+interfaz consulta en ``/trabajos/<id>/``. No requiere un broker externo: la tabla de trabajos
+es la cola.
+
+Cada worker reclama el trabajo pendiente más antiguo con un ``UPDATE`` condicional sobre el
+estado, de modo que dos workers (o procesos) nunca ejecutan el mismo trabajo. El resultado se
+guarda con otro ``UPDATE`` condicional (sigue en ejecución y es de este worker): un trabajo
+que ``fail_stale_jobs`` dio por perdido no vuelve a figurar como exitoso. Con
+``--processes N`` el comando arranca N procesos ``run_workers`` independientes, cada uno con su
+propia conexión a la base de datos.
+
+Uso:
+    python manage.py run_workers --processes 4
+    python manage.py run_workers --burst        # procesa la cola y termina
+"""
+
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .audit import ISSUE_LABELS, audit_schedule
+from .constraints import violating_flights
+from .models import Flight, Job, ResourceConstraint
+from .recurrence import materialize_recurring
+from .rollups import update_rollups
+from .transitions import advance_statuses
+
+logger = logging.getLogger("airline_app.jobs")
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Un trabajo en ejecución sin latido durante este tiempo se da por perdido (worker caído)
+DEFAULT_STALE_AFTER = timedelta(hours=1)
+
+# Intervalo mínimo entre escrituras del avance de un trabajo (que también son su latido)
+PROGRESS_INTERVAL = 1.0
+
+# tipo -> (función, etiqueta)
+JOB_TYPES = {}
+
+
+class UnknownJobType(Exception):
+    """No hay ninguna función registrada para el tipo de trabajo."""
+
+
+def register(kind, label):
+    """
+    Decorador que registra una función como tipo de trabajo.
+
+    La función recibe el ``Job`` (para ``job.report_progress``) y los parámetros guardados, y
+    retorna un resultado serializable a JSON.
+    """
+
+    def decorator(func):
+        JOB_TYPES[kind] = (func, label)
+        return func
+
+    return decorator
+
+
+def job_label(kind):
+    return JOB_TYPES[kind][1] if kind in JOB_TYPES else kind
+
+
+def enqueue(kind, **params):
+    """
+    Encola un trabajo (una consulta).
+
+    Args:
+        kind: Tipo registrado con ``register``
+        params: Parámetros serializables a JSON de la función del trabajo
+
+    Returns:
+        Job: El trabajo pendiente
+    """
+    if kind not in JOB_TYPES:
+        raise UnknownJobType(kind)
+    return Job.objects.create(kind=kind, params=params)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def throttled_progress(job, interval=PROGRESS_INTERVAL):
+    """
+    ``job.report_progress`` que escribe a lo sumo una vez cada ``interval`` segundos, para
+    pasarlo a bucles que reportan avance muy seguido.
+    """
+    last = None
+
+    def report(done, total=100, message=""):
+        nonlocal last
+        now = time.monotonic()
+        if last is None or now - last >= interval:
+            last = now
+            job.report_progress(done, total, message)
+
+    return report
+
+
+def claim_next(worker):
+    """
+    Reclama el trabajo pendiente más antiguo.
+
+    Returns:
+        Job | None: El trabajo, ya marcado como en ejecución por este worker
+    """
+    while True:
+        job = Job.objects.filter(status="PENDING").order_by("created_at", "id").first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status="PENDING").update(
+            status="RUNNING", worker=worker, started_at=now, updated_at=now
+        )
+        if claimed:
+            job.status, job.worker, job.started_at = "RUNNING", worker, now
+            return job
+        # Otro worker lo tomó primero: se intenta con el siguiente
+
+
+def run_job(job):
+    """Ejecuta un trabajo reclamado y guarda su resultado o su error."""
+    started = time.perf_counter()
+    try:
+        if job.kind not in JOB_TYPES:
+            raise UnknownJobType(job.kind)
+        func, _ = JOB_TYPES[job.kind]
+        job.result = func(job, **job.params)
+        job.status = "SUCCEEDED"
+        job.progress = 100
+    except Exception:
+        job.status = "FAILED"
+        job.error = traceback.format_exc()
+        logger.exception("Falló el trabajo %s", job)
+    job.finished_at = timezone.now()
+    saved = Job.objects.filter(pk=job.pk, status="RUNNING", worker=job.worker).update(
+        status=job.status,
+        progress=job.progress,
+        result=job.result,
+        error=job.error,
+        finished_at=job.finished_at,
+        updated_at=job.finished_at,
+    )
+    if not saved:
+        # Se dio por perdido (sin latido) mientras corría: se conserva ese estado
+        logger.warning("El trabajo %s ya no pertenecía a este worker", job.pk)
+        job.refresh_from_db()
+    logger.info(
+        "Trabajo %s terminado en %.2fs: %s",
+        job.pk,
+        time.perf_counter() - started,
+        job.status,
+    )
+    return job
+
+
+def fail_stale_jobs(stale_after=None):
+    """
+    Marca como fallidos los trabajos en ejecución sin latido reciente (worker caído).
+
+    No se reintentan automáticamente porque pueden haber quedado a medias.
+
+    Returns:
+        int: Cantidad de trabajos marcados
+    """
+    if stale_after is None:
+        stale_after = timedelta(
+            seconds=getattr(
+                settings, "JOB_STALE_SECONDS", DEFAULT_STALE_AFTER.total_seconds()
+            )
+        )
+    now = timezone.now()
+    return Job.objects.filter(
+        status="RUNNING", updated_at__lt=now - stale_after
+    ).update(
+        status="FAILED",
+        error="El worker dejó de reportar progreso.",
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def work(burst=False, poll_interval=DEFAULT_POLL_INTERVAL, max_jobs=None):
+    """
+    Bucle de un worker: toma trabajos pendientes y los ejecuta uno por uno.
+
+    Args:
+        burst: Termina cuando la cola queda vacía en lugar de esperar nuevos trabajos
+        poll_interval: Segundos de espera cuando no hay trabajos pendientes
+        max_jobs: Termina después de ejecutar esta cantidad de trabajos
+
+    Returns:
+        int: Cantidad de trabajos ejecutados
+    """
+    name = worker_name()
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = claim_next(name)
+        if job is None:
+            if burst:
+                break
+            # Sin trabajo pendiente, se revisan los de otros workers caídos
+            fail_stale_jobs()
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        done += 1
+    return done
+
+
+def _datetime(value):
+    return parse_datetime(value) if value else None
+
+
+def _date(value):
+    return parse_date(value) if value else None
+
+
+# Tipos de trabajo
+
+
+@register("find_slot", "Búsqueda de horario")
+def find_slot_job(
+    job,
+    runway_id,
+    gate_id,
+    aircraft_id,
+    pilot_id,
+    duration_hours,
+    start_search_from=None,
+    holder=None,
+):
+    job.report_progress(0, message="Cargando la ocupación de los recursos")
+    slot = Flight.find_next_available_slot(
+        runway_id,
+        gate_id,
+        aircraft_id,
+        pilot_id,
+        duration_hours,
+        _datetime(start_search_from),
+        holder=holder,
+        progress=throttled_progress(job),
+    )
+    if slot is None:
+        return None
+    return {key: value.isoformat() for key, value in slot.items()}
+
+
+@register("audit_schedule", "Auditoría del horario")
+def audit_schedule_job(job, start=None, end=None):
+    job.report_progress(0, message="Cargando la ocupación")
+    report = audit_schedule(_date(start), _date(end), progress=throttled_progress(job))
+    return {
+        "flights_checked": report.flights_checked,
+        "issues": len(report.issues),
+        **{label: report.counts.get(kind, 0) for kind, label in ISSUE_LABELS.items()},
+    }
+
+
+@register("revalidate_constraints", "Revalidación de restricciones")
+def revalidate_constraints_job(job):
+    constraints = list(ResourceConstraint.objects.filter(is_active=True))
+    violations = {}
+    for i, constraint in enumerate(constraints):
+        count = violating_flights(constraint).count()
+        if count:
+            violations[constraint.name] = count
+        job.report_progress(i + 1, len(constraints), constraint.name)
+    return {"constraints": len(constraints), "violations": violations}
+
+
+@register("update_rollups", "Actualización de rollups")
+def update_rollups_job(job):
+    job.report_progress(0, message="Buscando días con cambios")
+    ranges = update_rollups(progress=throttled_progress(job))
+    return {
+        "ranges": [f"{first} - {last}" for first, last, _ in ranges],
+        "flights": sum(flights for _, _, flights in ranges),
+    }
+
+
+@register("materialize_recurring", "Materialización de vuelos recurrentes")
+def materialize_recurring_job(job, horizon=None):
+    result = materialize_recurring(horizon, progress=throttled_progress(job))
+    return {
+        "created": result.created,
+        "horizon_end": result.horizon_end.isoformat(),
+        "skipped": [
+            f"{occurrence.flight_number}: {reason}"
+            for occurrence, reason in result.skipped
+        ],
+    }
+
+
+@register("advance_statuses", "Transiciones de estado de vuelos")
+def advance_statuses_job(job):
+    return advance_statuses(progress=throttled_progress(job))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airline_app.transitions import DEFAULT_BATCH_SIZE, advance_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Pasa a en progreso los vuelos que ya salieron y a completados los que ya llegaron, "
+        "con UPDATE por lotes. Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Vuelos por lote; cada lote se actualiza en una transacción.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que cero.")
+
+        started = time.perf_counter()
+        counts = advance_statuses(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{counts['IN_PROGRESS']} vuelos en progreso y {counts['COMPLETED']} "
+                f"completados en {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airline_app.archive import (
+    DEFAULT_BATCH_SIZE,
+    archivable_flights,
+    archive_cutoff,
+    archive_flights,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a la tabla de vuelos archivados los vuelos completados y cancelados más "
+        "antiguos que la retención, por lotes y conservando sus copilotos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            help="Días que se conservan los vuelos terminados "
+            "(por defecto: FLIGHT_ARCHIVE_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Vuelos por lote; cada lote se guarda en una transacción.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta los vuelos que se archivarían.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retention_days"] is not None and options["retention_days"] < 0:
+            raise CommandError("--retention-days no puede ser negativo.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que cero.")
+
+        if options["dry_run"]:
+            cutoff = archive_cutoff(retention_days=options["retention_days"])
+            count = archivable_flights(cutoff).count()
+            self.stdout.write(f"{count} vuelos se archivarían.")
+            return
+
+        started = time.perf_counter()
+        total = 0
+        for count in archive_flights(options["retention_days"], options["batch_size"]):
+            total += count
+            self.stdout.write(f"Lote: {count} vuelos archivados")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} vuelos archivados en {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from airline_app.audit import ISSUE_LABELS, audit_schedule
+
+
+def parse_date(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, "%Y-%m-%d"))
+    except ValueError:
+        raise CommandError(f"Fecha inválida (se espera YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Audita la integridad del horario: solapamientos de recursos, mantenimiento de "
+        "aeronaves, copilotos insuficientes y restricciones violadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", help="Fecha inicial YYYY-MM-DD (por defecto: todo)."
+        )
+        parser.add_argument("--end", help="Fecha final YYYY-MM-DD (por defecto: todo).")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Cantidad máxima de inconsistencias a listar (0 = todas).",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Termina con error si se encuentra alguna inconsistencia.",
+        )
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"]) if options["start"] else None
+        end = parse_date(options["end"]) if options["end"] else None
+
+        report = audit_schedule(start, end)
+        numbers = report.flight_numbers()
+
+        issues = report.issues
+        if options["limit"]:
+            issues = issues[: options["limit"]]
+        for issue in issues:
+            flights = ", ".join(numbers.get(i, str(i)) for i in issue.flight_ids)
+            resource = (
+                f"{issue.resource_type} {issue.resource_id}"
+                if issue.resource_id is not None
+                else issue.resource_type
+            )
+            self.stdout.write(
+                f"{issue.start:%Y-%m-%d %H:%M}  {ISSUE_LABELS[issue.kind]:<40} "
+                f"{resource:<16} {flights}"
+            )
+        if len(issues) < len(report.issues):
+            self.stdout.write(f"... y {len(report.issues) - len(issues)} más.")
+
+        for kind, label in ISSUE_LABELS.items():
+            self.stdout.write(f"{label}: {report.counts.get(kind, 0)}")
+
+        summary = (
+            f"{report.flights_checked} vuelos auditados en {report.elapsed:.1f}s, "
+            f"{len(report.issues)} inconsistencias."
+        )
+        if report:
+            if options["fail"]:
+                raise CommandError(summary)
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airline_app.rollups import DEFAULT_CHUNK_DAYS, backfill_rollups
+
+
+def parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Fecha inválida (se espera YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las tablas de rollup diarias del historial por bloques de días "
+        "(vuelos y minutos por recurso, vuelos por ruta)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", help="Fecha inicial YYYY-MM-DD (por defecto: primer vuelo)."
+        )
+        parser.add_argument(
+            "--end", help="Fecha final YYYY-MM-DD (por defecto: último vuelo)."
+        )
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=DEFAULT_CHUNK_DAYS,
+            help="Días por bloque; cada bloque se guarda en una transacción.",
+        )
+
+    def handle(self, *args, **options):
+        first = parse_day(options["start"]) if options["start"] else None
+        last = parse_day(options["end"]) if options["end"] else None
+        if first and last and last < first:
+            raise CommandError(
+                "La fecha final debe ser igual o posterior a la inicial."
+            )
+        if options["chunk_days"] < 1:
+            raise CommandError("--chunk-days debe ser mayor que cero.")
+
+        started = time.perf_counter()
+        chunks = flights = 0
+        for chunk_first, chunk_last, count in backfill_rollups(
+            first, last, options["chunk_days"]
+        ):
+            chunks += 1
+            flights += count
+            self.stdout.write(f"{chunk_first} → {chunk_last}: {count} vuelos")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{chunks} bloques, {flights} vuelos agregados en "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
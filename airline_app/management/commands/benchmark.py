@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from airline_app import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los benchmarks de las rutas críticas sobre una base de datos de pruebas "
+        "y compara los resultados con una línea base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000",
+            help="Cantidades de vuelos a sembrar, separadas por comas "
+            "(ej: 1000,10000,100000,1000000).",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--only",
+            default="",
+            help="Prefijos de benchmarks a ejecutar, separados por comas.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=0,
+            help="Peticiones concurrentes para comparar el throughput WSGI y ASGI "
+            "de la búsqueda de horarios y la disponibilidad (0 = no se mide).",
+        )
+        parser.add_argument(
+            "--slot-workers",
+            type=int,
+            default=0,
+            help="Máximo de procesos para medir la escalabilidad de la búsqueda de "
+            "horarios sobre muchas combinaciones de recursos (0 = no se mide).",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmarks/results.json",
+            help="Archivo JSON donde guardar los resultados.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default="benchmarks/baseline.json",
+            help="Línea base contra la cual comparar ('' para omitir).",
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=benchmarks.DEFAULT_TOLERANCE
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Sobrescribe la línea base con los resultados obtenidos.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Termina con error si se detectan regresiones.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        if options["concurrency"] < 0:
+            raise CommandError("--concurrency no puede ser negativo.")
+        if options["slot_workers"] < 0:
+            raise CommandError("--slot-workers no puede ser negativo.")
+        only = [prefix for prefix in options["only"].split(",") if prefix]
+
+        # Nunca sembrar sobre la base de datos real: se crea una base de pruebas aislada.
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = benchmarks.run_benchmarks(
+                sizes,
+                repeat=options["repeat"],
+                only=only,
+                stdout=self.stdout,
+                concurrency=options["concurrency"],
+                slot_workers=options["slot_workers"],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        benchmarks.save_results(results, options["output"])
+        self.stdout.write(f"Resultados guardados en {options['output']}")
+
+        baseline_path = options["baseline"]
+        if options["update_baseline"]:
+            benchmarks.save_results(results, baseline_path)
+            self.stdout.write(
+                self.style.SUCCESS(f"Línea base actualizada: {baseline_path}")
+            )
+            return
+
+        if not baseline_path:
+            return
+        try:
+            baseline = benchmarks.load_results(baseline_path)
+        except FileNotFoundError:
+            self.stdout.write(
+                self.style.WARNING(f"No existe la línea base {baseline_path}")
+            )
+            return
+
+        regressions = benchmarks.compare(results, baseline, options["tolerance"])
+        for r in regressions:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"REGRESIÓN [{r['size']}] {r['benchmark']} {r['metric']}: "
+                    f"{r['baseline']} -> {r['current']}"
+                )
+            )
+        if not regressions:
+            self.stdout.write(
+                self.style.SUCCESS("Sin regresiones respecto a la línea base.")
+            )
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regresión(es) detectada(s).")
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from airline_app.bulk_actions import (
+    BulkActionError,
+    cancel_flights,
+    set_status,
+    shift_flights,
+)
+from airline_app.models import Flight
+
+# Acción del comando -> (operación, mensaje de éxito)
+ACTIONS = {
+    "cancel": (lambda ids, options: cancel_flights(ids), "cancelados"),
+    "shift": (
+        lambda ids, options: shift_flights(ids, options["minutes"]),
+        "desplazados",
+    ),
+    "start": (
+        lambda ids, options: set_status(ids, "IN_PROGRESS"),
+        "marcados en progreso",
+    ),
+    "complete": (
+        lambda ids, options: set_status(ids, "COMPLETED"),
+        "marcados como completados",
+    ),
+}
+
+
+def _csv(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancela, desplaza o cambia de estado muchos vuelos a la vez: valida la selección "
+        "completa con una sola carga de la ocupación y la aplica con un solo UPDATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=sorted(ACTIONS))
+        parser.add_argument(
+            "--ids", default="", help="IDs de vuelos, separados por comas."
+        )
+        parser.add_argument(
+            "--numbers",
+            default="",
+            help="Números de vuelo, separados por comas.",
+        )
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=0,
+            help="Minutos a desplazar (shift); negativos adelantan los vuelos.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo valida la selección, sin aplicar los cambios.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            ids = [int(flight_id) for flight_id in _csv(options["ids"])]
+        except ValueError:
+            raise CommandError("--ids debe ser una lista de números enteros.")
+        numbers = _csv(options["numbers"])
+        if numbers:
+            ids += Flight.objects.filter(flight_number__in=numbers).values_list(
+                "id", flat=True
+            )
+        if not ids:
+            raise CommandError("Indique los vuelos con --ids o --numbers.")
+        if options["action"] == "shift" and not options["minutes"]:
+            raise CommandError("Indique los minutos a desplazar con --minutes.")
+
+        operation, done = ACTIONS[options["action"]]
+        try:
+            with transaction.atomic():
+                count = operation(ids, options)
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        except BulkActionError as e:
+            for rejection in e.rejections:
+                self.stderr.write(f"{rejection.flight_number}: {rejection.message}")
+            raise CommandError(
+                f"No se aplicó ningún cambio: {len(e.rejections)} vuelo(s) lo impiden."
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"{count} vuelos serían {done}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{count} vuelos {done}."))
@@ -0,0 +1,120 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from airline_app.generator import generate_schedule
+
+
+def parse_peak_hours(value):
+    """Convierte '6-10,16-20' en [(6, 10), (16, 20)]."""
+    try:
+        return [
+            tuple(int(hour) for hour in window.split("-"))
+            for window in value.split(",")
+            if window
+        ]
+    except ValueError:
+        raise CommandError(f"Horas pico inválidas: {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un horario sintético sin conflictos (recursos, restricciones y vuelos) "
+        "para pruebas de carga. Es determinista a partir de --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--start",
+            help="Fecha de inicio YYYY-MM-DD (por defecto: mañana). "
+            "Los vuelos ya terminados se crean como COMPLETED.",
+        )
+        parser.add_argument("--days", type=int, help="Días que abarca el horario.")
+        parser.add_argument("--flights-per-day", type=int, default=1000)
+        parser.add_argument("--peak-hours", default="6-10,16-20")
+        parser.add_argument("--peak-weight", type=float, default=3.0)
+        parser.add_argument(
+            "--long-haul-share",
+            type=float,
+            default=0.1,
+            help="Proporción de vuelos de más de 8 horas.",
+        )
+        parser.add_argument("--cancelled-share", type=float, default=0.0)
+        parser.add_argument(
+            "--constraints",
+            type=int,
+            default=0,
+            help="Cantidad de ResourceConstraint a generar.",
+        )
+        parser.add_argument("--terminals", type=int, default=4)
+        parser.add_argument(
+            "--slack",
+            type=float,
+            default=0.1,
+            help="Holgura de recursos sobre la concurrencia máxima.",
+        )
+        for name in ["runways", "gates", "aircraft", "pilots", "copilots"]:
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                help=f"Fija la cantidad de {name} (por defecto se calcula).",
+            )
+        parser.add_argument(
+            "--prefix",
+            default="GEN",
+            help="Prefijo de códigos (debe ser único; máximo 4 caracteres).",
+        )
+
+    def handle(self, *args, **options):
+        if len(options["prefix"]) > 4:
+            raise CommandError("El prefijo no puede tener más de 4 caracteres.")
+
+        start = None
+        if options["start"]:
+            start = timezone.make_aware(datetime.strptime(options["start"], "%Y-%m-%d"))
+
+        resources = {
+            name: options[name]
+            for name in ["runways", "gates", "aircraft", "pilots", "copilots"]
+            if options[name] is not None
+        }
+
+        started = time.perf_counter()
+        summary = generate_schedule(
+            options["flights"],
+            seed=options["seed"],
+            start=start,
+            days=options["days"],
+            flights_per_day=options["flights_per_day"],
+            peak_hours=parse_peak_hours(options["peak_hours"]),
+            peak_weight=options["peak_weight"],
+            long_haul_share=options["long_haul_share"],
+            cancelled_share=options["cancelled_share"],
+            constraints=options["constraints"],
+            terminals=options["terminals"],
+            slack=options["slack"],
+            resources=resources,
+            prefix=options["prefix"],
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+        elapsed = time.perf_counter() - started
+
+        counts = ", ".join(f"{n} {name}" for name, n in summary["resources"].items())
+        self.stdout.write(f"Recursos: {counts}")
+        self.stdout.write(f"Restricciones: {summary['constraints']}")
+        if summary["dropped"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{summary['dropped']} vuelos descartados por falta de recursos."
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['flights']} vuelos generados en {summary['days']} días "
+                f"desde {summary['start']:%Y-%m-%d} ({elapsed:.1f}s)."
+            )
+        )
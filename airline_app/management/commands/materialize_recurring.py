@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airline_app.recurrence import materialize_recurring
+
+
+class Command(BaseCommand):
+    help = (
+        "Convierte en vuelos las ocurrencias de los vuelos recurrentes dentro del horizonte, "
+        "validándolas en lote; las ocurrencias en conflicto se informan y se omiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            help="Días hacia adelante a materializar "
+            "(por defecto: RECURRING_HORIZON_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        if options["horizon_days"] is not None and options["horizon_days"] < 0:
+            raise CommandError("--horizon-days no puede ser negativo.")
+
+        started = time.perf_counter()
+        result = materialize_recurring(options["horizon_days"])
+        for occurrence, reason in result.skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Omitido {occurrence.flight_number} "
+                    f"({occurrence.departure_time:%d/%m/%Y %H:%M}): {reason}"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} vuelos creados hasta el {result.horizon_end:%d/%m/%Y}, "
+                f"{len(result.skipped)} omitidos, en {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airline_app.jobs import DEFAULT_POLL_INTERVAL, fail_stale_jobs, work
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano encolados (búsquedas de horario, auditorías, "
+        "revalidación de restricciones, rollups, vuelos recurrentes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Cantidad de procesos worker (por defecto: 1).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Procesa los trabajos pendientes y termina.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            help="Termina después de ejecutar esta cantidad de trabajos.",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes debe ser al menos 1.")
+
+        if options["processes"] > 1:
+            self.run_pool(options)
+            return
+
+        stale = fail_stale_jobs()
+        if stale:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{stale} trabajos abandonados marcados como fallidos."
+                )
+            )
+        done = work(
+            burst=options["burst"],
+            poll_interval=options["poll_interval"],
+            max_jobs=options["max_jobs"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{done} trabajos ejecutados."))
+
+    def run_pool(self, options):
+        # Cada worker es un proceso independiente con su propia conexión a la base de datos
+        command = [sys.executable, sys.argv[0], "run_workers", "--processes", "1"]
+        command += ["--poll-interval", str(options["poll_interval"])]
+        if options["burst"]:
+            command.append("--burst")
+        if options["max_jobs"] is not None:
+            command += ["--max-jobs", str(options["max_jobs"])]
+
+        workers = [subprocess.Popen(command) for _ in range(options["processes"])]
+        self.stdout.write(f"{len(workers)} workers iniciados.")
+        try:
+            codes = [worker.wait() for worker in workers]
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            codes = [worker.wait() for worker in workers]
+        if any(codes):
+            raise CommandError(f"Algún worker terminó con error: {codes}")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from airline_app.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Elimina en lote las reservas temporales de horarios vencidas."
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_holds()
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} reservas vencidas eliminadas.")
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airline_app.rollups import update_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza las tablas de rollup diarias: recalcula solo los días con vuelos "
+        "modificados desde la última ejecución. Pensado para ejecutarse periódicamente."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        runs = update_rollups()
+        for first, last, count in runs:
+            self.stdout.write(f"{first} → {last}: {count} vuelos")
+
+        days = sum((last - first).days + 1 for first, last, _ in runs)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{days} días recalculados en {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,341 @@
+"""
+Métricas en proceso con exposición en formato de texto de Prometheus.
+
+Cada proceso acumula sus contadores e histogramas en memoria (protegidos por un lock, por lo
+que es seguro con servidores multi-hilo). Para servidores WSGI con varios procesos se configura
+``METRICS_DIR``: cada proceso vuelca periódicamente su estado a ``<METRICS_DIR>/<pid>.json``
+y el endpoint ``/metrics`` suma los volcados de todos los procesos al exponerlos. Los volcados de
+procesos que ya terminaron se eliminan al exponer (Prometheus ve el descenso de sus contadores
+como un reinicio), de modo que el directorio no crece con cada reinicio de los workers.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Contador monotónico con etiquetas."""
+
+    kind = "counter"
+
+    def __init__(self, registry, name, documentation):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dump(self):
+        return [[list(map(list, key)), value] for key, value in self.values.items()]
+
+    @staticmethod
+    def merge(target, dumped):
+        for key, value in dumped:
+            key = tuple(tuple(pair) for pair in key)
+            target[key] = target.get(key, 0) + value
+
+    def expose(self, values):
+        lines = []
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas y buckets fijos."""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                # [conteos por bucket..., suma, total]
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def dump(self):
+        return [
+            [list(map(list, key)), list(state)] for key, state in self.values.items()
+        ]
+
+    @staticmethod
+    def merge(target, dumped):
+        for key, state in dumped:
+            key = tuple(tuple(pair) for pair in key)
+            current = target.get(key)
+            if current is None:
+                target[key] = list(state)
+            else:
+                target[key] = [a + b for a, b in zip(current, state)]
+
+    def expose(self, values):
+        lines = []
+        for key, state in sorted(values.items()):
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += state[i]
+                labels = _format_labels(key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            lines.append(
+                f"{self.name}_sum{_format_labels(key)} {_format_value(state[-2])}"
+            )
+            lines.append(f"{self.name}_count{_format_labels(key)} {state[-1]}")
+        return lines
+
+
+def _process_exists(pid):
+    """Si el proceso existe. Fuera de POSIX no se puede saber sin efectos: se asume que sí."""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Existe, pero es de otro usuario
+    return True
+
+
+class Registry:
+    """Conjunto de métricas del proceso."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.last_flush = 0.0
+
+    def counter(self, name, documentation):
+        metric = self.metrics[name] = Counter(self, name, documentation)
+        return metric
+
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        metric = self.metrics[name] = Histogram(self, name, documentation, buckets)
+        return metric
+
+    def dump(self):
+        """Estado serializable del proceso actual."""
+        with self.lock:
+            return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    def reset(self):
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+    # Soporte multi-proceso
+    @staticmethod
+    def metrics_dir():
+        return getattr(settings, "METRICS_DIR", None)
+
+    def flush(self):
+        """Vuelca el estado del proceso a METRICS_DIR (si está configurado)."""
+        directory = self.metrics_dir()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self.dump(), fh)
+        os.replace(tmp_path, path)
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        """Vuelca el estado si pasó METRICS_FLUSH_INTERVAL desde el último volcado."""
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        if self.metrics_dir() and time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def collect(self):
+        """Combina el estado propio con los volcados de los demás procesos que siguen vivos."""
+        sources = [self.dump()]
+        directory = self.metrics_dir()
+        if directory and os.path.isdir(directory):
+            own = f"{os.getpid()}.json"
+            for filename in os.listdir(directory):
+                if not filename.endswith(".json") or filename == own:
+                    continue
+                path = os.path.join(directory, filename)
+                pid = filename[: -len(".json")]
+                if pid.isdigit() and not _process_exists(int(pid)):
+                    # Volcado de un proceso terminado
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    with open(path) as fh:
+                        sources.append(json.load(fh))
+                except (OSError, ValueError):
+                    continue
+
+        merged = {name: {} for name in self.metrics}
+        for source in sources:
+            for name, dumped in source.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(merged[name], dumped)
+        return merged
+
+    def expose(self):
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)."""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.expose(merged[name]))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+HTTP_REQUESTS = registry.counter(
+    "airline_http_requests_total", "Peticiones HTTP atendidas por vista."
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "airline_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por vista.",
+)
+HTTP_REQUEST_QUERIES = registry.histogram(
+    "airline_http_request_db_queries",
+    "Consultas SQL ejecutadas por petición.",
+    buckets=QUERY_BUCKETS,
+)
+OPERATION_DURATION = registry.histogram(
+    "airline_operation_duration_seconds",
+    "Latencia de las operaciones de programación de vuelos.",
+)
+FLIGHT_STATUS_TRANSITIONS = registry.counter(
+    "airline_flight_status_transitions_total",
+    "Vuelos que cambiaron de estado por la hora (ver airline_app.transitions).",
+)
+
+
+def timed(operation, histogram=OPERATION_DURATION, result=None, **labels):
+    """
+    Decorador que observa la duración de la función en el histograma dado.
+
+    Args:
+        operation: Valor de la etiqueta ``operation``
+        histogram: Histograma donde registrar la duración
+        result: Función que convierte el valor retornado en la etiqueta ``result``
+            (por defecto ``"ok"``). Un ValidationError se registra como ``"invalid"``
+            y cualquier otra excepción como ``"error"``.
+        labels: Etiquetas adicionales fijas (ej: ``resource_type="runway"``)
+
+    Funciona también con funciones asíncronas (mide hasta que la corrutina termina).
+    """
+
+    def decorator(func):
+        def observe(start, outcome):
+            histogram.observe(
+                time.perf_counter() - start,
+                operation=operation,
+                result=outcome,
+                **labels,
+            )
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    value = await func(*args, **kwargs)
+                    outcome = result(value) if result else "ok"
+                    return value
+                except ValidationError:
+                    outcome = "invalid"
+                    raise
+                finally:
+                    observe(start, outcome)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                value = func(*args, **kwargs)
+                outcome = result(value) if result else "ok"
+                return value
+            except ValidationError:
+                outcome = "invalid"
+                raise
+            finally:
+                observe(start, outcome)
+
+        return wrapper
+
+    return decorator
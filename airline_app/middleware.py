@@ -0,0 +1,234 @@
+"""
+Middlewares de instrumentación de rendimiento.
+
+QueryInstrumentationMiddleware registra por cada petición la cantidad de consultas SQL,
+el tiempo total en base de datos, las consultas duplicadas y el tiempo total de la petición.
+Los datos se exponen en la cabecera ``Server-Timing`` y en una línea de log estructurada
+(logger ``airline_app.performance``).
+
+MetricsMiddleware alimenta las métricas de ``/metrics`` (ver ``airline_app.metrics``) con la
+latencia, el estado y la cantidad de consultas de cada vista.
+
+Ambos middlewares funcionan en modo síncrono (WSGI) y asíncrono (ASGI), de modo que las vistas
+asíncronas no se degradan a un hilo por petición.
+
+Configuración en ``config/settings.py``:
+
+- ``QUERY_BUDGETS``: diccionario ``{nombre_de_vista: máximo_de_consultas}``.
+- ``QUERY_BUDGET_DEFAULT``: presupuesto para vistas sin entrada propia (``None`` = sin límite).
+- ``QUERY_BUDGET_ACTION``: ``"log"`` (advertencia en el log) o ``"raise"`` (lanza QueryBudgetExceeded).
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger("airline_app.performance")
+
+
+class QueryBudgetExceeded(Exception):
+    """La vista ejecutó más consultas SQL que las permitidas por su presupuesto."""
+
+
+class QueryRecorder:
+    """
+    Wrapper de ejecución (``connection.execute_wrapper``) que acumula estadísticas de las
+    consultas ejecutadas mientras está activo.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+            self.queries[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Cantidad de consultas idénticas (mismo SQL y parámetros) repetidas."""
+        return sum(n - 1 for n in self.queries.values() if n > 1)
+
+    @property
+    def similar(self):
+        """Cantidad de consultas con el mismo SQL y distintos parámetros (típico N+1)."""
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def most_repeated(self, limit=3):
+        """Retorna las sentencias SQL más repetidas como lista de (sql, veces)."""
+        return [(sql, n) for sql, n in self.statements.most_common(limit) if n > 1]
+
+
+def get_query_budget(view_name):
+    """Obtiene el presupuesto de consultas configurado para una vista."""
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    if view_name in budgets:
+        return budgets[view_name]
+    return getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+
+
+class QueryInstrumentationMiddleware:
+    """Mide consultas SQL y tiempos de cada petición."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            self.record_queries(stack, recorder)
+            response = self.get_response(request)
+
+        return self.process_metrics(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+
+        # Las conexiones son locales a cada hilo: el ORM asíncrono consulta desde el hilo de
+        # la petición (sync_to_async), así que los wrappers se instalan en ese hilo.
+        stack = ExitStack()
+        await sync_to_async(self.record_queries)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        return self.process_metrics(request, response, recorder, start)
+
+    @staticmethod
+    def record_queries(stack, recorder):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+    def process_metrics(self, request, response, recorder, start):
+        request.query_recorder = recorder
+        wall_time = time.perf_counter() - start
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else None
+
+        response["Server-Timing"] = self.format_server_timing(recorder, wall_time)
+
+        budget = get_query_budget(view_name)
+        over_budget = budget is not None and recorder.count > budget
+
+        payload = {
+            "method": request.method,
+            "path": request.path,
+            "view": view_name,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration * 1000, 2),
+            "duplicate_queries": recorder.duplicates,
+            "similar_queries": recorder.similar,
+            "wall_ms": round(wall_time * 1000, 2),
+            "query_budget": budget,
+        }
+        level = logging.WARNING if over_budget or recorder.duplicates else logging.INFO
+        logger.log(
+            level, "request_metrics %s", json.dumps(payload), extra={"metrics": payload}
+        )
+
+        if over_budget:
+            self.handle_budget_exceeded(view_name, budget, recorder)
+
+        return response
+
+    @staticmethod
+    def format_server_timing(recorder, wall_time):
+        """Construye el valor de la cabecera Server-Timing."""
+        db_ms = recorder.duration * 1000
+        total_ms = wall_time * 1000
+        return ", ".join(
+            [
+                f'db;dur={db_ms:.2f};desc="{recorder.count} queries"',
+                f'dup;desc="{recorder.duplicates} duplicated"',
+                f"app;dur={max(total_ms - db_ms, 0):.2f}",
+                f"total;dur={total_ms:.2f}",
+            ]
+        )
+
+    @staticmethod
+    def handle_budget_exceeded(view_name, budget, recorder):
+        """Registra o lanza el exceso de presupuesto según QUERY_BUDGET_ACTION."""
+        message = (
+            f"La vista {view_name} ejecutó {recorder.count} consultas "
+            f"(presupuesto: {budget})."
+        )
+        if getattr(settings, "QUERY_BUDGET_ACTION", "log") == "raise":
+            raise QueryBudgetExceeded(message)
+
+        logger.warning(
+            "%s Más repetidas: %s",
+            message,
+            json.dumps(recorder.most_repeated()),
+        )
+
+
+class MetricsMiddleware:
+    """Registra latencia, conteo y consultas SQL de cada petición por vista."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    def observe(self, request, response, duration):
+        match = getattr(request, "resolver_match", None)
+        # Las rutas inexistentes se agrupan para no disparar la cardinalidad de etiquetas
+        view_name = match.view_name if match else "unmatched"
+
+        metrics.HTTP_REQUESTS.inc(
+            view=view_name, method=request.method, status=response.status_code
+        )
+        metrics.HTTP_REQUEST_DURATION.observe(
+            duration, view=view_name, method=request.method
+        )
+        recorder = getattr(request, "query_recorder", None)
+        if recorder is not None:
+            metrics.HTTP_REQUEST_QUERIES.observe(recorder.count, view=view_name)
+
+        metrics.registry.maybe_flush()
+        return response
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0003_resourceconstraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="Fecha")),
+                (
+                    "flights",
+                    models.PositiveIntegerField(default=0, verbose_name="Vuelos"),
+                ),
+                ("computed_at", models.DateTimeField(verbose_name="Calculado")),
+                (
+                    "stale",
+                    models.BooleanField(default=False, verbose_name="Desactualizado"),
+                ),
+            ],
+            options={
+                "verbose_name": "Día Agregado",
+                "verbose_name_plural": "Días Agregados",
+                "ordering": ["date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyResourceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Fecha")),
+                (
+                    "resource_type",
+                    models.CharField(
+                        choices=[
+                            ("runway", "Pista"),
+                            ("gate", "Puerta"),
+                            ("aircraft", "Aeronave"),
+                            ("personnel", "Personal"),
+                        ],
+                        max_length=20,
+                        verbose_name="Tipo de Recurso",
+                    ),
+                ),
+                (
+                    "resource_id",
+                    models.PositiveIntegerField(verbose_name="ID del Recurso"),
+                ),
+                (
+                    "flights",
+                    models.PositiveIntegerField(default=0, verbose_name="Vuelos"),
+                ),
+                (
+                    "occupied_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Minutos Ocupados"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Uso Diario de Recurso",
+                "verbose_name_plural": "Uso Diario de Recursos",
+                "indexes": [
+                    models.Index(
+                        fields=["resource_type", "date"],
+                        name="airline_app_resourc_902a92_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "resource_type", "resource_id"),
+                        name="unique_daily_resource_rollup",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyRouteRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Fecha")),
+                ("origin", models.CharField(max_length=100, verbose_name="Origen")),
+                (
+                    "destination",
+                    models.CharField(max_length=100, verbose_name="Destino"),
+                ),
+                (
+                    "flights",
+                    models.PositiveIntegerField(default=0, verbose_name="Vuelos"),
+                ),
+            ],
+            options={
+                "verbose_name": "Vuelos Diarios por Ruta",
+                "verbose_name_plural": "Vuelos Diarios por Ruta",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "origin", "destination"),
+                        name="unique_daily_route_rollup",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0004_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedFlight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original_id",
+                    models.PositiveBigIntegerField(
+                        unique=True, verbose_name="ID del Vuelo Original"
+                    ),
+                ),
+                (
+                    "flight_number",
+                    models.CharField(
+                        db_index=True, max_length=20, verbose_name="Número de Vuelo"
+                    ),
+                ),
+                ("origin", models.CharField(max_length=100, verbose_name="Origen")),
+                (
+                    "destination",
+                    models.CharField(max_length=100, verbose_name="Destino"),
+                ),
+                (
+                    "departure_time",
+                    models.DateTimeField(db_index=True, verbose_name="Hora de Salida"),
+                ),
+                ("arrival_time", models.DateTimeField(verbose_name="Hora de Llegada")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("SCHEDULED", "Programado"),
+                            ("IN_PROGRESS", "En Progreso"),
+                            ("COMPLETED", "Completado"),
+                            ("CANCELLED", "Cancelado"),
+                            ("DELAYED", "Retrasado"),
+                        ],
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Archivado"),
+                ),
+                (
+                    "aircraft",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_flights",
+                        to="airline_app.aircraft",
+                        verbose_name="Aeronave",
+                    ),
+                ),
+                (
+                    "copilots",
+                    models.ManyToManyField(
+                        related_name="archived_flights_as_copilot",
+                        to="airline_app.personnel",
+                        verbose_name="Copilotos",
+                    ),
+                ),
+                (
+                    "gate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_flights",
+                        to="airline_app.gate",
+                        verbose_name="Puerta",
+                    ),
+                ),
+                (
+                    "pilot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_flights_as_pilot",
+                        to="airline_app.personnel",
+                        verbose_name="Piloto",
+                    ),
+                ),
+                (
+                    "runway",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_flights",
+                        to="airline_app.runway",
+                        verbose_name="Pista",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Vuelo Archivado",
+                "verbose_name_plural": "Vuelos Archivados",
+                "ordering": ["-departure_time"],
+            },
+        ),
+    ]
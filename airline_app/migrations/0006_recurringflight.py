@@ -0,0 +1,141 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0005_archivedflight"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurringFlight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "flight_number",
+                    models.CharField(
+                        help_text="Cada ocurrencia se numera como NUMERO-AAMMDD.",
+                        max_length=13,
+                        unique=True,
+                        verbose_name="Número de Vuelo",
+                    ),
+                ),
+                ("origin", models.CharField(max_length=100, verbose_name="Origen")),
+                (
+                    "destination",
+                    models.CharField(max_length=100, verbose_name="Destino"),
+                ),
+                (
+                    "weekdays",
+                    models.CharField(
+                        help_text="Días ISO en que opera, p. ej. 135 = lunes, miércoles y viernes.",
+                        max_length=7,
+                        verbose_name="Días de la Semana",
+                    ),
+                ),
+                (
+                    "departure_time",
+                    models.TimeField(verbose_name="Hora de Salida (local)"),
+                ),
+                (
+                    "duration_minutes",
+                    models.PositiveIntegerField(verbose_name="Duración (minutos)"),
+                ),
+                ("start_date", models.DateField(verbose_name="Desde")),
+                (
+                    "end_date",
+                    models.DateField(blank=True, null=True, verbose_name="Hasta"),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="Activo")),
+                (
+                    "materialized_until",
+                    models.DateField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="Materializado Hasta",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "aircraft",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="recurring_flights",
+                        to="airline_app.aircraft",
+                        verbose_name="Aeronave",
+                    ),
+                ),
+                (
+                    "copilots",
+                    models.ManyToManyField(
+                        limit_choices_to={
+                            "is_active": True,
+                            "personnel_type": "COPILOT",
+                        },
+                        related_name="recurring_flights_as_copilot",
+                        to="airline_app.personnel",
+                        verbose_name="Copilotos",
+                    ),
+                ),
+                (
+                    "gate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="recurring_flights",
+                        to="airline_app.gate",
+                        verbose_name="Puerta",
+                    ),
+                ),
+                (
+                    "pilot",
+                    models.ForeignKey(
+                        limit_choices_to={"is_active": True, "personnel_type": "PILOT"},
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="recurring_flights_as_pilot",
+                        to="airline_app.personnel",
+                        verbose_name="Piloto",
+                    ),
+                ),
+                (
+                    "runway",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="recurring_flights",
+                        to="airline_app.runway",
+                        verbose_name="Pista",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Vuelo Recurrente",
+                "verbose_name_plural": "Vuelos Recurrentes",
+                "ordering": ["flight_number"],
+            },
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="recurring_flight",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="occurrences",
+                to="airline_app.recurringflight",
+                verbose_name="Vuelo Recurrente",
+            ),
+        ),
+    ]
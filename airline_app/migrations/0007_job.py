@@ -0,0 +1,94 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0006_recurringflight"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=50, verbose_name="Tipo")),
+                (
+                    "params",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Parámetros"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pendiente"),
+                            ("RUNNING", "En Ejecución"),
+                            ("SUCCEEDED", "Completado"),
+                            ("FAILED", "Fallido"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Progreso (%)"
+                    ),
+                ),
+                (
+                    "progress_message",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="Mensaje de Progreso"
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(blank=True, null=True, verbose_name="Resultado"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "worker",
+                    models.CharField(blank=True, max_length=100, verbose_name="Worker"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Iniciado"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Terminado"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Trabajo",
+                "verbose_name_plural": "Trabajos",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="airline_app_status_e2f8e9_idx",
+                    )
+                ],
+            },
+        ),
+    ]
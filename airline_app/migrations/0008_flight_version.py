@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0007_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
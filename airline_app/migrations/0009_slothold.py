@@ -0,0 +1,82 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0008_flight_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("holder", models.CharField(max_length=64, verbose_name="Titular")),
+                ("start_time", models.DateTimeField(verbose_name="Desde")),
+                ("end_time", models.DateTimeField(verbose_name="Hasta")),
+                ("expires_at", models.DateTimeField(verbose_name="Vence")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "aircraft",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_holds",
+                        to="airline_app.aircraft",
+                        verbose_name="Aeronave",
+                    ),
+                ),
+                (
+                    "gate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_holds",
+                        to="airline_app.gate",
+                        verbose_name="Puerta de Embarque",
+                    ),
+                ),
+                (
+                    "pilot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_holds",
+                        to="airline_app.personnel",
+                        verbose_name="Piloto",
+                    ),
+                ),
+                (
+                    "runway",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_holds",
+                        to="airline_app.runway",
+                        verbose_name="Pista",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Reserva Temporal",
+                "verbose_name_plural": "Reservas Temporales",
+                "ordering": ["expires_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="airline_app_expires_43b0e7_idx"
+                    ),
+                    models.Index(
+                        fields=["holder"], name="airline_app_holder_ff2b4b_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0009_slothold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="personnel",
+            index=models.Index(
+                fields=["last_name", "first_name"], name="personnel_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="personnel",
+            index=models.Index(fields=["first_name"], name="personnel_first_name_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0010_personnel_name_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["departure_time"], name="flight_departure_idx"),
+        ),
+    ]
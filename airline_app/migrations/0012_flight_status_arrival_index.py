@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0011_flight_departure_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["status", "arrival_time"], name="flight_status_arrival_idx"
+            ),
+        ),
+    ]
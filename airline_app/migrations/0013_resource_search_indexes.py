@@ -0,0 +1,54 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+# Columnas del autocompletado (ver ``airline_app.autocomplete.SEARCH_FIELDS``) -> nombre del índice
+SEARCH_COLUMNS = {
+    "runway": {"runway_code": "runway_code_upper_idx", "name": "runway_name_upper_idx"},
+    "gate": {"gate_code": "gate_code_upper_idx", "name": "gate_name_upper_idx"},
+    "aircraft": {"registration_number": "aircraft_reg_upper_idx"},
+    "personnel": {
+        "last_name": "personnel_last_upper_idx",
+        "first_name": "personnel_first_upper_idx",
+        "employee_id": "personnel_empid_upper_idx",
+    },
+}
+
+
+def search_indexes(vendor):
+    """
+    Índices funcionales sobre ``UPPER(columna)`` para la búsqueda por prefijo sin distinguir
+    mayúsculas.
+
+    En PostgreSQL llevan la clase de operadores ``text_pattern_ops``, que permite resolver
+    ``LIKE 'ABC%'`` con el índice sea cual sea la collation de la base; el resto de las bases
+    busca por rango sobre el índice simple.
+    """
+    for model_name, columns in SEARCH_COLUMNS.items():
+        for column, name in columns.items():
+            expression = Upper(column)
+            if vendor == "postgresql":
+                from django.contrib.postgres.indexes import OpClass
+
+                expression = OpClass(expression, name="text_pattern_ops")
+            yield model_name, models.Index(expression, name=name)
+
+
+def create_indexes(apps, schema_editor):
+    for model_name, index in search_indexes(schema_editor.connection.vendor):
+        schema_editor.add_index(apps.get_model("airline_app", model_name), index)
+
+
+def drop_indexes(apps, schema_editor):
+    for model_name, index in search_indexes(schema_editor.connection.vendor):
+        schema_editor.remove_index(apps.get_model("airline_app", model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airline_app", "0012_flight_status_arrival_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
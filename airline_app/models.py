@@ -1,9 +1,22 @@
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+from . import metrics
+
+
+# Días hacia adelante que recorre la búsqueda del próximo horario disponible
+SLOT_SEARCH_DAYS = 30
+
+
+def _availability_result(available):
+    return "available" if available else "busy"
+
 
 class ResourceConstraint(models.Model):
     """
@@ -63,6 +76,8 @@ class ResourceConstraint(models.Model):
 
     def get_primary_resource(self):
         """Obtiene la instancia del recurso primario."""
+        if hasattr(self, "_primary_resource"):
+            return self._primary_resource
         if self.primary_resource_type == "runway":
             return Runway.objects.filter(id=self.primary_resource_id).first()
         elif self.primary_resource_type == "gate":
@@ -75,6 +90,8 @@ class ResourceConstraint(models.Model):
 
     def get_related_resource(self):
         """Obtiene la instancia del recurso relacionado."""
+        if hasattr(self, "_related_resource"):
+            return self._related_resource
         if self.related_resource_type == "runway":
             return Runway.objects.filter(id=self.related_resource_id).first()
         elif self.related_resource_type == "gate":
@@ -85,6 +102,50 @@ class ResourceConstraint(models.Model):
             return Personnel.objects.filter(id=self.related_resource_id).first()
         return None
 
+    @classmethod
+    def resolve_resources(cls, constraints):
+        """
+        Carga los recursos primarios y relacionados de varias restricciones con una consulta
+        por tipo de recurso, en lugar de dos consultas por restricción.
+
+        Args:
+            constraints: Iterable de restricciones (se evalúa a lista)
+
+        Returns:
+            list: Las mismas restricciones, con los recursos ya resueltos
+        """
+        constraints = list(constraints)
+        models_by_type = {
+            "runway": Runway,
+            "gate": Gate,
+            "aircraft": Aircraft,
+            "personnel": Personnel,
+        }
+        wanted = {resource_type: set() for resource_type in models_by_type}
+        for constraint in constraints:
+            if constraint.primary_resource_type in wanted:
+                wanted[constraint.primary_resource_type].add(
+                    constraint.primary_resource_id
+                )
+            if constraint.related_resource_type in wanted:
+                wanted[constraint.related_resource_type].add(
+                    constraint.related_resource_id
+                )
+
+        resolved = {
+            resource_type: models_by_type[resource_type].objects.in_bulk(ids)
+            for resource_type, ids in wanted.items()
+            if ids
+        }
+        for constraint in constraints:
+            constraint._primary_resource = resolved.get(
+                constraint.primary_resource_type, {}
+            ).get(constraint.primary_resource_id)
+            constraint._related_resource = resolved.get(
+                constraint.related_resource_type, {}
+            ).get(constraint.related_resource_id)
+        return constraints
+
 
 class Runway(models.Model):
     """
@@ -115,6 +176,7 @@ class Runway(models.Model):
     def __str__(self):
         return f"{self.runway_code} - {self.name}"
 
+    @metrics.timed("is_available", result=_availability_result, resource_type="runway")
     def is_available(self, start_time, end_time, exclude_flight_id=None):
         """
         Checkea si la pista está disponible para el marco de tiempo dado.
@@ -162,6 +224,7 @@ class Gate(models.Model):
     def __str__(self):
         return f"{self.gate_code} - {self.terminal}"
 
+    @metrics.timed("is_available", result=_availability_result, resource_type="gate")
     def is_available(self, start_time, end_time, exclude_flight_id=None):
         """
         Checkea si la puerta de abordaje está disponible para el marco de tiempo dado.
@@ -219,6 +282,11 @@ class Personnel(models.Model):
         verbose_name = "Personal"
         verbose_name_plural = "Personal"
         ordering = ["last_name", "first_name"]
+        indexes = [
+            # Orden del autocompletado (la búsqueda usa los índices de UPPER, migración 0013)
+            models.Index(fields=["last_name", "first_name"], name="personnel_name_idx"),
+            models.Index(fields=["first_name"], name="personnel_first_name_idx"),
+        ]
 
     def clean(self):
         errors = {}
@@ -238,6 +306,9 @@ class Personnel(models.Model):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    @metrics.timed(
+        "is_available", result=_availability_result, resource_type="personnel"
+    )
     def is_available(self, start_time, end_time, exclude_flight_id=None):
         """
         Checkea si el personal seleccionado está disponible para el marco de tiempo dado.
@@ -308,6 +379,9 @@ class Aircraft(models.Model):
     def __str__(self):
         return f"{self.registration_number} - {self.manufacturer} {self.model}"
 
+    @metrics.timed(
+        "is_available", result=_availability_result, resource_type="aircraft"
+    )
     def is_available(self, start_time, end_time, exclude_flight_id=None):
         """
         Checkea si el avión está disponible para el marco de tiempo dado.
@@ -362,6 +436,59 @@ class Aircraft(models.Model):
             raise ValidationError(errors)
 
 
+def _display_value(field, value):
+    """Valor legible de un campo para los mensajes de conflicto."""
+    if value is None or value == "":
+        return "—"
+    if field.choices:
+        return str(dict(field.flatchoices).get(value, value))
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime("%d/%m/%Y %H:%M")
+    return str(value)
+
+
+class StaleFlightError(ValidationError):
+    """
+    El vuelo cambió desde que el usuario lo cargó (control de concurrencia optimista).
+
+    ``changes`` lista (campo, valor guardado, valor del usuario) de los campos que difieren.
+    """
+
+    def __init__(self, flight, changes):
+        self.flight = flight
+        self.changes = changes
+        message = "Otro usuario modificó este vuelo mientras usted lo editaba. "
+        if changes:
+            message += "Valores guardados que difieren de los suyos: " + "; ".join(
+                f"{label}: {current} (suyo: {mine})" for label, current, mine in changes
+            )
+            message += ". "
+        super().__init__(
+            message + "Revise los cambios y guarde de nuevo para sobrescribirlos."
+        )
+
+
+# Campo del vuelo -> tipo de recurso, para los conflictos de disponibilidad
+CONFLICT_FIELDS = {
+    "runway": "runway",
+    "gate": "gate",
+    "aircraft": "aircraft",
+    "pilot": "personnel",
+}
+
+# Alternativas sugeridas por cada recurso en conflicto
+CONFLICT_ALTERNATIVES = 3
+
+
+class FlightQuerySet(models.QuerySet):
+    def delete(self):
+        """Borra los vuelos e invalida sus días en los rollups con una sola consulta."""
+        RollupDay.objects.filter(
+            date__in=self.annotate(day=TruncDate("departure_time")).values("day")
+        ).update(stale=True)
+        return super().delete()
+
+
 class Flight(models.Model):
     """
     Representa el evento de "vuelo", evento principal del programa que consume los recursos asignados.
@@ -415,13 +542,36 @@ class Flight(models.Model):
         verbose_name="Copilotos",
     )
 
+    # Patrón del que se materializó el vuelo (ver ``airline_app.recurrence``)
+    recurring_flight = models.ForeignKey(
+        "RecurringFlight",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="occurrences",
+        verbose_name="Vuelo Recurrente",
+    )
+
+    # Se incrementa con cada guardado; las ediciones lo comparan para no pisar cambios ajenos
+    version = models.PositiveIntegerField(default=1, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FlightQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Vuelo"
         verbose_name_plural = "Vuelos"
         ordering = ["-departure_time"]
+        indexes = [
+            # Orden por defecto y jerarquía de fechas del admin sin recorrer la tabla
+            models.Index(fields=["departure_time"], name="flight_departure_idx"),
+            # Vuelos con transiciones de estado vencidas (ver ``airline_app.transitions``)
+            models.Index(
+                fields=["status", "arrival_time"], name="flight_status_arrival_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Vuelo {self.flight_number}: {self.origin} → {self.destination}"
@@ -456,6 +606,7 @@ class Flight(models.Model):
         else:
             return 3
 
+    @metrics.timed("flight_clean")
     def clean(self):
         """
         Valida los datos proporcionados para crear el vuelo y los recursos asignados.
@@ -541,6 +692,63 @@ class Flight(models.Model):
                     code="pilot_conflict",
                 )
 
+            # Ocurrencias pendientes de vuelos recurrentes (ver ``airline_app.recurrence``)
+            from .recurrence import reserved_resources
+
+            reserved = reserved_resources(
+                [
+                    (resource_type, getattr(self, f"{field}_id"))
+                    for field, resource_type in CONFLICT_FIELDS.items()
+                ],
+                self.departure_time,
+                self.arrival_time,
+            )
+            for field, resource_type in CONFLICT_FIELDS.items():
+                number = reserved.get((resource_type, getattr(self, f"{field}_id")))
+                if number and field not in errors:
+                    errors[field] = ValidationError(
+                        f"El recurso está reservado por el vuelo recurrente {number} "
+                        "durante el tiempo seleccionado.",
+                        code=f"{field}_reserved",
+                    )
+
+            # Reservas temporales de otros usuarios (ver ``airline_app.holds``)
+            from .holds import held_conflicts
+
+            held = held_conflicts(
+                self.runway_id,
+                self.gate_id,
+                self.aircraft_id,
+                self.pilot_id,
+                self.departure_time,
+                self.arrival_time,
+                holder=getattr(self, "slot_holder", None),
+            )
+            for field, resource_type in CONFLICT_FIELDS.items():
+                if resource_type in held and field not in errors:
+                    errors[field] = ValidationError(
+                        "El recurso está reservado temporalmente por otro usuario "
+                        "durante el tiempo seleccionado.",
+                        code=f"{field}_held",
+                    )
+
+            # Cada conflicto sugiere recursos libres del mismo tipo para la misma ventana
+            conflicted = [
+                field
+                for field in CONFLICT_FIELDS
+                if field in errors
+                and errors[field].code
+                in (f"{field}_conflict", f"{field}_reserved", f"{field}_held")
+            ]
+            if conflicted:
+                alternatives = self.suggest_alternatives(conflicted)
+                for field in conflicted:
+                    errors[field] = ValidationError(
+                        errors[field].message,
+                        code=errors[field].code,
+                        params={"alternatives": alternatives[field]},
+                    )
+
             # Valida restricciones de recursos
             constraint_errors = self.validate_resource_constraints()
             if constraint_errors:
@@ -549,6 +757,49 @@ class Flight(models.Model):
         if errors:
             raise ValidationError(errors)
 
+    def suggest_alternatives(self, fields, limit=CONFLICT_ALTERNATIVES):
+        """
+        Recursos libres para reemplazar los de los campos dados en la ventana del vuelo.
+
+        Una consulta por tipo de recurso, una para el índice de restricciones y una o dos para
+        las ocurrencias pendientes de vuelos recurrentes (ver
+        ``availability.alternative_resources``).
+
+        Args:
+            fields: Campos del vuelo ('runway', 'gate', 'aircraft', 'pilot')
+            limit: Cantidad máxima de alternativas por campo
+
+        Returns:
+            dict: Campo -> lista de recursos alternativos
+        """
+        from .availability import alternative_resources
+        from .constraints import ConstraintIndex, flight_resources
+        from .recurrence import pending_occurrences
+
+        index = ConstraintIndex.load()
+        occurrences = pending_occurrences(self.departure_time, self.arrival_time)
+        resources = flight_resources(
+            self.runway_id, self.gate_id, self.aircraft_id, self.pilot_id
+        )
+        return {
+            field: alternative_resources(
+                CONFLICT_FIELDS[field],
+                self.departure_time,
+                self.arrival_time,
+                resources,
+                exclude_flight_id=self.pk,
+                holder=getattr(self, "slot_holder", None),
+                index=index,
+                occurrences=occurrences,
+                limit=limit,
+            )
+            for field in fields
+        }
+
+    @metrics.timed(
+        "validate_resource_constraints",
+        result=lambda errors: "violated" if errors else "ok",
+    )
     def validate_resource_constraints(self):
         """
         Valida que el vuelo no viole ninguna restricción de recursos activa.
@@ -605,15 +856,21 @@ class Flight(models.Model):
 
         return errors
 
-    def validate_copilots(self):
+    @metrics.timed("validate_copilots")
+    def validate_copilots(self, copilots=None):
         """
         Valida que el vuelo tenga la cantidad de copilotos requerida y valida que los copilotos estén disponibles en el rango de tiempo dado.
+
+        Args:
+            copilots: Copilotos a validar antes de asignarlos (por defecto los ya asignados),
+                para no guardar un vuelo que luego se rechaza
         """
         errors = []
 
         # verificar si tenemos la cantidad minima de copilotos asignados
         required = self.get_required_copilots()
-        assigned = self.copilots.count()
+        copilots = list(self.copilots.all() if copilots is None else copilots)
+        assigned = len(copilots)
 
         if assigned < required:
             errors.append(
@@ -623,9 +880,37 @@ class Flight(models.Model):
                 )
             )
 
-        # Valida cada copiloto
+        # Disponibilidad de todos los copilotos con una sola consulta
+        from .availability import busy_resource_ids
+
         exclude_id = self.pk if self.pk else None
-        for copilot in self.copilots.all():
+        busy = (
+            busy_resource_ids(
+                [copilot.id for copilot in copilots],
+                "personnel",
+                self.departure_time,
+                self.arrival_time,
+                exclude_flight_id=exclude_id,
+            )
+            if copilots
+            else set()
+        )
+
+        # Ocurrencias de vuelos recurrentes pendientes que ya reservaron a los copilotos
+        from .recurrence import reserved_resources
+
+        reserved = (
+            reserved_resources(
+                [("personnel", copilot.id) for copilot in copilots],
+                self.departure_time,
+                self.arrival_time,
+            )
+            if copilots
+            else {}
+        )
+
+        # Valida cada copiloto
+        for copilot in copilots:
             if copilot.personnel_type != "COPILOT":
                 errors.append(
                     ValidationError(
@@ -634,25 +919,130 @@ class Flight(models.Model):
                     )
                 )
 
-            if not copilot.is_available(
-                self.departure_time, self.arrival_time, exclude_id
-            ):
+            if copilot.id in busy:
                 errors.append(
                     ValidationError(
                         f"Co-pilot {copilot.get_full_name()} no está disponible durante el tiempo seleccionado.",
                         code="copilot_conflict",
                     )
                 )
+            elif ("personnel", copilot.id) in reserved:
+                errors.append(
+                    ValidationError(
+                        f"Co-pilot {copilot.get_full_name()} está reservado por el vuelo "
+                        f"recurrente {reserved[('personnel', copilot.id)]} durante el "
+                        "tiempo seleccionado.",
+                        code="copilot_reserved",
+                    )
+                )
 
         if errors:
             raise ValidationError(errors)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Salida cargada, para invalidar su día en los rollups si el vuelo se reprograma
+        instance._loaded_departure = instance.__dict__.get("departure_time")
+        return instance
+
     def save(self, *args, **kwargs):
         """Corre una validación completa antes salvar los datos a la base de datos."""
         self.full_clean()
-        super().save(*args, **kwargs)
+        if self._state.adding:
+            super().save(*args, **kwargs)
+        else:
+            self._save_version(*args, **kwargs)
+
+        loaded = getattr(self, "_loaded_departure", None)
+        if loaded and timezone.localdate(loaded) != timezone.localdate(
+            self.departure_time
+        ):
+            RollupDay.mark_stale(loaded)
+        self._loaded_departure = self.departure_time
+
+    def _save_version(self, *args, **kwargs):
+        """
+        Actualiza el vuelo solo si nadie lo guardó desde que se cargó.
+
+        ``UPDATE … WHERE version = n`` reclama la versión antes de escribir; la validación
+        ya corrió fuera de la transacción, así que no se retiene ningún bloqueo mientras tanto.
+
+        Raises:
+            StaleFlightError: Si otro guardado avanzó la versión
+        """
+        expected = self.version
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        with transaction.atomic():
+            claimed = Flight.objects.filter(pk=self.pk, version=expected).update(
+                version=expected + 1
+            )
+            if not claimed:
+                current = Flight.objects.filter(pk=self.pk).first()
+                if current is None:
+                    raise ValidationError("Otro usuario eliminó este vuelo.")
+                raise current.conflict_error(
+                    {
+                        field.name: getattr(self, field.name)
+                        for field in self._meta.concrete_fields
+                        if field.editable and not field.primary_key
+                    }
+                )
+            self.version = expected + 1
+            try:
+                super().save(*args, **kwargs)
+            except Exception:
+                self.version = expected
+                raise
+
+    def conflict_error(self, values):
+        """
+        Error de edición concurrente con la diferencia entre este vuelo (el guardado) y los
+        valores que el usuario intentó guardar.
+
+        Args:
+            values: {nombre de campo: valor}; ``copilots`` admite un iterable de personal
+
+        Returns:
+            StaleFlightError
+        """
+        changes = []
+        for name, mine in values.items():
+            field = self._meta.get_field(name)
+            if field.many_to_many:
+                current = sorted(str(p) for p in getattr(self, name).all())
+                mine = sorted(str(p) for p in mine)
+                if current != mine:
+                    changes.append(
+                        (
+                            field.verbose_name,
+                            ", ".join(current) or "—",
+                            ", ".join(mine) or "—",
+                        )
+                    )
+                continue
+            current = getattr(self, name)
+            if current != mine:
+                changes.append(
+                    (
+                        field.verbose_name,
+                        _display_value(field, current),
+                        _display_value(field, mine),
+                    )
+                )
+        return StaleFlightError(self, changes)
+
+    def delete(self, *args, **kwargs):
+        """Invalida el día del vuelo en los rollups antes de borrarlo."""
+        RollupDay.mark_stale(self.departure_time)
+        return super().delete(*args, **kwargs)
 
     @staticmethod
+    @metrics.timed(
+        "find_next_available_slot",
+        result=lambda slot: "found" if slot else "not_found",
+    )
     def find_next_available_slot(
         runway_id,
         gate_id,
@@ -660,6 +1050,9 @@ class Flight(models.Model):
         pilot_id,
         duration_hours,
         start_search_from=None,
+        workers=None,
+        holder=None,
+        progress=None,
     ):
         """
         Busca el próximo slot de tiempo disponible donde TODOS los recursos estén libres
@@ -672,19 +1065,28 @@ class Flight(models.Model):
             pilot_id: ID del piloto
             duration_hours: Duración del vuelo en horas
             start_search_from: Fecha desde la cual buscar (por defecto: ahora)
+            workers: Procesos entre los que repartir la ventana de búsqueda
+                (ver ``airline_app.slot_search``; por defecto, en este proceso)
+            holder: Clave de sesión cuyas reservas temporales no bloquean la búsqueda
+                (las de los demás sí, ver ``airline_app.holds``)
+            progress: Función ``(hecho, total, mensaje)`` que recibe el avance de la búsqueda
+                (por ejemplo, ``Job.report_progress``)
 
         Returns:
             dict con 'departure_time', 'arrival_time' o None si no encuentra slot en las próximas 30 días
         """
+        from .constraints import ConstraintIndex, flight_resources
+        from .occupancy import Occupancy
+
         if start_search_from is None:
             start_search_from = timezone.now()
 
         # Obtener recursos
         try:
-            runway = Runway.objects.get(id=runway_id)
-            gate = Gate.objects.get(id=gate_id)
-            aircraft = Aircraft.objects.get(id=aircraft_id)
-            pilot = Personnel.objects.get(id=pilot_id)
+            Runway.objects.only("id").get(id=runway_id)
+            Gate.objects.only("id").get(id=gate_id)
+            aircraft = Aircraft.objects.only("id", "status").get(id=aircraft_id)
+            Personnel.objects.only("id").get(id=pilot_id)
         except (
             Runway.DoesNotExist,
             Gate.DoesNotExist,
@@ -693,61 +1095,700 @@ class Flight(models.Model):
         ):
             return None
 
+        # Una aeronave no operacional nunca está disponible
+        if aircraft.status != "OPERATIONAL":
+            return None
+
+        # Las restricciones no dependen del horario: se verifican una sola vez
+        index = ConstraintIndex.load()
+        if not index.is_valid(
+            flight_resources(runway_id, gate_id, aircraft_id, pilot_id)
+        ):
+            return None
+
+        duration_delta = timedelta(hours=duration_hours)
+        max_search_time = start_search_from + timedelta(days=SLOT_SEARCH_DAYS)
+
+        # Carga la ocupación de los cuatro recursos en la ventana de búsqueda
+        occupancy = Occupancy.load(
+            start_search_from,
+            max_search_time + duration_delta,
+            runway_ids=[runway_id],
+            gate_ids=[gate_id],
+            aircraft_ids=[aircraft_id],
+            personnel_ids=[pilot_id],
+            holds=True,
+            holder=holder,
+        )
+        if progress:
+            progress(0, SLOT_SEARCH_DAYS, "Buscando un horario libre")
+        if workers and workers > 1:
+            slots = Flight._best_slots(
+                occupancy,
+                [(runway_id, gate_id, aircraft_id, pilot_id)],
+                start_search_from,
+                duration_delta,
+                1,
+                workers,
+                progress,
+            )
+            if not slots:
+                return None
+            return {key: slots[0][key] for key in ("departure_time", "arrival_time")}
+        return Flight._scan_slots(
+            occupancy,
+            runway_id,
+            gate_id,
+            aircraft_id,
+            pilot_id,
+            start_search_from,
+            duration_delta,
+            progress,
+        )
+
+    @staticmethod
+    def find_available_slots(
+        runway_ids,
+        gate_ids,
+        aircraft_ids,
+        pilot_ids,
+        duration_hours,
+        start_search_from=None,
+        limit=5,
+        workers=None,
+        holder=None,
+    ):
+        """
+        Busca los horarios más tempranos entre todas las combinaciones de los recursos dados.
+
+        Cada combinación válida (aeronave operacional, sin violar restricciones) se recorre
+        como en ``find_next_available_slot``; la ocupación de todos los candidatos se carga una
+        sola vez. Con ``workers > 1`` las combinaciones se reparten entre procesos que leen la
+        ocupación desde memoria compartida (ver ``airline_app.slot_search``).
+
+        Args:
+            runway_ids, gate_ids, aircraft_ids, pilot_ids: IDs candidatos de cada recurso
+            duration_hours: Duración del vuelo en horas
+            start_search_from: Fecha desde la cual buscar (por defecto: ahora)
+            limit: Cantidad de resultados
+            workers: Procesos del pool (por defecto, en este proceso)
+            holder: Clave de sesión cuyas reservas temporales no bloquean la búsqueda
+
+        Returns:
+            list[dict]: 'departure_time', 'arrival_time' y los IDs de los recursos, ordenados
+            por salida (a lo sumo ``limit``)
+        """
+        from itertools import product
+
+        from .constraints import ConstraintIndex, flight_resources
+        from .occupancy import Occupancy
+
+        if start_search_from is None:
+            start_search_from = timezone.now()
+
+        # Solo los recursos existentes; una aeronave no operacional nunca está disponible
+        runway_ids = sorted(
+            Runway.objects.filter(id__in=runway_ids).values_list("id", flat=True)
+        )
+        gate_ids = sorted(
+            Gate.objects.filter(id__in=gate_ids).values_list("id", flat=True)
+        )
+        aircraft_ids = sorted(
+            Aircraft.objects.filter(
+                id__in=aircraft_ids, status="OPERATIONAL"
+            ).values_list("id", flat=True)
+        )
+        pilot_ids = sorted(
+            Personnel.objects.filter(id__in=pilot_ids).values_list("id", flat=True)
+        )
+
+        index = ConstraintIndex.load()
+        combos = [
+            combo
+            for combo in product(runway_ids, gate_ids, aircraft_ids, pilot_ids)
+            if index.is_valid(flight_resources(*combo))
+        ]
+        if not combos:
+            return []
+
         duration_delta = timedelta(hours=duration_hours)
-        search_increment = timedelta(hours=1)  # Buscar en incrementos de 1 hora
-        max_search_days = 30
-        max_search_time = start_search_from + timedelta(days=max_search_days)
+        occupancy = Occupancy.load(
+            start_search_from,
+            start_search_from + timedelta(days=SLOT_SEARCH_DAYS) + duration_delta,
+            runway_ids=runway_ids,
+            gate_ids=gate_ids,
+            aircraft_ids=aircraft_ids,
+            personnel_ids=pilot_ids,
+            holds=True,
+            holder=holder,
+        )
+        return Flight._best_slots(
+            occupancy, combos, start_search_from, duration_delta, limit, workers
+        )
 
-        current_start = start_search_from
+    @staticmethod
+    def _best_slots(
+        occupancy, combos, start, duration_delta, limit, workers, progress=None
+    ):
+        """Empaqueta la ocupación de las combinaciones y busca sus mejores horarios."""
+        from .availability import MAINTENANCE_BUFFER
+        from . import slot_search
+
+        resource_types = ["runway", "gate", "aircraft", "personnel"]
+        buffer = slot_search.micros(start + MAINTENANCE_BUFFER) - slot_search.micros(
+            start
+        )
+        timelines = {}
+        for combo in combos:
+            for key in zip(resource_types, combo):
+                if key in timelines:
+                    continue
+                # Las aeronaves se bloquean también por el mantenimiento antes y después
+                margin = buffer if key[0] == "aircraft" else 0
+                timelines[key] = [
+                    (slot_search.micros(dep) - margin, slot_search.micros(arr) + margin)
+                    for dep, arr, _ in occupancy.timelines.get(key, ())
+                ]
+        data, offsets = slot_search.pack(timelines)
+
+        step = timedelta(hours=1)
+        found = slot_search.best_slots(
+            data,
+            [
+                (number, tuple(offsets[key] for key in zip(resource_types, combo)))
+                for number, combo in enumerate(combos)
+            ],
+            slot_search.micros(start),
+            step // slot_search.MICROSECOND,
+            timedelta(days=SLOT_SEARCH_DAYS) // step,
+            duration_delta // slot_search.MICROSECOND,
+            limit,
+            workers,
+            progress,
+        )
+        return [
+            {
+                "departure_time": start + i * step,
+                "arrival_time": start + i * step + duration_delta,
+                **dict(
+                    zip(
+                        ["runway_id", "gate_id", "aircraft_id", "pilot_id"],
+                        combos[number],
+                    )
+                ),
+            }
+            for i, number in found
+        ]
+
+    @staticmethod
+    @metrics.timed(
+        "find_next_available_slot",
+        result=lambda slot: "found" if slot else "not_found",
+    )
+    async def afind_next_available_slot(
+        runway_id,
+        gate_id,
+        aircraft_id,
+        pilot_id,
+        duration_hours,
+        start_search_from=None,
+        holder=None,
+    ):
+        """
+        Versión asíncrona de ``find_next_available_slot`` para las vistas ASGI.
+
+        Las comprobaciones independientes (existencia de cada recurso, restricciones y
+        ocupación) se lanzan a la vez con ``asyncio.gather`` en lugar de una tras otra.
+        """
+        from .constraints import ConstraintIndex, flight_resources
+        from .occupancy import Occupancy
+
+        if start_search_from is None:
+            start_search_from = timezone.now()
+        duration_delta = timedelta(hours=duration_hours)
+        max_search_time = start_search_from + timedelta(days=SLOT_SEARCH_DAYS)
+
+        found, index, occupancy = await asyncio.gather(
+            asyncio.gather(
+                Runway.objects.filter(id=runway_id).aexists(),
+                Gate.objects.filter(id=gate_id).aexists(),
+                # Una aeronave no operacional nunca está disponible
+                Aircraft.objects.filter(id=aircraft_id, status="OPERATIONAL").aexists(),
+                Personnel.objects.filter(id=pilot_id).aexists(),
+            ),
+            sync_to_async(ConstraintIndex.load)(),
+            sync_to_async(Occupancy.load)(
+                start_search_from,
+                max_search_time + duration_delta,
+                runway_ids=[runway_id],
+                gate_ids=[gate_id],
+                aircraft_ids=[aircraft_id],
+                personnel_ids=[pilot_id],
+                holds=True,
+                holder=holder,
+            ),
+        )
+        if not all(found) or not index.is_valid(
+            flight_resources(runway_id, gate_id, aircraft_id, pilot_id)
+        ):
+            return None
+
+        return Flight._scan_slots(
+            occupancy,
+            runway_id,
+            gate_id,
+            aircraft_id,
+            pilot_id,
+            start_search_from,
+            duration_delta,
+        )
+
+    @staticmethod
+    def _scan_slots(
+        occupancy,
+        runway_id,
+        gate_id,
+        aircraft_id,
+        pilot_id,
+        start,
+        duration_delta,
+        progress=None,
+    ):
+        """
+        Recorre la ventana de búsqueda en incrementos de 1 hora sobre la ocupación cargada,
+        reportando a ``progress`` cada día recorrido.
+        """
+        resources = [
+            ("runway", runway_id),
+            ("gate", gate_id),
+            ("aircraft", aircraft_id),
+            ("personnel", pilot_id),
+        ]
+        search_increment = timedelta(hours=1)
+        max_search_time = start + timedelta(days=SLOT_SEARCH_DAYS)
+
+        current_start = start
 
         while current_start < max_search_time:
             current_end = current_start + duration_delta
 
             # Verificar disponibilidad de todos los recursos
-            all_available = (
-                runway.is_available(current_start, current_end)
-                and gate.is_available(current_start, current_end)
-                and aircraft.is_available(current_start, current_end)
-                and pilot.is_available(current_start, current_end)
-            )
-
-            if all_available:
-                # Verificar restricciones
-                flight_resources = {
-                    "runway": runway_id,
-                    "gate": gate_id,
-                    "aircraft": aircraft_id,
-                    # ResourceConstraint uses 'personnel' as the resource type.
-                    "personnel": pilot_id,
-                    # Backwards/defensive alias.
-                    "pilot": pilot_id,
+            if occupancy.all_free(resources, current_start, current_end):
+                return {
+                    "departure_time": current_start,
+                    "arrival_time": current_end,
                 }
 
-                constraints_valid = True
-                active_constraints = ResourceConstraint.objects.filter(is_active=True)
-
-                for constraint in active_constraints:
-                    primary_id = flight_resources.get(constraint.primary_resource_type)
-                    if primary_id != constraint.primary_resource_id:
-                        continue
-
-                    related_id = flight_resources.get(constraint.related_resource_type)
-
-                    if constraint.constraint_type == "CO_REQUISITE":
-                        if related_id != constraint.related_resource_id:
-                            constraints_valid = False
-                            break
-                    elif constraint.constraint_type == "MUTUAL_EXCLUSION":
-                        if related_id == constraint.related_resource_id:
-                            constraints_valid = False
-                            break
-
-                if constraints_valid:
-                    return {
-                        "departure_time": current_start,
-                        "arrival_time": current_end,
-                    }
-
             current_start += search_increment
+            if progress and (current_start - start) % timedelta(days=1) == timedelta(0):
+                days = (current_start - start).days
+                progress(
+                    days,
+                    SLOT_SEARCH_DAYS,
+                    f"Día {days} de {SLOT_SEARCH_DAYS} sin horario",
+                )
 
         return None  # No se encontró slot disponible en los próximos 30 días
+
+
+class RecurringFlight(models.Model):
+    """
+    Patrón semanal de vuelos: días de la semana, hora de salida, duración, rango de fechas y
+    recursos por defecto. Las ocurrencias no se guardan como vuelos al crear el patrón; el
+    trabajo ``materialize_recurring`` las convierte en vuelos dentro de un horizonte móvil
+    (ver ``airline_app.recurrence``). Hasta entonces, el motor de ocupación las ve como
+    vuelos programados.
+    """
+
+    WEEKDAYS = "1234567"  # ISO: 1 = lunes ... 7 = domingo
+
+    flight_number = models.CharField(
+        max_length=13,
+        unique=True,
+        verbose_name="Número de Vuelo",
+        help_text="Cada ocurrencia se numera como NUMERO-AAMMDD.",
+    )
+    origin = models.CharField(max_length=100, verbose_name="Origen")
+    destination = models.CharField(max_length=100, verbose_name="Destino")
+    weekdays = models.CharField(
+        max_length=7,
+        verbose_name="Días de la Semana",
+        help_text="Días ISO en que opera, p. ej. 135 = lunes, miércoles y viernes.",
+    )
+    departure_time = models.TimeField(verbose_name="Hora de Salida (local)")
+    duration_minutes = models.PositiveIntegerField(verbose_name="Duración (minutos)")
+    start_date = models.DateField(verbose_name="Desde")
+    end_date = models.DateField(null=True, blank=True, verbose_name="Hasta")
+
+    # Recursos por defecto de cada ocurrencia
+    runway = models.ForeignKey(
+        Runway,
+        on_delete=models.PROTECT,
+        related_name="recurring_flights",
+        verbose_name="Pista",
+    )
+    gate = models.ForeignKey(
+        Gate,
+        on_delete=models.PROTECT,
+        related_name="recurring_flights",
+        verbose_name="Puerta",
+    )
+    aircraft = models.ForeignKey(
+        Aircraft,
+        on_delete=models.PROTECT,
+        related_name="recurring_flights",
+        verbose_name="Aeronave",
+    )
+    pilot = models.ForeignKey(
+        Personnel,
+        on_delete=models.PROTECT,
+        related_name="recurring_flights_as_pilot",
+        limit_choices_to={"personnel_type": "PILOT", "is_active": True},
+        verbose_name="Piloto",
+    )
+    copilots = models.ManyToManyField(
+        Personnel,
+        related_name="recurring_flights_as_copilot",
+        limit_choices_to={"personnel_type": "COPILOT", "is_active": True},
+        verbose_name="Copilotos",
+    )
+
+    is_active = models.BooleanField(default=True, verbose_name="Activo")
+    # Último día cuyas ocurrencias ya se convirtieron en vuelos (o se descartaron)
+    materialized_until = models.DateField(
+        null=True, blank=True, editable=False, verbose_name="Materializado Hasta"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Vuelo Recurrente"
+        verbose_name_plural = "Vuelos Recurrentes"
+        ordering = ["flight_number"]
+
+    def __str__(self):
+        return f"Vuelo {self.flight_number}: {self.origin} → {self.destination} ({self.weekdays})"
+
+    def clean(self):
+        errors = {}
+        if (
+            not self.weekdays
+            or any(day not in self.WEEKDAYS for day in self.weekdays)
+            or len(set(self.weekdays)) != len(self.weekdays)
+        ):
+            errors["weekdays"] = ValidationError(
+                "Indique días ISO distintos entre 1 (lunes) y 7 (domingo).",
+                code="invalid_weekdays",
+            )
+
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            errors["end_date"] = ValidationError(
+                "La fecha final no puede ser anterior a la fecha inicial.",
+                code="invalid_date_range",
+            )
+
+        if self.duration_minutes is not None and not 0 < self.duration_minutes <= 1200:
+            errors["duration_minutes"] = ValidationError(
+                "El vuelo debe durar entre 1 minuto y 20 horas.",
+                code="invalid_time_range",
+            )
+
+        if (
+            self.origin
+            and self.destination
+            and self.origin.lower() == self.destination.lower()
+        ):
+            errors["origin"] = ValidationError(
+                "El origen y el destino no pueden ser iguales.",
+                code="invalid_origin_destination",
+            )
+
+        if self.pilot_id and self.pilot.personnel_type != "PILOT":
+            errors["pilot"] = ValidationError(
+                "El personal seleccionado debe ser un piloto.", code="invalid_pilot"
+            )
+
+        if errors:
+            raise ValidationError(errors)
+
+    def runs_on(self, day):
+        """Indica si el patrón opera el día dado (sin considerar la materialización)."""
+        return (
+            str(day.isoweekday()) in self.weekdays
+            and day >= self.start_date
+            and (self.end_date is None or day <= self.end_date)
+        )
+
+
+class ArchivedFlight(models.Model):
+    """
+    Vuelo completado o cancelado movido fuera de la tabla de vuelos (ver ``airline_app.archive``).
+    Conserva los datos, los recursos y los copilotos del vuelo original, pero ya no participa
+    en las validaciones de disponibilidad.
+    """
+
+    original_id = models.PositiveBigIntegerField(
+        unique=True, verbose_name="ID del Vuelo Original"
+    )
+    flight_number = models.CharField(
+        max_length=20, db_index=True, verbose_name="Número de Vuelo"
+    )
+    origin = models.CharField(max_length=100, verbose_name="Origen")
+    destination = models.CharField(max_length=100, verbose_name="Destino")
+    departure_time = models.DateTimeField(db_index=True, verbose_name="Hora de Salida")
+    arrival_time = models.DateTimeField(verbose_name="Hora de Llegada")
+    status = models.CharField(
+        max_length=20, choices=Flight.FLIGHT_STATUS, verbose_name="Estado"
+    )
+
+    runway = models.ForeignKey(
+        Runway,
+        on_delete=models.PROTECT,
+        related_name="archived_flights",
+        verbose_name="Pista",
+    )
+    gate = models.ForeignKey(
+        Gate,
+        on_delete=models.PROTECT,
+        related_name="archived_flights",
+        verbose_name="Puerta",
+    )
+    aircraft = models.ForeignKey(
+        Aircraft,
+        on_delete=models.PROTECT,
+        related_name="archived_flights",
+        verbose_name="Aeronave",
+    )
+    pilot = models.ForeignKey(
+        Personnel,
+        on_delete=models.PROTECT,
+        related_name="archived_flights_as_pilot",
+        verbose_name="Piloto",
+    )
+    copilots = models.ManyToManyField(
+        Personnel,
+        related_name="archived_flights_as_copilot",
+        verbose_name="Copilotos",
+    )
+
+    # Fechas del vuelo original
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archivado")
+
+    class Meta:
+        verbose_name = "Vuelo Archivado"
+        verbose_name_plural = "Vuelos Archivados"
+        ordering = ["-departure_time"]
+
+    def __str__(self):
+        return f"Vuelo {self.flight_number}: {self.origin} → {self.destination} (archivado)"
+
+    def get_duration(self):
+        """Duración del vuelo en horas."""
+        return (self.arrival_time - self.departure_time).total_seconds() / 3600
+
+
+class RollupDay(models.Model):
+    """
+    Día ya agregado en las tablas de rollup (ver ``airline_app.rollups``).
+    Un día se marca como desactualizado cuando un vuelo sale de él (reprogramación o borrado);
+    los vuelos creados o editados se detectan por su ``updated_at``.
+    """
+
+    date = models.DateField(unique=True, verbose_name="Fecha")
+    flights = models.PositiveIntegerField(default=0, verbose_name="Vuelos")
+    computed_at = models.DateTimeField(verbose_name="Calculado")
+    stale = models.BooleanField(default=False, verbose_name="Desactualizado")
+
+    class Meta:
+        verbose_name = "Día Agregado"
+        verbose_name_plural = "Días Agregados"
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date} ({self.flights} vuelos)"
+
+    @classmethod
+    def mark_stale(cls, *moments):
+        """Marca como desactualizados los días locales de los instantes dados."""
+        cls.objects.filter(
+            date__in={timezone.localdate(moment) for moment in moments}
+        ).update(stale=True)
+
+
+class DailyResourceRollup(models.Model):
+    """Vuelos y minutos ocupados de un recurso en un día (por fecha local de salida)."""
+
+    date = models.DateField(verbose_name="Fecha")
+    resource_type = models.CharField(
+        max_length=20,
+        choices=ResourceConstraint.RESOURCE_TYPES,
+        verbose_name="Tipo de Recurso",
+    )
+    resource_id = models.PositiveIntegerField(verbose_name="ID del Recurso")
+    flights = models.PositiveIntegerField(default=0, verbose_name="Vuelos")
+    occupied_minutes = models.PositiveIntegerField(
+        default=0, verbose_name="Minutos Ocupados"
+    )
+
+    class Meta:
+        verbose_name = "Uso Diario de Recurso"
+        verbose_name_plural = "Uso Diario de Recursos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "resource_type", "resource_id"],
+                name="unique_daily_resource_rollup",
+            )
+        ]
+        indexes = [models.Index(fields=["resource_type", "date"])]
+
+    def __str__(self):
+        return f"{self.date} {self.resource_type} {self.resource_id}"
+
+
+class DailyRouteRollup(models.Model):
+    """Cantidad de vuelos de una ruta en un día (por fecha local de salida)."""
+
+    date = models.DateField(verbose_name="Fecha")
+    origin = models.CharField(max_length=100, verbose_name="Origen")
+    destination = models.CharField(max_length=100, verbose_name="Destino")
+    flights = models.PositiveIntegerField(default=0, verbose_name="Vuelos")
+
+    class Meta:
+        verbose_name = "Vuelos Diarios por Ruta"
+        verbose_name_plural = "Vuelos Diarios por Ruta"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "origin", "destination"],
+                name="unique_daily_route_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.origin} → {self.destination}"
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano de la cola local (ver ``airline_app.jobs``).
+    Los workers de ``python manage.py run_workers`` toman los trabajos pendientes de esta
+    tabla, guardan su progreso mientras corren y, al terminar, su resultado o su error.
+    """
+
+    STATUSES = [
+        ("PENDING", "Pendiente"),
+        ("RUNNING", "En Ejecución"),
+        ("SUCCEEDED", "Completado"),
+        ("FAILED", "Fallido"),
+    ]
+
+    kind = models.CharField(max_length=50, verbose_name="Tipo")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default="PENDING", verbose_name="Estado"
+    )
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progreso (%)")
+    progress_message = models.CharField(
+        max_length=200, blank=True, verbose_name="Mensaje de Progreso"
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name="Resultado")
+    error = models.TextField(blank=True, verbose_name="Error")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Iniciado")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminado")
+    # Latido del worker: se actualiza con cada reporte de progreso
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ("SUCCEEDED", "FAILED")
+
+    def report_progress(self, done, total=100, message=""):
+        """Guarda el avance del trabajo (una consulta) para que la interfaz lo muestre."""
+        self.progress = min(100, int(done * 100 / total)) if total else 100
+        self.progress_message = message[:200]
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress,
+            progress_message=self.progress_message,
+            updated_at=timezone.now(),
+        )
+
+
+class SlotHoldQuerySet(models.QuerySet):
+    def active(self, now=None):
+        """Reservas que todavía no vencieron."""
+        return self.filter(expires_at__gt=now or timezone.now())
+
+
+class SlotHold(models.Model):
+    """
+    Reserva temporal del horario encontrado por la búsqueda de horarios (ver
+    ``airline_app.holds``). Hasta que vence, la pista, la puerta, la aeronave y el piloto se
+    consideran ocupados en su ventana para todos menos para quien la tomó.
+    """
+
+    # Clave de sesión de quien reservó
+    holder = models.CharField(max_length=64, verbose_name="Titular")
+    runway = models.ForeignKey(
+        Runway,
+        on_delete=models.CASCADE,
+        related_name="slot_holds",
+        verbose_name="Pista",
+    )
+    gate = models.ForeignKey(
+        Gate,
+        on_delete=models.CASCADE,
+        related_name="slot_holds",
+        verbose_name="Puerta de Embarque",
+    )
+    aircraft = models.ForeignKey(
+        Aircraft,
+        on_delete=models.CASCADE,
+        related_name="slot_holds",
+        verbose_name="Aeronave",
+    )
+    pilot = models.ForeignKey(
+        Personnel,
+        on_delete=models.CASCADE,
+        related_name="slot_holds",
+        verbose_name="Piloto",
+    )
+    start_time = models.DateTimeField(verbose_name="Desde")
+    end_time = models.DateTimeField(verbose_name="Hasta")
+    expires_at = models.DateTimeField(verbose_name="Vence")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SlotHoldQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Reserva Temporal"
+        verbose_name_plural = "Reservas Temporales"
+        ordering = ["expires_at"]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+            models.Index(fields=["holder"]),
+        ]
+
+    def __str__(self):
+        start, end, expires = (
+            timezone.localtime(moment)
+            for moment in (self.start_time, self.end_time, self.expires_at)
+        )
+        return f"{start:%d/%m/%Y %H:%M} - {end:%H:%M} (vence {expires:%H:%M})"
+
+    @property
+    def is_active(self):
+        return self.expires_at > timezone.now()
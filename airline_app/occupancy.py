@@ -0,0 +1,285 @@
+"""
+Motor de ocupación en memoria.
+
+Carga con pocas consultas los intervalos ocupados de cada recurso y los indexa en líneas de
+tiempo ordenadas (Timeline), de modo que comprobar si un recurso está libre cuesta una búsqueda
+binaria en lugar de una consulta SQL. Se usa donde hay que hacer muchas comprobaciones sobre
+el mismo conjunto de vuelos (búsqueda de horarios, auditorías, simulaciones).
+
+Las reglas son las mismas que las de ``is_available``: pistas, puertas y personal se bloquean
+con vuelos SCHEDULED/IN_PROGRESS; las aeronaves también con COMPLETED y con 24 horas de
+mantenimiento antes y después de cada vuelo.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .availability import (
+    AIRCRAFT_BLOCKING_STATUSES,
+    BLOCKING_STATUSES,
+    MAINTENANCE_BUFFER,
+)
+from .models import Flight
+
+RESOURCE_TYPES = ["runway", "gate", "aircraft", "personnel"]
+
+
+class Timeline:
+    """
+    Intervalos ocupados de un recurso, ordenados por inicio.
+
+    ``max_end[i]`` guarda el mayor fin entre los intervalos ``0..i``, lo que permite
+    detener la búsqueda de solapamientos en cuanto ningún intervalo anterior puede solaparse.
+    """
+
+    def __init__(self, intervals=()):
+        self._intervals = list(intervals)
+        self._sorted = False
+        self._max_end = None
+
+    @property
+    def intervals(self):
+        # Las altas se acumulan sin ordenar y se ordenan una sola vez al consultar
+        if not self._sorted:
+            self._intervals.sort()
+            self._sorted = True
+        return self._intervals
+
+    def add(self, start, end, flight_id):
+        self._intervals.append((start, end, flight_id))
+        self._sorted = False
+        self._max_end = None
+
+    def remove(self, flight_id):
+        self._intervals = [i for i in self._intervals if i[2] != flight_id]
+        self._max_end = None
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self.intervals)
+
+    @property
+    def max_end(self):
+        if self._max_end is None:
+            self._max_end = []
+            current = None
+            for _, end, _ in self.intervals:
+                current = end if current is None or end > current else current
+                self._max_end.append(current)
+        return self._max_end
+
+    def overlapping(self, start, end, exclude=()):
+        """
+        Intervalos que se solapan con ``[start, end)``.
+
+        Returns:
+            list[tuple]: (inicio, fin, id_vuelo) ordenados por inicio
+        """
+        hi = bisect_left(self.intervals, (end,))
+        max_end = self.max_end
+        found = []
+        i = hi - 1
+        while i >= 0 and max_end[i] > start:
+            interval = self.intervals[i]
+            if interval[1] > start and interval[2] not in exclude:
+                found.append(interval)
+            i -= 1
+        found.reverse()
+        return found
+
+    def is_free(self, start, end, exclude=()):
+        return not self.overlapping(start, end, exclude)
+
+    def next_after(self, moment, exclude=()):
+        """Primer intervalo que empieza en o después de ``moment``."""
+        for interval in self.intervals[bisect_left(self.intervals, (moment,)) :]:
+            if interval[2] not in exclude:
+                return interval
+        return None
+
+
+class Occupancy:
+    """Líneas de tiempo por recurso: ``timelines[(tipo, id)]``."""
+
+    def __init__(self):
+        self.timelines = defaultdict(Timeline)
+        # id_vuelo -> (salida, llegada, estado, {tipo: [ids]})
+        self.flights = {}
+
+    @classmethod
+    def load(
+        cls,
+        start=None,
+        end=None,
+        runway_ids=None,
+        gate_ids=None,
+        aircraft_ids=None,
+        personnel_ids=None,
+        flights=None,
+        recurring=True,
+        holds=False,
+        holder=None,
+    ):
+        """
+        Carga la ocupación con dos consultas (vuelos y copilotos).
+
+        Args:
+            start, end: Ventana de interés (se amplía 24 horas por el mantenimiento de
+                aeronaves). Sin límites se carga todo el historial bloqueante.
+            runway_ids, gate_ids, aircraft_ids, personnel_ids: Limitan la carga a los
+                vuelos que usan alguno de esos recursos. Si ninguno se indica se cargan todos.
+            flights: QuerySet base de vuelos (por defecto ``Flight.objects``)
+            recurring: Con una ventana acotada, incluye también las ocurrencias pendientes
+                de los vuelos recurrentes (dos consultas más, ver ``airline_app.recurrence``)
+            holds: Con una ventana acotada, incluye también las reservas temporales activas
+                de otros titulares que ``holder`` (una consulta más, ver ``airline_app.holds``)
+        """
+        occupancy = cls()
+        queryset = flights if flights is not None else Flight.objects.all()
+        queryset = queryset.filter(status__in=AIRCRAFT_BLOCKING_STATUSES)
+        if start is not None:
+            queryset = queryset.filter(arrival_time__gt=start - MAINTENANCE_BUFFER)
+        if end is not None:
+            queryset = queryset.filter(departure_time__lt=end + MAINTENANCE_BUFFER)
+
+        selected = {
+            "runway": runway_ids,
+            "gate": gate_ids,
+            "aircraft": aircraft_ids,
+            "pilot": personnel_ids,
+        }
+        if any(ids is not None for ids in selected.values()):
+            condition = Q()
+            for field, ids in selected.items():
+                if ids is not None:
+                    condition |= Q(**{f"{field}_id__in": list(ids)})
+            if personnel_ids is not None:
+                condition |= Q(
+                    id__in=Flight.copilots.through.objects.filter(
+                        personnel_id__in=list(personnel_ids)
+                    ).values("flight_id")
+                )
+            queryset = queryset.filter(condition)
+
+        copilots = Flight.copilots.through.objects.filter(
+            flight__in=queryset.values("id")
+        )
+
+        rows = queryset.order_by("departure_time").values_list(
+            "id",
+            "departure_time",
+            "arrival_time",
+            "status",
+            "runway_id",
+            "gate_id",
+            "aircraft_id",
+            "pilot_id",
+        )
+        crews = defaultdict(list)
+        for flight_id, personnel_id in copilots.values_list(
+            "flight_id", "personnel_id"
+        ):
+            crews[flight_id].append(personnel_id)
+
+        for flight_id, dep, arr, status, runway, gate, aircraft, pilot in rows:
+            occupancy.add_flight(
+                flight_id,
+                dep,
+                arr,
+                status,
+                runway=runway,
+                gate=gate,
+                aircraft=aircraft,
+                personnel=[pilot] + crews.get(flight_id, []),
+            )
+
+        if recurring and start is not None and end is not None:
+            from .recurrence import add_occurrences, pending_occurrences
+
+            if any(ids is not None for ids in selected.values()):
+                selected["personnel"] = selected.pop("pilot")
+                selected = {
+                    resource_type: set(ids)
+                    for resource_type, ids in selected.items()
+                    if ids is not None
+                }
+            else:
+                selected = None
+            add_occurrences(occupancy, pending_occurrences(start, end), selected)
+
+        if holds and start is not None and end is not None:
+            from .holds import add_holds
+
+            add_holds(occupancy, start, end, holder)
+        return occupancy
+
+    def add_flight(
+        self,
+        flight_id,
+        departure,
+        arrival,
+        status,
+        runway=None,
+        gate=None,
+        aircraft=None,
+        personnel=(),
+    ):
+        """Registra un vuelo (real o hipotético) en las líneas de tiempo correspondientes."""
+        resources = {
+            "runway": [runway] if runway else [],
+            "gate": [gate] if gate else [],
+            "aircraft": [aircraft] if aircraft else [],
+            "personnel": [p for p in personnel if p],
+        }
+        self.flights[flight_id] = (departure, arrival, status, resources)
+        for resource_type, ids in resources.items():
+            if status not in BLOCKING_STATUSES and resource_type != "aircraft":
+                continue
+            for resource_id in ids:
+                self.timelines[(resource_type, resource_id)].add(
+                    departure, arrival, flight_id
+                )
+
+    def remove_flight(self, flight_id):
+        """Quita un vuelo de todas sus líneas de tiempo."""
+        entry = self.flights.pop(flight_id, None)
+        if entry is None:
+            return
+        for resource_type, ids in entry[3].items():
+            for resource_id in ids:
+                timeline = self.timelines.get((resource_type, resource_id))
+                if timeline is not None:
+                    timeline.remove(flight_id)
+
+    def conflicts(self, resource_type, resource_id, start, end, exclude=()):
+        """
+        Vuelos que impiden usar el recurso en ``[start, end)``.
+
+        Returns:
+            list[tuple]: (inicio, fin, id_vuelo) de los vuelos en conflicto
+        """
+        timeline = self.timelines.get((resource_type, resource_id))
+        if timeline is None:
+            return []
+        if resource_type == "aircraft":
+            start, end = start - MAINTENANCE_BUFFER, end + MAINTENANCE_BUFFER
+        return timeline.overlapping(start, end, exclude)
+
+    def is_free(self, resource_type, resource_id, start, end, exclude=()):
+        return not self.conflicts(resource_type, resource_id, start, end, exclude)
+
+    def all_free(self, resources, start, end, exclude=()):
+        """
+        Comprueba varios recursos a la vez.
+
+        Args:
+            resources: Iterable de (tipo, id)
+        """
+        return all(
+            self.is_free(resource_type, resource_id, start, end, exclude)
+            for resource_type, resource_id in resources
+        )
@@ -0,0 +1,258 @@
+"""
+Análisis de impacto de interrupciones de recursos y reasignación masiva.
+
+Cuando una pista o puerta se desactiva, o una aeronave pasa a mantenimiento, sus vuelos
+futuros quedan varados. ``plan_outage`` lista los vuelos afectados con una consulta y calcula
+recursos de reemplazo para todos en lote: carga la ocupación de los candidatos una sola vez
+(``airline_app.occupancy``), respeta las restricciones activas (``airline_app.constraints``) y
+asigna en orden de salida, registrando cada asignación para que los vuelos siguientes la vean.
+``apply_outage`` bloquea los recursos de reemplazo, comprueba de nuevo su ocupación (vuelos,
+ocurrencias pendientes y reservas temporales) y guarda el plan de forma atómica con
+``bulk_update``, sin un ``save()`` por vuelo.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .availability import RESOURCE_MODELS, base_queryset
+from .constraints import ConstraintIndex, flight_resources
+from .models import Flight, Gate
+from .occupancy import Occupancy
+
+# Tipos de recurso que admiten interrupciones y su columna en Flight
+OUTAGE_FIELDS = {"runway": "runway", "gate": "gate", "aircraft": "aircraft"}
+
+# Vuelos que todavía pueden cambiar de recurso
+REASSIGNABLE_STATUSES = ["SCHEDULED", "DELAYED"]
+
+Reassignment = namedtuple(
+    "Reassignment",
+    [
+        "flight_id",
+        "flight_number",
+        "departure_time",
+        "old_resource_id",
+        "new_resource_id",
+    ],
+)
+
+
+class OutageError(Exception):
+    """El plan ya no corresponde al estado actual de los vuelos."""
+
+
+class OutagePlan:
+    """Vuelos afectados por la interrupción y su propuesta de reasignación."""
+
+    def __init__(self, resource_type, resource_id, start, end, reassignments, stranded):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.start = start
+        self.end = end
+        self.reassignments = reassignments
+        # Vuelos afectados sin reemplazo disponible
+        self.stranded = stranded
+
+    @property
+    def field(self):
+        return OUTAGE_FIELDS[self.resource_type]
+
+    @property
+    def affected_count(self):
+        return len(self.reassignments) + len(self.stranded)
+
+
+def affected_flights(resource_type, resource_id, start, end=None):
+    """Vuelos reasignables que usan el recurso durante la interrupción (una consulta)."""
+    flights = Flight.objects.filter(
+        status__in=REASSIGNABLE_STATUSES,
+        arrival_time__gt=start,
+        **{f"{OUTAGE_FIELDS[resource_type]}_id": resource_id},
+    )
+    if end is not None:
+        flights = flights.filter(departure_time__lt=end)
+    return flights.order_by("departure_time", "id")
+
+
+def plan_outage(resource_type, resource_id, start, end=None, holder=None):
+    """
+    Calcula reemplazos para todos los vuelos afectados por la interrupción.
+
+    Usa a lo sumo nueve consultas, independientemente de la cantidad de vuelos: vuelos
+    afectados, recursos candidatos (y terminal de la puerta), ocupación (dos, más dos de
+    vuelos recurrentes pendientes y una de reservas temporales) y restricciones.
+
+    Args:
+        resource_type: 'runway', 'gate' o 'aircraft'
+        resource_id: ID del recurso interrumpido
+        start: Inicio de la interrupción
+        end: Fin de la interrupción (None = indefinida)
+        holder: Titular cuyas reservas temporales no bloquean (ver ``airline_app.holds``)
+
+    Returns:
+        OutagePlan
+    """
+    flights = list(
+        affected_flights(resource_type, resource_id, start, end).values_list(
+            "id",
+            "flight_number",
+            "departure_time",
+            "arrival_time",
+            "runway_id",
+            "gate_id",
+            "aircraft_id",
+            "pilot_id",
+        )
+    )
+    if not flights:
+        return OutagePlan(resource_type, resource_id, start, end, [], [])
+
+    candidates = base_queryset(resource_type).exclude(id=resource_id).order_by("id")
+    if resource_type == "gate":
+        # Se prefieren puertas de la misma terminal
+        terminal = (
+            Gate.objects.filter(id=resource_id)
+            .values_list("terminal", flat=True)
+            .first()
+        )
+        rows = list(candidates.values_list("id", "terminal"))
+        candidate_ids = [i for i, t in rows if t == terminal] + [
+            i for i, t in rows if t != terminal
+        ]
+    else:
+        candidate_ids = list(candidates.values_list("id", flat=True))
+
+    occupancy = Occupancy.load(
+        min(row[2] for row in flights),
+        max(row[3] for row in flights),
+        **{f"{resource_type}_ids": candidate_ids},
+        holds=True,
+        holder=holder,
+    )
+    index = ConstraintIndex.load()
+
+    reassignments = []
+    stranded = []
+    for flight_id, number, departure, arrival, *resources in flights:
+        resources = dict(zip(["runway", "gate", "aircraft", "pilot"], resources))
+        for candidate in candidate_ids:
+            if not occupancy.is_free(resource_type, candidate, departure, arrival):
+                continue
+            proposed = {**resources, resource_type: candidate}
+            if not index.is_valid(
+                flight_resources(
+                    proposed["runway"],
+                    proposed["gate"],
+                    proposed["aircraft"],
+                    proposed["pilot"],
+                )
+            ):
+                continue
+            occupancy.add_flight(
+                flight_id,
+                departure,
+                arrival,
+                "SCHEDULED",
+                **{resource_type: candidate},
+            )
+            reassignments.append(
+                Reassignment(flight_id, number, departure, resource_id, candidate)
+            )
+            break
+        else:
+            stranded.append((flight_id, number, departure))
+
+    return OutagePlan(resource_type, resource_id, start, end, reassignments, stranded)
+
+
+def apply_outage(plan, holder=None):
+    """
+    Aplica las reasignaciones del plan en una transacción con ``bulk_update``.
+
+    Los vuelos y los recursos de reemplazo se bloquean (``select_for_update``) y la ocupación
+    de los reemplazos se carga de nuevo dentro de la transacción: un vuelo o una reserva creados
+    después de calcular el plan no se pisan.
+
+    Args:
+        holder: Titular cuyas reservas temporales no bloquean
+
+    Raises:
+        OutageError: Si algún vuelo cambió de recurso desde que se calculó el plan, o algún
+            recurso de reemplazo ya no está libre
+
+    Returns:
+        int: Cantidad de vuelos reasignados
+    """
+    if not plan.reassignments:
+        return 0
+
+    ids = [r.flight_id for r in plan.reassignments]
+    column = f"{plan.field}_id"
+    replacement_ids = sorted({r.new_resource_id for r in plan.reassignments})
+    now = timezone.now()
+    with transaction.atomic():
+        current = {
+            flight_id: (departure, arrival)
+            for flight_id, departure, arrival in Flight.objects.select_for_update()
+            .filter(
+                id__in=ids,
+                status__in=REASSIGNABLE_STATUSES,
+                **{column: plan.resource_id},
+            )
+            .values_list("id", "departure_time", "arrival_time")
+        }
+        if len(current) != len(ids):
+            raise OutageError(
+                "Los vuelos afectados cambiaron desde que se calculó el plan. "
+                "Vuelva a calcularlo."
+            )
+
+        # Serializa con las reservas y reasignaciones concurrentes sobre los reemplazos
+        list(
+            RESOURCE_MODELS[plan.resource_type]
+            .objects.select_for_update()
+            .filter(pk__in=replacement_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        occupancy = Occupancy.load(
+            min(departure for departure, _ in current.values()),
+            max(arrival for _, arrival in current.values()),
+            **{f"{plan.resource_type}_ids": replacement_ids},
+            holds=True,
+            holder=holder,
+        )
+        for r in plan.reassignments:
+            departure, arrival = current[r.flight_id]
+            if not occupancy.is_free(
+                plan.resource_type, r.new_resource_id, departure, arrival
+            ):
+                raise OutageError(
+                    f"El recurso de reemplazo del vuelo {r.flight_number} ya no está "
+                    "libre. Vuelva a calcular el plan."
+                )
+            occupancy.add_flight(
+                r.flight_id,
+                departure,
+                arrival,
+                "SCHEDULED",
+                **{plan.resource_type: r.new_resource_id},
+            )
+
+        Flight.objects.bulk_update(
+            [
+                Flight(
+                    id=r.flight_id,
+                    updated_at=now,
+                    version=F("version") + 1,
+                    **{column: r.new_resource_id},
+                )
+                for r in plan.reassignments
+            ],
+            [plan.field, "updated_at", "version"],
+            batch_size=1000,
+        )
+    return len(ids)
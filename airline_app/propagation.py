@@ -0,0 +1,257 @@
+"""
+Simulador de propagación de retrasos.
+
+Cuando un vuelo se retrasa (o cambian sus horarios), los vuelos posteriores que comparten sus
+recursos pueden quedar en conflicto: la aeronave necesita 24 horas de mantenimiento, el piloto
+y los copilotos tienen asignaciones siguientes y la pista y la puerta quedan ocupadas más tiempo.
+
+El simulador recorre ese grafo de dependencias sobre las líneas de tiempo en memoria de
+``airline_app.occupancy``: procesa los vuelos desplazados en orden de salida y empuja cada
+vuelo posterior en conflicto lo mínimo necesario para liberar el recurso. Nada se guarda en la
+base de datos; el resultado es una propuesta.
+"""
+
+import heapq
+import time
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from .availability import MAINTENANCE_BUFFER
+from .occupancy import Occupancy
+
+# Ventana cargada después de la nueva llegada para seguir la cascada
+DEFAULT_HORIZON = timedelta(days=2)
+
+# cause: (tipo_recurso, id_recurso, id_vuelo) que obliga el desplazamiento
+Shift = namedtuple(
+    "Shift",
+    [
+        "flight_id",
+        "old_departure",
+        "old_arrival",
+        "new_departure",
+        "new_arrival",
+        "delay",
+        "cause",
+    ],
+)
+
+
+class PropagationResult:
+    """Vuelos desplazados (sin contar el vuelo original) y conflictos sin resolver."""
+
+    def __init__(self, flight_id, shifts, unresolved, elapsed):
+        self.flight_id = flight_id
+        self.shifts = shifts
+        self.unresolved = unresolved
+        self.elapsed = elapsed
+
+    @property
+    def total_delay(self):
+        return sum((shift.delay for shift in self.shifts), timedelta())
+
+    def flight_numbers(self):
+        """Números de los vuelos involucrados, con una sola consulta."""
+        from .models import Flight
+
+        ids = {shift.flight_id for shift in self.shifts} | {self.flight_id}
+        ids |= {flight_id for _, _, flight_id in self.unresolved}
+        return dict(
+            Flight.objects.filter(id__in=ids).values_list("id", "flight_number")
+        )
+
+
+def simulate(occupancy, flight_id, new_departure, new_arrival):
+    """
+    Propaga el cambio de horario de un vuelo sobre una ocupación en memoria.
+
+    Un vuelo que salía después del vuelo desplazado (en el horario original) y ahora choca
+    con él se retrasa hasta el fin del conflicto (más 24 horas si comparten aeronave); ese
+    desplazamiento se propaga a su vez. Los choques con vuelos que salían antes no se
+    resuelven moviendo vuelos y se reportan en ``unresolved``.
+
+    ``occupancy`` se modifica: al terminar refleja el horario propuesto.
+
+    Returns:
+        PropagationResult
+    """
+    started = time.perf_counter()
+    original = {fid: (dep, arr) for fid, (dep, arr, _, _) in occupancy.flights.items()}
+    current = dict(original)
+
+    def order(fid):
+        return (original[fid][0], fid)
+
+    def move(fid, departure, arrival, status=None):
+        _, _, old_status, resources = occupancy.flights[fid]
+        occupancy.remove_flight(fid)
+        occupancy.add_flight(
+            fid,
+            departure,
+            arrival,
+            status or old_status,
+            runway=next(iter(resources["runway"]), None),
+            gate=next(iter(resources["gate"]), None),
+            aircraft=next(iter(resources["aircraft"]), None),
+            personnel=resources["personnel"],
+        )
+        current[fid] = (departure, arrival)
+
+    # Un vuelo retrasado sigue ocupando sus recursos aunque su estado no sea bloqueante
+    status = occupancy.flights[flight_id][2]
+    move(
+        flight_id,
+        new_departure,
+        new_arrival,
+        "SCHEDULED" if status == "DELAYED" else status,
+    )
+
+    causes = {}
+    pending = [(new_departure, flight_id)]
+    while pending:
+        departure, fid = heapq.heappop(pending)
+        if current[fid][0] != departure:
+            continue  # entrada obsoleta: el vuelo se desplazó de nuevo
+        start, end = current[fid]
+        resources = occupancy.flights[fid][3]
+
+        required = {}
+        for resource_type, ids in resources.items():
+            for resource_id in ids:
+                for _, _, other in occupancy.conflicts(
+                    resource_type, resource_id, start, end, exclude={fid}
+                ):
+                    if order(other) < order(fid):
+                        continue  # vuelo anterior: se revisa al final
+                    # El vuelo posterior debe salir cuando este libere el recurso
+                    free_at = end + (
+                        MAINTENANCE_BUFFER
+                        if resource_type == "aircraft"
+                        else timedelta()
+                    )
+                    if other not in required or free_at > required[other][0]:
+                        required[other] = (free_at, (resource_type, resource_id, fid))
+
+        for other, (free_at, cause) in required.items():
+            other_departure, other_arrival = current[other]
+            if free_at <= other_departure:
+                continue
+            delta = free_at - other_departure
+            move(other, free_at, other_arrival + delta)
+            causes[other] = cause
+            heapq.heappush(pending, (free_at, other))
+
+    # Choques que quedan tras la cascada: solo pueden ser con vuelos anteriores
+    unresolved = set()
+    for fid in [flight_id, *causes]:
+        start, end = current[fid]
+        for resource_type, ids in occupancy.flights[fid][3].items():
+            for resource_id in ids:
+                for _, _, other in occupancy.conflicts(
+                    resource_type, resource_id, start, end, exclude={fid}
+                ):
+                    unresolved.add((resource_type, resource_id, other))
+
+    shifts = [
+        Shift(
+            fid,
+            original[fid][0],
+            original[fid][1],
+            current[fid][0],
+            current[fid][1],
+            current[fid][0] - original[fid][0],
+            causes[fid],
+        )
+        for fid in causes
+        if fid != flight_id
+    ]
+    shifts.sort(key=lambda shift: (shift.new_departure, shift.flight_id))
+    return PropagationResult(
+        flight_id, shifts, sorted(unresolved), time.perf_counter() - started
+    )
+
+
+def propagate_delay(flight, new_departure, new_arrival=None, horizon=DEFAULT_HORIZON):
+    """
+    Simula el nuevo horario de ``flight`` y retorna los vuelos posteriores afectados.
+
+    Carga la ocupación de la ventana afectada con dos consultas y simula en memoria. Si la
+    cascada empuja vuelos más allá de la ventana, carga los vuelos posteriores que usan sus
+    recursos (dos consultas más por ampliación) y repite la simulación hasta cubrirla.
+
+    Args:
+        flight: Vuelo que cambia de horario
+        new_departure: Nueva hora de salida
+        new_arrival: Nueva hora de llegada (por defecto conserva la duración)
+        horizon: Margen cargado después de la nueva llegada (y de cada ampliación)
+
+    Returns:
+        PropagationResult
+    """
+    if new_arrival is None:
+        new_arrival = new_departure + (flight.arrival_time - flight.departure_time)
+
+    # Las ocurrencias recurrentes pendientes no son vuelos que se puedan desplazar
+    loaded_from = new_arrival + horizon
+    occupancy = Occupancy.load(
+        min(new_departure, flight.departure_time), loaded_from, recurring=False
+    )
+    if flight.pk not in occupancy.flights:
+        # Vuelos no bloqueantes (ej. DELAYED) no se cargan: se agregan con sus recursos
+        occupancy.add_flight(
+            flight.pk,
+            flight.departure_time,
+            flight.arrival_time,
+            flight.status,
+            runway=flight.runway_id,
+            gate=flight.gate_id,
+            aircraft=flight.aircraft_id,
+            personnel=[flight.pilot_id]
+            + [copilot.pk for copilot in flight.copilots.all()],
+        )
+    loaded = dict(occupancy.flights)
+    loaded_end = loaded_from
+
+    while True:
+        result = simulate(occupancy, flight.pk, new_departure, new_arrival)
+        reach = max([new_arrival] + [shift.new_arrival for shift in result.shifts])
+        if reach <= loaded_end:
+            # Los vuelos que salen hasta 24 horas después de la ventana ya están cargados
+            return result
+
+        # La cascada salió de la ventana cargada: se cargan los vuelos posteriores que
+        # usan los recursos de los vuelos desplazados y se repite la simulación
+        resources = defaultdict(set)
+        for fid in [flight.pk, *(shift.flight_id for shift in result.shifts)]:
+            for resource_type, ids in loaded[fid][3].items():
+                resources[resource_type].update(ids)
+        loaded_end = reach + horizon
+        extension = Occupancy.load(
+            loaded_from,
+            loaded_end,
+            runway_ids=resources["runway"],
+            gate_ids=resources["gate"],
+            aircraft_ids=resources["aircraft"],
+            personnel_ids=resources["personnel"],
+            recurring=False,
+        )
+        for fid, entry in extension.flights.items():
+            loaded.setdefault(fid, entry)
+        occupancy = _rebuild(loaded)
+
+
+def _rebuild(flights):
+    """Ocupación nueva con los vuelos de ``Occupancy.flights`` en su horario cargado."""
+    occupancy = Occupancy()
+    for fid, (departure, arrival, status, resources) in flights.items():
+        occupancy.add_flight(
+            fid,
+            departure,
+            arrival,
+            status,
+            runway=next(iter(resources["runway"]), None),
+            gate=next(iter(resources["gate"]), None),
+            aircraft=next(iter(resources["aircraft"]), None),
+            personnel=resources["personnel"],
+        )
+    return occupancy
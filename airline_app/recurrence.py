@@ -0,0 +1,384 @@
+"""
+Vuelos recurrentes materializados de forma diferida.
+
+Un ``RecurringFlight`` describe un patrón semanal (días, hora local de salida, duración, rango de
+fechas y recursos por defecto). Sus ocurrencias no se guardan como vuelos al crear el patrón:
+
+- ``materialize_recurring`` es el trabajo periódico que convierte en vuelos las ocurrencias de
+  un horizonte móvil (``RECURRING_HORIZON_DAYS``). Valida todo el horizonte en lote con el motor
+  de ocupación y el índice de restricciones (un número fijo de consultas, sin ``full_clean``
+  por vuelo), crea los vuelos y sus copilotos con ``bulk_create`` y avanza
+  ``materialized_until`` de cada patrón. Las ocurrencias en conflicto se informan y se omiten.
+- Las ocurrencias posteriores a ``materialized_until`` son *pendientes*: ``Occupancy.load`` y
+  ``availability.available_resources`` las tratan como vuelos programados con un ID virtual
+  negativo, de modo que la búsqueda de horarios, las interrupciones, la consulta de
+  disponibilidad, las opciones del formulario de vuelos y la validación en seco no ofrecen
+  recursos que un patrón ya tiene reservados. ``Flight.clean`` y ``validate_copilots`` los
+  rechazan con los códigos ``<campo>_reserved`` (ver ``reserved_resources``).
+
+Uso:
+    python manage.py materialize_recurring --horizon-days 28
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .availability import MAINTENANCE_BUFFER
+from .constraints import ConstraintIndex, flight_resources
+from .generator import required_copilots
+from .models import Flight, RecurringFlight
+from .occupancy import Occupancy
+
+DEFAULT_HORIZON_DAYS = 28
+
+# Duración máxima de un vuelo: una ocurrencia del día anterior puede seguir en curso
+MAX_DURATION = timedelta(hours=20)
+
+Occurrence = namedtuple(
+    "Occurrence",
+    [
+        "id",
+        "pattern_id",
+        "flight_number",
+        "date",
+        "departure_time",
+        "arrival_time",
+        "origin",
+        "destination",
+        "runway_id",
+        "gate_id",
+        "aircraft_id",
+        "pilot_id",
+        "copilot_ids",
+    ],
+)
+
+MaterializationResult = namedtuple(
+    "MaterializationResult", ["created", "skipped", "horizon_end"]
+)
+
+
+def occurrence_id(pattern_id, day):
+    """ID virtual (negativo, nunca choca con un vuelo real) de una ocurrencia pendiente."""
+    return -((pattern_id << 20) | day.toordinal())
+
+
+def is_occurrence_id(flight_id):
+    """
+    Si un ID del motor de ocupación corresponde a una ocurrencia pendiente.
+
+    Las reservas temporales usan múltiplos de ``1 << 20`` (ver ``holds.hold_id``) y los
+    candidatos de un lote de validación, IDs negativos menores que ``1 << 20``.
+    """
+    return flight_id < 0 and -flight_id >> 20 > 0 and -flight_id % (1 << 20) != 0
+
+
+def occurrence_number(flight_number, day):
+    """Número de vuelo de una ocurrencia: ``NUMERO-AAMMDD``."""
+    return f"{flight_number}-{day:%y%m%d}"
+
+
+def horizon_days():
+    return getattr(settings, "RECURRING_HORIZON_DAYS", DEFAULT_HORIZON_DAYS)
+
+
+def load_patterns(first, last):
+    """
+    Patrones activos con ocurrencias sin materializar entre ``first`` y ``last``.
+
+    Returns:
+        list[tuple]: (patrón, [ids de copilotos]); dos consultas
+    """
+    patterns = list(
+        RecurringFlight.objects.filter(is_active=True, start_date__lte=last)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=first))
+        .filter(Q(materialized_until__isnull=True) | Q(materialized_until__lt=last))
+        .select_related("aircraft")
+        .order_by("id")
+    )
+    if not patterns:
+        return []
+    crews = defaultdict(list)
+    for pattern_id, personnel_id in RecurringFlight.copilots.through.objects.filter(
+        recurringflight_id__in=[pattern.id for pattern in patterns]
+    ).values_list("recurringflight_id", "personnel_id"):
+        crews[pattern_id].append(personnel_id)
+    return [(pattern, crews.get(pattern.id, [])) for pattern in patterns]
+
+
+def pattern_occurrences(pattern, copilot_ids, first, last):
+    """Ocurrencias sin materializar del patrón entre los días ``first`` y ``last``."""
+    if pattern.materialized_until is not None:
+        first = max(first, pattern.materialized_until + timedelta(days=1))
+    day = first
+    while day <= last:
+        if pattern.runs_on(day):
+            departure = timezone.make_aware(
+                datetime.combine(day, pattern.departure_time)
+            )
+            yield Occurrence(
+                occurrence_id(pattern.id, day),
+                pattern.id,
+                occurrence_number(pattern.flight_number, day),
+                day,
+                departure,
+                departure + timedelta(minutes=pattern.duration_minutes),
+                pattern.origin,
+                pattern.destination,
+                pattern.runway_id,
+                pattern.gate_id,
+                pattern.aircraft_id,
+                pattern.pilot_id,
+                copilot_ids,
+            )
+        day += timedelta(days=1)
+
+
+def pending_occurrences(start, end):
+    """
+    Ocurrencias pendientes que pueden bloquear recursos en ``[start, end)``.
+
+    Usa la misma ventana que ``Occupancy.load`` (ampliada por el mantenimiento de aeronaves).
+    """
+    window_start = start - MAINTENANCE_BUFFER
+    window_end = end + MAINTENANCE_BUFFER
+    first = timezone.localdate(window_start - MAX_DURATION)
+    last = timezone.localdate(window_end)
+    return [
+        occurrence
+        for pattern, copilot_ids in load_patterns(first, last)
+        for occurrence in pattern_occurrences(pattern, copilot_ids, first, last)
+        if occurrence.arrival_time > window_start
+        and occurrence.departure_time < window_end
+    ]
+
+
+def add_occurrences(occupancy, occurrences, selected=None):
+    """
+    Registra ocurrencias pendientes en la ocupación como vuelos programados.
+
+    Args:
+        selected: {tipo: ids} para registrar solo las ocurrencias que usan alguno de esos
+            recursos (None = todas)
+    """
+    for occurrence in occurrences:
+        personnel = [occurrence.pilot_id, *occurrence.copilot_ids]
+        if selected is not None and not any(
+            resource_id in selected.get(resource_type, ())
+            for resource_type, ids in [
+                ("runway", [occurrence.runway_id]),
+                ("gate", [occurrence.gate_id]),
+                ("aircraft", [occurrence.aircraft_id]),
+                ("personnel", personnel),
+            ]
+            for resource_id in ids
+        ):
+            continue
+        occupancy.add_flight(
+            occurrence.id,
+            occurrence.departure_time,
+            occurrence.arrival_time,
+            "SCHEDULED",
+            runway=occurrence.runway_id,
+            gate=occurrence.gate_id,
+            aircraft=occurrence.aircraft_id,
+            personnel=personnel,
+        )
+
+
+def recurring_busy_ids(resource_type, start, end, occurrences=None):
+    """
+    IDs de recursos del tipo dado reservados por ocurrencias pendientes en ``[start, end)``.
+
+    Args:
+        occurrences: Ocurrencias pendientes ya cargadas (por defecto se consultan)
+    """
+    if occurrences is None:
+        occurrences = pending_occurrences(start, end)
+    occupancy = Occupancy()
+    add_occurrences(occupancy, occurrences)
+    return {
+        resource_id
+        for kind, resource_id in list(occupancy.timelines)
+        if kind == resource_type
+        and not occupancy.is_free(resource_type, resource_id, start, end)
+    }
+
+
+def reserved_resources(resources, start, end):
+    """
+    Recursos reservados por ocurrencias pendientes en ``[start, end)`` (una o dos consultas).
+
+    Es la verificación que usan ``Flight.clean`` y ``Flight.validate_copilots``: un vuelo
+    nuevo no puede tomar lo que un patrón ya reservó, porque ``materialize_recurring``
+    descartaría después esa ocurrencia.
+
+    Args:
+        resources: Iterable de (tipo, id); los IDs vacíos se ignoran
+
+    Returns:
+        dict: (tipo, id) -> número de vuelo de la ocurrencia que lo reserva
+    """
+    resources = [(kind, resource_id) for kind, resource_id in resources if resource_id]
+    if not resources:
+        return {}
+    selected = defaultdict(set)
+    for kind, resource_id in resources:
+        selected[kind].add(resource_id)
+    occurrences = pending_occurrences(start, end)
+    numbers = {occurrence.id: occurrence.flight_number for occurrence in occurrences}
+    occupancy = Occupancy()
+    add_occurrences(occupancy, occurrences, selected)
+
+    reserved = {}
+    for kind, resource_id in resources:
+        conflicts = occupancy.conflicts(kind, resource_id, start, end)
+        if conflicts:
+            reserved[(kind, resource_id)] = numbers[conflicts[0][2]]
+    return reserved
+
+
+def _skip_reason(occurrence, pattern, occupancy, index, taken_numbers):
+    duration = (occurrence.arrival_time - occurrence.departure_time).total_seconds()
+    if occurrence.flight_number in taken_numbers:
+        return "Ya existe un vuelo con ese número."
+    if pattern.aircraft.status != "OPERATIONAL":
+        return "La aeronave no está operacional."
+    if len(occurrence.copilot_ids) < required_copilots(duration / 60):
+        return "Copilotos insuficientes para la duración del vuelo."
+    if not index.is_valid(
+        flight_resources(
+            occurrence.runway_id,
+            occurrence.gate_id,
+            occurrence.aircraft_id,
+            occurrence.pilot_id,
+        )
+    ):
+        return "Viola una restricción de recursos activa."
+    resources = [
+        ("runway", occurrence.runway_id),
+        ("gate", occurrence.gate_id),
+        ("aircraft", occurrence.aircraft_id),
+        ("personnel", occurrence.pilot_id),
+        *[("personnel", copilot) for copilot in occurrence.copilot_ids],
+    ]
+    conflicts = [
+        resource_type
+        for resource_type, resource_id in resources
+        if occupancy.conflicts(
+            resource_type,
+            resource_id,
+            occurrence.departure_time,
+            occurrence.arrival_time,
+        )
+    ]
+    if conflicts:
+        return f"Recursos ocupados: {', '.join(dict.fromkeys(conflicts))}."
+    return None
+
+
+def materialize_recurring(horizon=None, now=None, progress=None):
+    """
+    Convierte en vuelos las ocurrencias pendientes hasta el final del horizonte.
+
+    Las ocurrencias se validan en orden de salida contra la ocupación real (dos consultas),
+    las restricciones (una) y los números de vuelo existentes (una); cada ocurrencia aceptada
+    se registra en la ocupación para que las siguientes la vean. Las que ya salieron se
+    descartan sin informarse.
+
+    Args:
+        horizon: Días hacia adelante a materializar (por defecto ``RECURRING_HORIZON_DAYS``)
+        progress: Función ``(hecho, total, mensaje)`` que recibe el avance por ocurrencia
+            validada (por ejemplo, ``jobs.throttled_progress``)
+
+    Returns:
+        MaterializationResult: vuelos creados, ocurrencias omitidas ``(ocurrencia, motivo)``
+        y último día materializado
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    horizon_end = today + timedelta(
+        days=horizon if horizon is not None else horizon_days()
+    )
+
+    patterns = load_patterns(today, horizon_end)
+    by_id = {pattern.id: pattern for pattern, _ in patterns}
+    occurrences = sorted(
+        (
+            occurrence
+            for pattern, copilot_ids in patterns
+            for occurrence in pattern_occurrences(
+                pattern, copilot_ids, today, horizon_end
+            )
+            if occurrence.departure_time > now
+        ),
+        key=lambda occurrence: (occurrence.departure_time, occurrence.pattern_id),
+    )
+
+    flights = []
+    skipped = []
+    if occurrences:
+        occupancy = Occupancy.load(
+            occurrences[0].departure_time,
+            max(occurrence.arrival_time for occurrence in occurrences),
+            recurring=False,
+        )
+        index = ConstraintIndex.load()
+        taken_numbers = set(
+            Flight.objects.filter(
+                flight_number__in=[o.flight_number for o in occurrences]
+            ).values_list("flight_number", flat=True)
+        )
+        for i, occurrence in enumerate(occurrences):
+            if progress:
+                progress(i, len(occurrences), "Validando ocurrencias")
+            reason = _skip_reason(
+                occurrence,
+                by_id[occurrence.pattern_id],
+                occupancy,
+                index,
+                taken_numbers,
+            )
+            if reason:
+                skipped.append((occurrence, reason))
+                continue
+            add_occurrences(occupancy, [occurrence])
+            flights.append(occurrence)
+
+    with transaction.atomic():
+        created = Flight.objects.bulk_create(
+            [
+                Flight(
+                    flight_number=o.flight_number,
+                    origin=o.origin,
+                    destination=o.destination,
+                    departure_time=o.departure_time,
+                    arrival_time=o.arrival_time,
+                    runway_id=o.runway_id,
+                    gate_id=o.gate_id,
+                    aircraft_id=o.aircraft_id,
+                    pilot_id=o.pilot_id,
+                    recurring_flight_id=o.pattern_id,
+                )
+                for o in flights
+            ],
+            batch_size=1000,
+        )
+        Through = Flight.copilots.through
+        Through.objects.bulk_create(
+            [
+                Through(flight_id=flight.pk, personnel_id=copilot)
+                for flight, occurrence in zip(created, flights)
+                for copilot in occurrence.copilot_ids
+            ],
+            batch_size=1000,
+        )
+        RecurringFlight.objects.filter(id__in=by_id).update(
+            materialized_until=horizon_end
+        )
+    return MaterializationResult(len(created), skipped, horizon_end)
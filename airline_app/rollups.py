@@ -0,0 +1,271 @@
+"""
+Tablas de rollup diarias para los informes históricos.
+
+Por cada día local se guardan, a partir de los vuelos no cancelados que salen ese día (incluidos
+los archivados, ver ``airline_app.archive``):
+
+- ``DailyResourceRollup``: vuelos y minutos ocupados de cada pista, puerta, aeronave y persona.
+- ``DailyRouteRollup``: vuelos por ruta (origen, destino).
+- ``RollupDay``: el día ya agregado, con su cantidad de vuelos y la hora del cálculo.
+
+Cada vuelo se atribuye completo al día de su salida. Un día se recalcula entero con una
+consulta agregada por tipo de recurso (más una de rutas) sobre un rango de fechas contiguo, de
+modo que recalcular un mes cuesta lo mismo que recalcular un día.
+
+``update_rollups`` es el trabajo incremental: solo recalcula los días con vuelos modificados
+desde la última ejecución (por ``updated_at``) y los días marcados como desactualizados por
+reprogramaciones o borrados (``RollupDay.mark_stale``). ``backfill_rollups`` procesa el
+historial por bloques.
+
+Uso:
+    python manage.py backfill_rollups --start 2020-01-01 --chunk-days 31
+    python manage.py update_rollups
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .analytics import EXCLUDED_STATUSES
+from .models import (
+    ArchivedFlight,
+    DailyResourceRollup,
+    DailyRouteRollup,
+    Flight,
+    RollupDay,
+)
+
+# Tipos de recurso con columna propia en Flight (el personal incluye los copilotos)
+FLIGHT_RESOURCE_FIELDS = {
+    "runway": "runway_id",
+    "gate": "gate_id",
+    "aircraft": "aircraft_id",
+}
+
+DEFAULT_CHUNK_DAYS = 31
+
+
+def day_start(day):
+    """Inicio (medianoche local) del día dado."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def date_runs(dates):
+    """Agrupa fechas en rangos contiguos ``(primera, última)``."""
+    runs = []
+    for day in sorted(set(dates)):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _duration(prefix=""):
+    return ExpressionWrapper(
+        F(f"{prefix}arrival_time") - F(f"{prefix}departure_time"),
+        output_field=DurationField(),
+    )
+
+
+def _minutes(duration):
+    return round(duration.total_seconds() / 60) if duration else 0
+
+
+def compute_rollups(first, last, computed_at=None):
+    """
+    Recalcula los rollups de los días ``first`` a ``last`` (inclusive).
+
+    Incluye los vuelos archivados. Usa siete consultas de agregación por tabla de vuelos sin
+    importar cuántos días o vuelos abarque el rango, y reemplaza los rollups del rango en una
+    transacción.
+
+    Returns:
+        int: Cantidad de vuelos agregados
+    """
+    computed_at = computed_at or timezone.now()
+    usage = {}
+    routes = {}
+
+    def add(day, resource_type, resource_id, count, duration):
+        previous_count, previous_minutes = usage.get(
+            (day, resource_type, resource_id), (0, 0)
+        )
+        usage[(day, resource_type, resource_id)] = (
+            previous_count + count,
+            previous_minutes + _minutes(duration),
+        )
+
+    # Los vuelos archivados tienen las mismas columnas y siguen contando en el historial
+    for model in (Flight, ArchivedFlight):
+        flights = (
+            model.objects.exclude(status__in=EXCLUDED_STATUSES)
+            .filter(
+                departure_time__gte=day_start(first),
+                departure_time__lt=day_start(last + timedelta(days=1)),
+            )
+            .annotate(day=TruncDate("departure_time"))
+            .order_by()
+        )
+        for resource_type, column in [
+            *FLIGHT_RESOURCE_FIELDS.items(),
+            ("personnel", "pilot_id"),
+        ]:
+            for day, resource_id, count, duration in flights.values_list(
+                "day", column
+            ).annotate(count=Count("id"), duration=Sum(_duration())):
+                add(day, resource_type, resource_id, count, duration)
+
+        flight = model._meta.model_name
+        copilots = (
+            model.copilots.through.objects.filter(
+                **{f"{flight}__in": flights.values("id")}
+            )
+            .annotate(day=TruncDate(f"{flight}__departure_time"))
+            .values_list("day", "personnel_id")
+            .annotate(
+                count=Count(f"{flight}_id"), duration=Sum(_duration(f"{flight}__"))
+            )
+            .order_by()
+        )
+        for day, personnel_id, count, duration in copilots:
+            add(day, "personnel", personnel_id, count, duration)
+
+        for day, origin, destination, count in flights.values_list(
+            "day", "origin", "destination"
+        ).annotate(count=Count("id")):
+            routes[(day, origin, destination)] = (
+                routes.get((day, origin, destination), 0) + count
+            )
+
+    per_day = {}
+    for (day, _, _), count in routes.items():
+        per_day[day] = per_day.get(day, 0) + count
+
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    with transaction.atomic():
+        for model in (DailyResourceRollup, DailyRouteRollup, RollupDay):
+            model.objects.filter(date__range=(first, last)).delete()
+        DailyResourceRollup.objects.bulk_create(
+            [
+                DailyResourceRollup(
+                    date=day,
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    flights=count,
+                    occupied_minutes=minutes,
+                )
+                for (day, resource_type, resource_id), (count, minutes) in usage.items()
+            ],
+            batch_size=1000,
+        )
+        DailyRouteRollup.objects.bulk_create(
+            [
+                DailyRouteRollup(
+                    date=day, origin=origin, destination=destination, flights=count
+                )
+                for (day, origin, destination), count in routes.items()
+            ],
+            batch_size=1000,
+        )
+        RollupDay.objects.bulk_create(
+            [
+                RollupDay(
+                    date=day, flights=per_day.get(day, 0), computed_at=computed_at
+                )
+                for day in days
+            ],
+            batch_size=1000,
+        )
+    return sum(per_day.values())
+
+
+def backfill_rollups(
+    first=None, last=None, chunk_days=DEFAULT_CHUNK_DAYS, progress=None
+):
+    """
+    Recalcula los rollups del historial por bloques de ``chunk_days`` días.
+
+    Args:
+        first, last: Rango de fechas (por defecto, del primer al último vuelo)
+        chunk_days: Días por bloque; cada bloque es una transacción
+        progress: Función ``(hecho, total, mensaje)`` llamada antes de cada bloque
+
+    Yields:
+        tuple: (primer_día, último_día, vuelos) de cada bloque procesado
+    """
+    if first is None or last is None:
+        bounds = [
+            model.objects.aggregate(
+                first=Min("departure_time"), last=Max("departure_time")
+            )
+            for model in (Flight, ArchivedFlight)
+        ]
+        bounds = [bound for bound in bounds if bound["first"] is not None]
+        if not bounds:
+            return
+        first = first or timezone.localdate(min(bound["first"] for bound in bounds))
+        last = last or timezone.localdate(max(bound["last"] for bound in bounds))
+
+    computed_at = timezone.now()
+    chunk_start = first
+    while chunk_start <= last:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last)
+        if progress:
+            progress(
+                (chunk_start - first).days,
+                (last - first).days + 1,
+                f"{chunk_start} - {chunk_end}",
+            )
+        yield chunk_start, chunk_end, compute_rollups(
+            chunk_start, chunk_end, computed_at
+        )
+        chunk_start = chunk_end + timedelta(days=1)
+
+
+def pending_days():
+    """
+    Días que el trabajo incremental debe recalcular.
+
+    Returns:
+        set | None: Fechas pendientes, o None si nunca se agregó ningún día
+    """
+    watermark = RollupDay.objects.aggregate(watermark=Max("computed_at"))["watermark"]
+    if watermark is None:
+        return None
+    changed = (
+        Flight.objects.filter(updated_at__gte=watermark)
+        .annotate(day=TruncDate("departure_time"))
+        .values_list("day", flat=True)
+        .order_by()
+        .distinct()
+    )
+    stale = RollupDay.objects.filter(stale=True).values_list("date", flat=True)
+    return set(changed) | set(stale)
+
+
+def update_rollups(progress=None):
+    """
+    Trabajo incremental: recalcula solo los días con cambios desde la última ejecución.
+
+    Los vuelos modificados durante la ejecución quedan con ``updated_at`` posterior a la
+    nueva marca y se procesan en la siguiente. ``progress`` (``(hecho, total, mensaje)``)
+    se llama antes de cada rango o bloque.
+
+    Returns:
+        list: Rangos ``(primer_día, último_día, vuelos)`` recalculados
+    """
+    computed_at = timezone.now()
+    days = pending_days()
+    if days is None:
+        return list(backfill_rollups(progress=progress))
+    runs = date_runs(days)
+    ranges = []
+    for i, (first, last) in enumerate(runs):
+        if progress:
+            progress(i, len(runs), f"{first} - {last}")
+        ranges.append((first, last, compute_rollups(first, last, computed_at)))
+    return ranges
@@ -0,0 +1,232 @@
+"""
+Búsqueda de horarios en paralelo sobre muchas combinaciones de recursos.
+
+Una vez cargada la ocupación, buscar el primer horario libre de cada combinación
+(pista, puerta, aeronave, piloto) es independiente de las demás. ``Flight.find_available_slots``
+empaqueta las líneas de tiempo de los recursos candidatos en un único arreglo de enteros
+(microsegundos desde la época) y, con ``workers > 1``, lo comparte con los procesos de un
+``ProcessPoolExecutor`` mediante memoria compartida: a los workers solo se les envían los
+desplazamientos de cada combinación, nunca instancias de modelos. Cada worker retorna sus
+mejores resultados y el proceso principal los combina.
+
+El pool y el segmento de memoria compartida se crean la primera vez y se reutilizan en las
+búsquedas siguientes del mismo proceso (el segmento solo se reemplaza si el arreglo no cabe);
+los workers mantienen el segmento abierto entre tareas.
+
+Con menos combinaciones que workers (p. ej. ``Flight.find_next_available_slot(workers=N)``)
+se reparte la ventana de búsqueda en lugar de las combinaciones.
+
+Este módulo no importa Django: los workers lo importan en procesos nuevos sin configurar.
+"""
+
+import atexit
+import heapq
+import math
+import multiprocessing
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import UTC, datetime, timedelta
+from multiprocessing.shared_memory import SharedMemory
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = timedelta(microseconds=1)
+
+# Tareas por worker al repartir combinaciones: equilibra la carga si unas terminan antes
+TASKS_PER_WORKER = 4
+
+# Pool y segmento compartidos por las búsquedas del proceso (ver ``_shared``)
+_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+_segment = None
+_owner = None
+
+# En cada worker: segmento abierto por última vez, como (nombre, SharedMemory, vista)
+_attached = None
+
+
+def micros(moment):
+    """Microsegundos desde la época de una fecha con zona horaria (exacto, sin flotantes)."""
+    return (moment - EPOCH) // MICROSECOND
+
+
+def pack(timelines):
+    """
+    Empaqueta líneas de tiempo en un arreglo compacto.
+
+    Cada recurso ocupa tres bloques consecutivos de ``n`` enteros: inicios (ordenados), fines
+    y el mayor fin acumulado, que permite decidir si un intervalo está libre con una sola
+    búsqueda binaria.
+
+    Args:
+        timelines: ``{clave: [(inicio, fin), ...]}`` en microsegundos
+
+    Returns:
+        tuple: (``array('q')``, ``{clave: (desplazamiento, n)}``)
+    """
+    data = array("q")
+    index = {}
+    for key, intervals in timelines.items():
+        intervals = sorted(intervals)
+        index[key] = (len(data), len(intervals))
+        data.extend(start for start, _ in intervals)
+        data.extend(end for _, end in intervals)
+        current = None
+        for _, end in intervals:
+            current = end if current is None or end > current else current
+            data.append(current)
+    return data, index
+
+
+def is_free(data, offset, count, start, end):
+    """Indica si ``[start, end)`` no se solapa con ningún intervalo del recurso."""
+    if not count:
+        return True
+    hi = bisect_left(data, end, offset, offset + count)
+    # Todos los intervalos anteriores a ``hi`` empiezan antes de ``end``: hay solapamiento
+    # si alguno termina después de ``start``
+    return hi == offset or data[hi - 1 + 2 * count] <= start
+
+
+def scan(data, combos, first, step, duration, lo, hi, limit=None):
+    """
+    Primer paso libre de cada combinación dentro de los pasos ``[lo, hi)``.
+
+    Args:
+        combos: ``[(número, ((desplazamiento, n), ...)), ...]``
+        first, step, duration: Inicio de la búsqueda, incremento y duración, en microsegundos
+        limit: Retorna solo los ``limit`` mejores resultados
+
+    Returns:
+        list[tuple]: (paso, número de combinación) ordenados
+    """
+    found = []
+    for number, resources in combos:
+        for i in range(lo, hi):
+            start = first + i * step
+            end = start + duration
+            if all(
+                is_free(data, offset, count, start, end) for offset, count in resources
+            ):
+                found.append((i, number))
+                break
+    return heapq.nsmallest(limit, found) if limit else sorted(found)
+
+
+def _scan_shared(name, combos, first, step, duration, lo, hi, limit):
+    """Ejecuta ``scan`` en un worker sobre el arreglo de la memoria compartida ``name``."""
+    global _attached
+    if _attached is None or _attached[0] != name:
+        if _attached is not None:
+            _attached[2].release()
+            _attached[1].close()
+        shm = SharedMemory(name=name, track=False)
+        _attached = (name, shm, shm.buf.cast("q"))
+    return scan(_attached[2], combos, first, step, duration, lo, hi, limit)
+
+
+def _shared(workers, size):
+    """
+    Pool de al menos ``workers`` procesos y segmento de al menos ``size`` bytes.
+
+    Se crean la primera vez (o tras un ``fork``, que no los hereda utilizables) y se
+    reemplazan solo si quedan chicos. Llamar con ``_lock`` tomado.
+    """
+    global _pool, _pool_workers, _segment, _owner
+    if _owner != os.getpid():
+        _pool = _segment = None
+        _owner = os.getpid()
+    if _pool is None or _pool_workers < workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # ``spawn``: el proceso ya tiene hilos y el pool vive más que la búsqueda que lo
+        # crea, así que ``fork`` podría heredar bloqueos tomados
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _pool_workers = workers
+    if _segment is None or _segment.size < size:
+        if _segment is not None:
+            _segment.close()
+            _segment.unlink()
+        _segment = SharedMemory(create=True, size=size)
+    return _pool, _segment
+
+
+@atexit.register
+def _shutdown():
+    """Detiene el pool y libera el segmento al terminar el proceso que los creó."""
+    global _pool, _segment
+    if _owner != os.getpid():
+        return
+    if _pool is not None:
+        _pool.shutdown()
+    if _segment is not None:
+        _segment.close()
+        _segment.unlink()
+    _pool = _segment = None
+
+
+def _tasks(combos, steps, workers, limit):
+    """Reparte combinaciones (o, si son pocas, rangos de pasos) entre los workers."""
+    if len(combos) >= workers:
+        size = math.ceil(len(combos) / (workers * TASKS_PER_WORKER))
+        # Cada combinación aparece en una sola tarea: basta con sus ``limit`` mejores
+        return [
+            (combos[i : i + size], 0, steps, limit) for i in range(0, len(combos), size)
+        ]
+    size = math.ceil(steps / workers)
+    return [(combos, lo, min(steps, lo + size), None) for lo in range(0, steps, size)]
+
+
+def best_slots(
+    data, combos, first, step, steps, duration, limit, workers=None, progress=None
+):
+    """
+    Mejores ``limit`` combinaciones por paso de salida más temprano.
+
+    Args:
+        data: Arreglo de ``pack``
+        combos: ``[(número, ((desplazamiento, n), ...)), ...]``
+        steps: Cantidad de pasos de la ventana de búsqueda
+        workers: Procesos del pool (``None`` o 1 = en este proceso)
+        progress: Función ``(hecho, total, mensaje)`` llamada cada vez que termina una
+            tarea del pool
+
+    Returns:
+        list[tuple]: (paso, número de combinación), a lo sumo ``limit``, ordenados
+    """
+    global _pool
+    if not combos:
+        return []
+    if not workers or workers <= 1:
+        return scan(data, combos, first, step, duration, 0, steps, limit)
+
+    size = len(data) * data.itemsize
+    tasks = _tasks(combos, steps, workers, limit)
+    # Las búsquedas comparten el segmento: una a la vez ocupa el pool completo
+    with _lock:
+        pool, shm = _shared(workers, max(data.itemsize, size))
+        shm.buf[:size] = data.tobytes()
+        earliest = {}
+        try:
+            futures = [
+                pool.submit(
+                    _scan_shared, shm.name, chunk, first, step, duration, lo, hi, top
+                )
+                for chunk, lo, hi, top in tasks
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                for i, number in future.result():
+                    earliest[number] = min(i, earliest.get(number, i))
+                if progress:
+                    progress(done, len(futures), "Buscando un horario libre")
+        except BrokenProcessPool:
+            # Un worker murió: la próxima búsqueda crea un pool nuevo
+            _pool = None
+            raise
+    return heapq.nsmallest(limit, ((i, number) for number, i in earliest.items()))
@@ -0,0 +1,77 @@
+// AeroControl - Resource autocomplete for selects rendered by AutocompleteSelect
+(function() {
+  function setupAutocomplete(select) {
+    const search = document.createElement('input');
+    search.type = 'search';
+    search.placeholder = 'Buscar...';
+    search.className = select.className + ' mb-2';
+    search.setAttribute('autocomplete', 'off');
+    select.parentNode.insertBefore(search, select);
+
+    const more = document.createElement('button');
+    more.type = 'button';
+    more.textContent = 'Más resultados';
+    more.className = 'mt-2 text-sm text-cyan-400 hover:text-cyan-300';
+    more.hidden = true;
+    select.parentNode.insertBefore(more, select.nextSibling);
+
+    let page = 1;
+    let timer = null;
+    let pending = null;
+
+    function load(reset) {
+      const url = new URL(select.dataset.autocompleteUrl, window.location.origin);
+      url.searchParams.set('q', search.value);
+      url.searchParams.set('page', page);
+      if (pending) {
+        pending.abort();
+      }
+      pending = new AbortController();
+      fetch(url, {signal: pending.signal})
+        .then((response) => response.json())
+        .then(function(data) {
+          if (reset) {
+            // Keep the empty option and the current selection
+            Array.from(select.options).forEach(function(option) {
+              if (option.value && !option.selected) {
+                option.remove();
+              }
+            });
+          }
+          const present = new Set(Array.from(select.options).map((option) => option.value));
+          data.results.forEach(function(result) {
+            if (!present.has(String(result.id))) {
+              select.appendChild(new Option(result.label, result.id));
+            }
+          });
+          more.hidden = !data.more;
+        })
+        .catch(function(error) {
+          if (error.name !== 'AbortError') {
+            throw error;
+          }
+        });
+    }
+
+    search.addEventListener('input', function() {
+      clearTimeout(timer);
+      timer = setTimeout(function() {
+        page = 1;
+        load(true);
+      }, 250);
+    });
+    select.addEventListener('focus', function() {
+      if (select.options.length <= 2 && page === 1) {
+        load(true);
+      }
+    }, {once: true});
+    more.addEventListener('click', function() {
+      page += 1;
+      load(false);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(setupAutocomplete);
+  });
+})();
@@ -68,3 +68,92 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
 });
+
+// Flight form: offer only the resources free in the entered time window
+function renderSelectChoices(select, choices) {
+  const selected = select.value;
+  const empty = select.querySelector('option[value=""]');
+  select.innerHTML = '';
+  if (empty) {
+    select.appendChild(empty);
+  }
+  choices.forEach(function(choice) {
+    select.appendChild(new Option(choice.label, choice.id));
+  });
+  // Keep the selection only if it is still free
+  select.value = choices.some((choice) => String(choice.id) === selected) ? selected : '';
+}
+
+function renderCheckboxChoices(container, name, choices) {
+  const checked = new Set(
+    Array.from(container.querySelectorAll('input:checked')).map((input) => input.value)
+  );
+  const template = container.querySelector('input');
+  container.innerHTML = '';
+  choices.forEach(function(choice, index) {
+    const id = container.id + '_' + index;
+    const input = document.createElement('input');
+    input.type = 'checkbox';
+    input.name = name;
+    input.value = choice.id;
+    input.id = id;
+    input.checked = checked.has(String(choice.id));
+    if (template) {
+      input.className = template.className;
+    }
+    const label = document.createElement('label');
+    label.htmlFor = id;
+    label.append(input, ' ' + choice.label);
+    const row = document.createElement('div');
+    row.appendChild(label);
+    container.appendChild(row);
+  });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  const form = document.querySelector('form[data-resource-choices-url]');
+  if (!form) {
+    return;
+  }
+  const departure = form.querySelector('[name="departure_time"]');
+  const arrival = form.querySelector('[name="arrival_time"]');
+  let pending = null;
+
+  function refreshChoices() {
+    if (!departure.value || !arrival.value) {
+      return;
+    }
+    const params = new URLSearchParams({
+      departure_time: departure.value,
+      arrival_time: arrival.value,
+      flight: form.dataset.flight,
+    });
+    if (pending) {
+      pending.abort();
+    }
+    pending = new AbortController();
+    fetch(form.dataset.resourceChoicesUrl + '?' + params, {signal: pending.signal})
+      .then((response) => (response.ok ? response.json() : null))
+      .then(function(choices) {
+        if (!choices) {
+          return;
+        }
+        Object.entries(choices).forEach(function([name, fieldChoices]) {
+          const field = document.getElementById('id_' + name);
+          if (field && field.tagName === 'SELECT') {
+            renderSelectChoices(field, fieldChoices);
+          } else if (field) {
+            renderCheckboxChoices(field, name, fieldChoices);
+          }
+        });
+      })
+      .catch(function(error) {
+        if (error.name !== 'AbortError') {
+          throw error;
+        }
+      });
+  }
+
+  departure.addEventListener('change', refreshChoices);
+  arrival.addEventListener('change', refreshChoices);
+});
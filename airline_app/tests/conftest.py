@@ -1,7 +1,11 @@
+from datetime import timedelta
+
 import pytest
+from django.db import connection
 from django.utils import timezone
 
-from airline_app.models import Aircraft, Gate, Personnel, Runway
+from airline_app.middleware import QueryRecorder
+from airline_app.models import Aircraft, Flight, Gate, Personnel, Runway
 
 
 @pytest.fixture()
@@ -56,3 +60,63 @@ def copilot(db):
         years_of_experience=6,
         is_active=True,
     )
+
+
+@pytest.fixture()
+def make_flight(runway, gate, aircraft, pilot):
+    """
+    Crea vuelos Havana-Miami con los recursos de los fixtures (cualquier campo se puede
+    sobrescribir por nombre). ``save=False`` solo construye el vuelo, p. ej. para probar
+    ``full_clean``; ``holder`` es el titular de reservas con el que se valida.
+    """
+
+    def make(
+        departure,
+        number="CH100",
+        hours=2,
+        copilots=(),
+        holder=None,
+        save=True,
+        **fields,
+    ):
+        flight = Flight(
+            **{
+                "flight_number": number,
+                "origin": "Havana",
+                "destination": "Miami",
+                "departure_time": departure,
+                "arrival_time": departure + timedelta(hours=hours),
+                "runway": runway,
+                "gate": gate,
+                "aircraft": aircraft,
+                "pilot": pilot,
+                **fields,
+            }
+        )
+        flight.slot_holder = holder
+        if save:
+            flight.save()
+            flight.copilots.add(*copilots)
+        return flight
+
+    return make
+
+
+@pytest.fixture()
+def count_queries():
+    """Ejecuta un callable y retorna la cantidad de consultas SQL que realizó."""
+
+    def run(func, *args, **kwargs):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            func(*args, **kwargs)
+        return recorder.count
+
+    return run
+
+
+@pytest.fixture()
+def query_budget_client(client, settings):
+    """Cliente de pruebas con el middleware de presupuestos en modo estricto."""
+    settings.QUERY_BUDGET_ACTION = "raise"
+    return client
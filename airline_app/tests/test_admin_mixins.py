@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app import admin_mixins
+from airline_app.admin_mixins import EstimatedCountPaginator
+from airline_app.generator import generate_schedule
+from airline_app.models import Flight, ResourceConstraint
+
+
+def _changelist(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [query["sql"] for query in queries.captured_queries]
+
+
+@pytest.mark.django_db
+def test_flight_changelist_cost_does_not_depend_on_table_size(
+    admin_client, monkeypatch
+):
+    cache.clear()
+    url = reverse("admin:airline_app_flight_changelist")
+    start = timezone.make_aware(datetime(2030, 3, 1))
+    generate_schedule(40, seed=1, start=start, days=4, prefix="AS")
+
+    _, cold = _changelist(admin_client, url)
+    _, small = _changelist(admin_client, url)
+    # Las opciones de origen y destino salen de la caché después de la primera vez
+    assert [sql for sql in cold if "DISTINCT" in sql and '"origin"' in sql]
+    assert not [sql for sql in small if "DISTINCT" in sql and '"origin"' in sql]
+
+    generate_schedule(400, seed=2, start=start, days=40, prefix="AL")
+    response, large = _changelist(admin_client, url)
+    assert len(large) == len(small)
+    assert response.context["cl"].result_count == 440
+    # Recursos de las filas con JOIN, sin consultas por fila
+    assert "runway" in response.context["cl"].list_select_related
+
+    monkeypatch.setattr(admin_mixins, "EXACT_COUNT_LIMIT", 100)
+    # Sin estadísticas se reporta el límite; con ellas, la estimación sigue a los borrados
+    assert EstimatedCountPaginator(Flight.objects.all(), 10).count == 101
+    Flight.objects.filter(flight_number__startswith="AS").delete()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    assert EstimatedCountPaginator(Flight.objects.all(), 10).count == 400
+
+    # Las páginas más allá del conteo estimado se pueden pedir y enlazan a la siguiente
+    scheduled = Flight.objects.filter(status="SCHEDULED").order_by("pk")
+    total = scheduled.count()
+    paginator = EstimatedCountPaginator(scheduled, 10)
+    assert paginator.count == 101 and paginator.num_pages == 11
+    page = paginator.page(20)
+    assert list(page) == list(scheduled[190:200])
+    assert page.has_next() and paginator.num_pages == 21
+    last = (total + 9) // 10
+    assert len(paginator.page(last)) == total - (last - 1) * 10
+    with pytest.raises(EmptyPage):
+        paginator.page(last + 1)
+
+
+@pytest.mark.django_db
+def test_constraint_changelist_resolves_resource_names_in_bulk(admin_client):
+    url = reverse("admin:airline_app_resourceconstraint_changelist")
+    start = timezone.make_aware(datetime(2030, 3, 1))
+    generate_schedule(20, seed=3, start=start, constraints=2, prefix="AC")
+
+    def resource_types():
+        constraints = ResourceConstraint.objects.all()
+        return {c.primary_resource_type for c in constraints} | {
+            c.related_resource_type for c in constraints
+        }
+
+    response, few = _changelist(admin_client, url)
+    constraint = ResourceConstraint.objects.first()
+    assert str(constraint.get_primary_resource()) in response.content.decode()
+    few_types = resource_types()
+
+    generate_schedule(20, seed=4, start=start, constraints=20, prefix="AD")
+    _, many = _changelist(admin_client, url)
+    assert ResourceConstraint.objects.count() > 20
+    # Una consulta por tipo de recurso presente, no dos por restricción
+    assert len(many) - len(resource_types()) == len(few) - len(few_types)
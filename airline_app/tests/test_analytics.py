@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.urls import reverse
+
+from airline_app import analytics
+from airline_app.models import Aircraft, Flight, Runway
+
+T0 = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _at(hours):
+    return T0 + timedelta(hours=hours)
+
+
+@pytest.fixture()
+def flights(runway, gate, gate_2, aircraft, pilot, copilot):
+    runway_2 = Runway.objects.create(
+        name="Runway 2", runway_code="RW-02", length_meters=3000
+    )
+    aircraft_2 = Aircraft.objects.create(
+        registration_number="N67890",
+        model="A320",
+        manufacturer="Airbus",
+        capacity=150,
+        year_manufactured=2019,
+    )
+
+    def flight(number, dep, arr, gate, runway, aircraft, status="SCHEDULED"):
+        return Flight(
+            flight_number=number,
+            origin="Havana",
+            destination="Miami",
+            departure_time=_at(dep),
+            arrival_time=_at(arr),
+            status=status,
+            runway=runway,
+            gate=gate,
+            aircraft=aircraft,
+            pilot=pilot,
+        )
+
+    created = Flight.objects.bulk_create(
+        [
+            flight("AN1", 10, 12, gate, runway, aircraft),
+            flight("AN2", 11, 13, gate_2, runway_2, aircraft_2, "COMPLETED"),
+            flight("AN3", 10, 12, gate, runway, aircraft, "CANCELLED"),
+            # Termina fuera del periodo: solo cuenta una hora
+            flight("AN4", 23, 26, gate, runway, aircraft),
+        ]
+    )
+    created[0].copilots.add(copilot)
+    return created
+
+
+@pytest.mark.django_db
+def test_report_aggregates_utilization_peaks_and_block_hours(
+    count_queries, flights, gate, gate_2, copilot
+):
+    reports = []
+    queries = count_queries(
+        lambda: reports.append(analytics.compute_report(_at(0), _at(24)))
+    )
+    report = reports[0]
+
+    gates = {usage.resource_id: usage for usage in report.utilization["gate"]}
+    assert gates[gate.pk].flights == 2
+    assert gates[gate.pk].occupied == timedelta(hours=3)
+    assert gates[gate.pk].utilization == pytest.approx(3 / 24)
+    assert gates[gate_2.pk].occupied == timedelta(hours=2)
+    personnel = {usage.resource_id: usage for usage in report.utilization["personnel"]}
+    assert personnel[copilot.pk].occupied == timedelta(hours=2)
+
+    assert report.peaks["T1"] == {_at(10): 1, _at(11): 2, _at(12): 1, _at(23): 1}
+    assert list(report.block_hours["N12345"].values()) == [3.0]
+    assert list(report.block_hours["N67890"].values()) == [2.0]
+    # Dos consultas por tipo de recurso (tres para el personal) y una por gráfico o tabla
+    assert queries == 12
+
+
+@pytest.mark.django_db
+def test_period_report_is_cached_until_flights_change(count_queries, flights, gate):
+    first = analytics.period_report(_at(0), _at(24))
+    assert count_queries(analytics.period_report, _at(0), _at(24)) == 1
+
+    Flight.objects.filter(flight_number="AN4").update(
+        status="CANCELLED", updated_at=_at(30)
+    )
+    report = analytics.period_report(_at(0), _at(24))
+
+    assert report is not first
+    gates = {usage.resource_id: usage for usage in report.utilization["gate"]}
+    assert gates[gate.pk].occupied == timedelta(hours=2)
+
+
+@pytest.mark.django_db
+def test_analytics_view_renders_report_for_valid_period(client, flights):
+    url = reverse("analytics")
+
+    response = client.get(url, {"start_date": "2030-01-01", "end_date": "2030-01-02"})
+    assert response.status_code == 200
+    assert response.context["report"].peaks["T1"]
+
+    response = client.get(url, {"start_date": "2030-01-02", "end_date": "2030-01-01"})
+    assert response.status_code == 200
+    assert "report" not in response.context
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.archive import archivable_flights, archive_cutoff, archive_flights
+from airline_app.generator import generate_schedule
+from airline_app.models import (
+    Aircraft,
+    ArchivedFlight,
+    DailyResourceRollup,
+    DailyRouteRollup,
+    Flight,
+)
+from airline_app.rollups import backfill_rollups, update_rollups
+
+
+def _rollups():
+    return set(
+        DailyResourceRollup.objects.values_list(
+            "date", "resource_type", "resource_id", "flights", "occupied_minutes"
+        )
+    ) | set(
+        DailyRouteRollup.objects.values_list("date", "origin", "destination", "flights")
+    )
+
+
+def _copilots(model, key):
+    rows = model.copilots.through.objects.values_list(
+        f"{model._meta.model_name}__{key}", "personnel_id"
+    )
+    assignments = {}
+    for flight_id, personnel_id in rows:
+        assignments.setdefault(flight_id, set()).add(personnel_id)
+    return assignments
+
+
+@pytest.mark.django_db
+def test_archive_moves_old_flights_in_batches_with_copilots():
+    generate_schedule(
+        300,
+        seed=6,
+        start=timezone.now() - timedelta(days=400),
+        days=10,
+        cancelled_share=0.2,
+    )
+    list(backfill_rollups())
+    rollups = _rollups()
+    copilots = _copilots(Flight, "id")
+
+    batches = list(archive_flights(retention_days=365, batch_size=50))
+
+    assert len(batches) > 1 and max(batches) == 50
+    assert ArchivedFlight.objects.count() + Flight.objects.count() == 300
+    # Solo queda el último vuelo completado de cada aeronave
+    assert (
+        Flight.objects.count() == Aircraft.objects.filter(flights__isnull=False).count()
+    )
+    assert set(Flight.objects.values_list("status", flat=True)) == {"COMPLETED"}
+    archived = _copilots(ArchivedFlight, "original_id")
+    assert archived == {i: ids for i, ids in copilots.items() if i in archived}
+    assert (
+        len(archived)
+        == len(copilots)
+        - Flight.objects.filter(copilots__isnull=False).distinct().count()
+    )
+
+    # Los rollups se recalculan incluyendo el archivo
+    update_rollups()
+    assert _rollups() == rollups
+
+
+@pytest.mark.django_db
+def test_archive_keeps_flights_within_the_maintenance_buffer(
+    runway, gate, aircraft, pilot
+):
+    cutoff = archive_cutoff(retention_days=30)
+    other = Aircraft.objects.create(
+        registration_number="N67890",
+        model="A320",
+        manufacturer="Airbus",
+        capacity=150,
+        year_manufactured=2019,
+    )
+
+    def flight(number, arrival, status="COMPLETED", plane=aircraft):
+        return Flight(
+            flight_number=number,
+            origin="Havana",
+            destination="Miami",
+            departure_time=arrival - timedelta(hours=2),
+            arrival_time=arrival,
+            status=status,
+            runway=runway,
+            gate=gate,
+            aircraft=plane,
+            pilot=pilot,
+        )
+
+    Flight.objects.bulk_create(
+        [
+            flight("OLD", cutoff - timedelta(hours=48)),
+            flight("BUFFER", cutoff - timedelta(hours=12)),
+            flight("CANCELLED", cutoff - timedelta(hours=72), "CANCELLED"),
+            flight("RECENT", timezone.now() - timedelta(days=10)),
+            flight("LAST", cutoff - timedelta(days=90), plane=other),
+        ]
+    )
+
+    assert set(archivable_flights(cutoff).values_list("flight_number", flat=True)) == {
+        "OLD",
+        "CANCELLED",
+    }
+
+
+@pytest.mark.django_db
+def test_flight_search_includes_archived_flights_only_on_request(client):
+    generate_schedule(40, seed=7, start=timezone.now() - timedelta(days=400), days=2)
+    list(archive_flights(retention_days=365))
+    number = ArchivedFlight.objects.values_list("flight_number", flat=True).first()
+    url = reverse("flight_list")
+
+    response = client.get(url, {"flight_number": number})
+    assert "archived_flights" not in response.context
+
+    response = client.get(url, {"flight_number": number, "include_archived": "on"})
+    assert [f.flight_number for f in response.context["archived_flights"]] == [number]
+    assert response.context["archived_count"] == 1
@@ -0,0 +1,99 @@
+from datetime import time, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.availability import aavailable_resources, available_resources
+from airline_app.models import Flight, RecurringFlight
+
+
+@pytest.mark.django_db
+def test_async_slot_search_matches_sync(make_flight, runway, gate, aircraft, pilot):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    make_flight(start + timedelta(hours=3), "AS100")
+    args = (runway.id, gate.id, aircraft.id, pilot.id, 2)
+
+    result = async_to_sync(Flight.afind_next_available_slot)(
+        *args, start_search_from=start
+    )
+
+    assert result == Flight.find_next_available_slot(*args, start_search_from=start)
+    assert result["departure_time"] > start + timedelta(days=1)
+
+    aircraft.status = "MAINTENANCE"
+    aircraft.save()
+    assert (
+        async_to_sync(Flight.afind_next_available_slot)(*args, start_search_from=start)
+        is None
+    )
+
+
+@pytest.mark.django_db
+def test_async_availability_matches_sync(
+    make_flight, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    start = timezone.now() + timedelta(days=2)
+    make_flight(start, "AS100")
+    pattern = RecurringFlight.objects.create(
+        flight_number="RC100",
+        origin="Havana",
+        destination="Cancun",
+        weekdays="1234567",
+        departure_time=time(0, 0),
+        duration_minutes=23 * 60 + 59,
+        start_date=timezone.localdate(),
+        runway=runway,
+        gate=gate_2,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    pattern.copilots.add(copilot)
+    end = start + timedelta(hours=1)
+
+    for resource_type in ["runway", "gate", "aircraft", "personnel"]:
+        expected = list(available_resources(resource_type, start, end))
+        assert (
+            async_to_sync(aavailable_resources)(resource_type, start, end) == expected
+        )
+    assert async_to_sync(aavailable_resources)("gate", start, end) == []
+    assert async_to_sync(aavailable_resources)("gate", start, end, recurring=False) == [
+        gate_2
+    ]
+
+
+@pytest.mark.django_db
+def test_async_views_under_asgi_handler(
+    make_flight, runway, gate, gate_2, aircraft, pilot
+):
+    start = timezone.localtime() + timedelta(days=1)
+    make_flight(start, "AS100")
+    client = AsyncClient()
+
+    response = async_to_sync(client.post)(
+        reverse("check_availability"),
+        {
+            "resource_type": "gate",
+            "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M"),
+        },
+    )
+    assert response.status_code == 200
+    assert list(response.context["available_resources"]) == [gate_2]
+    # El middleware de instrumentación también mide las consultas en modo asíncrono
+    assert 'desc="0 queries"' not in response["Server-Timing"]
+
+    response = async_to_sync(client.post)(
+        reverse("find_slot"),
+        {
+            "runway": runway.id,
+            "gate": gate.id,
+            "aircraft": aircraft.id,
+            "pilot": pilot.id,
+            "duration_hours": 2,
+        },
+    )
+    assert response.status_code == 200
+    assert response.context["result"]["departure_time"] > start
@@ -0,0 +1,110 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.audit import (
+    CONSTRAINT_VIOLATION,
+    INSUFFICIENT_COPILOTS,
+    MAINTENANCE,
+    OVERLAP,
+    audit_schedule,
+)
+from airline_app.generator import generate_schedule
+from airline_app.models import Flight, ResourceConstraint
+
+
+@pytest.fixture()
+def corrupted_flights(runway, gate, gate_2, aircraft, pilot, copilot):
+    # bulk_create omite Flight.save()/full_clean(), como una edición directa en la BD
+    dep = timezone.now() + timezone.timedelta(days=2)
+    first, second = Flight.objects.bulk_create(
+        [
+            Flight(
+                flight_number="AU100",
+                origin="Havana",
+                destination="Miami",
+                departure_time=dep,
+                arrival_time=dep + timezone.timedelta(hours=2),
+                runway=runway,
+                gate=gate,
+                aircraft=aircraft,
+                pilot=pilot,
+            ),
+            Flight(
+                flight_number="AU101",
+                origin="Havana",
+                destination="Cancun",
+                departure_time=dep + timezone.timedelta(hours=1),
+                arrival_time=dep + timezone.timedelta(hours=3),
+                runway=runway,
+                gate=gate_2,
+                aircraft=aircraft,
+                pilot=pilot,
+            ),
+        ]
+    )
+    first.copilots.add(copilot)
+    ResourceConstraint.objects.create(
+        name="Pista sin puerta 2",
+        constraint_type="MUTUAL_EXCLUSION",
+        description="",
+        primary_resource_type="runway",
+        primary_resource_id=runway.id,
+        related_resource_type="gate",
+        related_resource_id=gate_2.id,
+    )
+    return first, second
+
+
+@pytest.mark.django_db
+def test_generated_schedule_passes_audit_with_constant_queries(count_queries):
+    generate_schedule(500, seed=4, constraints=10, long_haul_share=0.3)
+
+    reports = []
+    queries = count_queries(lambda: reports.append(audit_schedule()))
+
+    assert queries == 3
+    assert not reports[0]
+    assert reports[0].flights_checked == 500
+
+
+@pytest.mark.django_db
+def test_audit_finds_overlaps_buffer_copilot_and_constraint_issues(
+    corrupted_flights, runway, aircraft, pilot
+):
+    first, second = corrupted_flights
+
+    report = audit_schedule()
+
+    found = {
+        (i.kind, i.resource_type, i.resource_id, i.flight_ids) for i in report.issues
+    }
+    assert found == {
+        (OVERLAP, "runway", runway.id, (first.id, second.id)),
+        (OVERLAP, "personnel", pilot.id, (first.id, second.id)),
+        (MAINTENANCE, "aircraft", aircraft.id, (first.id, second.id)),
+        (INSUFFICIENT_COPILOTS, "personnel", None, (second.id,)),
+        (CONSTRAINT_VIOLATION, "runway", runway.id, (second.id,)),
+    }
+
+
+@pytest.mark.django_db
+def test_audit_command_and_admin_report(corrupted_flights, admin_client, capsys):
+    call_command("audit_schedule")
+    assert "AU101" in capsys.readouterr().out
+
+    resp = admin_client.get(reverse("admin:airline_app_flight_audit"))
+    assert resp.status_code == 200
+    assert b"AU101" in resp.content
+
+    # El admin audita solo la ventana acotada; el comando, todo el historial
+    Flight.objects.filter(flight_number__startswith="AU").update(
+        departure_time=F("departure_time") + timezone.timedelta(days=30),
+        arrival_time=F("arrival_time") + timezone.timedelta(days=30),
+    )
+    resp = admin_client.get(reverse("admin:airline_app_flight_audit"))
+    assert b"AU101" not in resp.content
+    call_command("audit_schedule")
+    assert "AU101" in capsys.readouterr().out
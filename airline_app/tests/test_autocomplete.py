@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from airline_app.autocomplete import (
+    AUTOCOMPLETE_PAGE_SIZE,
+    prefix_filter,
+    search_resources,
+)
+from airline_app.forms import FindSlotForm, ResourceConstraintForm
+from airline_app.models import Gate, Personnel, ResourceConstraint
+
+
+@pytest.mark.django_db
+def test_autocomplete_endpoint_searches_and_paginates(
+    client, gate, pilot, copilot, count_queries
+):
+    Gate.objects.bulk_create(
+        Gate(name=f"Gate B{i:02}", gate_code=f"B-{i:02}", terminal="T2")
+        for i in range(AUTOCOMPLETE_PAGE_SIZE + 5)
+    )
+    url = reverse("resource_autocomplete", args=["gate"])
+
+    first = client.get(url, {"q": "b-"}).json()
+    assert len(first["results"]) == AUTOCOMPLETE_PAGE_SIZE
+    assert first["results"][0]["label"] == "B-00 - T2"
+    assert first["more"]
+    second = client.get(url, {"q": "b-", "page": 2}).json()
+    assert len(second["results"]) == 5
+    assert not second["more"]
+    assert count_queries(client.get, url, {"q": "b-"}) == 1
+
+    pilots = client.get(
+        reverse("resource_autocomplete", args=["personnel"]),
+        {"q": "pér", "active": 1, "personnel_type": "PILOT"},
+    ).json()
+    assert pilots == {"results": [{"id": pilot.pk, "label": str(pilot)}], "more": False}
+    Personnel.objects.filter(pk=pilot.pk).update(is_active=False)
+    pilots = client.get(
+        reverse("resource_autocomplete", args=["personnel"]), {"active": 1}
+    ).json()
+    assert [result["id"] for result in pilots["results"]] == [copilot.pk]
+
+    assert (
+        client.get(reverse("resource_autocomplete", args=["hangar"])).status_code == 404
+    )
+
+
+@pytest.mark.django_db
+def test_forms_render_only_selected_resources(
+    admin_client, runway, gate, gate_2, aircraft, pilot
+):
+    constraint = ResourceConstraint.objects.create(
+        name="Pista sin puerta 2",
+        constraint_type="MUTUAL_EXCLUSION",
+        primary_resource_type="runway",
+        primary_resource_id=runway.id,
+        related_resource_type="gate",
+        related_resource_id=gate_2.id,
+    )
+    html = str(ResourceConstraintForm(instance=constraint))
+    assert str(gate_2) in html
+    assert str(gate) not in html
+    assert 'data-autocomplete-url="/recursos/gate/buscar/"' in html
+    assert "autocomplete.js" in str(ResourceConstraintForm().media)
+
+    form = FindSlotForm()
+    assert str(runway) not in str(form["runway"])
+    assert "personnel_type=PILOT" in str(form["pilot"])
+    # Cualquier recurso asignable sigue siendo válido aunque no se haya renderizado
+    form = FindSlotForm(
+        data={
+            "runway": runway.pk,
+            "gate": gate.pk,
+            "aircraft": aircraft.pk,
+            "pilot": pilot.pk,
+            "duration_hours": 2,
+        }
+    )
+    assert form.is_valid(), form.errors
+
+    for url in [
+        reverse("admin:airline_app_flight_add"),
+        reverse("admin:airline_app_resourceconstraint_change", args=[constraint.pk]),
+    ]:
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert str(gate) not in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_prefix_search_uses_the_upper_indexes(gate, pilot):
+    assert search_resources("gate", gate.gate_code.lower()) == ([gate], False)
+    assert search_resources("gate", gate.gate_code + "%") == ([], False)
+    if connection.vendor != "sqlite":
+        return
+
+    sql, params = Personnel.objects.filter(
+        prefix_filter("last_name", "pér", "sqlite")
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = " ".join(str(row) for row in cursor.fetchall())
+    assert "USING INDEX personnel_last_upper_idx" in plan
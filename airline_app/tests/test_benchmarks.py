@@ -0,0 +1,49 @@
+import os
+import warnings
+
+import pytest
+from django.conf import settings
+
+from airline_app import benchmarks
+from airline_app.models import Flight
+
+BASELINE_PATH = os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json")
+
+
+@pytest.mark.django_db
+def test_seed_schedule_is_conflict_free():
+    benchmarks.seed_schedule(50)
+
+    assert Flight.objects.count() == 50
+    for flight in Flight.objects.all()[:10]:
+        assert flight.runway.is_available(
+            flight.departure_time, flight.arrival_time, flight.id
+        )
+        assert flight.aircraft.is_available(
+            flight.departure_time, flight.arrival_time, flight.id
+        )
+
+
+def test_compare_reports_query_and_time_regressions():
+    baseline = {"results": {"1000": {"op": {"wall_ms": 10, "queries": 2}}}}
+    results = {"results": {"1000": {"op": {"wall_ms": 20, "queries": 3}}}}
+
+    regressions = benchmarks.compare(results, baseline, tolerance=0.25)
+
+    assert {r["metric"] for r in regressions} == {"wall_ms", "queries"}
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmarks_against_baseline(tmp_path):
+    sizes = [int(s) for s in os.environ.get("BENCHMARK_SIZES", "1000").split(",")]
+    results = benchmarks.run_benchmarks(sizes, repeat=3)
+    benchmarks.save_results(results, tmp_path / "results.json")
+
+    regressions = benchmarks.compare(results, benchmarks.load_results(BASELINE_PATH))
+    for r in regressions:
+        if r["metric"] == "wall_ms":
+            warnings.warn(f"Regresión de tiempo: {r}")
+
+    # Las consultas son deterministas; el tiempo depende de la máquina.
+    assert [r for r in regressions if r["metric"] == "queries"] == []
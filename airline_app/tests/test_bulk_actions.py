@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.bulk_actions import BulkActionError, set_status, shift_flights
+from airline_app.models import Aircraft, Flight
+
+
+@pytest.fixture()
+def departure():
+    departure = timezone.localtime().replace(second=0, microsecond=0)
+    return departure + timedelta(days=1)
+
+
+@pytest.fixture()
+def back_to_back(make_flight, departure, copilot):
+    """Dos vuelos seguidos en la misma pista y puerta; el segundo con otra aeronave."""
+    other = Aircraft.objects.create(
+        registration_number="CU-T2002",
+        model="ATR 72",
+        manufacturer="ATR",
+        capacity=70,
+        year_manufactured=2015,
+        status="OPERATIONAL",
+    )
+    first = make_flight(departure, "BK100", copilots=[copilot])
+    second = make_flight(
+        departure + timedelta(hours=2),
+        "BK200",
+        copilots=[copilot],
+        destination="Cancun",
+        aircraft=other,
+    )
+    return first, second
+
+
+@pytest.mark.django_db
+def test_shift_validates_selection_as_a_whole(back_to_back, count_queries):
+    first, second = back_to_back
+
+    # Retrasar solo el primero lo superpone con el segundo: no se aplica nada
+    with pytest.raises(BulkActionError) as excinfo:
+        shift_flights([first.pk], 60)
+    assert [(r.flight_number, r.code) for r in excinfo.value.rejections] == [
+        ("BK100", "runway_conflict")
+    ]
+    first.refresh_from_db()
+    assert first.version == 1
+
+    # Juntos no chocan, aunque el primero pase al horario viejo del segundo
+    assert shift_flights([first.pk, second.pk], 60) == 2
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert second.departure_time - first.departure_time == timedelta(hours=2)
+    assert (first.version, second.version) == (2, 2)
+
+    # Adelantarlos al pasado se rechaza
+    with pytest.raises(BulkActionError) as excinfo:
+        shift_flights([first.pk, second.pk], -3 * 24 * 60)
+    assert {r.code for r in excinfo.value.rejections} == {"invalid_departure_time"}
+
+    assert count_queries(shift_flights, [first.pk], -10) == count_queries(
+        shift_flights, [first.pk, second.pk], -10
+    )
+
+
+@pytest.mark.django_db
+def test_status_transitions_follow_times(back_to_back):
+    first, second = back_to_back
+    past = timezone.now() - timedelta(hours=3)
+    Flight.objects.filter(pk=first.pk).update(
+        departure_time=past, arrival_time=past + timedelta(hours=2)
+    )
+
+    with pytest.raises(BulkActionError) as excinfo:
+        set_status([first.pk, second.pk], "COMPLETED")
+    assert [(r.flight_number, r.code) for r in excinfo.value.rejections] == [
+        ("BK200", "invalid_arrival_time")
+    ]
+    assert set_status([first.pk], "COMPLETED") == 1
+
+    with pytest.raises(BulkActionError) as excinfo:
+        set_status([first.pk], "CANCELLED")
+    assert excinfo.value.rejections[0].code == "invalid_status"
+    assert set_status([second.pk], "CANCELLED") == 1
+    assert dict(Flight.objects.values_list("flight_number", "status")) == {
+        "BK100": "COMPLETED",
+        "BK200": "CANCELLED",
+    }
+
+
+@pytest.mark.django_db
+def test_admin_actions_and_command(admin_client, back_to_back):
+    first, second = back_to_back
+    url = reverse("admin:airline_app_flight_changelist")
+
+    response = admin_client.post(
+        url,
+        {
+            "action": "shift_selected",
+            "minutes": "30",
+            "_selected_action": [first.pk, second.pk],
+        },
+        follow=True,
+    )
+    assert "2 vuelo(s) desplazado(s) 30 minuto(s)." in response.content.decode()
+    response = admin_client.post(
+        url,
+        {"action": "shift_selected", "minutes": "45", "_selected_action": [first.pk]},
+        follow=True,
+    )
+    assert "No se aplicó ningún cambio" in response.content.decode()
+
+    call_command("bulk_flights", "cancel", numbers="BK100,BK200", dry_run=True)
+    assert not Flight.objects.filter(status="CANCELLED").exists()
+    call_command("bulk_flights", "cancel", ids=f"{first.pk},{second.pk}")
+    assert Flight.objects.filter(status="CANCELLED").count() == 2
+    with pytest.raises(CommandError):
+        call_command("bulk_flights", "shift", ids=str(first.pk), minutes=30)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.models import Gate, ResourceConstraint
+
+
+@pytest.fixture()
+def departure(make_flight):
+    departure = timezone.localtime().replace(second=0, microsecond=0)
+    departure += timedelta(days=1)
+    make_flight(departure, "AL100")
+    return departure
+
+
+@pytest.mark.django_db
+def test_conflicts_suggest_free_resources_allowed_by_constraints(
+    make_flight, departure, runway, gate, gate_2, aircraft, pilot, count_queries
+):
+    gate_3 = Gate.objects.create(name="Gate 3", gate_code="G3", terminal="T1")
+    gate_4 = Gate.objects.create(name="Gate 4", gate_code="G4", terminal="T1")
+    ResourceConstraint.objects.create(
+        name="Pista sin puerta 3",
+        constraint_type="MUTUAL_EXCLUSION",
+        primary_resource_type="runway",
+        primary_resource_id=runway.id,
+        related_resource_type="gate",
+        related_resource_id=gate_3.id,
+    )
+
+    flight = make_flight(departure, "AL200", save=False)
+    with pytest.raises(ValidationError) as excinfo:
+        flight.full_clean()
+    errors = excinfo.value.error_dict
+    gate_error = errors["gate"][0]
+    assert gate_error.code == "gate_conflict"
+    assert gate_error.params["alternatives"] == [gate_2, gate_4]
+    # No hay otra pista, aeronave ni piloto libre
+    for field in ["runway", "aircraft", "pilot"]:
+        assert errors[field][0].params == {"alternatives": []}
+
+    # Una consulta por tipo de recurso, el índice de restricciones y los patrones recurrentes
+    assert count_queries(flight.suggest_alternatives, ["runway", "gate"]) == 4
+
+
+@pytest.mark.django_db
+def test_flight_form_renders_alternatives_as_picks(
+    client, departure, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    response = client.post(
+        reverse("flight_create"),
+        {
+            "flight_number": "AL200",
+            "origin": "Havana",
+            "destination": "Miami",
+            "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+            "arrival_time": f"{departure + timedelta(hours=2):%Y-%m-%dT%H:%M}",
+            "status": "SCHEDULED",
+            "runway": runway.id,
+            "gate": gate.id,
+            "aircraft": aircraft.id,
+            "pilot": pilot.id,
+            "copilots": [copilot.id],
+        },
+    )
+
+    assert response.status_code == 200
+    form = response.context["form"]
+    assert [(field.name, alts) for field, alts in form.conflict_alternatives()] == [
+        ("gate", [gate_2])
+    ]
+    content = response.content.decode()
+    assert 'data-alternative-for="id_gate"' in content
+    assert f'data-alternative-value="{gate_2.pk}"' in content
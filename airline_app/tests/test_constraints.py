@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.constraints import ConstraintIndex, flight_resources, violating_flights
+from airline_app.generator import generate_schedule
+from airline_app.models import Flight, ResourceConstraint
+
+
+@pytest.mark.django_db
+def test_violating_flights_matches_in_memory_index_with_one_query(count_queries):
+    generate_schedule(400, seed=9)
+    flight = Flight.objects.filter(status="SCHEDULED").first()
+    rules = [
+        ResourceConstraint(
+            name="Pista requiere otra puerta",
+            constraint_type="CO_REQUISITE",
+            primary_resource_type="runway",
+            primary_resource_id=flight.runway_id,
+            related_resource_type="gate",
+            related_resource_id=flight.gate_id + 1,
+        ),
+        ResourceConstraint(
+            name="Piloto sin esta aeronave",
+            constraint_type="MUTUAL_EXCLUSION",
+            primary_resource_type="personnel",
+            primary_resource_id=flight.pilot_id,
+            related_resource_type="aircraft",
+            related_resource_id=flight.aircraft_id,
+        ),
+    ]
+    scheduled = Flight.objects.filter(status="SCHEDULED").values_list(
+        "id", "runway_id", "gate_id", "aircraft_id", "pilot_id"
+    )
+
+    for rule in rules:
+        index = ConstraintIndex()
+        index.add(rule)
+        expected = {
+            row[0]
+            for row in scheduled
+            if not index.is_valid(flight_resources(*row[1:]))
+        }
+        found = []
+        queries = count_queries(
+            lambda: found.extend(violating_flights(rule).values_list("id", flat=True))
+        )
+
+        assert queries == 1
+        assert flight.id in expected
+        assert set(found) == expected
+
+
+@pytest.mark.django_db
+def test_constraint_create_previews_violations_before_saving(
+    client, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    dep = timezone.now() + timezone.timedelta(days=1)
+    flight = Flight.objects.create(
+        flight_number="CV100",
+        origin="Havana",
+        destination="Miami",
+        departure_time=dep,
+        arrival_time=dep + timezone.timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    payload = {
+        "name": "Pista requiere puerta 2",
+        "constraint_type": "CO_REQUISITE",
+        "description": "Prueba",
+        "primary_resource_type": "runway",
+        "primary_runway": runway.id,
+        "related_resource_type": "gate",
+        "related_gate": gate_2.id,
+        "is_active": "on",
+    }
+
+    resp = client.post(reverse("constraint_create"), data=payload)
+
+    assert resp.status_code == 200
+    assert [f.id for f in resp.context["violating_flights"]] == [flight.id]
+    assert not ResourceConstraint.objects.exists()
+
+    key = resp.context["violation_key"]
+
+    # La confirmación no vale para otra regla: se revisa de nuevo
+    changed = {
+        **payload,
+        "constraint_type": "MUTUAL_EXCLUSION",
+        "related_gate": gate.id,
+        "confirm_violations": key,
+    }
+    resp = client.post(reverse("constraint_create"), data=changed)
+
+    assert resp.status_code == 200
+    assert [f.id for f in resp.context["violating_flights"]] == [flight.id]
+    assert resp.context["violation_key"] != key
+    assert not ResourceConstraint.objects.exists()
+
+    resp = client.post(
+        reverse("constraint_create"), data={**payload, "confirm_violations": key}
+    )
+
+    assert resp.status_code == 302
+    assert ResourceConstraint.objects.count() == 1
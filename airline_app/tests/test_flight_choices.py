@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.forms import FlightForm
+from airline_app.models import Flight
+
+
+@pytest.fixture()
+def busy_window(runway, gate, aircraft, pilot, copilot):
+    cache.clear()
+    departure = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+    departure += timedelta(days=1)
+    flight = Flight(
+        flight_number="CH100",
+        origin="Havana",
+        destination="Miami",
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    flight.save()
+    flight.copilots.add(copilot)
+    return departure, departure + timedelta(hours=2)
+
+
+@pytest.mark.django_db
+def test_choices_endpoint_returns_free_resources_and_caches_window(
+    client, busy_window, gate_2, copilot, count_queries
+):
+    departure, arrival = busy_window
+    url = reverse("flight_resource_choices")
+    params = {
+        "departure_time": f"{departure + timedelta(minutes=5):%Y-%m-%dT%H:%M}",
+        "arrival_time": f"{arrival:%Y-%m-%dT%H:%M}",
+    }
+
+    data = client.get(url, params).json()
+    assert data == {
+        "runway": [],
+        "gate": [{"id": gate_2.pk, "label": str(gate_2)}],
+        "aircraft": [],
+        "pilot": [],
+        "copilots": [],
+    }
+    # La misma ventana sale de la caché
+    assert count_queries(client.get, url, params) == 0
+
+    # Al editar el vuelo, sus propios recursos están libres
+    flight = Flight.objects.get(flight_number="CH100")
+    data = client.get(url, {**params, "flight": flight.pk}).json()
+    assert data["copilots"] == [{"id": copilot.pk, "label": str(copilot)}]
+
+    response = client.get(url, {**params, "arrival_time": params["departure_time"]})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_choices_endpoint_offers_resources_freed_inside_the_minute(
+    client, runway, gate, aircraft, pilot
+):
+    cache.clear()
+    departure = timezone.localtime().replace(minute=5, second=0, microsecond=0)
+    departure += timedelta(days=1)
+    Flight.objects.create(
+        flight_number="CH200",
+        origin="Havana",
+        destination="Miami",
+        departure_time=departure - timedelta(hours=2),
+        arrival_time=departure,
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+
+    # La pista queda libre justo a las HH:05: no debe ocultarse por redondeos
+    data = client.get(
+        reverse("flight_resource_choices"),
+        {
+            "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+            "arrival_time": f"{departure + timedelta(hours=2):%Y-%m-%dT%H:%M}",
+        },
+    ).json()
+
+    assert data["runway"] == [{"id": runway.pk, "label": str(runway)}]
+    assert data["pilot"] == [{"id": pilot.pk, "label": str(pilot)}]
+    assert data["aircraft"] == []
+
+
+@pytest.mark.django_db
+def test_flight_form_renders_only_free_or_selected_resources(
+    busy_window, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    departure, arrival = busy_window
+
+    # Sin ventana no hay opciones que ofrecer (las carga main.js)
+    form = FlightForm()
+    assert [value for value, label in form.fields["gate"].widget.choices] == [""]
+
+    form = FlightForm(
+        initial={
+            "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+            "arrival_time": f"{arrival:%Y-%m-%dT%H:%M}",
+            "runway": runway.pk,
+        }
+    )
+    gates = [value for value, label in form.fields["gate"].widget.choices]
+    assert gates == ["", gate_2.pk]
+    runways = [value for value, label in form.fields["runway"].widget.choices]
+    assert runways == ["", runway.pk]
+
+    # La validación sigue aceptando cualquier recurso: el conflicto lo reporta Flight.clean
+    form = FlightForm(
+        data={
+            "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+            "arrival_time": f"{arrival:%Y-%m-%dT%H:%M}",
+            "flight_number": "CH200",
+            "origin": "Havana",
+            "destination": "Miami",
+            "status": "SCHEDULED",
+            "runway": runway.pk,
+            "gate": gate.pk,
+            "aircraft": aircraft.pk,
+            "pilot": pilot.pk,
+            "copilots": [copilot.pk],
+        }
+    )
+    assert not form.is_valid()
+    assert form.errors.as_data()["gate"][0].code == "gate_conflict"
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.admin import FlightAdmin
+from airline_app.models import Flight, StaleFlightError
+from airline_app.outages import apply_outage, plan_outage
+
+
+@pytest.fixture()
+def flight(make_flight, copilot):
+    departure = timezone.localtime().replace(second=0, microsecond=0)
+    return make_flight(departure + timedelta(days=1), "AV100", copilots=[copilot])
+
+
+def _payload(flight, copilot, **changes):
+    return {
+        "flight_number": flight.flight_number,
+        "origin": flight.origin,
+        "destination": flight.destination,
+        "departure_time": timezone.localtime(flight.departure_time).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "arrival_time": timezone.localtime(flight.arrival_time).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "status": flight.status,
+        "runway": flight.runway_id,
+        "gate": flight.gate_id,
+        "aircraft": flight.aircraft_id,
+        "pilot": flight.pilot_id,
+        "copilots": [copilot.id],
+        "version": flight.version,
+        **changes,
+    }
+
+
+@pytest.mark.django_db
+def test_concurrent_saves_raise_stale_error_with_diff(flight):
+    assert flight.version == 1
+    first = Flight.objects.get(pk=flight.pk)
+    second = Flight.objects.get(pk=flight.pk)
+
+    first.destination = "Cancun"
+    first.save()
+    assert first.version == 2
+
+    second.status = "DELAYED"
+    with pytest.raises(StaleFlightError) as excinfo:
+        second.save()
+    assert second.version == 1
+    changes = {label: (current, mine) for label, current, mine in excinfo.value.changes}
+    assert changes["Destino"] == ("Cancun", "Miami")
+    assert changes["Estado"] == ("Programado", "Retrasado")
+    assert Flight.objects.get(pk=flight.pk).destination == "Cancun"
+
+
+@pytest.mark.django_db
+def test_update_view_reports_conflict_and_allows_overwrite(client, flight, copilot):
+    url = reverse("flight_update", kwargs={"pk": flight.pk})
+    assert client.get(url).context["form"]["version"].value() == 1
+
+    assert (
+        client.post(url, _payload(flight, copilot, origin="Varadero")).status_code
+        == 302
+    )
+
+    # Segundo despachador con la versión que cargó antes del guardado anterior
+    response = client.post(url, _payload(flight, copilot, destination="Madrid"))
+    assert response.status_code == 200
+    error = response.context["form"].non_field_errors()[0]
+    assert "Otro usuario modificó este vuelo" in error
+    assert "Origen: Varadero (suyo: Havana)" in error
+    assert Flight.objects.get(pk=flight.pk).destination == "Miami"
+
+    # El formulario ya tiene la versión guardada: volver a enviar sobrescribe a propósito
+    data = response.context["form"].data
+    assert data["version"] == 2
+    assert client.post(url, data).status_code == 302
+    flight.refresh_from_db()
+    assert (flight.origin, flight.destination, flight.version) == (
+        "Havana",
+        "Madrid",
+        3,
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_reassignment_bumps_version(flight, gate, gate_2):
+    plan = plan_outage(
+        "gate",
+        gate.id,
+        flight.departure_time - timedelta(hours=1),
+        flight.arrival_time + timedelta(hours=1),
+    )
+
+    assert apply_outage(plan) == 1
+    flight.destination = "Cancun"
+    with pytest.raises(StaleFlightError):
+        flight.save()
+
+
+@pytest.mark.django_db
+def test_admin_change_form_carries_version(admin_client, flight):
+    response = admin_client.get(
+        reverse("admin:airline_app_flight_change", args=[flight.pk])
+    )
+    assert response.status_code == 200
+    assert response.context["adminform"].form["version"].value() == 1
+
+
+@pytest.mark.django_db
+def test_admin_save_race_reports_conflict(admin_client, monkeypatch, flight, copilot):
+    raced = []
+
+    def other_user_saves():
+        Flight.objects.filter(pk=flight.pk).update(destination="Cancun", version=2)
+
+    # Otro usuario guarda entre la validación del formulario y el guardado. Su cambio
+    # queda confirmado aunque la transacción de la vista admin se revierta.
+    save_version = Flight._save_version
+    get_object = FlightAdmin.get_object
+
+    def racing_save(self, *args, **kwargs):
+        other_user_saves()
+        raced.append(self.pk)
+        return save_version(self, *args, **kwargs)
+
+    def committed_get_object(self, *args, **kwargs):
+        if raced:
+            other_user_saves()
+        return get_object(self, *args, **kwargs)
+
+    monkeypatch.setattr(Flight, "_save_version", racing_save)
+    monkeypatch.setattr(FlightAdmin, "get_object", committed_get_object)
+    payload = _payload(flight, copilot, status="DELAYED")
+    for name in ["departure_time", "arrival_time"]:
+        payload[f"{name}_0"], payload[f"{name}_1"] = payload.pop(name).split("T")
+    response = admin_client.post(
+        reverse("admin:airline_app_flight_change", args=[flight.pk]), payload
+    )
+
+    assert response.status_code == 200
+    form = response.context["adminform"].form
+    assert isinstance(form.non_field_errors().as_data()[0], StaleFlightError)
+    assert form["version"].value() == 2
+    flight.refresh_from_db()
+    assert (flight.destination, flight.status) == ("Cancun", "SCHEDULED")
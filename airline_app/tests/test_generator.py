@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+
+from airline_app.generator import generate_schedule, max_concurrency
+from airline_app.models import Flight, ResourceConstraint
+
+
+def _schedule_signature():
+    return list(
+        Flight.objects.order_by("flight_number").values_list(
+            "flight_number",
+            "departure_time",
+            "arrival_time",
+            "runway__runway_code",
+            "aircraft__registration_number",
+        )
+    )
+
+
+def test_max_concurrency_counts_touching_intervals_once():
+    assert max_concurrency([(0, 10), (10, 20), (5, 15)]) == 2
+    assert max_concurrency([(0, 10), (0, 10)], weights=[2, 3]) == 5
+
+
+@pytest.mark.django_db
+def test_generated_schedule_is_conflict_free_and_respects_constraints():
+    summary = generate_schedule(300, seed=7, constraints=10, long_haul_share=0.3)
+
+    assert summary["flights"] + summary["dropped"] == 300
+    assert ResourceConstraint.objects.count() == 10
+
+    for flight in Flight.objects.prefetch_related("copilots")[:40]:
+        flight.full_clean(exclude=["departure_time", "arrival_time"])
+        flight.validate_copilots()
+
+
+@pytest.mark.django_db
+def test_generate_schedule_is_deterministic_from_seed():
+    generate_schedule(100, seed=3)
+    first = _schedule_signature()
+
+    Flight.objects.all().delete()
+    call_command("flush", "--noinput")
+    generate_schedule(100, seed=3)
+
+    assert _schedule_signature() == first
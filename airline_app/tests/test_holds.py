@@ -0,0 +1,178 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ValidationError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.availability import available_resources
+from airline_app.forms import FindSlotForm
+from airline_app.holds import HoldConflictError, place_hold, sweep_expired_holds
+from airline_app.models import Flight, SlotHold
+
+
+@pytest.mark.django_db
+def test_active_holds_block_everyone_but_the_holder(
+    make_flight, runway, gate, gate_2, aircraft, pilot
+):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    end = start + timedelta(hours=2)
+    place_hold("alice", runway.id, gate.id, aircraft.id, pilot.id, start, end)
+
+    with pytest.raises(ValidationError) as excinfo:
+        make_flight(start, "HD100", holder="bob", save=False).full_clean()
+    assert {"runway", "gate", "aircraft", "pilot"} <= set(excinfo.value.error_dict)
+    make_flight(start, "HD100", holder="alice", save=False).full_clean()
+
+    assert list(available_resources("gate", start, end, holder="bob")) == [gate_2]
+    assert list(available_resources("gate", start, end, holder="alice")) == [
+        gate,
+        gate_2,
+    ]
+    # La aeronave reservada también bloquea su mantenimiento de 24 horas
+    later = end + timedelta(hours=12)
+    assert not available_resources(
+        "aircraft", later, later + timedelta(hours=1), holder="bob"
+    ).exists()
+
+    args = (runway.id, gate.id, aircraft.id, pilot.id, 2)
+    assert Flight.find_next_available_slot(*args, start, holder="alice") == {
+        "departure_time": start,
+        "arrival_time": end,
+    }
+    slot = Flight.find_next_available_slot(*args, start, holder="bob")
+    assert slot["departure_time"] >= end + timedelta(hours=24)
+    slot = async_to_sync(Flight.afind_next_available_slot)(*args, start, holder="bob")
+    assert slot["departure_time"] >= end + timedelta(hours=24)
+
+
+@pytest.mark.django_db
+def test_expired_holds_stop_blocking_and_are_swept(
+    make_flight, runway, gate, aircraft, pilot
+):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    expired = place_hold(
+        "alice",
+        runway.id,
+        gate.id,
+        aircraft.id,
+        pilot.id,
+        start,
+        start + timedelta(hours=2),
+        now=timezone.now() - timedelta(hours=1),
+    )
+    assert not expired.is_active
+    make_flight(start, "HD100", holder="bob", save=False).full_clean()
+
+    # Una nueva reserva barre las vencidas y reemplaza las anteriores del titular
+    place_hold("bob", runway.id, gate.id, aircraft.id, pilot.id, start, start)
+    place_hold("bob", runway.id, gate.id, aircraft.id, pilot.id, start, start)
+    assert list(SlotHold.objects.values_list("holder", flat=True)) == ["bob"]
+
+    SlotHold.objects.update(expires_at=timezone.now())
+    assert sweep_expired_holds() == 1
+    assert not SlotHold.objects.exists()
+
+
+@pytest.mark.django_db
+def test_find_slot_hold_reserves_slot_for_the_session(
+    client, runway, gate, aircraft, pilot, copilot
+):
+    response = client.post(
+        reverse("find_slot"),
+        {
+            "runway": runway.id,
+            "gate": gate.id,
+            "aircraft": aircraft.id,
+            "pilot": pilot.id,
+            "duration_hours": 2,
+            "hold_slot": "on",
+        },
+    )
+    hold = response.context["hold"]
+    assert hold.holder == client.session.session_key
+    assert hold.start_time == response.context["result"]["departure_time"]
+
+    departure = timezone.localtime(hold.start_time)
+    create = reverse("flight_create")
+    initial = (
+        client.get(
+            create,
+            {
+                "runway": runway.id,
+                "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+            },
+        )
+        .context["form"]
+        .initial
+    )
+    assert initial["departure_time"] == f"{departure:%Y-%m-%dT%H:%M}"
+
+    data = {
+        "flight_number": "HD200",
+        "origin": "Havana",
+        "destination": "Miami",
+        "departure_time": f"{departure:%Y-%m-%dT%H:%M}",
+        "arrival_time": f"{departure + timedelta(hours=2):%Y-%m-%dT%H:%M}",
+        "status": "SCHEDULED",
+        "runway": runway.id,
+        "gate": gate.id,
+        "aircraft": aircraft.id,
+        "pilot": pilot.id,
+        "copilots": [copilot.id],
+    }
+    # Otro usuario no puede tomar el horario reservado
+    response = Client().post(create, {**data, "flight_number": "HD300"})
+    assert response.status_code == 200
+    assert "reservado temporalmente" in str(response.context["form"].errors)
+
+    response = client.post(create, data)
+    assert response.status_code == 302
+    assert Flight.objects.filter(flight_number="HD200").exists()
+    assert not SlotHold.objects.exists()
+
+
+@pytest.mark.django_db
+def test_hold_is_refused_when_the_slot_was_taken(
+    make_flight, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    end = start + timedelta(hours=2)
+    place_hold("alice", runway.id, gate.id, aircraft.id, pilot.id, start, end)
+
+    # Otra búsqueda encontró el mismo horario: no puede reservarlo también
+    with pytest.raises(HoldConflictError) as excinfo:
+        place_hold("bob", runway.id, gate.id, aircraft.id, pilot.id, start, end)
+    assert excinfo.value.resource_types == ["runway", "gate", "aircraft", "personnel"]
+    assert list(SlotHold.objects.values_list("holder", flat=True)) == ["alice"]
+
+    # Ni un horario que ya ocupa un vuelo guardado
+    later = start + timedelta(days=3)
+    make_flight(later, "HD100", gate=gate_2, holder="alice")
+    with pytest.raises(HoldConflictError) as excinfo:
+        place_hold(
+            "bob",
+            runway.id,
+            gate.id,
+            aircraft.id,
+            pilot.id,
+            later,
+            later + timedelta(hours=1),
+        )
+    assert excinfo.value.resource_types == ["runway", "aircraft", "personnel"]
+
+    form = FindSlotForm(
+        {
+            "runway": runway.id,
+            "gate": gate.id,
+            "aircraft": aircraft.id,
+            "pilot": pilot.id,
+            "duration_hours": 2,
+            "hold_slot": "on",
+            "run_in_background": "on",
+        }
+    )
+    assert not form.is_valid()
+    assert "segundo plano" in str(form.non_field_errors())
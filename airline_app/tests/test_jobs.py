@@ -0,0 +1,216 @@
+from datetime import time, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app import jobs
+from airline_app.jobs import claim_next, enqueue, fail_stale_jobs, work
+from airline_app.models import Flight, Job, RecurringFlight
+
+
+@pytest.mark.django_db
+def test_worker_runs_find_slot_job_and_stores_result(runway, gate, aircraft, pilot):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    args = (runway.id, gate.id, aircraft.id, pilot.id, 2.0)
+    job = enqueue(
+        "find_slot",
+        runway_id=runway.id,
+        gate_id=gate.id,
+        aircraft_id=aircraft.id,
+        pilot_id=pilot.id,
+        duration_hours=2.0,
+        start_search_from=start.isoformat(),
+    )
+
+    assert work(burst=True) == 1
+
+    job.refresh_from_db()
+    expected = Flight.find_next_available_slot(*args, start_search_from=start)
+    assert job.status == "SUCCEEDED"
+    assert job.progress == 100
+    assert job.result == {key: value.isoformat() for key, value in expected.items()}
+    assert job.worker and job.finished_at >= job.started_at
+
+
+@pytest.mark.django_db
+def test_failing_job_stores_error(monkeypatch):
+    def broken(job):
+        raise ValueError("falla de prueba")
+
+    monkeypatch.setitem(jobs.JOB_TYPES, "broken", (broken, "Roto"))
+    job = enqueue("broken")
+    ok = enqueue("update_rollups")
+
+    # El fallo de un trabajo no detiene al worker
+    assert work(burst=True) == 2
+
+    job.refresh_from_db()
+    ok.refresh_from_db()
+    assert job.status == "FAILED"
+    assert "falla de prueba" in job.error
+    assert ok.status == "SUCCEEDED"
+    with pytest.raises(jobs.UnknownJobType):
+        enqueue("inexistente")
+
+
+@pytest.mark.django_db
+def test_claim_is_exclusive_and_stale_jobs_fail():
+    first = enqueue("update_rollups")
+    second = enqueue("update_rollups")
+
+    assert claim_next("w1").pk == first.pk
+    assert claim_next("w2").pk == second.pk
+    assert claim_next("w3") is None
+
+    Job.objects.filter(pk=first.pk).update(
+        updated_at=timezone.now() - timedelta(hours=2)
+    )
+    assert fail_stale_jobs(timedelta(hours=1)) == 1
+    assert Job.objects.get(pk=first.pk).status == "FAILED"
+    assert Job.objects.get(pk=second.pk).status == "RUNNING"
+
+
+@pytest.mark.django_db
+def test_find_slot_in_background_redirects_to_job(
+    client, runway, gate, aircraft, pilot
+):
+    response = async_to_sync(AsyncClient().post)(
+        reverse("find_slot"),
+        {
+            "runway": runway.id,
+            "gate": gate.id,
+            "aircraft": aircraft.id,
+            "pilot": pilot.id,
+            "duration_hours": 2,
+            "run_in_background": "on",
+        },
+    )
+    job = Job.objects.get()
+    assert response.status_code == 302
+    assert response.url == reverse("job_detail", kwargs={"pk": job.pk})
+    assert job.kind == "find_slot" and job.status == "PENDING"
+    # Las reservas temporales de quien pidió la búsqueda no la bloquean
+    assert "holder" in job.params
+
+    work(burst=True)
+    data = client.get(reverse("job_status", kwargs={"pk": job.pk})).json()
+    assert data["status"] == "SUCCEEDED" and data["finished"]
+    assert data["result"]["departure_time"]
+    assert client.get(reverse("job_detail", kwargs={"pk": job.pk})).status_code == 200
+
+
+@pytest.mark.django_db
+def test_result_does_not_overwrite_a_job_failed_as_stale(monkeypatch):
+    def slow(job):
+        # Mientras corre, otro worker lo da por perdido
+        Job.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(hours=2)
+        )
+        fail_stale_jobs(timedelta(hours=1))
+        return {"ok": True}
+
+    monkeypatch.setitem(jobs.JOB_TYPES, "slow", (slow, "Lento"))
+    job = enqueue("slow")
+
+    assert work(burst=True) == 1
+
+    job.refresh_from_db()
+    assert job.status == "FAILED"
+    assert job.result is None
+
+
+@pytest.mark.django_db
+def test_slot_search_reports_progress_per_day(runway, gate, aircraft, pilot):
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    # El horario está ocupado durante tres días (insertado sin validar)
+    Flight.objects.bulk_create(
+        [
+            Flight(
+                flight_number="PJ100",
+                origin="Havana",
+                destination="Miami",
+                departure_time=start,
+                arrival_time=start + timedelta(days=3),
+                runway=runway,
+                gate=gate,
+                aircraft=aircraft,
+                pilot=pilot,
+            )
+        ]
+    )
+    reports = []
+    slot = Flight.find_next_available_slot(
+        runway.id,
+        gate.id,
+        aircraft.id,
+        pilot.id,
+        2.0,
+        start_search_from=start,
+        progress=lambda done, total, message: reports.append((done, total)),
+    )
+
+    assert slot["departure_time"] >= start + timedelta(days=3)
+    assert reports[:3] == [(0, 30), (1, 30), (2, 30)]
+
+
+@pytest.mark.django_db
+def test_long_jobs_heartbeat_from_inside_their_loops(
+    monkeypatch, runway, gate, aircraft, pilot, copilot
+):
+    # Sin límite de frecuencia, cada llamada al avance es un latido
+    beats = []
+
+    def unthrottled(job):
+        def report(done, total=100, message=""):
+            beats.append(job.kind)
+            job.report_progress(done, total, message)
+
+        return report
+
+    monkeypatch.setattr(jobs, "throttled_progress", unthrottled)
+    departure = timezone.now() - timedelta(days=2)
+    Flight.objects.bulk_create(
+        [
+            Flight(
+                flight_number="HB100",
+                origin="Havana",
+                destination="Miami",
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=2),
+                runway=runway,
+                gate=gate,
+                aircraft=aircraft,
+                pilot=pilot,
+            )
+        ]
+    )
+    pattern = RecurringFlight.objects.create(
+        flight_number="HB200",
+        origin="Havana",
+        destination="Miami",
+        weekdays="1234567",
+        departure_time=time(10, 0),
+        duration_minutes=120,
+        start_date=timezone.localdate() + timedelta(days=1),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    pattern.copilots.add(copilot)
+    kinds = [
+        "audit_schedule",
+        "update_rollups",
+        "materialize_recurring",
+        "advance_statuses",
+    ]
+    for kind in kinds:
+        enqueue(kind)
+
+    assert work(burst=True) == len(kinds)
+
+    assert set(beats) == set(kinds)
+    assert set(Job.objects.values_list("status", flat=True)) == {"SUCCEEDED"}
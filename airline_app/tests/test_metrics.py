@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app import metrics
+from airline_app.models import Flight
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_exposes_view_histograms(client):
+    client.get(reverse("home"))
+    resp = client.get(reverse("metrics"))
+
+    assert resp.status_code == 200
+    body = resp.content.decode()
+    assert "# TYPE airline_http_request_duration_seconds histogram" in body
+    assert (
+        'airline_http_requests_total{method="GET",status="200",view="home"} 1' in body
+    )
+    assert (
+        'airline_http_request_duration_seconds_count{method="GET",view="home"} 1'
+        in body
+    )
+
+
+@pytest.mark.django_db
+def test_is_available_is_labelled_by_resource_type_and_result(runway):
+    start = timezone.now() + timezone.timedelta(days=1)
+    runway.is_available(start, start + timezone.timedelta(hours=2))
+
+    body = metrics.registry.expose()
+    assert (
+        'airline_operation_duration_seconds_count{operation="is_available",'
+        'resource_type="runway",result="available"} 1'
+    ) in body
+
+
+@pytest.mark.django_db
+def test_find_next_available_slot_records_result(runway, gate, aircraft, pilot):
+    Flight.find_next_available_slot(runway.id, gate.id, aircraft.id, pilot.id, 2)
+
+    body = metrics.registry.expose()
+    assert 'operation="find_next_available_slot",result="found"' in body
+
+
+def test_metrics_dir_merges_other_processes(tmp_path, settings):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics.HTTP_REQUESTS.inc(view="home", method="GET", status=200)
+    dump = (
+        '{"airline_http_requests_total": '
+        '[[[["method", "GET"], ["status", "200"], ["view", "home"]], 2]]}'
+    )
+    (tmp_path / f"{os.getppid()}.json").write_text(dump)
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    (tmp_path / f"{finished.pid}.json").write_text(dump)
+
+    body = metrics.registry.expose()
+    assert (
+        'airline_http_requests_total{method="GET",status="200",view="home"} 3' in body
+    )
+    # El volcado del proceso terminado se descarta y se elimina
+    assert not (tmp_path / f"{finished.pid}.json").exists()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_rejects_remote_clients(client):
+    resp = client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.8")
+    assert resp.status_code == 403
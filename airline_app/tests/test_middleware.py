@@ -0,0 +1,36 @@
+import pytest
+from django.urls import reverse
+
+from airline_app.middleware import QueryBudgetExceeded
+
+
+@pytest.mark.django_db
+def test_server_timing_header_reports_queries(client, runway, gate):
+    resp = client.get(reverse("home"))
+
+    assert resp.status_code == 200
+    header = resp["Server-Timing"]
+    assert header.startswith("db;dur=")
+    assert "queries" in header
+    assert "total;dur=" in header
+
+
+@pytest.mark.django_db
+def test_query_budget_logs_when_exceeded(client, settings, caplog):
+    settings.QUERY_BUDGETS = {"home": 0}
+    settings.QUERY_BUDGET_ACTION = "log"
+
+    with caplog.at_level("WARNING", logger="airline_app.performance"):
+        resp = client.get(reverse("home"))
+
+    assert resp.status_code == 200
+    assert any("presupuesto: 0" in r.getMessage() for r in caplog.records)
+
+
+@pytest.mark.django_db
+def test_query_budget_raises_when_configured(client, settings):
+    settings.QUERY_BUDGETS = {"home": 0}
+    settings.QUERY_BUDGET_ACTION = "raise"
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse("home"))
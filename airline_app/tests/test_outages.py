@@ -0,0 +1,146 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.audit import audit_schedule
+from airline_app.generator import generate_schedule
+from airline_app.models import Flight, Gate, ResourceConstraint, SlotHold
+from airline_app.outages import OutageError, apply_outage, plan_outage
+
+
+@pytest.mark.django_db
+def test_gate_outage_reassigns_all_flights_in_bulk(count_queries):
+    summary = generate_schedule(600, seed=5, days=2, slack=3)
+    gate_id = (
+        Flight.objects.filter(status="SCHEDULED")
+        .values_list("gate_id", flat=True)
+        .first()
+    )
+    start = summary["start"]
+    affected = set(
+        Flight.objects.filter(gate_id=gate_id, status="SCHEDULED").values_list(
+            "id", flat=True
+        )
+    )
+
+    plans = []
+    planning_queries = count_queries(
+        lambda: plans.append(plan_outage("gate", gate_id, start))
+    )
+    plan = plans[0]
+    applying_queries = count_queries(apply_outage, plan)
+
+    assert planning_queries <= 9
+    assert applying_queries <= 9
+    assert {r.flight_id for r in plan.reassignments} == affected
+    assert not plan.stranded
+    assert not Flight.objects.filter(gate_id=gate_id, status="SCHEDULED").exists()
+    assert not audit_schedule().issues
+
+
+@pytest.mark.django_db
+def test_outage_respects_constraints_and_reports_stranded_flights(
+    runway, gate, gate_2, aircraft, pilot
+):
+    dep = timezone.now() + timezone.timedelta(days=1)
+    flight = Flight.objects.create(
+        flight_number="OT100",
+        origin="Havana",
+        destination="Miami",
+        departure_time=dep,
+        arrival_time=dep + timezone.timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    ResourceConstraint.objects.create(
+        name="Pista sin puerta 2",
+        constraint_type="MUTUAL_EXCLUSION",
+        description="",
+        primary_resource_type="runway",
+        primary_resource_id=runway.id,
+        related_resource_type="gate",
+        related_resource_id=gate_2.id,
+    )
+
+    plan = plan_outage("gate", gate.id, timezone.now())
+
+    assert plan.reassignments == []
+    assert [f[0] for f in plan.stranded] == [flight.id]
+
+
+@pytest.mark.django_db
+def test_outage_is_not_applied_over_a_replacement_taken_after_planning(
+    runway, gate, gate_2, aircraft, pilot
+):
+    dep = timezone.now() + timezone.timedelta(days=1)
+    flight = Flight.objects.create(
+        flight_number="OT150",
+        origin="Havana",
+        destination="Miami",
+        departure_time=dep,
+        arrival_time=dep + timezone.timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    plan = plan_outage("gate", gate.id, timezone.now())
+    assert [r.new_resource_id for r in plan.reassignments] == [gate_2.id]
+
+    # Otro usuario reserva la puerta de reemplazo antes de aplicar
+    SlotHold.objects.create(
+        holder="otra-sesion",
+        runway=runway,
+        gate=gate_2,
+        aircraft=aircraft,
+        pilot=pilot,
+        start_time=dep,
+        end_time=dep + timezone.timedelta(hours=1),
+        expires_at=timezone.now() + timezone.timedelta(minutes=10),
+    )
+    with pytest.raises(OutageError):
+        apply_outage(plan)
+    flight.refresh_from_db()
+    assert flight.gate == gate
+
+    # Un plan nuevo ya no usa la puerta reservada; quien la reservó sí puede usarla
+    assert [f[0] for f in plan_outage("gate", gate.id, timezone.now()).stranded] == [
+        flight.id
+    ]
+    assert apply_outage(plan, holder="otra-sesion") == 1
+    flight.refresh_from_db()
+    assert flight.gate == gate_2
+
+
+@pytest.mark.django_db
+def test_outage_view_previews_then_applies(
+    client, runway, gate, gate_2, aircraft, pilot
+):
+    dep = timezone.now() + timezone.timedelta(days=1)
+    flight = Flight.objects.create(
+        flight_number="OT200",
+        origin="Havana",
+        destination="Miami",
+        departure_time=dep,
+        arrival_time=dep + timezone.timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    url = reverse("gate_outage", args=[gate.pk])
+    data = {"start_time": timezone.now().strftime("%Y-%m-%dT%H:%M")}
+
+    resp = client.post(url, data)
+    assert resp.status_code == 200
+    assert resp.context["plan"].affected_count == 1
+    flight.refresh_from_db()
+    assert flight.gate == gate
+
+    resp = client.post(url, {**data, "apply": "1"})
+    assert resp.status_code == 302
+    flight.refresh_from_db()
+    assert flight.gate == gate_2
+    assert Gate.objects.get(pk=gate.pk).is_active
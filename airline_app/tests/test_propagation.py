@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.urls import reverse
+
+from airline_app.audit import audit_schedule
+from airline_app.generator import generate_schedule
+from airline_app.models import Flight
+from airline_app.occupancy import Occupancy
+from airline_app.propagation import propagate_delay, simulate
+
+T0 = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _at(hours):
+    return T0 + timedelta(hours=hours)
+
+
+def test_simulate_pushes_downstream_flights_by_minimal_shift():
+    occupancy = Occupancy()
+    # A y B comparten aeronave (24 h de mantenimiento); B y C comparten piloto
+    occupancy.add_flight(1, _at(10), _at(12), "SCHEDULED", 1, 1, 1, [1, 10])
+    occupancy.add_flight(2, _at(38), _at(40), "SCHEDULED", 2, 2, 1, [2, 11])
+    occupancy.add_flight(3, _at(41), _at(43), "SCHEDULED", 3, 3, 2, [2, 12])
+    occupancy.add_flight(4, _at(11), _at(13), "SCHEDULED", 4, 4, 3, [3, 13])
+
+    result = simulate(occupancy, 1, _at(14), _at(16))
+
+    assert [(s.flight_id, s.delay, s.cause) for s in result.shifts] == [
+        (2, timedelta(hours=2), ("aircraft", 1, 1)),
+        (3, timedelta(hours=1), ("personnel", 2, 2)),
+    ]
+    assert not result.unresolved
+
+
+@pytest.mark.django_db
+def test_propagate_delay_over_a_days_traffic_is_fast_and_conflict_free(
+    count_queries,
+):
+    generate_schedule(1000, seed=11, days=1)
+    flight = Flight.objects.filter(status="SCHEDULED").order_by("departure_time")[100]
+
+    results = []
+    queries = count_queries(
+        lambda: results.append(
+            propagate_delay(flight, flight.departure_time + timedelta(hours=8))
+        )
+    )
+    result = results[0]
+
+    assert queries == 2
+    assert result.elapsed < 0.5
+    assert not result.unresolved
+    assert result.shifts
+
+    # Aplicar la propuesta no deja conflictos
+    Flight.objects.filter(pk=flight.pk).update(
+        departure_time=flight.departure_time + timedelta(hours=8),
+        arrival_time=flight.arrival_time + timedelta(hours=8),
+    )
+    for shift in result.shifts:
+        Flight.objects.filter(pk=shift.flight_id).update(
+            departure_time=shift.new_departure, arrival_time=shift.new_arrival
+        )
+    assert not [i for i in audit_schedule().issues if i.kind != "constraint_violation"]
+
+
+@pytest.mark.django_db
+def test_propagate_delay_follows_the_cascade_past_the_horizon(
+    runway, gate, aircraft, pilot
+):
+    # Cinco vuelos de la misma aeronave separados 28 horas (2 de holgura tras el
+    # mantenimiento): con 10 horas de retraso la cascada sale de la ventana inicial
+    flights = Flight.objects.bulk_create(
+        Flight(
+            flight_number=f"CH{n}",
+            origin="Havana",
+            destination="Miami",
+            departure_time=_at(28 * n),
+            arrival_time=_at(28 * n + 2),
+            runway=runway,
+            gate=gate,
+            aircraft=aircraft,
+            pilot=pilot,
+        )
+        for n in range(5)
+    )
+
+    result = propagate_delay(flights[0], _at(10))
+
+    assert [(s.flight_id, s.delay) for s in result.shifts] == [
+        (flight.pk, timedelta(hours=hours))
+        for flight, hours in zip(flights[1:], [8, 6, 4, 2])
+    ]
+    assert not result.unresolved
+
+
+@pytest.mark.django_db
+def test_delay_simulation_view_lists_affected_flights(client):
+    generate_schedule(200, seed=3, days=1)
+    flight = Flight.objects.filter(status="SCHEDULED").order_by("departure_time")[0]
+    new_departure = flight.departure_time + timedelta(hours=6)
+
+    resp = client.post(
+        reverse("flight_delay_simulation", args=[flight.pk]),
+        {"new_departure_time": new_departure.strftime("%Y-%m-%dT%H:%M")},
+    )
+
+    assert resp.status_code == 200
+    assert resp.context["result"].flight_id == flight.pk
@@ -0,0 +1,204 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.generator import generate_schedule
+from airline_app.jobs import enqueue
+from airline_app.middleware import get_query_budget
+from airline_app.models import (
+    Aircraft,
+    Flight,
+    Gate,
+    Job,
+    Personnel,
+    ResourceConstraint,
+    Runway,
+)
+from airline_app.urls import urlpatterns
+
+# Modelo de los objetos de las URLs con <pk>, según el prefijo del nombre de la URL.
+# Una vista nueva con <pk> sobre otro modelo necesita su entrada aquí.
+PK_MODELS = {
+    "runway": Runway,
+    "gate": Gate,
+    "personnel": Personnel,
+    "aircraft": Aircraft,
+    "flight": Flight,
+    "constraint": ResourceConstraint,
+    "job": Job,
+}
+
+# Presupuestos de las operaciones del modelo Flight (consultas por llamada)
+MODEL_BUDGETS = {
+    "full_clean": 14,
+    "save": 15,
+    "validate_copilots": 4,
+}
+
+URL_NAMES = [pattern.name for pattern in urlpatterns if pattern.name]
+
+# Vistas que solo aceptan POST (se miden en test_form_posts_within_budget...)
+POST_ONLY = {"flight_validate"}
+
+# El horario grande tiene cien veces más vuelos: una consulta por fila no pasa desapercibida
+SMALL = {"flights": 60, "seed": 1, "constraints": 12, "prefix": "QS"}
+LARGE = {"flights": 6000, "seed": 2, "constraints": 40, "prefix": "QL"}
+
+
+def _seed(size):
+    enqueue("update_rollups")
+    return generate_schedule(
+        size["flights"],
+        seed=size["seed"],
+        constraints=size["constraints"],
+        prefix=size["prefix"],
+    )
+
+
+def _url(name):
+    pattern = next(p for p in urlpatterns if p.name == name)
+    if name == "flight_resource_choices":
+        # Ventana del vuelo más reciente (distinta en cada horario sembrado, sin caché)
+        flight = Flight.objects.order_by("-pk").first()
+        departure = timezone.localtime(flight.departure_time)
+        arrival = timezone.localtime(flight.arrival_time)
+        return (
+            f"{reverse(name)}?departure_time={departure:%Y-%m-%dT%H:%M}"
+            f"&arrival_time={arrival:%Y-%m-%dT%H:%M}"
+        )
+    if name == "resource_autocomplete":
+        return reverse(name, args=["personnel"]) + "?active=1&page=2"
+    if "pk" not in pattern.pattern.converters:
+        return reverse(name)
+    model = PK_MODELS.get(name.split("_")[0])
+    assert model is not None, f"Agregar el modelo de '{name}' a PK_MODELS"
+    # El objeto más reciente pertenece al último horario sembrado
+    return reverse(name, kwargs={"pk": model.objects.order_by("-pk").first().pk})
+
+
+def _queries(response):
+    assert response.status_code in (200, 302)
+    return response.wsgi_request.query_recorder.count
+
+
+def _post_data(name, start, resources):
+    dep = start + timezone.timedelta(days=200)
+    arr = dep + timezone.timedelta(hours=2)
+    if name == "check_availability":
+        return [
+            {
+                "resource_type": resource_type,
+                "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+                "end_time": (start + timezone.timedelta(hours=3)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+            }
+            for resource_type in ["runway", "gate", "aircraft", "personnel"]
+        ]
+    if name == "find_slot":
+        flight = Flight.objects.order_by("-pk").first()
+        return [
+            {
+                "runway": flight.runway_id,
+                "gate": flight.gate_id,
+                "aircraft": flight.aircraft_id,
+                "pilot": flight.pilot_id,
+                "duration_hours": "2",
+                "start_search_from": start.strftime("%Y-%m-%dT%H:%M"),
+            }
+        ]
+    return [
+        {
+            "flight_number": f"QB{start:%m%d}",
+            "origin": "Havana",
+            "destination": "Miami",
+            "departure_time": dep.strftime("%Y-%m-%dT%H:%M"),
+            "arrival_time": arr.strftime("%Y-%m-%dT%H:%M"),
+            "status": "SCHEDULED",
+            "runway": resources["runway"].id,
+            "gate": resources["gate"].id,
+            "aircraft": resources["aircraft"].id,
+            "pilot": resources["pilot"].id,
+            "copilots": [resources["copilot"].id],
+        }
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", [name for name in URL_NAMES if name not in POST_ONLY])
+def test_view_queries_within_budget_and_independent_of_data_size(
+    query_budget_client, name
+):
+    budget = get_query_budget(name)
+    assert budget is not None, f"La vista '{name}' no tiene presupuesto de consultas"
+
+    _seed(SMALL)
+    small = _queries(query_budget_client.get(_url(name)))
+    _seed(LARGE)
+    large = _queries(query_budget_client.get(_url(name)))
+
+    assert large == small
+    assert large <= budget
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name", ["check_availability", "find_slot", "flight_create", "flight_validate"]
+)
+def test_form_posts_within_budget_and_independent_of_data_size(
+    query_budget_client, name, runway, gate, aircraft, pilot, copilot
+):
+    resources = {
+        "runway": runway,
+        "gate": gate,
+        "aircraft": aircraft,
+        "pilot": pilot,
+        "copilot": copilot,
+    }
+    counts = []
+    for size, offset in [(SMALL, 0), (LARGE, 20)]:
+        start = _seed(size)["start"] + timezone.timedelta(days=offset)
+        counts.append(
+            [
+                _queries(query_budget_client.post(reverse(name), data))
+                for data in _post_data(name, start, resources)
+            ]
+        )
+
+    assert counts[0] == counts[1]
+    assert max(counts[1]) <= get_query_budget(name)
+
+
+@pytest.mark.django_db
+def test_flight_operations_within_budget_and_independent_of_data_size(
+    count_queries, runway, gate, aircraft, pilot, copilot
+):
+    def operations(size, number, days):
+        _seed(size)
+        dep = timezone.now() + timezone.timedelta(days=days)
+        flight = Flight(
+            flight_number=number,
+            origin="Havana",
+            destination="Miami",
+            departure_time=dep,
+            arrival_time=dep + timezone.timedelta(hours=2),
+            status="SCHEDULED",
+            runway=runway,
+            gate=gate,
+            aircraft=aircraft,
+            pilot=pilot,
+        )
+        counts = {
+            "full_clean": count_queries(flight.full_clean),
+            "save": count_queries(flight.save),
+        }
+        flight.copilots.add(copilot)
+        counts["validate_copilots"] = count_queries(flight.validate_copilots)
+        return counts
+
+    small = operations(SMALL, "QB-SMALL", 200)
+    large = operations(LARGE, "QB-LARGE", 220)
+
+    assert small == large
+    for operation, queries in large.items():
+        assert queries <= MODEL_BUDGETS[operation], operation
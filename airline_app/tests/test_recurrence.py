@@ -0,0 +1,203 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.utils import timezone
+
+from django.core.exceptions import ValidationError
+
+from airline_app.availability import available_choices, available_resources
+from airline_app.models import Flight, RecurringFlight
+from airline_app.occupancy import Occupancy
+from airline_app.recurrence import materialize_recurring, pending_occurrences
+from airline_app.validation import validate_flights
+
+
+def _pattern(runway, gate, aircraft, pilot, copilot, **kwargs):
+    fields = {
+        "flight_number": "RC100",
+        "origin": "Havana",
+        "destination": "Miami",
+        "weekdays": "135",
+        "departure_time": time(10, 0),
+        "duration_minutes": 120,
+        "start_date": timezone.localdate() + timedelta(days=1),
+        **kwargs,
+    }
+    pattern = RecurringFlight.objects.create(
+        runway=runway, gate=gate, aircraft=aircraft, pilot=pilot, **fields
+    )
+    pattern.copilots.add(copilot)
+    return pattern
+
+
+def _days(pattern, first, last):
+    return [
+        first + timedelta(days=i)
+        for i in range((last - first).days + 1)
+        if pattern.runs_on(first + timedelta(days=i))
+    ]
+
+
+@pytest.mark.django_db
+def test_materialize_creates_occurrences_within_horizon(
+    runway, gate, aircraft, pilot, copilot, count_queries
+):
+    pattern = _pattern(runway, gate, aircraft, pilot, copilot)
+    today = timezone.localdate()
+
+    queries = count_queries(materialize_recurring, 7)
+    pattern.refresh_from_db()
+    assert pattern.materialized_until == today + timedelta(days=7)
+
+    # Un horizonte más largo cuesta las mismas consultas
+    assert count_queries(materialize_recurring, 28) == queries
+
+    days = _days(pattern, today, today + timedelta(days=28))
+    flights = Flight.objects.filter(recurring_flight=pattern).order_by("departure_time")
+    assert [timezone.localdate(f.departure_time) for f in flights] == days
+    assert flights[0].flight_number == f"RC100-{days[0]:%y%m%d}"
+    assert all(list(f.copilots.all()) == [copilot] for f in flights)
+
+    # Ya materializado: no se duplica
+    assert materialize_recurring(28).created == 0
+    assert Flight.objects.count() == len(days)
+
+
+@pytest.mark.django_db
+def test_materialize_skips_conflicting_occurrences(
+    runway, gate, gate_2, aircraft, pilot, copilot
+):
+    today = timezone.localdate()
+    first = next(
+        day
+        for day in (today + timedelta(days=i) for i in range(1, 8))
+        if day.isoweekday() in (1, 3, 5)
+    )
+    departure = timezone.make_aware(datetime.combine(first, time(11, 0)))
+    # Un vuelo reservado antes de crear el patrón (después, ``Flight.clean`` lo rechaza)
+    Flight(
+        flight_number="AA100",
+        origin="Havana",
+        destination="Madrid",
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=1),
+        runway=runway,
+        gate=gate_2,
+        aircraft=aircraft,
+        pilot=pilot,
+    ).save()
+    pattern = _pattern(runway, gate, aircraft, pilot, copilot)
+    assert _days(pattern, today, today + timedelta(days=14))[0] == first
+    inactive = _pattern(
+        runway,
+        gate_2,
+        aircraft,
+        pilot,
+        copilot,
+        flight_number="RC200",
+        weekdays="7",
+        is_active=False,
+    )
+
+    result = materialize_recurring(14)
+
+    assert [o.date for o, _ in result.skipped] == [first]
+    assert "runway" in result.skipped[0][1]
+    assert result.created == len(_days(pattern, today, today + timedelta(days=14))) - 1
+    assert not Flight.objects.filter(recurring_flight=inactive).exists()
+
+
+@pytest.mark.django_db
+def test_pending_occurrences_block_resources(
+    runway, gate, gate_2, aircraft, pilot, copilot
+):
+    pattern = _pattern(runway, gate, aircraft, pilot, copilot)
+    today = timezone.localdate()
+    first = _days(pattern, today, today + timedelta(days=14))[0]
+    start = timezone.make_aware(datetime.combine(first, time(10, 30)))
+    end = start + timedelta(hours=1)
+
+    assert [o.date for o in pending_occurrences(start, end)] == [first]
+    occupancy = Occupancy.load(start, end, gate_ids=[gate.id])
+    assert not occupancy.is_free("gate", gate.id, start, end)
+    assert Occupancy.load(start, end, recurring=False).is_free(
+        "gate", gate.id, start, end
+    )
+    assert list(available_resources("gate", start, end)) == [gate_2]
+
+    # Materializadas, las ocurrencias se ven como vuelos y ya no como pendientes
+    materialize_recurring(14)
+    assert pending_occurrences(start, end) == []
+    occupancy = Occupancy.load(start, end)
+    assert all(flight_id > 0 for flight_id in occupancy.flights)
+    assert list(available_resources("gate", start, end)) == [gate_2]
+
+
+@pytest.mark.django_db
+def test_bookings_cannot_take_resources_reserved_by_pending_occurrences(
+    runway, gate, gate_2, aircraft, pilot, copilot
+):
+    pattern = _pattern(runway, gate, aircraft, pilot, copilot)
+    today = timezone.localdate()
+    days = _days(pattern, today, today + timedelta(days=14))
+    departure = timezone.make_aware(datetime.combine(days[0], time(11, 0)))
+    arrival = departure + timedelta(hours=1)
+    flight = Flight(
+        flight_number="AA100",
+        origin="Havana",
+        destination="Madrid",
+        departure_time=departure,
+        arrival_time=arrival,
+        runway=runway,
+        gate=gate_2,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+
+    with pytest.raises(ValidationError) as excinfo:
+        flight.full_clean()
+    assert {
+        field: [error.code for error in errors]
+        for field, errors in excinfo.value.error_dict.items()
+    } == {
+        "runway": ["runway_reserved"],
+        "aircraft": ["aircraft_reserved"],
+        "pilot": ["pilot_reserved"],
+    }
+    with pytest.raises(ValidationError) as excinfo:
+        flight.validate_copilots([copilot])
+    assert [error.code for error in excinfo.value.error_list] == ["copilot_reserved"]
+
+    # Las opciones del formulario y la validación en seco tampoco los ofrecen
+    choices = available_choices(departure, arrival)
+    assert [choice["id"] for choice in choices["gate"]] == [gate_2.id]
+    assert choices["runway"] == choices["pilot"] == choices["copilots"] == []
+    [result] = validate_flights(
+        [
+            {
+                "flight_number": "AA100",
+                "origin": "Havana",
+                "destination": "Madrid",
+                "departure_time": departure.isoformat(),
+                "arrival_time": arrival.isoformat(),
+                "runway": runway.pk,
+                "gate": gate_2.pk,
+                "aircraft": aircraft.pk,
+                "pilot": pilot.pk,
+                "copilots": [copilot.pk],
+            }
+        ]
+    )
+    assert {
+        field: [error["code"] for error in errors]
+        for field, errors in result["errors"].items()
+    } == {
+        "runway": ["runway_reserved"],
+        "aircraft": ["aircraft_reserved"],
+        "pilot": ["pilot_reserved"],
+        "copilots": ["copilot_reserved"],
+    }
+
+    # La ocurrencia se materializa sin perderse
+    assert materialize_recurring(14).skipped == []
+    assert Flight.objects.filter(recurring_flight=pattern).count() == len(days)
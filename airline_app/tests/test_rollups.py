@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from airline_app import analytics
+from airline_app.generator import generate_schedule
+from airline_app.models import DailyResourceRollup, DailyRouteRollup, Flight, RollupDay
+from airline_app.rollups import (
+    backfill_rollups,
+    day_start,
+    pending_days,
+    update_rollups,
+)
+
+
+def _live_totals():
+    flights = Flight.objects.exclude(status="CANCELLED")
+    return {
+        "flights": flights.count(),
+        "runways": dict(
+            flights.values_list("runway_id").annotate(Count("id")).order_by()
+        ),
+        "routes": flights.values("origin", "destination").distinct().count(),
+    }
+
+
+def _rolled_up_totals():
+    runways = DailyResourceRollup.objects.filter(resource_type="runway")
+    return {
+        "flights": RollupDay.objects.aggregate(total=Sum("flights"))["total"],
+        "runways": dict(
+            runways.values_list("resource_id").annotate(Sum("flights")).order_by()
+        ),
+        "routes": DailyRouteRollup.objects.values("origin", "destination")
+        .distinct()
+        .count(),
+    }
+
+
+@pytest.mark.django_db
+def test_backfill_in_chunks_matches_flights_and_feeds_analytics(count_queries):
+    summary = generate_schedule(400, seed=3, days=6, cancelled_share=0.1)
+
+    chunks = list(backfill_rollups(chunk_days=2))
+
+    assert len(chunks) >= 3
+    assert _rolled_up_totals() == _live_totals()
+
+    first = timezone.localdate(summary["start"]) + timedelta(days=1)
+    start = day_start(first)
+    end = day_start(first + timedelta(days=3))
+    report = analytics.period_report(start, end)
+    assert report.rolled_up_at is not None
+    assert sum(flights for _, _, flights in report.routes) <= Flight.objects.count()
+    # Con los rollups, la cantidad de consultas no depende de los vuelos del periodo
+    assert count_queries(
+        analytics.compute_report, start, end, (first, first, None)
+    ) == (
+        count_queries(
+            analytics.compute_report,
+            start,
+            end,
+            (first, first + timedelta(days=2), None),
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_update_recomputes_only_changed_and_stale_days():
+    summary = generate_schedule(200, seed=4, days=5)
+    list(backfill_rollups())
+    assert pending_days() == set()
+
+    moved, deleted = Flight.objects.order_by("departure_time")[:2]
+    old_day = timezone.localdate(moved.departure_time)
+    moved.departure_time += timedelta(days=10)
+    moved.arrival_time += timedelta(days=10)
+    moved.save()
+    deleted_day = timezone.localdate(deleted.departure_time)
+    deleted.delete()
+
+    assert pending_days() == {
+        old_day,
+        deleted_day,
+        timezone.localdate(moved.departure_time),
+    }
+    runs = update_rollups()
+
+    assert sum((last - first).days + 1 for first, last, _ in runs) <= 3
+    assert pending_days() == set()
+    assert _rolled_up_totals() == _live_totals()
+
+
+@pytest.mark.django_db
+def test_rollup_commands(capsys):
+    generate_schedule(50, seed=5, days=2)
+
+    call_command("backfill_rollups", chunk_days=1)
+    assert RollupDay.objects.exists()
+    Flight.objects.filter(pk=Flight.objects.first().pk).update(
+        updated_at=timezone.now() + timedelta(minutes=1)
+    )
+    call_command("update_rollups")
+
+    output = capsys.readouterr().out
+    assert "vuelos agregados" in output
+    assert "1 días recalculados" in output
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from airline_app import slot_search
+from airline_app.models import Aircraft, Flight, ResourceConstraint
+
+
+@pytest.fixture()
+def schedule(make_flight, gate_2):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+    make_flight(start + timedelta(hours=3), "PS100")
+    make_flight(start + timedelta(days=3), "PS200", hours=18, gate=gate_2)
+    return start
+
+
+@pytest.mark.django_db
+def test_find_available_slots_matches_single_combination_search(
+    schedule, runway, gate, gate_2, aircraft, pilot, copilot
+):
+    other = Aircraft.objects.create(
+        registration_number="N54321",
+        model="A320",
+        manufacturer="Airbus",
+        capacity=150,
+        year_manufactured=2018,
+        status="OPERATIONAL",
+        last_maintenance_date=timezone.now(),
+    )
+    ResourceConstraint.objects.create(
+        name="Gate 2 sin A320",
+        constraint_type="MUTUAL_EXCLUSION",
+        primary_resource_type="gate",
+        primary_resource_id=gate_2.id,
+        related_resource_type="aircraft",
+        related_resource_id=other.id,
+    )
+    pilots = [pilot.id, copilot.id]
+    slots = Flight.find_available_slots(
+        [runway.id],
+        [gate.id, gate_2.id],
+        [aircraft.id, other.id],
+        pilots,
+        2,
+        start_search_from=schedule,
+        limit=10,
+    )
+
+    expected = []
+    for gate_id in [gate.id, gate_2.id]:
+        for aircraft_id in [aircraft.id, other.id]:
+            for pilot_id in pilots:
+                slot = Flight.find_next_available_slot(
+                    runway.id, gate_id, aircraft_id, pilot_id, 2, schedule
+                )
+                if slot:
+                    expected.append(
+                        {
+                            **slot,
+                            "runway_id": runway.id,
+                            "gate_id": gate_id,
+                            "aircraft_id": aircraft_id,
+                            "pilot_id": pilot_id,
+                        }
+                    )
+    expected.sort(key=lambda slot: slot["departure_time"])
+
+    assert slots == expected
+    assert len(slots) == 6  # la restricción excluye gate 2 con el A320
+    assert slots[0]["departure_time"] == schedule
+    assert (
+        Flight.find_available_slots(
+            [runway.id],
+            [gate.id, gate_2.id],
+            [aircraft.id, other.id],
+            pilots,
+            2,
+            schedule,
+            limit=1,
+        )
+        == expected[:1]
+    )
+
+
+@pytest.mark.django_db
+def test_parallel_search_matches_serial(
+    schedule, runway, gate, gate_2, aircraft, pilot
+):
+    args = ([runway.id], [gate.id, gate_2.id], [aircraft.id], [pilot.id], 3)
+
+    # Más combinaciones que workers: se reparten las combinaciones
+    serial = Flight.find_available_slots(*args, start_search_from=schedule)
+    assert Flight.find_available_slots(*args, schedule, workers=2) == serial
+
+    # Una sola combinación: se reparte la ventana de búsqueda
+    single = (runway.id, gate.id, aircraft.id, pilot.id, 3)
+    expected = Flight.find_next_available_slot(*single, schedule)
+    assert expected["departure_time"] > schedule + timedelta(days=1)
+    reports = []
+    assert (
+        Flight.find_next_available_slot(
+            *single,
+            schedule,
+            workers=3,
+            progress=lambda done, total, message: reports.append((done, total)),
+        )
+        == expected
+    )
+    # Avance al cargar y al terminar cada tarea del pool
+    assert reports == [(0, 30), (1, 3), (2, 3), (3, 3)]
+
+    # Las búsquedas siguientes reutilizan el pool y el segmento
+    pool, segment = slot_search._pool, slot_search._segment
+    assert Flight.find_available_slots(*args, schedule, workers=2) == serial
+    assert (slot_search._pool, slot_search._segment) == (pool, segment)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from airline_app.jobs import claim_next, enqueue, run_job
+from airline_app.models import Flight, Gate
+from airline_app.transitions import advance_statuses
+
+
+@pytest.fixture()
+def timeline(runway, gate, aircraft, pilot, copilot):
+    """Vuelos guardados en el futuro y llevados luego a sus horarios (ya pasados o no)."""
+    now = timezone.now()
+    gates = [gate] + [
+        Gate.objects.create(name=f"Gate T{i}", gate_code=f"T-{i}", terminal="T1")
+        for i in range(4)
+    ]
+    # número -> (estado, salida relativa a ahora, duración en horas)
+    plan = {
+        "TR100": ("SCHEDULED", timedelta(hours=-5), 2),
+        "TR200": ("DELAYED", timedelta(hours=-1), 3),
+        "TR300": ("IN_PROGRESS", timedelta(hours=-4), 1),
+        "TR400": ("CANCELLED", timedelta(hours=-8), 2),
+        "TR500": ("SCHEDULED", timedelta(days=2), 2),
+    }
+    for day, (number, (status, offset, hours)) in enumerate(plan.items()):
+        departure = now + timedelta(days=3 + 2 * day)
+        flight = Flight(
+            flight_number=number,
+            origin="Havana",
+            destination="Miami",
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+            runway=runway,
+            gate=gates[day],
+            aircraft=aircraft,
+            pilot=pilot,
+        )
+        flight.save()
+        Flight.objects.filter(pk=flight.pk).update(
+            status=status,
+            departure_time=now + offset,
+            arrival_time=now + offset + timedelta(hours=hours),
+        )
+    return now
+
+
+@pytest.mark.django_db
+def test_advance_statuses_updates_only_due_flights_in_batches(
+    timeline, runway, count_queries
+):
+    before = dict(Flight.objects.values_list("flight_number", "updated_at"))
+    completed = Flight.objects.get(flight_number="TR100")
+    assert not runway.is_available(completed.departure_time, completed.arrival_time)
+
+    assert advance_statuses(now=timeline, batch_size=1) == {
+        "COMPLETED": 2,
+        "IN_PROGRESS": 1,
+    }
+    flights = {
+        number: (status, version, updated_at)
+        for number, status, version, updated_at in Flight.objects.values_list(
+            "flight_number", "status", "version", "updated_at"
+        )
+    }
+    assert {number: row[0] for number, row in flights.items()} == {
+        "TR100": "COMPLETED",
+        "TR200": "IN_PROGRESS",
+        "TR300": "COMPLETED",
+        "TR400": "CANCELLED",
+        "TR500": "SCHEDULED",
+    }
+    # Solo las filas cambiadas invalidan sus cachés (updated_at y versión nuevos)
+    for number in ["TR400", "TR500"]:
+        assert flights[number][1:] == (1, before[number])
+    for number in ["TR100", "TR200", "TR300"]:
+        assert flights[number][1:] == (2, timeline)
+    # Un vuelo completado ya no bloquea la pista
+    assert runway.is_available(completed.departure_time, completed.arrival_time)
+
+    # Sin transiciones pendientes, una consulta por estado destino
+    assert count_queries(advance_statuses, timeline) == 2
+
+
+@pytest.mark.django_db
+def test_command_and_job_advance_statuses(timeline):
+    out = StringIO()
+    call_command("advance_statuses", stdout=out)
+    assert "1 vuelos en progreso y 2 completados" in out.getvalue()
+
+    Flight.objects.filter(flight_number="TR200").update(
+        arrival_time=timezone.now() - timedelta(minutes=1)
+    )
+    enqueue("advance_statuses")
+    job = run_job(claim_next("test"))
+    job.refresh_from_db()
+    assert job.result == {"COMPLETED": 1, "IN_PROGRESS": 0}
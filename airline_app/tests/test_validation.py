@@ -0,0 +1,191 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from airline_app.models import Flight, Gate, Personnel, ResourceConstraint
+from airline_app.validation import validate_flights
+
+
+@pytest.fixture()
+def departure():
+    departure = timezone.localtime().replace(second=0, microsecond=0)
+    return departure + timedelta(days=1)
+
+
+def _payload(number, departure, runway, gate, aircraft, pilot, copilot, hours=2):
+    return {
+        "flight_number": number,
+        "origin": "Havana",
+        "destination": "Miami",
+        "departure_time": departure.isoformat(),
+        "arrival_time": (departure + timedelta(hours=hours)).isoformat(),
+        "runway": runway.pk,
+        "gate": gate.pk,
+        "aircraft": aircraft.pk,
+        "pilot": pilot.pk,
+        "copilots": [copilot.pk],
+    }
+
+
+def _codes(result):
+    return {
+        field: [error["code"] for error in errors]
+        for field, errors in result["errors"].items()
+    }
+
+
+@pytest.mark.django_db
+def test_validation_reports_model_error_codes_without_saving(
+    departure, runway, gate, aircraft, pilot, copilot
+):
+    existing = Flight(
+        flight_number="VL100",
+        origin="Havana",
+        destination="Miami",
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=2),
+        runway=runway,
+        gate=gate,
+        aircraft=aircraft,
+        pilot=pilot,
+    )
+    existing.save()
+    existing.copilots.add(copilot)
+    ResourceConstraint.objects.create(
+        name="Pista sin piloto",
+        constraint_type="MUTUAL_EXCLUSION",
+        primary_resource_type="runway",
+        primary_resource_id=runway.id,
+        related_resource_type="personnel",
+        related_resource_id=pilot.id,
+    )
+
+    payload = _payload(
+        "VL100", departure, runway, gate, aircraft, pilot, copilot, hours=6
+    )
+    payload["destination"] = "havana"
+    overlapping, malformed, edit = validate_flights(
+        [
+            payload,
+            {"flight_number": "VL300", "copilots": "x"},
+            {
+                **_payload("VL100", departure, runway, gate, aircraft, pilot, copilot),
+                "id": existing.pk,
+            },
+        ]
+    )
+
+    assert not overlapping["valid"]
+    assert _codes(overlapping) == {
+        "flight_number": ["unique"],
+        "origin": ["invalid_origin_destination"],
+        "runway": ["runway_conflict"],
+        "gate": ["gate_conflict"],
+        "aircraft": ["aircraft_conflict"],
+        "pilot": ["pilot_conflict"],
+        "copilots": ["insufficient_copilots", "copilot_conflict"],
+        "__all__": ["mutual_exclusion_violation"],
+    }
+    assert _codes(malformed)["copilots"] == ["invalid_list"]
+    assert _codes(malformed)["departure_time"] == ["required"]
+    # La edición del propio vuelo no choca consigo misma (solo la restricción)
+    assert _codes(edit) == {"__all__": ["mutual_exclusion_violation"]}
+    assert Flight.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_batch_is_cumulative_and_costs_constant_queries(
+    departure, runway, gate, aircraft, pilot, copilot, count_queries
+):
+    first = _payload("VL200", departure, runway, gate, aircraft, pilot, copilot)
+    second = _payload("VL201", departure, runway, gate, aircraft, pilot, copilot)
+    results = validate_flights([first, second, first])
+    assert results[0] == {"valid": True, "errors": {}}
+    assert _codes(results[1])["gate"] == ["gate_conflict"]
+    assert _codes(results[2])["flight_number"] == ["unique"]
+
+    # Cien candidatos en recursos distintos: las mismas consultas que uno
+    gates = Gate.objects.bulk_create(
+        Gate(name=f"Gate V{i}", gate_code=f"V-{i}", terminal="T3") for i in range(100)
+    )
+    pilots = Personnel.objects.bulk_create(
+        Personnel(
+            first_name="Ana",
+            last_name=f"Piloto {i}",
+            employee_id=f"VP{i:03}",
+            personnel_type="PILOT",
+            license_number=f"LIC-V{i:03}",
+            years_of_experience=5,
+        )
+        for i in range(100)
+    )
+    batch = [
+        _payload(
+            f"VB{i:03}",
+            departure + timedelta(days=3 * i),
+            runway,
+            gates[i],
+            aircraft,
+            pilots[i],
+            copilot,
+        )
+        for i in range(100)
+    ]
+    assert count_queries(validate_flights, batch[:1]) == count_queries(
+        validate_flights, batch
+    )
+    assert all(result["valid"] for result in validate_flights(batch))
+
+
+@pytest.mark.django_db
+def test_validate_endpoint_accepts_json_batches_and_form_data(
+    client, departure, runway, gate, aircraft, pilot, copilot
+):
+    url = reverse("flight_validate")
+    payload = _payload("VL400", departure, runway, gate, aircraft, pilot, copilot)
+
+    response = client.post(
+        url, json.dumps([payload, payload]), content_type="application/json"
+    )
+    data = response.json()
+    assert not data["valid"]
+    assert [result["valid"] for result in data["results"]] == [True, False]
+
+    response = client.post(url, {**payload, "copilots": [copilot.pk]})
+    assert response.json() == {"valid": True, "errors": {}}
+
+    assert client.post(url, "{", content_type="application/json").status_code == 400
+    assert client.get(url).status_code == 405
+    assert not Flight.objects.exists()
+
+
+@pytest.mark.django_db
+def test_malformed_values_become_field_errors(
+    client, departure, runway, gate, aircraft, pilot, copilot
+):
+    payload = _payload("VL500", departure, runway, gate, aircraft, pilot, copilot)
+    malformed = [
+        {**payload, "departure_time": 5},
+        {**payload, "arrival_time": ["x"]},
+        {**payload, "flight_number": 500, "origin": {"city": "Havana"}},
+        {**payload, "runway": 10**30, "id": -1},
+        {**payload, "copilots": [10**30]},
+    ]
+
+    response = client.post(
+        reverse("flight_validate"),
+        json.dumps(malformed),
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert [_codes(result) for result in response.json()["results"]] == [
+        {"departure_time": ["invalid"]},
+        {"arrival_time": ["invalid"]},
+        {"flight_number": ["invalid"], "origin": ["invalid"]},
+        {"id": ["min_value"], "runway": ["max_value"]},
+        {"copilots": ["invalid"]},
+    ]
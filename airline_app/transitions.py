@@ -0,0 +1,74 @@
+"""
+Transiciones de estado de los vuelos según la hora.
+
+``Flight.status`` no cambia solo: un vuelo programado cuya hora ya pasó sigue bloqueando su
+pista y su puerta, y aparece en cada consulta de vuelos activos. ``advance_statuses``, ejecutado
+periódicamente (``python manage.py advance_statuses`` o el trabajo del mismo nombre, ver
+``airline_app.jobs``), mueve por lotes:
+
+- a completado los vuelos programados, retrasados o en progreso que ya llegaron;
+- a en progreso los programados o retrasados que ya salieron y todavía no llegan.
+
+Cada lote es un ``UPDATE`` por IDs (atómico por sí solo) que repite las condiciones de estado
+y horario, de modo que un vuelo editado o cancelado mientras tanto no se pisa. No pasa por
+``save()``/``full_clean()``: la transición no cambia recursos ni horarios, y ``full_clean``
+rechazaría justamente los vuelos del pasado. Solo las filas cambiadas reciben ``updated_at`` y
+una versión nueva, lo que invalida la caché de analítica de sus periodos, los rollups de sus
+días (``update_rollups``) y las ediciones abiertas sobre ellas (``Flight.version``), sin tocar
+el resto.
+
+Uso:
+    python manage.py advance_statuses --batch-size 1000
+"""
+
+import logging
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import metrics
+from .bulk_actions import STATUS_TRANSITIONS
+from .models import Flight
+
+logger = logging.getLogger("airline_app.transitions")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def due_conditions(now):
+    """Estado destino -> condición de horario, en el orden en que se aplican."""
+    # Completado primero: un vuelo que ya llegó no pasa antes por en progreso
+    return [
+        ("COMPLETED", Q(arrival_time__lte=now)),
+        ("IN_PROGRESS", Q(departure_time__lte=now, arrival_time__gt=now)),
+    ]
+
+
+def advance_statuses(now=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Aplica las transiciones vencidas por lotes de ``batch_size`` vuelos, llamando a
+    ``progress`` (``(hecho, total, mensaje)``) antes de cada lote.
+
+    Returns:
+        dict: Estado destino -> cantidad de vuelos que pasaron a él
+    """
+    now = now or timezone.now()
+    counts = {}
+    conditions = due_conditions(now)
+    for i, (status, condition) in enumerate(conditions):
+        due = Flight.objects.filter(condition, status__in=STATUS_TRANSITIONS[status])
+        counts[status] = 0
+        while True:
+            if progress:
+                progress(i, len(conditions), f"{counts[status]} vuelos a {status}")
+            ids = list(due.order_by().values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            # Un solo UPDATE por lote, que vuelve a exigir el estado y el horario
+            updated = due.filter(id__in=ids).update(
+                status=status, updated_at=now, version=F("version") + 1
+            )
+            counts[status] += updated
+            metrics.FLIGHT_STATUS_TRANSITIONS.inc(updated, status=status)
+            logger.info("%s vuelos pasaron a %s", updated, status)
+    return counts
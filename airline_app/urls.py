@@ -13,6 +13,12 @@ urlpatterns = [
         views.RunwayUpdateView.as_view(),
         name="runway_update",
     ),
+    path(
+        "pistas/<int:pk>/interrupcion/",
+        views.resource_outage,
+        {"resource_type": "runway"},
+        name="runway_outage",
+    ),
     path(
         "pistas/<int:pk>/eliminar/",
         views.RunwayDeleteView.as_view(),
@@ -25,6 +31,12 @@ urlpatterns = [
     path(
         "puertas/<int:pk>/editar/", views.GateUpdateView.as_view(), name="gate_update"
     ),
+    path(
+        "puertas/<int:pk>/interrupcion/",
+        views.resource_outage,
+        {"resource_type": "gate"},
+        name="gate_outage",
+    ),
     path(
         "puertas/<int:pk>/eliminar/", views.GateDeleteView.as_view(), name="gate_delete"
     ),
@@ -63,6 +75,12 @@ urlpatterns = [
         views.AircraftUpdateView.as_view(),
         name="aircraft_update",
     ),
+    path(
+        "aeronaves/<int:pk>/interrupcion/",
+        views.resource_outage,
+        {"resource_type": "aircraft"},
+        name="aircraft_outage",
+    ),
     path(
         "aeronaves/<int:pk>/eliminar/",
         views.AircraftDeleteView.as_view(),
@@ -71,20 +89,41 @@ urlpatterns = [
     # URLs para los vuelos
     path("vuelos/", views.FlightListView.as_view(), name="flight_list"),
     path("vuelos/crear/", views.FlightCreateView.as_view(), name="flight_create"),
+    path(
+        "vuelos/recursos-libres/",
+        views.flight_resource_choices,
+        name="flight_resource_choices",
+    ),
+    path("vuelos/validar/", views.flight_validate, name="flight_validate"),
     path("vuelos/<int:pk>/", views.FlightDetailView.as_view(), name="flight_detail"),
     path(
         "vuelos/<int:pk>/editar/",
         views.FlightUpdateView.as_view(),
         name="flight_update",
     ),
+    path(
+        "vuelos/<int:pk>/simular-retraso/",
+        views.flight_delay_simulation,
+        name="flight_delay_simulation",
+    ),
     path(
         "vuelos/<int:pk>/eliminar/",
         views.FlightDeleteView.as_view(),
         name="flight_delete",
     ),
     # URLs de utilidad
+    path(
+        "recursos/<str:resource_type>/buscar/",
+        views.resource_autocomplete,
+        name="resource_autocomplete",
+    ),
     path("disponibilidad/", views.check_availability, name="check_availability"),
     path("buscar-horario/", views.find_slot, name="find_slot"),
+    path("analitica/", views.analytics, name="analytics"),
+    path("metrics", views.metrics, name="metrics"),
+    # URLs para trabajos en segundo plano
+    path("trabajos/<int:pk>/", views.job_detail, name="job_detail"),
+    path("trabajos/<int:pk>/estado/", views.job_status, name="job_status"),
     # URLs para restricciones de recursos
     path(
         "restricciones/", views.ConstraintListView.as_view(), name="constraint_list"
@@ -0,0 +1,351 @@
+"""
+Validación de vuelos sin guardarlos (dry run).
+
+``validate_flights`` aplica a uno o varios vuelos candidatos las reglas que ``FlightForm``,
+``Flight.full_clean`` y ``Flight.validate_copilots`` aplican al guardar: horarios, origen y
+destino, número de vuelo único, tipo y cantidad de tripulantes, conflictos de recursos,
+ocurrencias pendientes de vuelos recurrentes, reservas temporales de otros usuarios y
+restricciones activas. Retorna los errores por campo con sus códigos (los mismos que usa la
+validación del modelo) y no escribe nada.
+
+Todos los candidatos se validan contra una misma instantánea (``FlightSnapshot``) cargada con
+un número fijo de consultas: ocupación de los recursos referenciados en la ventana del lote
+(ver ``airline_app.occupancy``, con ocurrencias pendientes y reservas), los recursos mismos, el
+índice de restricciones y los números de vuelo existentes. Validar 100 candidatos cuesta casi
+lo mismo que validar uno.
+
+Los candidatos de un lote se validan en orden y cada uno aceptado ocupa sus recursos en la
+instantánea, de modo que un lote válido se puede crear completo: dos candidatos que usan la
+misma puerta al mismo tiempo no son ambos válidos.
+"""
+
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .availability import RESOURCE_MODELS
+from .constraints import ConstraintIndex, flight_resources
+from .forms import FlightPayloadForm
+from .generator import required_copilots
+from .holds import is_hold_id
+from .models import CONFLICT_FIELDS, Flight
+from .occupancy import Occupancy
+from .recurrence import is_occurrence_id
+
+CONFLICT_MESSAGES = {
+    "runway": "La pista seleccionada no está disponible durante el tiempo seleccionado.",
+    "gate": "La puerta seleccionada no está disponible durante el tiempo seleccionado.",
+    "aircraft": "El avión seleccionado no está disponible (requiere un mantenimiento de 24 "
+    "horas entre vuelos).",
+    "pilot": "El piloto seleccionado no está disponible durante el tiempo seleccionado.",
+}
+
+HELD_MESSAGE = "El recurso está reservado temporalmente por otro usuario durante el tiempo seleccionado."
+
+RESERVED_MESSAGE = (
+    "El recurso está reservado por un vuelo recurrente durante el tiempo seleccionado."
+)
+
+CONSTRAINT_CODES = {
+    "CO_REQUISITE": "co_requisite_violation",
+    "MUTUAL_EXCLUSION": "mutual_exclusion_violation",
+}
+
+# Candidatos como máximo por lote
+MAX_BATCH_SIZE = 1000
+
+
+def _candidate_id(position):
+    """ID virtual de un candidato aceptado del lote (negativo, nunca múltiplo de una reserva)."""
+    return -(position + 1)
+
+
+def _conflict_kind(conflicts):
+    """
+    Qué bloquea un recurso, con la misma prioridad que ``Flight.clean``: un vuelo (guardado
+    o candidato del lote), una ocurrencia pendiente o una reserva temporal; None si nada.
+    """
+    ids = [other for _, _, other in conflicts]
+    if any(not is_hold_id(other) and not is_occurrence_id(other) for other in ids):
+        return "conflict"
+    if any(is_occurrence_id(other) for other in ids):
+        return "reserved"
+    if ids:
+        return "held"
+    return None
+
+
+def _assignable(resource_type, resource):
+    if resource_type == "aircraft":
+        return resource.status == "OPERATIONAL"
+    return resource.is_active
+
+
+class FlightSnapshot:
+    """Estado compartido contra el que se validan los candidatos de un lote."""
+
+    def __init__(self, occupancy, index, resources, flight_numbers, now):
+        self.occupancy = occupancy
+        self.index = index
+        # tipo -> {id: recurso}
+        self.resources = resources
+        # número de vuelo -> id del vuelo que lo usa
+        self.flight_numbers = flight_numbers
+        self.now = now
+
+    @classmethod
+    def load(cls, candidates, holder=None, now=None):
+        """
+        Carga la instantánea para los candidatos dados (datos ya limpiados).
+
+        Args:
+            holder: Titular cuyas reservas temporales no bloquean (ver ``airline_app.holds``)
+        """
+        wanted = defaultdict(set)
+        for candidate in candidates:
+            for field, resource_type in CONFLICT_FIELDS.items():
+                wanted[resource_type].add(candidate[field])
+            wanted["personnel"].update(candidate["copilots"])
+        resources = {
+            resource_type: RESOURCE_MODELS[resource_type].objects.in_bulk(ids)
+            for resource_type, ids in wanted.items()
+        }
+
+        timed = [
+            candidate
+            for candidate in candidates
+            if candidate["departure_time"] < candidate["arrival_time"]
+        ]
+        if timed:
+            occupancy = Occupancy.load(
+                min(candidate["departure_time"] for candidate in timed),
+                max(candidate["arrival_time"] for candidate in timed),
+                runway_ids=wanted["runway"],
+                gate_ids=wanted["gate"],
+                aircraft_ids=wanted["aircraft"],
+                personnel_ids=wanted["personnel"],
+                holds=True,
+                holder=holder,
+            )
+        else:
+            occupancy = Occupancy()
+
+        flight_numbers = dict(
+            Flight.objects.filter(
+                flight_number__in=[c["flight_number"] for c in candidates]
+            ).values_list("flight_number", "id")
+        )
+        return cls(
+            occupancy,
+            ConstraintIndex.load(),
+            resources,
+            flight_numbers,
+            now or timezone.now(),
+        )
+
+    def check(self, candidate):
+        """
+        Errores del candidato, como ``{campo: [{"message", "code"}]}`` (vacío si es válido).
+        """
+        errors = defaultdict(list)
+
+        def error(field, message, code):
+            errors[field].append({"message": message, "code": code})
+
+        flight_id = candidate["id"]
+        exclude = (flight_id,) if flight_id else ()
+        departure = candidate["departure_time"]
+        arrival = candidate["arrival_time"]
+        timed = departure < arrival
+        duration = (arrival - departure).total_seconds() / 3600
+
+        owner = self.flight_numbers.get(candidate["flight_number"])
+        if owner is not None and owner != flight_id:
+            error(
+                "flight_number",
+                "Ya existe un vuelo con este número de vuelo.",
+                "unique",
+            )
+
+        if departure < self.now:
+            error(
+                "departure_time",
+                "La fecha de salida no puede ser anterior a la fecha actual.",
+                "invalid_departure_time",
+            )
+        if arrival < self.now:
+            error(
+                "arrival_time",
+                "La fecha de llegada no puede ser anterior a la fecha actual.",
+                "invalid_arrival_time",
+            )
+        if not timed:
+            error(
+                "arrival_time",
+                "La fecha de llegada debe ser posterior a la fecha de salida.",
+                "invalid_time_range",
+            )
+        elif duration > 20:
+            error(
+                "arrival_time",
+                "El vuelo no puede durar más de 20 horas.",
+                "invalid_time_range",
+            )
+
+        if candidate["origin"].lower() == candidate["destination"].lower():
+            error(
+                "origin",
+                "El origen y el destino no pueden ser iguales.",
+                "invalid_origin_destination",
+            )
+
+        # Recursos: existencia, tipo de personal y conflictos
+        found = {}
+        for field, resource_type in CONFLICT_FIELDS.items():
+            resource = self.resources[resource_type].get(candidate[field])
+            if resource is None or not _assignable(resource_type, resource):
+                error(field, "Seleccione un recurso válido y activo.", "invalid_choice")
+                continue
+            found[field] = resource
+            if field == "pilot" and resource.personnel_type != "PILOT":
+                error(
+                    field,
+                    "El personal seleccionado debe ser un piloto.",
+                    "invalid_pilot",
+                )
+                continue
+            if not timed:
+                continue
+            conflicts = self.occupancy.conflicts(
+                resource_type, resource.pk, departure, arrival, exclude
+            )
+            kind = _conflict_kind(conflicts)
+            if kind == "conflict":
+                error(field, CONFLICT_MESSAGES[field], f"{field}_conflict")
+            elif kind == "reserved":
+                error(field, RESERVED_MESSAGE, f"{field}_reserved")
+            elif kind == "held":
+                error(field, HELD_MESSAGE, f"{field}_held")
+
+        # Copilotos: cantidad según la duración, tipo y disponibilidad
+        copilot_ids = candidate["copilots"]
+        required = required_copilots(duration * 60)
+        if len(copilot_ids) < required:
+            error(
+                "copilots",
+                f"Flight requires at least {required} co-pilot(s) based on duration "
+                f"of {duration:.1f} hours. Currently assigned: {len(copilot_ids)}.",
+                "insufficient_copilots",
+            )
+        for copilot_id in copilot_ids:
+            copilot = self.resources["personnel"].get(copilot_id)
+            if copilot is None or not copilot.is_active:
+                error(
+                    "copilots",
+                    "Seleccione copilotos válidos y activos.",
+                    "invalid_choice",
+                )
+                continue
+            if copilot.personnel_type != "COPILOT":
+                error(
+                    "copilots",
+                    f"Personnel {copilot.get_full_name()} no es un co-piloto.",
+                    "invalid_copilot",
+                )
+                continue
+            if not timed:
+                continue
+            kind = _conflict_kind(
+                self.occupancy.conflicts(
+                    "personnel", copilot_id, departure, arrival, exclude
+                )
+            )
+            if kind == "conflict":
+                error(
+                    "copilots",
+                    f"Co-pilot {copilot.get_full_name()} no está disponible durante "
+                    "el tiempo seleccionado.",
+                    "copilot_conflict",
+                )
+            elif kind == "reserved":
+                error(
+                    "copilots",
+                    f"Co-pilot {copilot.get_full_name()} está reservado por un vuelo "
+                    "recurrente durante el tiempo seleccionado.",
+                    "copilot_reserved",
+                )
+
+        # Restricciones activas
+        if len(found) == len(CONFLICT_FIELDS):
+            for rule in self.index.violations(
+                flight_resources(
+                    candidate["runway"],
+                    candidate["gate"],
+                    candidate["aircraft"],
+                    candidate["pilot"],
+                )
+            ):
+                error(
+                    "__all__",
+                    f'RESTRICCIÓN VIOLADA: "{rule.name}".',
+                    CONSTRAINT_CODES[rule.constraint_type],
+                )
+        return dict(errors)
+
+    def add(self, candidate, position):
+        """Ocupa los recursos de un candidato aceptado para los siguientes del lote."""
+        key = _candidate_id(position)
+        if candidate["id"]:
+            self.occupancy.remove_flight(candidate["id"])
+        self.occupancy.add_flight(
+            key,
+            candidate["departure_time"],
+            candidate["arrival_time"],
+            candidate["status"],
+            runway=candidate["runway"],
+            gate=candidate["gate"],
+            aircraft=candidate["aircraft"],
+            personnel=[candidate["pilot"], *candidate["copilots"]],
+        )
+        self.flight_numbers[candidate["flight_number"]] = key
+
+
+def validate_flights(payloads, holder=None, now=None):
+    """
+    Valida vuelos candidatos sin guardarlos.
+
+    Args:
+        payloads: Lista de diccionarios con los campos de ``FlightPayloadForm`` (los recursos
+            como IDs y ``copilots`` como lista de IDs; ``id`` para validar la edición de un
+            vuelo existente)
+        holder: Titular cuyas reservas temporales no bloquean
+
+    Returns:
+        list[dict]: Por candidato, ``{"valid": bool, "errors": {campo: [{message, code}]}}``
+    """
+    forms = [
+        FlightPayloadForm(payload) if isinstance(payload, dict) else None
+        for payload in payloads
+    ]
+    candidates = [form.cleaned_data for form in forms if form and form.is_valid()]
+    snapshot = FlightSnapshot.load(candidates, holder, now) if candidates else None
+
+    results = []
+    for position, form in enumerate(forms):
+        if form is None:
+            errors = {
+                "__all__": [
+                    {
+                        "message": "Cada vuelo debe ser un objeto JSON.",
+                        "code": "invalid",
+                    }
+                ]
+            }
+        elif not form.is_valid():
+            errors = form.errors.get_json_data()
+        else:
+            errors = snapshot.check(form.cleaned_data)
+            if not errors:
+                snapshot.add(form.cleaned_data, position)
+        results.append({"valid": not errors, "errors": errors})
+    return results
@@ -1,10 +1,18 @@
-from datetime import datetime
+import hashlib
+import json
+from datetime import datetime, timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.db.models import Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -13,18 +21,56 @@ from django.views.generic import (
     UpdateView,
 )
 
+from . import analytics as app_analytics
+from . import availability
+from .autocomplete import search_resources
+from .constraints import violating_flights
+from .holds import HoldConflictError, place_hold, release_holds
+from .jobs import enqueue, job_label
+from .outages import OutageError, apply_outage, plan_outage
+from .propagation import propagate_delay
+from .validation import MAX_BATCH_SIZE, validate_flights
+from . import metrics as app_metrics
 from .forms import (
     AircraftForm,
+    AnalyticsPeriodForm,
+    DelaySimulationForm,
+    OutageForm,
     FlightForm,
     FlightSearchForm,
     GateForm,
     PersonnelForm,
     ResourceAvailabilityForm,
+    ResourceChoicesForm,
     RunwayForm,
     ResourceConstraintForm,
     FindSlotForm,
 )
-from .models import Aircraft, Flight, Gate, Personnel, Runway, ResourceConstraint
+from .models import (
+    Aircraft,
+    ArchivedFlight,
+    Flight,
+    Gate,
+    Job,
+    Personnel,
+    Runway,
+    ResourceConstraint,
+    StaleFlightError,
+)
+
+# Vuelos archivados listados como máximo en la búsqueda de vuelos
+ARCHIVED_SEARCH_LIMIT = 50
+
+# Las plantillas de los formularios consultan la base de datos al renderizarse (opciones de
+# los selects), por lo que las vistas asíncronas las renderizan en el hilo de la petición.
+arender = sync_to_async(render)
+
+
+def slot_holder(request):
+    """Clave de sesión que identifica al titular de las reservas temporales de horarios."""
+    if not request.session.session_key:
+        request.session.save()
+    return request.session.session_key
 
 
 def home(request):
@@ -329,41 +375,36 @@ class FlightListView(ListView):
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        form = FlightSearchForm(self.request.GET)
+        self.search_form = FlightSearchForm(self.request.GET)
 
-        if form.is_valid():
-            if form.cleaned_data.get("flight_number"):
-                queryset = queryset.filter(
-                    flight_number__icontains=form.cleaned_data["flight_number"]
-                )
-            if form.cleaned_data.get("origin"):
-                queryset = queryset.filter(
-                    origin__icontains=form.cleaned_data["origin"]
-                )
-            if form.cleaned_data.get("destination"):
-                queryset = queryset.filter(
-                    destination__icontains=form.cleaned_data["destination"]
-                )
-            if form.cleaned_data.get("status"):
-                queryset = queryset.filter(status=form.cleaned_data["status"])
-            if form.cleaned_data.get("date_from"):
-                queryset = queryset.filter(
-                    departure_time__gte=form.cleaned_data["date_from"]
-                )
-            if form.cleaned_data.get("date_to"):
-                queryset = queryset.filter(
-                    departure_time__lte=form.cleaned_data["date_to"]
-                )
+        if self.search_form.is_valid():
+            queryset = self.search_form.filter_queryset(queryset)
 
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["search_form"] = FlightSearchForm(self.request.GET)
+        context["search_form"] = self.search_form
+        # Los vuelos archivados solo se buscan si se pide explícitamente
+        if self.search_form.is_valid() and self.search_form.cleaned_data.get(
+            "include_archived"
+        ):
+            archived = self.search_form.filter_queryset(ArchivedFlight.objects.all())
+            context["archived_flights"] = archived[:ARCHIVED_SEARCH_LIMIT]
+            context["archived_count"] = archived.count()
         return context
 
 
-class FlightCreateView(CreateView):
+class SlotHolderFormMixin:
+    """Las reservas temporales de horarios propias no bloquean el vuelo que se valida."""
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        form.instance.slot_holder = self.request.session.session_key
+        return form
+
+
+class FlightCreateView(SlotHolderFormMixin, CreateView):
     """Crear un vuelo."""
 
     model = Flight
@@ -371,11 +412,23 @@ class FlightCreateView(CreateView):
     template_name = "airline_app/flight_form.html"
     success_url = reverse_lazy("flight_list")
 
+    def get_initial(self):
+        # Los datos del horario encontrado por la búsqueda llegan por la URL
+        initial = super().get_initial()
+        initial.update(
+            (name, value)
+            for name, value in self.request.GET.items()
+            if name in self.form_class.Meta.fields
+        )
+        return initial
+
     def form_valid(self, form):
         try:
+            # Validación de copilotos antes de guardar
+            form.instance.validate_copilots(form.cleaned_data["copilots"])
             self.object = form.save()
-            # Validación de copilotos
-            self.object.validate_copilots()
+            if form.instance.slot_holder:
+                release_holds(form.instance.slot_holder)
             messages.success(self.request, "Vuelo creado exitosamente.")
             return redirect(self.success_url)
         except ValidationError as e:
@@ -389,7 +442,7 @@ class FlightCreateView(CreateView):
             return self.form_invalid(form)
 
 
-class FlightUpdateView(UpdateView):
+class FlightUpdateView(SlotHolderFormMixin, UpdateView):
     """Actualizar un vuelo."""
 
     model = Flight
@@ -399,11 +452,15 @@ class FlightUpdateView(UpdateView):
 
     def form_valid(self, form):
         try:
+            # Valida los copilotos antes de guardar
+            form.instance.validate_copilots(form.cleaned_data["copilots"])
             self.object = form.save()
-            # Valida los copilotos
-            self.object.validate_copilots()
             messages.success(self.request, "Vuelo actualizado exitosamente.")
             return redirect(self.success_url)
+        except StaleFlightError as e:
+            # Otro usuario guardó el vuelo entre la validación y el guardado
+            form.add_conflict_error(e)
+            return self.form_invalid(form)
         except ValidationError as e:
             if hasattr(e, "error_dict"):
                 for field, errors in e.message_dict.items():
@@ -433,49 +490,115 @@ class FlightDetailView(DetailView):
     model = Flight
     template_name = "airline_app/flight_detail.html"
     context_object_name = "flight"
+    queryset = Flight.objects.select_related(
+        "runway", "gate", "aircraft", "pilot"
+    ).prefetch_related("copilots")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["duration"] = self.object.get_duration()
         context["required_copilots"] = self.object.get_required_copilots()
-        context["assigned_copilots"] = self.object.copilots.count()
+        context["assigned_copilots"] = len(self.object.copilots.all())
         return context
 
 
-def check_availability(request):
-    """Checkea la disponibilidad de los recursos en el tiempo dado."""
+def flight_delay_simulation(request, pk):
+    """Simula un nuevo horario para un vuelo y muestra los vuelos posteriores afectados."""
+    flight = get_object_or_404(Flight.objects.prefetch_related("copilots"), pk=pk)
+    context = {"flight": flight}
+
     if request.method == "POST":
-        form = ResourceAvailabilityForm(request.POST)
+        form = DelaySimulationForm(request.POST)
         if form.is_valid():
-            resource_type = form.cleaned_data["resource_type"]
-            start_time = form.cleaned_data["start_time"]
-            end_time = form.cleaned_data["end_time"]
+            result = propagate_delay(
+                flight,
+                form.cleaned_data["new_departure_time"],
+                form.cleaned_data["new_arrival_time"],
+            )
+            numbers = result.flight_numbers()
+            context["result"] = result
+            context["shifts"] = [
+                (shift, numbers.get(shift.flight_id), numbers.get(shift.cause[2]))
+                for shift in result.shifts
+            ]
+            context["unresolved"] = [
+                (resource_type, resource_id, numbers.get(other))
+                for resource_type, resource_id, other in result.unresolved
+            ]
+    else:
+        form = DelaySimulationForm(
+            initial={
+                "new_departure_time": flight.departure_time,
+                "new_arrival_time": flight.arrival_time,
+            }
+        )
 
-            available_resources = []
+    context["form"] = form
+    return render(request, "airline_app/flight_delay_simulation.html", context)
 
-            if resource_type == "runway":
-                resources = Runway.objects.filter(is_active=True)
-                for resource in resources:
-                    if resource.is_available(start_time, end_time):
-                        available_resources.append(resource)
 
-            elif resource_type == "gate":
-                resources = Gate.objects.filter(is_active=True)
-                for resource in resources:
-                    if resource.is_available(start_time, end_time):
-                        available_resources.append(resource)
+def resource_outage(request, resource_type, pk):
+    """
+    Planifica la interrupción de una pista, puerta o aeronave: muestra los vuelos afectados
+    con su recurso de reemplazo y, al confirmar, aplica la reasignación.
+    """
+    resource = get_object_or_404(availability.RESOURCE_MODELS[resource_type], pk=pk)
+    context = {"resource": resource, "resource_type": resource_type}
 
-            elif resource_type == "aircraft":
-                resources = Aircraft.objects.filter(status="OPERATIONAL")
-                for resource in resources:
-                    if resource.is_available(start_time, end_time):
-                        available_resources.append(resource)
+    if request.method == "POST":
+        form = OutageForm(request.POST)
+        if form.is_valid():
+            plan = plan_outage(
+                resource_type,
+                resource.pk,
+                form.cleaned_data["start_time"],
+                form.cleaned_data["end_time"],
+                holder=request.session.session_key,
+            )
+            if "apply" in request.POST:
+                try:
+                    count = apply_outage(plan, holder=request.session.session_key)
+                except OutageError as e:
+                    messages.error(request, str(e))
+                else:
+                    messages.success(request, f"{count} vuelo(s) reasignado(s).")
+                    if plan.stranded:
+                        messages.warning(
+                            request,
+                            f"{len(plan.stranded)} vuelo(s) sin recurso de reemplazo.",
+                        )
+                    return redirect(f"{resource_type}_detail", pk=resource.pk)
+            else:
+                replacements = availability.RESOURCE_MODELS[
+                    resource_type
+                ].objects.in_bulk({r.new_resource_id for r in plan.reassignments})
+                context["plan"] = plan
+                context["reassignments"] = [
+                    (r, replacements.get(r.new_resource_id)) for r in plan.reassignments
+                ]
+    else:
+        form = OutageForm(initial={"start_time": timezone.now()})
+
+    context["form"] = form
+    return render(request, "airline_app/resource_outage.html", context)
+
+
+async def check_availability(request):
+    """Checkea la disponibilidad de los recursos en el tiempo dado (vista asíncrona)."""
+    if request.method == "POST":
+        form = ResourceAvailabilityForm(request.POST)
+        if form.is_valid():
+            resource_type = form.cleaned_data["resource_type"]
+            start_time = form.cleaned_data["start_time"]
+            end_time = form.cleaned_data["end_time"]
 
-            elif resource_type == "personnel":
-                resources = Personnel.objects.filter(is_active=True)
-                for resource in resources:
-                    if resource.is_available(start_time, end_time):
-                        available_resources.append(resource)
+            # Una sola consulta por tipo: los recursos ocupados se excluyen como subconsulta
+            available_resources = await availability.aavailable_resources(
+                resource_type,
+                start_time,
+                end_time,
+                holder=request.session.session_key,
+            )
 
             context = {
                 "form": form,
@@ -484,11 +607,88 @@ def check_availability(request):
                 "start_time": start_time,
                 "end_time": end_time,
             }
-            return render(request, "airline_app/check_availability.html", context)
+            return await arender(
+                request, "airline_app/check_availability.html", context
+            )
     else:
         form = ResourceAvailabilityForm()
 
-    return render(request, "airline_app/check_availability.html", {"form": form})
+    return await arender(request, "airline_app/check_availability.html", {"form": form})
+
+
+def flight_resource_choices(request):
+    """Recursos libres en una ventana, en JSON, para las opciones del formulario de vuelos."""
+    form = ResourceChoicesForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    return JsonResponse(
+        availability.available_choices(
+            form.cleaned_data["departure_time"],
+            form.cleaned_data["arrival_time"],
+            exclude_flight_id=form.cleaned_data["flight"],
+            holder=request.session.session_key,
+        )
+    )
+
+
+# Solo valida: no escribe nada, por lo que las integraciones no necesitan el token CSRF
+@csrf_exempt
+@require_POST
+def flight_validate(request):
+    """
+    Valida uno o varios vuelos sin crearlos (ver ``airline_app.validation``).
+
+    Acepta un vuelo como datos de formulario o como objeto JSON, o un lote como lista JSON.
+    Un lote retorna ``{"valid": ..., "results": [...]}`` con un resultado por candidato.
+    """
+    if request.content_type != "application/json":
+        return JsonResponse(
+            validate_flights([request.POST], request.session.session_key)[0]
+        )
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+    if isinstance(payload, dict):
+        return JsonResponse(validate_flights([payload], request.session.session_key)[0])
+    if not isinstance(payload, list) or len(payload) > MAX_BATCH_SIZE:
+        return JsonResponse(
+            {"error": f"Envíe un vuelo o una lista de hasta {MAX_BATCH_SIZE} vuelos."},
+            status=400,
+        )
+
+    results = validate_flights(payload, request.session.session_key)
+    return JsonResponse(
+        {"valid": all(result["valid"] for result in results), "results": results}
+    )
+
+
+def resource_autocomplete(request, resource_type):
+    """Página de recursos que coinciden con el texto buscado, para los widgets de autocompletado."""
+    if resource_type not in availability.RESOURCE_MODELS:
+        raise Http404("Tipo de recurso desconocido.")
+
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 1
+    resources, more = search_resources(
+        resource_type,
+        request.GET.get("q", ""),
+        page,
+        active=bool(request.GET.get("active")),
+        personnel_type=request.GET.get("personnel_type"),
+    )
+    return JsonResponse(
+        {
+            "results": [
+                {"id": resource.pk, "label": str(resource)} for resource in resources
+            ],
+            "more": more,
+        }
+    )
 
 
 # Vistas de Restricciones de Recursos
@@ -501,8 +701,72 @@ class ConstraintListView(ListView):
     paginate_by = 10
     ordering = ["name"]
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Resuelve los recursos de la página completa de una vez (evita N+1 en la plantilla)
+        context[self.context_object_name] = ResourceConstraint.resolve_resources(
+            context[self.context_object_name]
+        )
+        return context
+
+
+class ConstraintViolationPreviewMixin:
+    """
+    Antes de guardar una restricción activa, muestra los vuelos programados que ya la violan
+    y pide confirmación. La revisión es una consulta SQL por restricción (ver
+    ``airline_app.constraints.violating_flights``).
+    """
+
+    violation_preview_limit = 50
+
+    @staticmethod
+    def violation_key(constraint):
+        """
+        Huella de la regla revisada. La confirmación solo vale para la misma regla: si el
+        usuario cambia los recursos o el tipo después de la revisión, se revisa de nuevo.
+        """
+        rule = [
+            constraint.constraint_type,
+            constraint.primary_resource_type,
+            constraint.primary_resource_id,
+            constraint.related_resource_type,
+            constraint.related_resource_id,
+        ]
+        return hashlib.sha256("|".join(map(str, rule)).encode()).hexdigest()[:16]
+
+    def preview_violations(self, form):
+        """Retorna la respuesta de confirmación, o None si se puede guardar directamente."""
+        if not form.cleaned_data.get("is_active"):
+            return None
+
+        constraint = form.save(commit=False)
+        key = self.violation_key(constraint)
+        if self.request.POST.get("confirm_violations") == key:
+            return None
+        violating = violating_flights(constraint).order_by("departure_time")
+        flights = list(violating[: self.violation_preview_limit])
+        if not flights:
+            return None
+
+        count = len(flights)
+        if count == self.violation_preview_limit:
+            count = violating.count()
+        messages.warning(
+            self.request,
+            f"{count} vuelo(s) programado(s) violan esta restricción. "
+            "Revise la lista y confirme para guardarla de todas formas.",
+        )
+        return self.render_to_response(
+            self.get_context_data(
+                form=form,
+                violating_flights=flights,
+                violation_count=count,
+                violation_key=key,
+            )
+        )
 
-class ConstraintCreateView(CreateView):
+
+class ConstraintCreateView(ConstraintViolationPreviewMixin, CreateView):
     """Crear restricción de recursos."""
 
     model = ResourceConstraint
@@ -511,11 +775,14 @@ class ConstraintCreateView(CreateView):
     success_url = reverse_lazy("constraint_list")
 
     def form_valid(self, form):
+        preview = self.preview_violations(form)
+        if preview:
+            return preview
         messages.success(self.request, "Restricción creada exitosamente.")
         return super().form_valid(form)
 
 
-class ConstraintUpdateView(UpdateView):
+class ConstraintUpdateView(ConstraintViolationPreviewMixin, UpdateView):
     """Actualizar restricción de recursos."""
 
     model = ResourceConstraint
@@ -524,6 +791,9 @@ class ConstraintUpdateView(UpdateView):
     success_url = reverse_lazy("constraint_list")
 
     def form_valid(self, form):
+        preview = self.preview_violations(form)
+        if preview:
+            return preview
         messages.success(self.request, "Restricción actualizada exitosamente.")
         return super().form_valid(form)
 
@@ -555,27 +825,68 @@ class ConstraintDetailView(DetailView):
 
 
 # Vista de búsqueda de horarios
-def find_slot(request):
-    """Buscar el próximo horario disponible para un vuelo."""
+async def find_slot(request):
+    """Buscar el próximo horario disponible para un vuelo (vista asíncrona)."""
     if request.method == "POST":
         form = FindSlotForm(request.POST)
-        if form.is_valid():
+        # La validación consulta los recursos elegidos (ModelChoiceField)
+        if await sync_to_async(form.is_valid)():
             runway = form.cleaned_data["runway"]
             gate = form.cleaned_data["gate"]
             aircraft = form.cleaned_data["aircraft"]
             pilot = form.cleaned_data["pilot"]
             duration_hours = float(form.cleaned_data["duration_hours"])
             start_search_from = form.cleaned_data.get("start_search_from")
+            if form.cleaned_data["hold_slot"] and not start_search_from:
+                # El formulario del vuelo trabaja en minutos: la reserva empieza en un minuto exacto
+                start_search_from = timezone.now().replace(
+                    second=0, microsecond=0
+                ) + timedelta(minutes=1)
+
+            if form.cleaned_data["run_in_background"]:
+                job = await sync_to_async(enqueue)(
+                    "find_slot",
+                    runway_id=runway.id,
+                    gate_id=gate.id,
+                    aircraft_id=aircraft.id,
+                    pilot_id=pilot.id,
+                    duration_hours=duration_hours,
+                    start_search_from=(
+                        start_search_from.isoformat() if start_search_from else None
+                    ),
+                    holder=request.session.session_key,
+                )
+                return redirect("job_detail", pk=job.pk)
 
-            result = Flight.find_next_available_slot(
+            result = await Flight.afind_next_available_slot(
                 runway_id=runway.id,
                 gate_id=gate.id,
                 aircraft_id=aircraft.id,
                 pilot_id=pilot.id,
                 duration_hours=duration_hours,
                 start_search_from=start_search_from,
+                holder=request.session.session_key,
             )
 
+            hold = None
+            taken = False
+            if result and form.cleaned_data["hold_slot"]:
+                # Reserva el horario encontrado mientras se llena el formulario del vuelo
+                try:
+                    hold = await sync_to_async(place_hold)(
+                        await sync_to_async(slot_holder)(request),
+                        runway.id,
+                        gate.id,
+                        aircraft.id,
+                        pilot.id,
+                        result["departure_time"],
+                        result["arrival_time"],
+                    )
+                except HoldConflictError:
+                    # Otro usuario reservó o tomó el horario entre la búsqueda y la reserva
+                    result = None
+                    taken = True
+
             context = {
                 "form": form,
                 "result": result,
@@ -584,9 +895,15 @@ def find_slot(request):
                 "aircraft": aircraft,
                 "pilot": pilot,
                 "duration_hours": duration_hours,
+                "hold": hold,
             }
 
-            if result:
+            if taken:
+                messages.warning(
+                    request,
+                    "Otro usuario tomó el horario encontrado antes de poder reservarlo. Busque de nuevo.",
+                )
+            elif result:
                 messages.success(
                     request,
                     f"¡Horario encontrado! Disponible desde {result['departure_time'].strftime('%Y-%m-%d %H:%M')} hasta {result['arrival_time'].strftime('%Y-%m-%d %H:%M')}",
@@ -597,9 +914,87 @@ def find_slot(request):
                     "No se encontró un horario disponible en los próximos 30 días con los recursos seleccionados.",
                 )
 
-            return render(request, "airline_app/find_slot.html", context)
+            return await arender(request, "airline_app/find_slot.html", context)
     else:
         form = FindSlotForm()
 
-    return render(request, "airline_app/find_slot.html", {"form": form})
-
+    return await arender(request, "airline_app/find_slot.html", {"form": form})
+
+
+# Vista de analítica
+def analytics(request):
+    """Ocupación de recursos, picos por terminal y horas bloque de un periodo."""
+    today = timezone.localdate()
+    form = AnalyticsPeriodForm(
+        request.GET
+        or {"start_date": today - timezone.timedelta(days=29), "end_date": today}
+    )
+    context = {"form": form}
+
+    if form.is_valid():
+        start = timezone.make_aware(
+            datetime.combine(form.cleaned_data["start_date"], datetime.min.time())
+        )
+        end = timezone.make_aware(
+            datetime.combine(
+                form.cleaned_data["end_date"] + timezone.timedelta(days=1),
+                datetime.min.time(),
+            )
+        )
+        report = app_analytics.period_report(start, end)
+        context["report"] = report
+        context["utilization"] = [
+            (label, report.utilization[resource_type])
+            for resource_type, label in ResourceConstraint.RESOURCE_TYPES
+        ]
+        context["profile"] = sorted(report.hourly_profile().items())
+        context["peak_max"] = max(
+            (max(hours) for _, hours in context["profile"]), default=0
+        )
+        context["block_hours"] = [
+            (registration, [hours.get(week, 0) for week in report.weeks])
+            for registration, hours in sorted(report.block_hours.items())
+        ]
+
+    return render(request, "airline_app/analytics.html", context)
+
+
+# Vistas de trabajos en segundo plano
+def job_detail(request, pk):
+    """Progreso y resultado de un trabajo en segundo plano."""
+    job = get_object_or_404(Job, pk=pk)
+    return render(
+        request,
+        "airline_app/job_detail.html",
+        {"job": job, "label": job_label(job.kind)},
+    )
+
+
+def job_status(request, pk):
+    """Estado de un trabajo en JSON, consultado periódicamente por la página del trabajo."""
+    job = get_object_or_404(Job, pk=pk)
+    return JsonResponse(
+        {
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "progress": job.progress,
+            "message": job.progress_message,
+            "finished": job.is_finished,
+            "result": job.result,
+            "error": job.error,
+        }
+    )
+
+
+# Vista de métricas
+def metrics(request):
+    """Expone las métricas del proceso en formato de texto de Prometheus."""
+    allowed_ips = getattr(settings, "METRICS_ALLOWED_IPS", None)
+    if allowed_ips is not None and request.META.get("REMOTE_ADDR") not in allowed_ips:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        app_metrics.registry.expose(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -51,6 +51,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "airline_app.middleware.MetricsMiddleware",
+    "airline_app.middleware.QueryInstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -124,3 +126,95 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Instrumentación de consultas por petición (airline_app.middleware)
+# Presupuesto de consultas SQL por vista; las vistas sin entrada usan QUERY_BUDGET_DEFAULT.
+
+QUERY_BUDGETS = {
+    "find_slot": 20,
+    "check_availability": 5,
+    "flight_resource_choices": 8,
+    "resource_autocomplete": 3,
+    "flight_create": 40,
+    "flight_update": 40,
+    "flight_validate": 12,
+}
+QUERY_BUDGET_DEFAULT = 50
+# "log" registra una advertencia, "raise" lanza QueryBudgetExceeded
+QUERY_BUDGET_ACTION = os.environ.get("QUERY_BUDGET_ACTION", "log")
+
+
+# Analítica de utilización (airline_app.analytics)
+# Segundos que se conserva en caché el informe de un periodo; cualquier cambio en sus vuelos
+# lo invalida antes.
+
+ANALYTICS_CACHE_TIMEOUT = 900
+
+
+# Opciones de recursos libres del formulario de vuelos (airline_app.availability)
+# Segundos que se conservan en caché las opciones de una ventana; un recurso ocupado entretanto
+# lo sigue rechazando la validación del vuelo.
+
+AVAILABLE_CHOICES_CACHE_TIMEOUT = 30
+
+
+# Listados del admin (airline_app.admin_mixins)
+# Segundos que se conservan en caché las opciones de los filtros por origen y destino; un valor
+# nuevo aparece en el filtro al vencer la caché.
+
+ADMIN_FILTER_CACHE_TIMEOUT = 600
+
+
+# Archivo de vuelos (airline_app.archive)
+# Días que los vuelos completados y cancelados permanecen en la tabla de vuelos antes de que
+# "python manage.py archive_flights" los mueva a la tabla de vuelos archivados.
+
+FLIGHT_ARCHIVE_RETENTION_DAYS = 365
+
+
+# Vuelos recurrentes (airline_app.recurrence)
+# Días hacia adelante en que "python manage.py materialize_recurring" convierte en vuelos las
+# ocurrencias de los patrones; más allá, la ocupación las calcula al vuelo.
+
+RECURRING_HORIZON_DAYS = 28
+
+
+# Trabajos en segundo plano (airline_app.jobs), ejecutados por "python manage.py run_workers"
+# Un trabajo en ejecución sin reportar progreso durante este tiempo se marca como fallido.
+
+JOB_STALE_SECONDS = 60 * 60
+
+
+# Reservas temporales de horarios (airline_app.holds)
+# Minutos que la búsqueda de horarios reserva los recursos encontrados; las reservas vencidas
+# se eliminan en lote con "python manage.py sweep_holds".
+
+SLOT_HOLD_MINUTES = 10
+
+
+# Métricas de Prometheus (airline_app.metrics), expuestas en /metrics
+# Con varios procesos WSGI, cada uno vuelca su estado en METRICS_DIR y /metrics los combina.
+
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "airline_app.performance": {
+            "handlers": ["console"],
+            "level": os.environ.get("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}